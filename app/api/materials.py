@@ -1,5 +1,4 @@
 from typing import Annotated, List, Optional
-import httpx
 from fastapi import (
     APIRouter,
     Depends,
@@ -9,22 +8,43 @@ from fastapi import (
     status,
     UploadFile,
     File,
+    Form,
 )
-from sqlmodel import select, delete
+from sqlmodel import delete
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy import func
 
 from app.core.auth import get_current_user
 from app.core.db import get_session
 from app.models import (
+    FridgeSummaryResponse,
     Material,
+    MaterialBatchUpdate,
     MaterialCreate,
     MaterialUpdate,
     MaterialResponse,
     Pagination,
+    ReceiptJobResponse,
 )
-from app.core.config import settings
-from app.services.materials import extract_items_from_ocr
+from app.services.expiry_refinement import expiry_refinement_queue
+from app.services.fridge_status import fridge_status_service
+from app.services.materials import (
+    MAX_BATCH_MATERIALS,
+    MaterialBatchError,
+    MaterialSort,
+    batch_update_materials,
+    bulk_create_materials,
+    fill_estimated_expiry,
+    fill_ingredient_ids,
+    list_materials,
+    search_materials,
+)
+from app.services.receipt_ingestion import (
+    ReceiptIngestionError,
+    ReceiptUpload,
+    ingest_receipt,
+    receipt_job_queue,
+)
+from app.utils.cursor import InvalidCursorError
 
 router = APIRouter()
 
@@ -35,35 +55,46 @@ async def get_materials(
     search: Optional[str] = None,
     cursor: Optional[str] = None,
     limit: int = 10,
+    sort: MaterialSort = "id",
     session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
 ):
-    query = select(Material)
-
-    if category:
-        query = query.where(Material.category == category)
     if search:
-        query = query.where(Material.name.contains(search))
-    if cursor:
-        query = query.where(Material.id > int(cursor))
-
-    query = query.order_by(Material.id).limit(limit + 1)
-
-    result = await session.execute(query)
-    materials = result.scalars().all()
-
-    has_next = False
-    next_cursor = None
+        # 이름 유사도 순 검색 (sort 무시, trigram 인덱스, cursor는 (유사도, id) keyset)
+        try:
+            materials, next_cursor = await search_materials(
+                session, user.id, search, category=category, cursor=cursor, limit=limit
+            )
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return Pagination[MaterialResponse](
+            result=materials, next_cursor=next_cursor, has_next=next_cursor is not None, size=limit
+        )
 
-    if len(materials) > limit:
-        has_next = True
-        materials = materials[:limit]
-        next_cursor = str(materials[-1].id)
+    try:
+        materials, next_cursor = await list_materials(
+            session, user.id, category=category, cursor=cursor, limit=limit, sort=sort
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return Pagination[MaterialResponse](
-        result=materials, next_cursor=next_cursor, has_next=has_next, size=limit
+        result=materials, next_cursor=next_cursor, has_next=next_cursor is not None, size=limit
     )
 
 
+@router.get("/summary", response_model=FridgeSummaryResponse)
+async def get_materials_summary(
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
+):
+    """
+    소비기한 우선순위별 재료 수 (HIGH: D-3 이내, MEDIUM: D-7 이내, NORMAL: 그 외)
+    재료 목록을 읽지 않고 fridge_status 한 행으로 응답합니다.
+    """
+    return await fridge_status_service.get_summary(session, user.id)
+
+
 @router.get("/{id}", response_model=MaterialResponse)
 async def get_material(
     id: int,
@@ -87,54 +118,49 @@ async def create_materials_from_receipt(
 ):
     content = await file.read()
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            "https://api.ocr.space/parse/image",
-            files={"file": (file.filename, content, file.content_type)},
-            data={
-                "apikey": settings.OCR_API_KEY,
-                "language": "kor",
-                "detectOrientation": "true",
-                "isTable": "true",
-                "OCREngine": "2",
-            },
-        )
+    try:
+        return await ingest_receipt(session, user.id, content, file.filename, file.content_type)
+    except ReceiptIngestionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
 
-    result = response.json()
-
-    data = ""
-    for threshold in [5, 10, 15, 20]:
-        if isinstance(data, list) and len(data) > 0:
-            break
-        data = extract_items_from_ocr(result, 10, threshold)
-
-    if isinstance(data, str):
-        raise HTTPException(status_code=400, detail=data)
-
-    materials = []
-    for item in data:
-        print(item)
-        material = Material(
-            name=item["name"],
-            price=item["price"],
-            quantity=item["quantity"],
-            currency="KRW",
-            category="기타",
-            purchased_at=func.now(),
-            expired_at=func.now(),
-            user_id=user.id,
-        )
-        materials.append(material)
 
-    for material in materials:
-        session.add(material)
+@router.post(
+    "/receipt/jobs",
+    response_model=ReceiptJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def create_receipt_job(
+    file: UploadFile = File(...),
+    webhook_url: Optional[str] = Form(None),
+    user=Depends(get_current_user),
+):
+    """
+    영수증 비동기 처리: 작업 ID를 바로 반환하고 OCR/항목 추출/저장은 백그라운드에서 수행
+    결과는 GET /materials/receipt/jobs/{job_id} 로 조회하거나 webhook_url로 전달받습니다.
+    """
+    content = await file.read()
+    try:
+        # webhook_url은 공인 주소로 resolve되는 http(s) URL만 허용 (SSRF 방지)
+        job = await receipt_job_queue.submit(
+            user.id,
+            ReceiptUpload(content=content, filename=file.filename, content_type=file.content_type),
+            webhook_url=webhook_url,
+        )
+    except ReceiptIngestionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return job.to_response()
 
-    if materials:
-        await session.commit()
-        for material in materials:
-            await session.refresh(material)
 
-    return materials
+@router.get("/receipt/jobs/{job_id}", response_model=ReceiptJobResponse)
+async def get_receipt_job(
+    job_id: str,
+    user=Depends(get_current_user),
+):
+    job = receipt_job_queue.store.get(job_id)
+    # 다른 사용자의 작업은 존재 여부도 노출하지 않음
+    if job is None or job.user_id != user.id:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return job.to_response()
 
 
 @router.post(
@@ -147,15 +173,65 @@ async def create_material(
     session: AsyncSession = Depends(get_session),
     user=Depends(get_current_user),
 ):
-    db_material = Material.model_validate(
-        Material(**material.model_dump(), user_id=user.id)
-    )
+    row = {**material.model_dump(), "user_id": user.id}
+    # 소비기한을 입력하지 않으면 규칙 기반으로 추정 (AI 보정은 백그라운드)
+    estimated = fill_estimated_expiry([row])
+    fill_ingredient_ids([row])
+
+    db_material = Material.model_validate(Material(**row))
     session.add(db_material)
+    await session.flush()
+    await fridge_status_service.refresh(session, [user.id])
     await session.commit()
     await session.refresh(db_material)
+
+    if estimated:
+        expiry_refinement_queue.enqueue([db_material])
     return db_material
 
 
+@router.post(
+    "/batch",
+    response_model=List[MaterialResponse],
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_materials_batch(
+    materials: List[MaterialCreate],
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
+):
+    """
+    재료 여러 개를 한 번에 생성 (INSERT ... RETURNING 한 번, 입력 순서대로 반환)
+    """
+    if len(materials) > MAX_BATCH_MATERIALS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"한 번에 최대 {MAX_BATCH_MATERIALS}개까지 생성할 수 있습니다.",
+        )
+
+    rows = [{**material.model_dump(), "user_id": user.id} for material in materials]
+    estimated = fill_estimated_expiry(rows)
+    created = await bulk_create_materials(session, rows)
+    expiry_refinement_queue.enqueue(created[idx] for idx in estimated)
+    return created
+
+
+@router.patch("", response_model=List[MaterialResponse])
+async def update_materials_batch(
+    updates: List[MaterialBatchUpdate],
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user),
+):
+    """
+    재료 여러 개를 한 번에 수정 (UPDATE ... FROM (VALUES ...) 한 번, 입력 순서대로 반환)
+    quantity_delta로 수량을 차감/증가할 수 있고, 하나라도 실패하면 전체가 반영되지 않습니다.
+    """
+    try:
+        return await batch_update_materials(session, user.id, updates)
+    except MaterialBatchError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+
 @router.patch("/{id}", response_model=MaterialResponse)
 async def update_material(
     id: int,
@@ -167,10 +243,14 @@ async def update_material(
         raise HTTPException(status_code=404, detail="재료를 찾을 수 없습니다.")
 
     material_data = material_update.model_dump(exclude_unset=True)
+    if material_data.get("name") is not None:
+        fill_ingredient_ids([material_data])
     for key, value in material_data.items():
         setattr(db_material, key, value)
 
     session.add(db_material)
+    await session.flush()
+    await fridge_status_service.refresh(session, [db_material.user_id])
     await session.commit()
     await session.refresh(db_material)
     return db_material
@@ -186,6 +266,8 @@ async def delete_material(
         raise HTTPException(status_code=404, detail="재료를 찾을 수 없습니다.")
 
     await session.delete(db_material)
+    await session.flush()
+    await fridge_status_service.refresh(session, [db_material.user_id])
     await session.commit()
 
 
@@ -194,6 +276,7 @@ async def bulk_delete_materials(
     id: List[int] = Query(...),
     session: AsyncSession = Depends(get_session),
 ):
-    statement = delete(Material).where(Material.id.in_(id))
-    await session.execute(statement)
+    statement = delete(Material).where(Material.id.in_(id)).returning(Material.user_id)
+    result = await session.execute(statement)
+    await fridge_status_service.refresh(session, result.scalars().all())
     await session.commit()
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel.ext.asyncio.session import AsyncSession
-from typing import List
+from typing import List, Optional
 
 from app.core.auth import get_current_user
 from app.core.db import get_session
@@ -9,6 +9,8 @@ from app.models.recipes import (
     RecommendationListResponse,
     RecipeFeedbackRequest,
     RecipeFeedbackResponse,
+    RecipeCookRequest,
+    RecipeCookResponse,
     ExpiryEstimationRequest,
     ExpiryEstimationResponse,
     RecipeRecommendation
@@ -46,6 +48,7 @@ async def get_recipe_recommendations(
     - user_id: 사용자 ID
     - limit: 추천할 레시피 수 (기본: 10)
     - min_match_ratio: 최소 재료 일치율 0.0~1.0 (기본: 0.3)
+    - thumbnail_size: 썸네일 너비(px, 선택). 지정 시 thumbnail_url로 160/320/640px WebP 중 맞는 크기 반환
 
     **Response:**
     - List[RecipeRecommendationResponse]: 추천 레시피 목록
@@ -61,7 +64,8 @@ async def get_recipe_recommendations(
             session=session,
             user_id=user.id,
             limit=request.limit,
-            min_match_ratio=request.min_match_ratio
+            min_match_ratio=request.min_match_ratio,
+            thumbnail_size=request.thumbnail_size
         )
 
         return RecommendationListResponse(
@@ -126,6 +130,49 @@ async def create_recipe_feedback(
         )
 
 
+@router.post("/{recommendation_id}/cook", response_model=RecipeCookResponse)
+async def cook_recipe(
+    recommendation_id: int,
+    request: Optional[RecipeCookRequest] = None,
+    session: AsyncSession = Depends(get_session),
+    user=Depends(get_current_user)
+):
+    """
+    추천 레시피로 요리 완료 처리
+
+    레시피 재료와 일치하는 사용자 재료(matched_materials)를 1개씩 차감하고,
+    수량이 0이 되면 삭제합니다. RecipeRecommendation의 cooked_at도 함께 기록합니다.
+    재료 차감과 기록은 한 트랜잭션(쿼리 한 번)으로 처리됩니다.
+
+    **Request Body (선택):**
+    - material_names: 사용한 재료 이름 (생략하면 일치하는 재료 전부)
+
+    **Response:**
+    - id: recommendation id
+    - recipe_id: 레시피 ID
+    - cooked_at: 요리 완료 시각
+    - consumed_materials: 차감/삭제된 재료 (material_id, name, 남은 quantity, deleted)
+    """
+    try:
+        return await recipe_recommendation_service.cook_recipe(
+            session=session,
+            user_id=user.id,
+            recommendation_id=recommendation_id,
+            material_names=request.material_names if request else None
+        )
+
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"요리 완료 처리 중 오류가 발생했습니다: {str(e)}"
+        )
+
+
 @router.post("/expire", response_model=ExpiryEstimationResponse)
 async def estimate_expiry_date(
     request: ExpiryEstimationRequest,
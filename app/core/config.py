@@ -28,12 +28,18 @@ class Settings(BaseSettings):
 
     # Amazon Bedrock (Nova Lite)
     BEDROCK_REGION: str = "ap-northeast-2"  # Amazon Nova Lite 지원 리전 (서울)
+    EXPIRY_AI_REFINEMENT_ENABLED: bool = False  # 규칙 기반으로 저장한 소비기한을 백그라운드에서 AI로 보정
 
     # API keys
     OCR_API_KEY: str = ""
+    OCR_PREPROCESS_ENABLED: bool = True  # OCR 전 영수증 이미지 축소/흑백 변환 (끄면 원본 전송, 지연 비교용)
     FOOD_SAFETY_API_KEY: str = ""
     FOOD_SAFETY_API_BASE_URL: str = "http://openapi.foodsafetykorea.go.kr/api"
 
+    # Recipe sync
+    # 수동 동기화 Lambda 제한 시간 (이 시간이 지나도 결과를 기록하지 않은 샤드는 실패로 간주)
+    RECIPE_SYNC_SHARD_TIMEOUT_SECONDS: int = 900
+
     @computed_field
     @property
     def DATABASE_URL(self) -> str:
@@ -21,7 +21,9 @@ engine = create_async_engine(
 # Lambda에서 사용하는 alias
 async_engine = engine
 
+# 요청마다 만들지 않고 공유 (백그라운드 작업에서도 사용)
+async_session_maker = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-    async with async_session() as session:
+    async with async_session_maker() as session:
         yield session
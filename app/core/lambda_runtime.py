@@ -0,0 +1,219 @@
+import asyncio
+import json
+import os
+import ssl
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from .config import settings
+
+
+class LambdaRuntime:
+    """
+    Lambda 실행 환경(warm start) 간에 재사용되는 런타임
+
+    핸들러 모듈 레벨에서 한 번 생성하고, 컨테이너가 살아 있는 동안
+    이벤트 루프, DB 엔진, 시크릿, HTTP 클라이언트를 재사용합니다.
+    - 이벤트 루프: asyncio.run() 대신 하나의 루프를 유지 (엔진/클라이언트가 루프에 묶여 있음)
+    - DB 엔진: pre-ping을 사용하는 작은 풀 (Lambda 1개 = 동시 요청 1개)
+    - 시크릿: TTL 캐시 (DB 비밀번호 교체 시 TTL 이후 반영)
+    """
+
+    def __init__(
+        self,
+        secret_ttl_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.secret_ttl_seconds = secret_ttl_seconds
+        self._clock = clock
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._engine = None
+        self._engine_password: Optional[str] = None
+        self._session_factory = None
+        self._http_client = None
+        self._secrets_client = None
+        self._secret_cache: Dict[str, Tuple[Dict, float]] = {}
+
+        # 실행 시간 측정용
+        self._created_at = time.perf_counter()
+        self._invocation_started_at: Optional[float] = None
+        self.invocation_count = 0
+        self.cold_start = True
+        self.init_ms = 0.0
+        self.setup_ms = 0.0
+
+    # ======================
+    # Event Loop
+    # ======================
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """warm start 간에 유지되는 이벤트 루프"""
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+        return self._loop
+
+    def run(self, coro):
+        """코루틴을 유지 중인 이벤트 루프에서 실행"""
+        return self.loop.run_until_complete(coro)
+
+    # ======================
+    # Secrets
+    # ======================
+
+    def _get_secrets_client(self):
+        """Secrets Manager 클라이언트 생성 (lazy loading)"""
+        if self._secrets_client is None:
+            import boto3
+
+            self._secrets_client = boto3.client(
+                'secretsmanager',
+                region_name=os.environ.get("AWS_REGION", settings.AWS_REGION)
+            )
+        return self._secrets_client
+
+    def get_secret(self, secret_id: str) -> Dict:
+        """
+        Secrets Manager에서 JSON 시크릿을 가져와 TTL 동안 캐시
+        """
+        cached = self._secret_cache.get(secret_id)
+        if cached is not None and cached[1] > self._clock():
+            return cached[0]
+
+        response = self._get_secrets_client().get_secret_value(SecretId=secret_id)
+        secret = json.loads(response.get('SecretString') or '{}')
+        self._secret_cache[secret_id] = (secret, self._clock() + self.secret_ttl_seconds)
+        return secret
+
+    def ensure_database_password(self) -> Optional[str]:
+        """
+        DB 비밀번호를 settings에 설정
+        DB_SECRET_NAME이 없으면 (로컬 환경) 기존 DATABASE_PASSWORD를 그대로 사용
+        """
+        secret_name = os.environ.get("DB_SECRET_NAME")
+        if not secret_name:
+            if not settings.DATABASE_PASSWORD:
+                print("Warning: DB_SECRET_NAME environment variable is not set.")
+            return settings.DATABASE_PASSWORD
+
+        password = self.get_secret(secret_name).get('password')
+        if not password:
+            raise ValueError("Failed to retrieve DB password.")
+
+        settings.DATABASE_PASSWORD = password
+        return password
+
+    # ======================
+    # Database
+    # ======================
+
+    def _create_engine(self):
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        ssl_context = ssl.create_default_context()
+        ssl_context.check_hostname = False
+        ssl_context.verify_mode = ssl.CERT_NONE
+
+        return create_async_engine(
+            settings.DATABASE_URL,
+            echo=False,  # Lambda에서는 로그 최소화
+            future=True,
+            # Lambda 인스턴스는 한 번에 하나의 요청만 처리하므로 작은 풀로 충분
+            pool_size=1,
+            max_overflow=2,
+            # freeze/thaw 사이에 끊긴 연결을 사용 전에 확인
+            pool_pre_ping=True,
+            pool_recycle=300,
+            connect_args={"ssl": ssl_context} if settings.ENVIRONMENT == "production" else {},
+        )
+
+    def get_session_factory(self):
+        """
+        DB 비밀번호 확인 후 캐시된 엔진의 sessionmaker를 반환
+        비밀번호가 바뀐 경우(rotation)에만 엔진을 다시 생성합니다.
+        """
+        from sqlalchemy.orm import sessionmaker
+        from sqlmodel.ext.asyncio.session import AsyncSession
+
+        password = self.ensure_database_password()
+
+        if self._engine is not None and password != self._engine_password:
+            print("DB password changed, recreating engine...")
+            self.run(self._engine.dispose())
+            self._engine = None
+
+        if self._engine is None:
+            self._engine = self._create_engine()
+            self._engine_password = password
+            # sessionmaker를 사용하여 expire_on_commit=False 설정 적용
+            self._session_factory = sessionmaker(
+                self._engine,
+                class_=AsyncSession,
+                expire_on_commit=False
+            )
+
+        return self._session_factory
+
+    # ======================
+    # HTTP
+    # ======================
+
+    def get_http_client(self):
+        """warm start 간에 keep-alive 연결을 재사용하는 HTTP 클라이언트"""
+        if self._http_client is None or self._http_client.is_closed:
+            import httpx
+
+            self._http_client = httpx.AsyncClient(
+                timeout=120.0,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+        return self._http_client
+
+    # ======================
+    # Invocation
+    # ======================
+
+    def begin_invocation(self):
+        """핸들러 시작 시 호출: cold/warm 여부와 초기화 시간 기록"""
+        now = time.perf_counter()
+        self.cold_start = self.invocation_count == 0
+        # cold start일 때만 모듈 로드 ~ 첫 호출까지의 시간을 초기화 시간으로 기록
+        self.init_ms = (now - self._created_at) * 1000 if self.cold_start else 0.0
+        self.setup_ms = 0.0
+        self.invocation_count += 1
+        self._invocation_started_at = now
+
+    def prepare(self, *http_consumers):
+        """
+        DB 세션 팩토리와 HTTP 클라이언트를 준비
+        warm start에서는 캐시된 객체를 그대로 반환합니다.
+
+        Args:
+            http_consumers: 공유 HTTP 클라이언트를 주입할 객체 (http_client 속성 보유)
+
+        Returns:
+            sessionmaker
+        """
+        started_at = time.perf_counter()
+        session_factory = self.get_session_factory()
+
+        http_client = self.get_http_client()
+        for consumer in http_consumers:
+            consumer.http_client = http_client
+
+        self.setup_ms = (time.perf_counter() - started_at) * 1000
+        return session_factory
+
+    def timing(self) -> Dict:
+        """응답에 포함할 cold/warm 실행 시간 정보"""
+        started_at = self._invocation_started_at or time.perf_counter()
+        return {
+            'cold_start': self.cold_start,
+            'invocation_count': self.invocation_count,
+            'init_ms': round(self.init_ms, 1),
+            'setup_ms': round(self.setup_ms, 1),
+            'duration_ms': round((time.perf_counter() - started_at) * 1000, 1),
+        }
@@ -1,8 +1,13 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
 from app.core.db import engine
 from app.api import api_router
+from app.services.expiry_refinement import expiry_refinement_queue
+from app.services.fridge_status import fridge_status_service
+from app.services.ocr_client import ocr_client
+from app.services.receipt_ingestion import receipt_job_queue
 
 from app.models import SQLModel
 import logging
@@ -15,10 +20,25 @@ async def lifespan(app: FastAPI):
     logging.basicConfig(level=logging.INFO)
 
     async with engine.begin() as conn:
+        # 재료 이름 trigram 인덱스(ix_material_name_trgm)에 필요
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(SQLModel.metadata.create_all)
 
+    # 영수증 비동기 처리 worker 시작
+    await receipt_job_queue.start()
+    # 소비기한 AI 보정 배치 (EXPIRY_AI_REFINEMENT_ENABLED일 때만)
+    await expiry_refinement_queue.start()
+    # 우선순위가 바뀐 사용자의 fridge_status 주기 갱신
+    await fridge_status_service.start()
+
     yield
 
+    await fridge_status_service.stop()
+    await expiry_refinement_queue.stop()
+    await receipt_job_queue.stop()
+    # OCR 공유 클라이언트의 연결 풀 정리
+    await ocr_client.aclose()
+
 
 app = FastAPI(
     title="MyFridger API",
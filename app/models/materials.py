@@ -1,7 +1,8 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from sqlmodel import Field, SQLModel
-from sqlalchemy import Column, DateTime
+from sqlalchemy import Column, DateTime, Index, Integer, func, literal_column, text
+from sqlalchemy.dialects import postgresql
 
 
 class MaterialBase(SQLModel):
@@ -11,14 +12,71 @@ class MaterialBase(SQLModel):
     currency: str = "KRW"
     category: str
     purchased_at: datetime = Field(sa_column=Column(DateTime(timezone=True)))
-    expired_at: datetime = Field(sa_column=Column(DateTime(timezone=True)))
+    # 비어 있으면 생성 시 규칙 기반으로 추정 (추정 불가 시 NULL)
+    expired_at: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
     quantity: int
     quantity_unit: Optional[str] = None
 
 
 class Material(MaterialBase, table=True):
+    __table_args__ = (
+        # 이름 검색(ILIKE '%x%', 유사도)용 trigram 인덱스 (pg_trgm 확장 필요)
+        Index(
+            "ix_material_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        # 사용자별 목록 (id 순 페이지), 카테고리 필터 목록
+        # (user_id) 단독 인덱스는 (user_id, id)가 대신하므로 두지 않음
+        Index("ix_material_user_id_id", "user_id", "id"),
+        Index("ix_material_user_id_category_id", "user_id", "category", "id"),
+        # 전체 사용자 대상 소비기한 범위 스캔 (만료 알림 배치), 소비기한 없는 재료는 제외
+        Index(
+            "ix_material_expired_at_id",
+            "expired_at",
+            "id",
+            postgresql_where=text("expired_at IS NOT NULL"),
+        ),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: str = Field(index=True)
+    user_id: str
+    # 이름을 표준 식재료 사전으로 정규화한 id (생성/이름 변경 시 계산, 레시피 매칭에 사용)
+    ingredient_ids: List[int] = Field(
+        sa_column=Column(postgresql.ARRAY(Integer), nullable=False, server_default="{}"), default_factory=list
+    )
+
+
+# 날짜 정렬 키: NULL을 ±infinity로 바꿔 항상 마지막에 오도록 하고, (키, id) 행 비교로 keyset 조회
+# 쿼리의 정렬 식이 인덱스 식과 같아야 인덱스 순서대로 읽으므로 이 식을 그대로 사용할 것
+MATERIAL_EXPIRY_SORT_KEY = func.coalesce(
+    Material.__table__.c.expired_at, literal_column("'infinity'::timestamptz")
+)
+MATERIAL_PURCHASE_SORT_KEY = func.coalesce(
+    Material.__table__.c.purchased_at, literal_column("'-infinity'::timestamptz")
+)
+
+# 소비기한 임박 순 (오름차순), 최근 구매 순 (내림차순, 역방향 scan)
+Index("ix_material_user_id_expiry_sort", Material.__table__.c.user_id, MATERIAL_EXPIRY_SORT_KEY, Material.__table__.c.id)
+Index("ix_material_user_id_purchase_sort", Material.__table__.c.user_id, MATERIAL_PURCHASE_SORT_KEY, Material.__table__.c.id)
+
+
+class FridgeStatus(SQLModel, table=True):
+    """사용자별 냉장고 상태 projection (소비기한 우선순위별 재료 수, 재료 변경 시/주기적으로 갱신)"""
+    __tablename__ = "fridge_status"
+
+    user_id: str = Field(primary_key=True)
+    high_count: int = 0  # 남은 기한 3일 이하 (지난 재료 포함)
+    medium_count: int = 0  # 남은 기한 7일 이하
+    normal_count: int = 0  # 그 외, 소비기한 없음
+    total_count: int = 0
+    # 이 시각이 지나면 어떤 재료의 우선순위가 바뀌므로 다시 계산 (바뀔 재료가 없으면 NULL)
+    next_change_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), index=True)
+    )
+    refreshed_at: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False))
+
 
 class MaterialCreate(MaterialBase):
     pass
@@ -36,5 +94,31 @@ class MaterialUpdate(SQLModel):
     quantity_unit: Optional[str] = None
 
 
+class MaterialBatchUpdate(MaterialUpdate):
+    """배치 수정 항목 (보낸 필드만 변경)"""
+    id: int
+    # 수량 증감 (사용한 만큼 음수로 전달, 결과가 0 미만이면 0), quantity와 함께 보낼 수 없음
+    quantity_delta: Optional[int] = None
+
+
 class MaterialResponse(MaterialBase):
     id: int
+
+
+class FridgeSummaryResponse(SQLModel):
+    """냉장고 요약 (소비기한 우선순위별 재료 수)"""
+    high: int
+    medium: int
+    normal: int
+    total: int
+    refreshed_at: datetime
+
+
+class ReceiptJobResponse(SQLModel):
+    """영수증 처리 작업 상태 (queued → running → succeeded/failed)"""
+    job_id: str
+    status: str
+    materials: Optional[List[MaterialResponse]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
@@ -1,8 +1,9 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 from enum import Enum
 from sqlmodel import Field, SQLModel
-from sqlalchemy import Column, ARRAY, String, DateTime
+from sqlalchemy import Column, ARRAY, JSON, String, DateTime, Index, Integer
+from sqlalchemy.dialects import postgresql
 
 
 class Priority(str, Enum):
@@ -21,6 +22,11 @@ class RecipeBase(SQLModel):
 
 
 class Recipe(RecipeBase, table=True):
+    __table_args__ = (
+        # 사용자 재료와 표준 재료가 하나라도 겹치는 레시피 조회 (ingredient_ids && :ids)
+        Index("ix_recipe_ingredient_ids", "ingredient_ids", postgresql_using="gin"),
+    )
+
     instructions: List[str] = Field(
         sa_column=Column(ARRAY(String)), default_factory=list
     )
@@ -30,6 +36,68 @@ class Recipe(RecipeBase, table=True):
     image_url: List[str] = Field(
         sa_column=Column(ARRAY(String)), default_factory=list
     )
+    # 너비별 WebP 썸네일 URL ({"160": url, "320": url, "640": url})
+    thumbnail_variants: Optional[Dict[str, str]] = Field(
+        default=None, sa_column=Column(JSON, nullable=True)
+    )
+    # material_names를 표준 식재료 사전으로 정규화한 id (동기화 시 계산)
+    ingredient_ids: List[int] = Field(
+        sa_column=Column(postgresql.ARRAY(Integer), nullable=False, server_default="{}"), default_factory=list
+    )
+    # 원본 API 필드의 SHA-256 (변경 없는 레시피는 동기화 시 건너뜀)
+    content_hash: Optional[str] = Field(
+        default=None, sa_column=Column(String(64), nullable=True)
+    )
+
+
+class RecipeSyncState(SQLModel, table=True):
+    """레시피 동기화 상태 테이블 (소스별 high-water mark)"""
+    __tablename__ = "recipe_sync_state"
+
+    source: str = Field(primary_key=True)  # API 서비스 ID (예: COOKRCP01)
+    last_change_date: Optional[str] = None  # 다음 증분 동기화에 사용할 CHNG_DT (YYYYMMDD)
+    max_recipe_seq: Optional[int] = None  # 지금까지 동기화한 최대 RCP_SEQ
+    total_synced: int = 0  # 마지막 동기화에서 저장한 레시피 수
+    last_synced_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True))
+    )
+
+
+class RecipeSyncRun(SQLModel, table=True):
+    """코디네이터 모드 동기화 실행 (샤드는 비동기로 실행되고 마지막 샤드가 결과를 집계)"""
+    __tablename__ = "recipe_sync_run"
+
+    run_id: str = Field(primary_key=True)
+    start_index: int
+    end_index: int
+    shard_size: int
+    shard_count: int
+    status: str = "running"  # running | completed | partial (일부 샤드 실패)
+    # 완료 시 샤드 결과 집계 (total_synced, new, changed, unchanged, failed, failed_shards)
+    result: Optional[Dict] = Field(default=None, sa_column=Column(JSON, nullable=True))
+    created_at: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False))
+    completed_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True))
+    )
+
+
+class RecipeSyncShard(SQLModel, table=True):
+    """코디네이터 모드 샤드별 실행 상태"""
+    __tablename__ = "recipe_sync_shard"
+
+    run_id: str = Field(primary_key=True, foreign_key="recipe_sync_run.run_id")
+    start_index: int = Field(primary_key=True)
+    end_index: int
+    status: str = "pending"  # pending | succeeded | failed
+    total_synced: int = 0
+    new: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    error: Optional[str] = None
+    updated_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True))
+    )
 
 
 class RecipeCreate(SQLModel):
@@ -61,6 +129,10 @@ class RecipeRecommendation(RecipeRecommendationBase, table=True):
     __tablename__ = "recipe_recommendations"
 
     id: Optional[int] = Field(default=None, primary_key=True)
+    # "이 레시피로 요리함" 시각 (POST /recommends/{id}/cook, 다시 요리하면 갱신)
+    cooked_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True)
+    )
 
 
 class RecipeRecommendationRequest(SQLModel):
@@ -68,6 +140,7 @@ class RecipeRecommendationRequest(SQLModel):
     user_id: str
     limit: int = 10
     min_match_ratio: float = 0.3  # 최소 재료 일치율 (0.0 ~ 1.0)
+    thumbnail_size: Optional[int] = None  # 클라이언트 썸네일 너비(px), 지정 시 맞는 WebP 변형 URL 반환
 
 
 class RecipeRecommendationResponse(SQLModel):
@@ -101,6 +174,28 @@ class RecipeFeedbackResponse(SQLModel):
     liked: bool
 
 
+class RecipeCookRequest(SQLModel):
+    """요리 완료 요청 모델"""
+    # 사용한 재료 이름 (없으면 레시피와 일치하는 재료 전부)
+    material_names: Optional[List[str]] = None
+
+
+class ConsumedMaterial(SQLModel):
+    """요리로 사용한 재료"""
+    material_id: int
+    name: str
+    quantity: int               # 남은 수량 (삭제된 경우 0)
+    deleted: bool               # 수량이 0이 되어 삭제됨
+
+
+class RecipeCookResponse(SQLModel):
+    """요리 완료 응답 모델"""
+    id: int                     # 해당 레시피 추천 엔티티의 id
+    recipe_id: int
+    cooked_at: datetime
+    consumed_materials: List[ConsumedMaterial]
+
+
 class ExpiryEstimationRequest(SQLModel):
     """소비기한 추정 요청 모델"""
     name: str
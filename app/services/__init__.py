@@ -1,7 +1,21 @@
-from .recipe_sync_service import recipe_sync_service
-from .recipe_recommendation_service import recipe_recommendation_service
+# 서비스 싱글톤은 처음 사용할 때 import
+# (Lambda에서 app.services.* 모듈 하나만 필요해도 패키지 __init__이 다른 서비스까지 로드하지 않도록)
+_LAZY_ATTRIBUTES = {
+    "recipe_sync_service": "recipe_sync_service",
+    "recipe_recommendation_service": "recipe_recommendation_service",
+}
 
 __all__ = [
     "recipe_sync_service",
     "recipe_recommendation_service"
 ]
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(f".{_LAZY_ATTRIBUTES[name]}", __name__), name)
+    globals()[name] = value
+    return value
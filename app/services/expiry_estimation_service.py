@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime, timedelta
 from typing import Dict, Optional
 import json
@@ -52,6 +53,73 @@ EXPIRY_RULES: Dict[str, Dict] = {
 }
 
 
+# 한국어 재료명/카테고리 키워드 → EXPIRY_RULES 키
+# (부분 문자열로 비교하므로 "무", "배", "파"처럼 다른 단어에 흔히 포함되는 한 글자는 제외)
+EXPIRY_RULE_ALIASES: Dict[str, tuple] = {
+  "vegetable": (
+    "채소", "야채", "배추", "양배추", "상추", "양상추", "양파", "대파", "쪽파", "감자", "고구마", "당근",
+    "버섯", "고추", "마늘", "시금치", "오이", "호박", "콩나물", "숙주", "깻잎", "부추", "브로콜리",
+    "파프리카", "피망", "토마토", "가지", "미나리", "샐러드",
+  ),
+  "fruit": (
+    "과일", "사과", "바나나", "딸기", "포도", "수박", "귤", "오렌지", "레몬", "복숭아", "참외",
+    "키위", "블루베리", "멜론", "망고", "파인애플", "자두", "체리",
+  ),
+  "meat": (
+    "육류", "고기", "소고기", "쇠고기", "돼지고기", "닭고기", "한우", "삼겹살", "목살", "등심",
+    "안심", "갈비", "다짐육", "닭가슴살",
+  ),
+  "seafood": (
+    "해산물", "수산", "생선", "고등어", "연어", "오징어", "새우", "조개", "문어", "낙지", "갈치",
+    "동태", "명태", "꽃게", "전복", "굴비",
+  ),
+  "dairy_processed": (
+    "유제품", "가공식품", "우유", "밀크", "요거트", "요구르트", "치즈", "버터", "계란", "달걀",
+    "두부", "햄", "소시지", "어묵", "베이컨",
+  ),
+  "seasoning": (
+    "양념", "조미료", "소스", "간장", "된장", "고추장", "쌈장", "식초", "설탕", "소금", "솔트",
+    "참기름", "들기름", "식용유", "케첩", "마요네즈", "드레싱", "후추", "통조림", "참치캔",
+  ),
+  "homemade": ("반찬", "찌개", "볶음", "무침", "조림", "나물"),
+}
+
+# 긴 키워드부터 비교 ("고추장"이 "고추"보다 먼저, "돼지고기"가 "고기"보다 먼저)
+_EXPIRY_KEYWORDS = sorted(
+  [(rule_key, rule_key) for rule_key in EXPIRY_RULES if rule_key != "etc"]
+  + [(alias, rule_key) for rule_key, aliases in EXPIRY_RULE_ALIASES.items() for alias in aliases],
+  key=lambda pair: len(pair[0]),
+  reverse=True,
+)
+
+
+def match_expiry_rule(name: str, category: Optional[str]) -> Optional[tuple]:
+    """
+    재료명 → 카테고리 순으로 소비기한 규칙 매칭
+
+    Returns:
+        (EXPIRY_RULES 키, 신뢰도) 또는 매칭 실패 시 None
+        재료명 매칭은 0.75, 카테고리 매칭은 0.5
+    """
+    for text, confidence in ((name, 0.75), (category, 0.5)):
+        text = (text or "").lower()
+        for keyword, rule_key in _EXPIRY_KEYWORDS:
+            if keyword in text:
+                return rule_key, confidence
+    return None
+
+
+def estimate_expired_at(name: str, category: Optional[str], purchased_at: datetime) -> Optional[datetime]:
+    """
+    재료 생성 시 사용하는 규칙 기반 빠른 추정 (외부 호출 없음)
+    매칭되는 규칙이 없으면 None (임의의 날짜로 우선순위가 왜곡되지 않도록)
+    """
+    matched = match_expiry_rule(name, category)
+    if matched is None:
+        return None
+    return purchased_at + timedelta(days=EXPIRY_RULES[matched[0]]["default"])
+
+
 class ExpiryEstimationService:
     """소비기한 추정 서비스"""
 
@@ -79,34 +147,17 @@ class ExpiryEstimationService:
         Option A: Rule-Based Estimation
         카테고리별 기본 소비기한 규칙을 사용한 추정
         """
-        name_lower = request.name.lower()
-        category_lower = request.category.lower()
-
-        # 우선순위 1: 재료 이름으로 직접 매칭
-        rule = None
-        for key, value in EXPIRY_RULES.items():
-            if key.lower() in name_lower:
-                rule = value
-                break
-
-        # 우선순위 2: 카테고리로 매칭
-        if not rule:
-            for key, value in EXPIRY_RULES.items():
-                if key.lower() in category_lower:
-                    rule = value
-                    break
-
-        # 우선순위 3: 기본값
-        if not rule:
-            rule = EXPIRY_RULES["etc"]
+        matched = match_expiry_rule(request.name, request.category)
+        if matched:
+            rule_key, confidence = matched
+            rule = EXPIRY_RULES[rule_key]
+        else:
+            rule, confidence = EXPIRY_RULES["etc"], 0.0
 
         # 소비기한 계산(default값 사용)
         estimated_days = rule["default"]
         estimated_date = request.purchased_at + timedelta(days=estimated_days)
 
-        # 신뢰도 계산 (규칙 기반이므로 중간 수준)
-        confidence = 0.5 if rule != EXPIRY_RULES["etc"] else 0.0
-
         notes = f"냉장 보관 시 평균 {estimated_days}일 기준 (최소 {rule["min_days"]}일, 최대 {rule["max_days"]}일) (규칙 기반 추정)"
 
         return ExpiryEstimationResponse(
@@ -129,8 +180,23 @@ class ExpiryEstimationService:
             return self.estimate_expiry_rule_based(request)
 
         try:
-            # Amazon Nova Lite에게 보낼 프롬프트 구성
-            prompt = f"""당신은 시중에서 판매되는 식품과 식재료, 혹은 조리된 가정식 음식의 소비기한 또는 안전 보관 가능 기간을 추정하는 식품 안전 보조 모델입니다. 
+            # boto3 invoke_model은 blocking 호출이므로 이벤트 루프를 막지 않도록 스레드에서 실행
+            return await asyncio.to_thread(self.estimate_expiry_with_bedrock, request)
+        except Exception as e:
+            print(f"AI-based estimation failed: {str(e)}")
+            # AI 실패 시 규칙 기반으로 폴백
+            return self.estimate_expiry_rule_based(request)
+
+    def estimate_expiry_with_bedrock(
+        self,
+        request: ExpiryEstimationRequest
+    ) -> ExpiryEstimationResponse:
+        """
+        Amazon Bedrock (Nova Lite) 호출 (폴백 없이 실패 시 예외 발생)
+        소비기한 백그라운드 보정처럼 AI 결과만 필요한 곳에서 직접 사용합니다.
+        """
+        # Amazon Nova Lite에게 보낼 프롬프트 구성
+        prompt = f"""당신은 시중에서 판매되는 식품과 식재료, 혹은 조리된 가정식 음식의 소비기한 또는 안전 보관 가능 기간을 추정하는 식품 안전 보조 모델입니다. 
 
 정확한 법적 소비기한을 제공하는 것이 아니라,
 입력된 텍스트를 분석하여 “식품 유형 → 위험도 → 보관 방식 → 소비/보관 가능 기간”을 식품의약품안전처(MFDS) 및 한국식품산업협회 소비기한 연구센터의 공식 참고값을 기준으로 추정해야 합니다.
@@ -313,56 +379,51 @@ class ExpiryEstimationService:
 위 기준에 따라 소비기한 또는 안전 보관 기간을 추정하십시오.
 """
 
-            # Bedrock API 호출 (Amazon Nova Lite 형식)
-            response = self._bedrock_client.invoke_model(
-                modelId="amazon.nova-lite-v1:0",
-                body=json.dumps({
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": [
-                                {
-                                    "text": prompt
-                                }
-                            ]
-                        }
-                    ],
-                    "inferenceConfig": {
-                        "max_new_tokens": 500,
-                        "temperature": 0.7,
-                        "top_p": 0.9
+        # Bedrock API 호출 (Amazon Nova Lite 형식)
+        response = self._bedrock_client.invoke_model(
+            modelId="amazon.nova-lite-v1:0",
+            body=json.dumps({
+                "messages": [
+                    {
+                        "role": "user",
+                        "content": [
+                            {
+                                "text": prompt
+                            }
+                        ]
                     }
-                })
-            )
-
-            # 응답 파싱 (Amazon Nova 형식)
-            response_body = json.loads(response['body'].read())
-            content = response_body['output']['message']['content'][0]['text']
+                ],
+                "inferenceConfig": {
+                    "max_new_tokens": 500,
+                    "temperature": 0.7,
+                    "top_p": 0.9
+                }
+            })
+        )
 
-            # JSON 추출 (Nova가 추가 텍스트를 포함할 수 있으므로)
-            import re
-            json_match = re.search(r'\{[^{}]*\}', content)
-            if json_match:
-                ai_result = json.loads(json_match.group())
+        # 응답 파싱 (Amazon Nova 형식)
+        response_body = json.loads(response['body'].read())
+        content = response_body['output']['message']['content'][0]['text']
 
-                estimated_days = ai_result.get("estimated_days", 7)
-                confidence = ai_result.get("confidence", 0.8)
-                notes = ai_result.get("notes", "AI 기반 추정")
+        # JSON 추출 (Nova가 추가 텍스트를 포함할 수 있으므로)
+        import re
+        json_match = re.search(r'\{[^{}]*\}', content)
+        if json_match:
+            ai_result = json.loads(json_match.group())
 
-                estimated_date = request.purchased_at + timedelta(days=estimated_days)
+            estimated_days = ai_result.get("estimated_days", 7)
+            confidence = ai_result.get("confidence", 0.8)
+            notes = ai_result.get("notes", "AI 기반 추정")
 
-                return ExpiryEstimationResponse(
-                    estimated_expiration_date=estimated_date,
-                    confidence=confidence,
-                    notes=notes
-                )
-            else:
-                raise ValueError("Invalid AI response format")
+            estimated_date = request.purchased_at + timedelta(days=estimated_days)
 
-        except Exception as e:
-            print(f"AI-based estimation failed: {str(e)}")
-            # AI 실패 시 규칙 기반으로 폴백
-            return self.estimate_expiry_rule_based(request)
+            return ExpiryEstimationResponse(
+                estimated_expiration_date=estimated_date,
+                confidence=confidence,
+                notes=notes
+            )
+        else:
+            raise ValueError("Invalid AI response format")
 
     async def estimate_expiry(
         self,
@@ -0,0 +1,181 @@
+import asyncio
+import json
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Protocol, Tuple
+
+from sqlalchemy import tuple_
+from sqlmodel import select
+
+from app.models import Material
+from app.utils.expiry_priority import HIGH_WITHIN
+
+# 기본 알림 범위: 아직 지나지 않았고 남은 기한이 3일 이하인 재료 (HIGH 우선순위와 같은 기준)
+DEFAULT_WINDOW = HIGH_WITHIN
+
+
+@dataclass
+class ExpiringItem:
+    material_id: int
+    name: str
+    expired_at: str  # ISO 8601
+    days_left: int
+
+
+@dataclass
+class ExpiryDigest:
+    """사용자 한 명에게 보낼 소비기한 임박 재료 요약"""
+    user_id: str
+    items: List[ExpiringItem] = field(default_factory=list)
+    generated_at: str = ""
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class DigestSink(Protocol):
+    """digest 전송 대상 (푸시/메일 발송 서비스 앞단의 큐 등)"""
+
+    async def send(self, digests: List[ExpiryDigest]) -> None:
+        ...
+
+
+class JsonlFileSink:
+    """digest를 JSON Lines 파일에 추가 (로컬 실행/테스트용)"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    async def send(self, digests: List[ExpiryDigest]) -> None:
+        lines = "".join(json.dumps(d.to_dict(), ensure_ascii=False) + "\n" for d in digests)
+        await asyncio.to_thread(self._append, lines)
+
+    def _append(self, lines: str):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+class QueueSink:
+    """digest를 asyncio.Queue에 넣음 (같은 프로세스의 소비자/테스트용)"""
+
+    def __init__(self, queue: Optional[asyncio.Queue] = None):
+        self.queue = queue if queue is not None else asyncio.Queue()
+
+    async def send(self, digests: List[ExpiryDigest]) -> None:
+        for digest in digests:
+            await self.queue.put(digest)
+
+
+class SqsSink:
+    """digest를 SQS 메시지(사용자당 1개)로 전송, SendMessageBatch 최대 10개씩"""
+
+    MAX_BATCH = 10
+
+    def __init__(self, queue_url: str, client=None):
+        self.queue_url = queue_url
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            # boto3는 실제로 전송할 때 로드 (Lambda cold start 단축)
+            import boto3
+            self._client = boto3.client("sqs")
+        return self._client
+
+    async def send(self, digests: List[ExpiryDigest]) -> None:
+        for start in range(0, len(digests), self.MAX_BATCH):
+            chunk = digests[start:start + self.MAX_BATCH]
+            entries = [
+                {"Id": str(i), "MessageBody": json.dumps(d.to_dict(), ensure_ascii=False)}
+                for i, d in enumerate(chunk)
+            ]
+            response = await asyncio.to_thread(
+                self.client.send_message_batch, QueueUrl=self.queue_url, Entries=entries
+            )
+            failed = response.get("Failed") or []
+            if failed:
+                raise RuntimeError(f"SQS rejected {len(failed)} expiry digests: {failed[0].get('Message')}")
+
+
+def build_expiry_scan_query(
+    start: datetime,
+    end: datetime,
+    after: Optional[Tuple[datetime, int]] = None,
+    limit: int = 1000,
+):
+    """
+    소비기한이 [start, end) 인 재료를 (expired_at, id) 순서로 limit개 조회 (ix_material_expired_at_id 범위 scan)
+    after는 이전 배치 마지막 행의 (expired_at, id)로, 다음 배치는 그 다음 행부터 이어서 읽음
+    """
+    query = (
+        select(Material.id, Material.user_id, Material.name, Material.expired_at)
+        .where(Material.expired_at >= start, Material.expired_at < end)
+    )
+    if after is not None:
+        query = query.where(tuple_(Material.expired_at, Material.id) > tuple_(*after))
+    return query.order_by(Material.expired_at, Material.id).limit(limit)
+
+
+class ExpiryNotificationScanner:
+    """
+    소비기한 임박 재료를 배치 단위로 스캔하여 사용자별 digest로 묶어 sink에 전송
+
+    클라이언트가 /materials를 반복 조회하는 대신, 스케줄 작업(EventBridge → Lambda)이
+    하루 한 번 만료 범위만 인덱스로 읽어 알림을 만듭니다.
+    """
+
+    def __init__(
+        self,
+        sink: DigestSink,
+        window: timedelta = DEFAULT_WINDOW,
+        batch_size: int = 1000,
+        send_batch_size: int = 100,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ):
+        self.sink = sink
+        self.window = window
+        self.batch_size = batch_size
+        self.send_batch_size = send_batch_size
+        self._clock = clock
+
+    async def scan(self, session_factory: Callable) -> Dict[str, int]:
+        """
+        Returns:
+            {"scanned": 재료 수, "batches": 조회 횟수, "users": digest 수}
+        """
+        now = self._clock()
+        digests: Dict[str, ExpiryDigest] = {}
+        stats = {"scanned": 0, "batches": 0, "users": 0}
+        after = None
+
+        async with session_factory() as session:
+            while True:
+                query = build_expiry_scan_query(now, now + self.window, after, self.batch_size)
+                rows = (await session.execute(query)).all()
+                stats["batches"] += 1
+                stats["scanned"] += len(rows)
+
+                for row in rows:
+                    digest = digests.get(row.user_id)
+                    if digest is None:
+                        digest = digests[row.user_id] = ExpiryDigest(row.user_id, generated_at=now.isoformat())
+                    digest.items.append(ExpiringItem(
+                        material_id=row.id,
+                        name=row.name,
+                        expired_at=row.expired_at.isoformat(),
+                        days_left=(row.expired_at - now).days,
+                    ))
+
+                if len(rows) < self.batch_size:
+                    break
+                after = (rows[-1].expired_at, rows[-1].id)
+
+        pending = list(digests.values())
+        for start in range(0, len(pending), self.send_batch_size):
+            await self.sink.send(pending[start:start + self.send_batch_size])
+
+        stats["users"] = len(pending)
+        return stats
@@ -0,0 +1,180 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import update
+from sqlmodel import select
+
+from app.core.config import settings
+from app.models import Material
+from app.models.recipes import ExpiryEstimationRequest
+from app.services.fridge_status import fridge_status_service
+
+
+def _same_instant(a: Optional[datetime], b: Optional[datetime]) -> bool:
+    """timezone 없는 값은 UTC로 간주하여 비교"""
+    if a is None or b is None:
+        return a is b
+    if a.tzinfo is None:
+        a = a.replace(tzinfo=timezone.utc)
+    if b.tzinfo is None:
+        b = b.replace(tzinfo=timezone.utc)
+    return a == b
+
+
+class ExpiryRefinementQueue:
+    """
+    규칙 기반으로 먼저 저장한 재료의 소비기한을 Bedrock으로 나중에 보정하는 백그라운드 배치
+
+    재료 생성 요청은 Bedrock 응답을 기다리지 않고, 등록된 재료를 batch_size개씩 모아
+    interval초마다(또는 batch_size가 차면 바로) 보정합니다.
+    그 사이 사용자가 소비기한을 직접 수정한 재료는 덮어쓰지 않습니다.
+    (Bedrock 호출은 세션 밖에서 하고, 반영은 expired_at이 등록 시점 값과 같을 때만 하는 조건부 UPDATE)
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 20,
+        interval: float = 30.0,
+        session_factory: Optional[Callable] = None,
+        estimator=None,
+    ):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.session_factory = session_factory
+        self.estimator = estimator
+        # material_id → 등록 시점의 expired_at
+        self._pending: Dict[int, Optional[datetime]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.EXPIRY_AI_REFINEMENT_ENABLED
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def enqueue(self, materials: Iterable):
+        """보정할 재료 등록 (id, expired_at 속성 필요)"""
+        if not self.enabled:
+            return
+        for material in materials:
+            self._pending[material.id] = material.expired_at
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    async def start(self):
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="expiry-refinement")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            while self._pending:
+                try:
+                    await self.run_batch()
+                except Exception as e:
+                    print(f"Expiry refinement batch failed: {str(e)}")
+                    break
+
+    def _get_session_factory(self) -> Callable:
+        if self.session_factory is None:
+            from app.core.db import async_session_maker
+            self.session_factory = async_session_maker
+        return self.session_factory
+
+    def _get_estimator(self):
+        if self.estimator is None:
+            # Bedrock 클라이언트는 보정을 실제로 실행할 때 생성
+            from app.utils.bedrock_dependencies import get_expiry_service
+            self.estimator = get_expiry_service()
+        return self.estimator
+
+    async def run_batch(self) -> Dict[str, int]:
+        """
+        등록된 재료 중 batch_size개 보정
+
+        Returns:
+            {"updated": n, "skipped": n, "failed": n}
+        """
+        ids: List[int] = list(self._pending)[:self.batch_size]
+        expected = {material_id: self._pending.pop(material_id) for material_id in ids}
+        stats = {"updated": 0, "skipped": 0, "failed": 0}
+        if not ids:
+            return stats
+
+        estimator = self._get_estimator()
+        async with self._get_session_factory()() as session:
+            result = await session.execute(select(Material).where(Material.id.in_(ids)))
+            materials = result.scalars().all()
+        stats["skipped"] += len(ids) - len(materials)  # 그 사이 삭제된 재료
+
+        # Bedrock 호출 동안 DB 연결을 잡고 있지 않도록 세션 밖에서 추정
+        estimations = []
+        for material in materials:
+            if not _same_instant(material.expired_at, expected[material.id]):
+                # 사용자가 직접 수정한 소비기한은 유지
+                stats["skipped"] += 1
+                continue
+            try:
+                # boto3 호출은 blocking이므로 스레드에서 실행
+                estimation = await asyncio.to_thread(
+                    estimator.estimate_expiry_with_bedrock,
+                    ExpiryEstimationRequest(
+                        name=material.name,
+                        category=material.category,
+                        purchased_at=material.purchased_at,
+                    ),
+                )
+            except Exception as e:
+                print(f"Expiry refinement failed for material {material.id}: {str(e)}")
+                stats["failed"] += 1
+                continue
+            estimations.append((material, estimation.estimated_expiration_date))
+
+        if not estimations:
+            print(f"Expiry refinement batch: {stats}")
+            return stats
+
+        async with self._get_session_factory()() as session:
+            user_ids = set()
+            for material, estimated_expiration_date in estimations:
+                # 추정하는 동안 사용자가 소비기한을 수정했으면 덮어쓰지 않도록 등록 시점 값과 같을 때만 변경
+                expected_expired_at = expected[material.id]
+                result = await session.execute(
+                    update(Material)
+                    .where(
+                        Material.id == material.id,
+                        Material.expired_at.is_(None) if expected_expired_at is None
+                        else Material.expired_at == expected_expired_at,
+                    )
+                    .values(expired_at=estimated_expiration_date)
+                )
+                if result.rowcount == 0:
+                    stats["skipped"] += 1
+                    continue
+                stats["updated"] += 1
+                user_ids.add(material.user_id)
+
+            if user_ids:
+                await fridge_status_service.refresh(session, user_ids)
+                await session.commit()
+
+        print(f"Expiry refinement batch: {stats}")
+        return stats
+
+
+expiry_refinement_queue = ExpiryRefinementQueue()
@@ -0,0 +1,199 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import String, and_, bindparam, func, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import FridgeStatus, FridgeSummaryResponse, Material
+from app.models.recipes import Priority
+from app.utils.expiry_priority import HIGH_WITHIN, MEDIUM_WITHIN, as_utc, priority_boundaries
+
+
+def material_priority(expired_at: Optional[datetime], now: datetime) -> Priority:
+    """
+    소비기한 우선순위 (fridge_status 집계와 같은 기준)
+    HIGH: 남은 기한 3일 이하 (지난 재료 포함), MEDIUM: 7일 이하, NORMAL: 그 외/소비기한 없음
+    """
+    if expired_at is None:
+        return Priority.NORMAL
+    high_before, medium_before = priority_boundaries(now)
+    expired_at = as_utc(expired_at)
+    if expired_at < high_before:
+        return Priority.HIGH
+    if expired_at < medium_before:
+        return Priority.MEDIUM
+    return Priority.NORMAL
+
+
+def build_fridge_status_query(user_ids: List[str], now: datetime):
+    """
+    사용자별 우선순위 재료 수와 다음 변경 시각 집계 (ix_material_user_id_expiry_sort 범위 조회)
+    다음 변경 시각: NORMAL → MEDIUM (기한 - 8일), MEDIUM → HIGH (기한 - 4일) 중 가장 빠른 시각
+    """
+    high_before, medium_before = priority_boundaries(now)
+    expired_at = Material.expired_at
+    is_high = expired_at < high_before
+    is_medium = and_(expired_at >= high_before, expired_at < medium_before)
+
+    return (
+        select(
+            Material.user_id,
+            func.count().filter(is_high).label("high_count"),
+            func.count().filter(is_medium).label("medium_count"),
+            func.count().label("total_count"),
+            func.least(
+                func.min(expired_at).filter(expired_at >= medium_before) - MEDIUM_WITHIN,
+                func.min(expired_at).filter(is_medium) - HIGH_WITHIN,
+            ).label("next_change_at"),
+        )
+        .where(Material.user_id.in_(user_ids))
+        .group_by(Material.user_id)
+    )
+
+
+# 같은 사용자의 refresh를 트랜잭션이 끝날 때까지 직렬화하는 advisory lock
+# 여러 사용자를 잠글 때 교착이 생기지 않도록 항상 user_id 순서로 잠금
+# (ORDER BY가 있으면 volatile 함수인 pg_advisory_xact_lock은 정렬 후에 평가됨)
+FRIDGE_STATUS_LOCK = text(
+    "SELECT pg_advisory_xact_lock(hashtext(user_id)) "
+    "FROM unnest(:user_ids) AS user_id ORDER BY user_id"
+).bindparams(bindparam("user_ids", type_=postgresql.ARRAY(String)))
+
+
+def _summary(row: Dict) -> FridgeSummaryResponse:
+    return FridgeSummaryResponse(
+        high=row["high_count"],
+        medium=row["medium_count"],
+        normal=row["normal_count"],
+        total=row["total_count"],
+        refreshed_at=row["refreshed_at"],
+    )
+
+
+class FridgeStatusService:
+    """
+    fridge_status projection 관리
+
+    - 재료를 생성/수정/삭제하는 트랜잭션 안에서 해당 사용자 행만 다시 집계 (refresh)
+    - 시간이 지나 우선순위가 바뀌는 행(next_change_at 경과)은 interval초마다 batch_size명씩 갱신
+    - 조회(get_summary) 시 행이 없거나 오래되었으면 그 자리에서 갱신하므로 주기 갱신이 늦어도 결과는 정확함
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 500,
+        interval: float = 600.0,
+        session_factory: Optional[Callable] = None,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.session_factory = session_factory
+        self._clock = clock
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh(self, session: AsyncSession, user_ids: Iterable[str]) -> Dict[str, Dict]:
+        """
+        사용자들의 fridge_status를 다시 집계하여 저장 (commit은 호출한 쪽에서)
+
+        같은 사용자의 재료를 바꾸는 두 트랜잭션이 서로의 변경을 보지 못한 채 집계하면
+        나중에 저장한 쪽의 오래된 값이 남으므로, 사용자별 advisory lock을 잡은 뒤 집계합니다.
+        lock은 commit/rollback 시 풀리고, 뒤에 온 트랜잭션은 앞 트랜잭션이 commit한 재료까지 집계합니다.
+        :return: {user_id: 저장한 행}
+        """
+        user_ids = sorted(set(user_ids))
+        if not user_ids:
+            return {}
+
+        await session.execute(FRIDGE_STATUS_LOCK, {"user_ids": user_ids})
+        now = self._clock()
+        result = await session.execute(build_fridge_status_query(user_ids, now))
+        counts = {row.user_id: row for row in result.all()}
+
+        rows = {}
+        for user_id in user_ids:
+            row = counts.get(user_id)
+            high = row.high_count if row else 0
+            medium = row.medium_count if row else 0
+            total = row.total_count if row else 0
+            rows[user_id] = {
+                "user_id": user_id,
+                "high_count": high,
+                "medium_count": medium,
+                "normal_count": total - high - medium,
+                "total_count": total,
+                "next_change_at": row.next_change_at if row else None,
+                "refreshed_at": now,
+            }
+
+        statement = insert(FridgeStatus.__table__).values(list(rows.values()))
+        statement = statement.on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={column: statement.excluded[column] for column in rows[user_ids[0]] if column != "user_id"},
+        )
+        await session.execute(statement)
+        return rows
+
+    async def get_summary(self, session: AsyncSession, user_id: str) -> FridgeSummaryResponse:
+        """재료 행을 읽지 않고 projection 한 행으로 요약 반환 (없거나 오래된 경우만 다시 집계)"""
+        status = await session.get(FridgeStatus, user_id)
+        if status is not None and (
+            status.next_change_at is None or as_utc(status.next_change_at) > self._clock()
+        ):
+            return _summary(status.model_dump())
+
+        rows = await self.refresh(session, [user_id])
+        await session.commit()
+        return _summary(rows[user_id])
+
+    def _get_session_factory(self) -> Callable:
+        if self.session_factory is None:
+            from app.core.db import async_session_maker
+            self.session_factory = async_session_maker
+        return self.session_factory
+
+    async def refresh_stale(self) -> int:
+        """next_change_at이 지난 사용자를 batch_size명씩 모두 갱신 (주기 실행용)"""
+        refreshed = 0
+        while True:
+            async with self._get_session_factory()() as session:
+                result = await session.execute(
+                    select(FridgeStatus.user_id)
+                    .where(FridgeStatus.next_change_at <= self._clock())
+                    .order_by(FridgeStatus.next_change_at)
+                    .limit(self.batch_size)
+                )
+                user_ids = result.scalars().all()
+                if user_ids:
+                    await self.refresh(session, user_ids)
+                    await session.commit()
+            refreshed += len(user_ids)
+            if len(user_ids) < self.batch_size:
+                return refreshed
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop(), name="fridge-status-refresh")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            try:
+                refreshed = await self.refresh_stale()
+                if refreshed:
+                    print(f"Fridge status refreshed for {refreshed} users")
+            except Exception as e:
+                print(f"Fridge status refresh failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+
+fridge_status_service = FridgeStatusService()
@@ -0,0 +1,173 @@
+import re
+from typing import Dict, Iterable, List, Tuple
+
+# 표준 식재료 사전: ingredient id → (표준 이름, 동의어...)
+# id는 material/recipe의 ingredient_ids에 저장되므로 바꾸거나 재사용하지 말고 새 항목은 뒤에 추가할 것
+# 부분 문자열로 비교하되, 한 글자 이름(무, 배, 굴, 김, 쌀, 떡, 꿀, 깨)은 다른 단어에 흔히 포함되므로
+# 분량을 뺀 재료명 전체가 그 글자일 때만 매칭
+INGREDIENTS: Dict[int, Tuple[str, ...]] = {
+    # 채소
+    1: ("양파", "적양파", "자색양파"),
+    2: ("대파", "쪽파", "실파", "파채"),
+    3: ("마늘", "다진마늘", "통마늘", "마늘쫑"),
+    4: ("생강", "다진생강"),
+    5: ("감자", "햇감자", "알감자"),
+    6: ("고구마", "호박고구마", "밤고구마"),
+    7: ("당근",),
+    8: ("양배추", "적양배추"),
+    9: ("배추", "알배추", "알배기배추", "봄동"),
+    10: ("무", "무우", "조선무", "총각무", "알타리무"),
+    11: ("오이", "백오이", "취청오이"),
+    12: ("애호박", "주키니"),
+    13: ("단호박", "늙은호박"),
+    14: ("고추", "풋고추", "청양고추", "홍고추", "꽈리고추", "오이고추"),
+    15: ("파프리카", "피망"),
+    16: ("토마토", "방울토마토", "대추토마토"),
+    17: ("가지",),
+    18: ("시금치",),
+    19: ("상추", "적상추", "청상추"),
+    20: ("깻잎",),
+    21: ("부추", "영양부추"),
+    22: ("미나리",),
+    23: ("브로콜리",),
+    24: ("콩나물",),
+    25: ("숙주", "숙주나물"),
+    26: ("양송이버섯", "양송이"),
+    27: ("표고버섯", "표고"),
+    28: ("느타리버섯", "느타리"),
+    29: ("팽이버섯", "팽이"),
+    30: ("새송이버섯", "새송이"),
+    31: ("양상추",),
+    32: ("셀러리", "샐러리"),
+    33: ("연근",),
+    34: ("우엉",),
+    35: ("고사리",),
+    36: ("도라지",),
+    # 과일
+    37: ("사과", "부사", "홍로"),
+    38: ("배", "신고배"),
+    39: ("바나나",),
+    40: ("딸기",),
+    41: ("레몬", "레몬즙"),
+    42: ("귤", "감귤", "한라봉", "천혜향"),
+    43: ("오렌지",),
+    44: ("키위", "참다래"),
+    45: ("블루베리",),
+    46: ("포도", "샤인머스캣", "청포도"),
+    47: ("아보카도",),
+    # 육류, 달걀
+    48: ("소고기", "쇠고기", "한우", "차돌박이", "우둔", "홍두깨", "불고기용"),
+    49: ("돼지고기", "삼겹살", "목살", "앞다리살", "뒷다리살", "돈가스용"),
+    50: ("닭고기", "닭가슴살", "닭다리", "닭안심", "닭봉", "생닭", "닭날개"),
+    51: ("오리고기", "훈제오리"),
+    52: ("다짐육", "간고기", "다진고기", "다진소고기", "다진돼지고기"),
+    53: ("달걀", "계란", "유정란", "구운란"),
+    54: ("메추리알",),
+    55: ("햄", "스팸", "통조림햄"),
+    56: ("소시지", "비엔나", "소세지"),
+    57: ("베이컨",),
+    # 해산물
+    58: ("새우", "칵테일새우", "대하", "흰다리새우", "건새우"),
+    59: ("오징어", "한치"),
+    60: ("고등어",),
+    61: ("연어", "훈제연어"),
+    62: ("조개", "바지락", "모시조개", "홍합", "꼬막"),
+    63: ("굴", "생굴", "석굴"),
+    64: ("멸치", "국물멸치", "볶음멸치", "잔멸치"),
+    65: ("참치", "참치캔", "참치통조림"),
+    66: ("어묵", "오뎅"),
+    67: ("게맛살", "맛살", "크래미"),
+    68: ("김", "김밥김", "조미김", "구운김"),
+    69: ("미역", "건미역"),
+    70: ("다시마",),
+    71: ("낙지", "쭈꾸미", "주꾸미"),
+    72: ("명태", "동태", "북어", "황태", "코다리"),
+    # 유제품, 콩 가공품
+    73: ("우유", "저지방우유", "흰우유"),
+    74: ("두유",),
+    75: ("치즈", "슬라이스치즈", "모짜렐라", "모차렐라", "파마산"),
+    76: ("버터", "무염버터"),
+    77: ("요거트", "요구르트", "플레인요거트"),
+    78: ("생크림", "휘핑크림"),
+    79: ("두부", "연두부", "순두부", "부침두부", "찌개두부"),
+    80: ("유부",),
+    # 곡물, 면, 가루
+    81: ("쌀", "백미", "현미", "찹쌀", "즉석밥", "햇반", "공깃밥", "흰밥"),
+    82: ("밀가루", "중력분", "강력분", "박력분", "부침가루", "튀김가루"),
+    83: ("빵가루",),
+    84: ("전분", "녹말", "감자전분", "옥수수전분"),
+    85: ("식빵", "바게트"),
+    86: ("국수", "소면", "중면", "칼국수면"),
+    87: ("라면",),
+    88: ("당면",),
+    89: ("파스타", "스파게티", "펜네"),
+    90: ("떡", "떡국떡", "떡볶이떡", "가래떡"),
+    91: ("김치", "배추김치", "묵은지", "깍두기"),
+    # 양념
+    92: ("간장", "진간장", "국간장", "양조간장", "맛간장"),
+    93: ("고추장",),
+    94: ("된장",),
+    95: ("고춧가루",),
+    96: ("설탕", "백설탕", "황설탕"),
+    97: ("소금", "천일염", "꽃소금", "맛소금"),
+    98: ("후추", "후춧가루"),
+    99: ("식초", "사과식초"),
+    100: ("참기름",),
+    101: ("들기름",),
+    102: ("식용유", "카놀라유", "포도씨유", "올리브유", "올리브오일"),
+    103: ("물엿", "올리고당", "조청"),
+    104: ("꿀",),
+    105: ("참깨", "깨", "통깨", "깨소금"),
+    106: ("케첩", "케찹", "토마토케첩"),
+    107: ("마요네즈",),
+    108: ("굴소스",),
+    109: ("맛술", "미림", "청주"),
+    110: ("액젓", "멸치액젓", "까나리액젓", "새우젓"),
+}
+
+# 공백, 괄호 속 분량/설명, 숫자+단위 제거 ("CJ 햇반 210g" → "cj햇반", "연두부 75g(3/4모)" → "연두부")
+_NOISE = re.compile(r"\([^)]*\)|\[[^\]]*\]|\d[\d.,/~]*\s*[a-zA-Z가-힣]{0,3}\b|\s+")
+
+
+class IngredientNormalizer:
+    """
+    재료명(영수증 OCR 품목, 사용자 입력, 레시피 재료 문자열) → 표준 ingredient id
+
+    모든 동의어를 긴 것부터 하나의 정규식으로 미리 컴파일해 두고, 이름을 한 번 훑어 id를 찾습니다.
+    ("연두부"가 "두부"보다, "고추장"이 "고추"보다 먼저 매칭)
+    """
+
+    def __init__(self, ingredients: Dict[int, Tuple[str, ...]] = INGREDIENTS):
+        self.names: Dict[int, str] = {id: names[0] for id, names in ingredients.items()}
+        self._ids: Dict[str, int] = {}
+        self._exact: Dict[str, int] = {}
+        for id, names in ingredients.items():
+            for name in names:
+                (self._exact if len(name) == 1 else self._ids).setdefault(name.lower(), id)
+
+        keywords = sorted(self._ids, key=len, reverse=True)
+        self._pattern = re.compile("|".join(re.escape(keyword) for keyword in keywords))
+
+    @staticmethod
+    def clean(name: str) -> str:
+        return _NOISE.sub("", (name or "").lower())
+
+    def normalize(self, name: str) -> List[int]:
+        """이름에 포함된 표준 재료 id (정렬, 중복 제거), 없으면 빈 리스트"""
+        text = self.clean(name)
+        if text in self._exact:
+            return [self._exact[text]]
+        return sorted({self._ids[match.group()] for match in self._pattern.finditer(text)})
+
+    def normalize_all(self, names: Iterable[str]) -> List[int]:
+        """여러 이름(레시피 재료 목록 등)의 표준 재료 id 합집합"""
+        ids = set()
+        for name in names:
+            ids.update(self.normalize(name))
+        return sorted(ids)
+
+    def names_of(self, ids: Iterable[int]) -> List[str]:
+        return [self.names[id] for id in sorted(ids) if id in self.names]
+
+
+ingredient_normalizer = IngredientNormalizer()
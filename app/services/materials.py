@@ -1,14 +1,50 @@
 import re
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import List, Literal, Optional, Sequence, Tuple
 
-def extract_items_from_ocr(json_data, threshold_x=10, threshold_y=10) -> list | str:
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    Integer,
+    Numeric,
+    case,
+    cast,
+    column,
+    func,
+    insert,
+    literal,
+    literal_column,
+    or_,
+    tuple_,
+    update,
+    values,
+)
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import (
+    MATERIAL_EXPIRY_SORT_KEY,
+    MATERIAL_PURCHASE_SORT_KEY,
+    Material,
+    MaterialBatchUpdate,
+    MaterialResponse,
+    MaterialUpdate,
+)
+from app.services.expiry_estimation_service import estimate_expired_at
+from app.services.fridge_status import fridge_status_service
+from app.services.ingredients import ingredient_normalizer
+from app.utils.cursor import InvalidCursorError, decode_cursor, encode_cursor
+
+# create_materials_from_receipt에서 차례로 시도하는 행 분리 y 오차 (픽셀)
+ROW_THRESHOLDS = (5, 10, 15, 20)
+
+
+def _parse_ocr_words(json_data) -> list | str:
     """
-    OCR Response로 부터 영수증 항목을 분리하는 함수 입니다.
-    :param json_data: OCR API Response
-    :param threshold: 같은 행으로 간주할 텍스트의 y좌표 오차 범위 (픽셀)
-    :return: 추출된 항목들의 리스트
+    OCR Response에서 모든 단어를 꺼내 Top 기준으로 정렬합니다.
+    :return: 정렬된 단어 리스트 (형식 오류 시 오류 메시지)
     """
-
-    # 데이터 전처리
     try:
         parsed_result = json_data['ParsedResults'][0]
         if 'TextOverlay' in parsed_result:
@@ -20,31 +56,84 @@ def extract_items_from_ocr(json_data, threshold_x=10, threshold_y=10) -> list |
     except (KeyError, IndexError, TypeError):
         return "데이터 형식이 올바르지 않습니다."
 
-    # 단어 추출 및 Y축 정렬
     all_words = []
     for line in lines_data:
         all_words.extend(line["Words"])
     all_words.sort(key=lambda x: x["Top"])
 
     if not all_words: return "텍스트 데이터가 없습니다."
+    return all_words
 
-    # 행 분리
+
+def group_rows(sorted_words: list, threshold_y=10) -> list:
+    """
+    Top 기준으로 정렬된 단어들을 행으로 묶습니다.
+    행의 Top 합계/개수를 누적해 평균을 구하므로 단어 수에 선형입니다.
+    :param sorted_words: Top 기준으로 정렬된 단어 리스트
+    :param threshold_y: 같은 행으로 간주할 텍스트의 y좌표 오차 범위 (픽셀)
+    :return: Left 기준으로 정렬된 단어 리스트들의 리스트
+    """
     rows = []
-    current_row = [all_words[0]]
+    current_row = [sorted_words[0]]
+    top_sum = sorted_words[0]["Top"]
 
-    for word in all_words[1:]:
+    for word in sorted_words[1:]:
+        top = word["Top"]
         # 현재 y가 이전 평균과 가까우면 같은 행으로 간주
-        prev_avg_top = sum([w["Top"] for w in current_row]) / len(current_row)
-        if abs(word["Top"] - prev_avg_top) <= threshold_y:
+        if abs(top - top_sum / len(current_row)) <= threshold_y:
             current_row.append(word)
+            top_sum += top
         else:
             rows.append(current_row)
             current_row = [word]
+            top_sum = top
     rows.append(current_row)
 
     for row in rows:
         row.sort(key=lambda x: x["Left"])
+    return rows
+
+
+def extract_items_from_ocr(json_data, threshold_x=10, threshold_y=10) -> list | str:
+    """
+    OCR Response로 부터 영수증 항목을 분리하는 함수 입니다.
+    :param json_data: OCR API Response
+    :param threshold: 같은 행으로 간주할 텍스트의 y좌표 오차 범위 (픽셀)
+    :return: 추출된 항목들의 리스트
+    """
+    all_words = _parse_ocr_words(json_data)
+    if isinstance(all_words, str):
+        return all_words
+
+    return extract_items_from_rows(group_rows(all_words, threshold_y), threshold_x)
+
+
+def extract_items_with_fallback(json_data, threshold_x=10, thresholds: Sequence = ROW_THRESHOLDS) -> list | str:
+    """
+    y 오차를 thresholds 순서대로 시도하여 처음으로 항목이 추출된 결과를 반환합니다.
+    OCR 응답 파싱과 단어 정렬은 한 번만 수행하고, 정렬된 단어로 threshold별 행 분리만 다시 합니다.
+    (앞 threshold에서 항목이 나오면 나머지 threshold는 계산하지 않음)
+    :return: 추출된 항목들의 리스트 (모두 실패하면 마지막 결과)
+    """
+    all_words = _parse_ocr_words(json_data)
+    if isinstance(all_words, str):
+        return all_words
+
+    items = []
+    for threshold in thresholds:
+        items = extract_items_from_rows(group_rows(all_words, threshold), threshold_x)
+        if items:
+            break
+    return items
 
+
+def extract_items_from_rows(rows: list, threshold_x=10) -> list:
+    """
+    행 단위로 묶인 단어들에서 헤더를 찾아 영수증 항목을 추출합니다.
+    :param rows: group_rows 결과
+    :param threshold_x: 같은 열로 간주할 x좌표 오차 범위 (픽셀)
+    :return: 추출된 항목들의 리스트
+    """
     # 헤더 탐색
     column_map = {"price": None, "quantity": None, "total_price": None}
     KEYWORDS = {
@@ -181,4 +270,326 @@ def extract_items_from_ocr(json_data, threshold_x=10, threshold_y=10) -> list |
             items.append(current_item)
             current_item = {"name": "", "price": 0, "quantity": 1, "total": 0}
 
-    return items
\ No newline at end of file
+    return items
+
+# 한 번에 생성할 수 있는 최대 재료 수 (배치 생성 API)
+MAX_BATCH_MATERIALS = 500
+
+
+def fill_estimated_expiry(rows: List[dict]) -> List[int]:
+    """
+    expired_at이 비어 있는 행에 규칙 기반 추정 소비기한을 채웁니다. (Bedrock 호출 없음)
+    :return: 추정한 행의 index 리스트 (AI 보정 대상)
+    """
+    estimated = []
+    for idx, row in enumerate(rows):
+        if row.get("expired_at") is None:
+            row["expired_at"] = estimate_expired_at(row["name"], row.get("category"), row["purchased_at"])
+            estimated.append(idx)
+    return estimated
+
+
+def fill_ingredient_ids(rows: List[dict]) -> None:
+    """재료 이름을 표준 식재료 id로 정규화하여 ingredient_ids에 채웁니다. (레시피 매칭용)"""
+    for row in rows:
+        row["ingredient_ids"] = ingredient_normalizer.normalize(row["name"])
+
+
+async def bulk_create_materials(session: AsyncSession, rows: List[dict]) -> List[MaterialResponse]:
+    """
+    재료 여러 개를 INSERT ... RETURNING 으로 저장하고 응답 모델로 변환합니다.
+    저장 후 행마다 refresh(SELECT) 하지 않고, 반환된 행으로 바로 MaterialResponse를 만듭니다.
+    :param rows: Material 컬럼 값 dict 리스트 (user_id 포함)
+    :return: 입력 순서대로 생성된 재료들
+    """
+    if not rows:
+        return []
+
+    fill_ingredient_ids(rows)
+    table = Material.__table__
+    statement = insert(table).returning(*table.columns, sort_by_parameter_order=True)
+    result = await session.execute(statement, rows)
+    created = [MaterialResponse.model_validate(dict(row._mapping)) for row in result.all()]
+    await fridge_status_service.refresh(session, {row["user_id"] for row in rows})
+    await session.commit()
+    return created
+
+
+class MaterialBatchError(Exception):
+    """배치 수정 실패 (status_code는 API 응답 코드로 사용)"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+# 배치 수정으로 바꿀 수 있는 컬럼 (ingredient_ids는 name에서 계산)
+_UPDATABLE_FIELDS = tuple(MaterialUpdate.model_fields) + ("ingredient_ids",)
+
+
+def build_material_batch_update(user_id: str, updates: List[MaterialBatchUpdate]):
+    """
+    수정 항목들을 UPDATE material ... FROM (VALUES ...) 한 문장으로 만듭니다.
+    항목마다 보낸 필드가 다르므로 필드별로 값 컬럼과 "<필드>_set" 플래그 컬럼을 두고,
+    플래그가 true인 행만 값을 바꿉니다. 다른 사용자의 재료는 갱신되지 않습니다.
+    :return: 변경할 필드가 없으면 None
+    """
+    table = Material.__table__
+    changes = [item.model_dump(exclude_unset=True, exclude={"id", "quantity_delta"}) for item in updates]
+    # 이름이 바뀌면 표준 식재료 id도 다시 계산
+    fill_ingredient_ids([change for change in changes if change.get("name") is not None])
+    fields = [name for name in _UPDATABLE_FIELDS if any(name in change for change in changes)]
+    has_delta = any(item.quantity_delta for item in updates)
+    if not fields and not has_delta:
+        return None
+
+    value_columns = [column("id", Integer)]
+    for name in fields:
+        value_columns += [column(name, table.c[name].type), column(f"{name}_set", Boolean)]
+    value_columns.append(column("quantity_delta", Integer))
+
+    rows = []
+    for item, change in zip(updates, changes):
+        row = [item.id]
+        for name in fields:
+            row += [change.get(name), name in change]
+        row.append(item.quantity_delta or 0)
+        rows.append(tuple(row))
+    data = values(*value_columns, name="v").data(rows)
+
+    # 모든 행이 NULL인 값 컬럼은 text로 추론되므로 컬럼 타입으로 CAST
+    assignments = {
+        name: case((data.c[f"{name}_set"], cast(data.c[name], table.c[name].type)), else_=table.c[name])
+        for name in fields
+    }
+    if has_delta:
+        quantity = assignments.get("quantity", table.c.quantity)
+        assignments["quantity"] = func.greatest(quantity + data.c.quantity_delta, 0)
+
+    return (
+        update(table)
+        .where(table.c.id == data.c.id, table.c.user_id == user_id)
+        .values(assignments)
+        .returning(*table.columns)
+    )
+
+
+async def batch_update_materials(
+    session: AsyncSession, user_id: str, updates: List[MaterialBatchUpdate]
+) -> List[MaterialResponse]:
+    """
+    사용자의 재료 여러 개를 한 트랜잭션, UPDATE 한 번으로 수정합니다. (수량 차감 포함)
+    하나라도 없거나 다른 사용자의 재료면 전체를 되돌립니다.
+    :return: 입력 순서대로 수정된 재료들
+    """
+    if not updates:
+        return []
+    if len(updates) > MAX_BATCH_MATERIALS:
+        raise MaterialBatchError(400, f"한 번에 최대 {MAX_BATCH_MATERIALS}개까지 수정할 수 있습니다.")
+
+    ids = [item.id for item in updates]
+    if len(set(ids)) != len(ids):
+        raise MaterialBatchError(400, "같은 재료를 두 번 수정할 수 없습니다.")
+    if any("quantity" in item.model_fields_set and item.quantity_delta is not None for item in updates):
+        raise MaterialBatchError(400, "quantity와 quantity_delta는 함께 보낼 수 없습니다.")
+
+    statement = build_material_batch_update(user_id, updates)
+    if statement is None:
+        raise MaterialBatchError(400, "변경할 필드가 없습니다.")
+
+    result = await session.execute(statement)
+    updated = {row.id: MaterialResponse.model_validate(dict(row._mapping)) for row in result.all()}
+    missing = [id for id in ids if id not in updated]
+    if missing:
+        await session.rollback()
+        raise MaterialBatchError(404, f"재료를 찾을 수 없습니다: {missing}")
+
+    await fridge_status_service.refresh(session, [user_id])
+    await session.commit()
+    return [updated[id] for id in ids]
+
+
+# GET /materials 정렬: id 순(기본), 소비기한 임박 순, 최근 구매 순
+MaterialSort = Literal["id", "expired_at", "purchased_at"]
+
+# 정렬 이름 → (정렬 키 식, Material 속성, 내림차순 여부, NULL 대신 비교할 값)
+_DATE_SORTS = {
+    "expired_at": (MATERIAL_EXPIRY_SORT_KEY, "expired_at", False, "'infinity'::timestamptz"),
+    "purchased_at": (MATERIAL_PURCHASE_SORT_KEY, "purchased_at", True, "'-infinity'::timestamptz"),
+}
+
+
+def _invalid_cursor(cursor: str) -> InvalidCursorError:
+    return InvalidCursorError(f"잘못된 cursor입니다: {cursor}")
+
+
+def _decode_list_cursor(cursor: str, sort: str) -> Tuple[Optional[datetime], int]:
+    """
+    목록 cursor → (마지막 행의 정렬 키, 마지막 행의 id)
+    id 정렬은 이전 형식(마지막 id 숫자 문자열)도 허용
+    """
+    if sort == "id" and cursor.isdigit():
+        return None, int(cursor)
+
+    after = decode_cursor(cursor, keys=("sort", "id"))
+    if after["sort"] != sort:
+        raise _invalid_cursor(cursor)
+    try:
+        key = datetime.fromisoformat(after["key"]) if after.get("key") is not None else None
+        return key, int(after["id"])
+    except (TypeError, ValueError) as e:
+        raise _invalid_cursor(cursor) from e
+
+
+def encode_list_cursor(material: Material, sort: str) -> str:
+    """목록 마지막 행으로 다음 페이지 cursor 생성"""
+    values = {"sort": sort, "id": material.id}
+    if sort in _DATE_SORTS:
+        key = getattr(material, _DATE_SORTS[sort][1])
+        values["key"] = key.isoformat() if key is not None else None
+    return encode_cursor(values)
+
+
+def build_material_list_query(
+    user_id: str,
+    category: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 10,
+    sort: MaterialSort = "id",
+):
+    """
+    사용자 재료 목록 쿼리 (cursor는 마지막 행의 (정렬 키, id) keyset)
+
+    - id: id 오름차순 (category가 있으면 ix_material_user_id_category_id, 없으면 ix_material_user_id_id)
+    - expired_at: 소비기한 임박 순, 기한 없는 재료는 마지막 (ix_material_user_id_expiry_sort)
+    - purchased_at: 최근 구매 순, 구매일 없는 재료는 마지막 (ix_material_user_id_purchase_sort)
+
+    Raises:
+        InvalidCursorError: cursor 형식이 잘못되었거나 다른 정렬의 cursor인 경우
+    """
+    query = select(Material).where(Material.user_id == user_id)
+
+    if category:
+        query = query.where(Material.category == category)
+
+    if sort == "id":
+        if cursor:
+            _, after_id = _decode_list_cursor(cursor, sort)
+            query = query.where(Material.id > after_id)
+        return query.order_by(Material.id).limit(limit + 1)
+
+    sort_key, _, descending, null_key = _DATE_SORTS[sort]
+    if cursor:
+        after_key, after_id = _decode_list_cursor(cursor, sort)
+        # 행 비교 (키, id) > (마지막 키, 마지막 id) 는 인덱스 조건으로 쓰여 깊은 페이지도 바로 시작 위치로 감
+        after_key = literal(after_key, DateTime(timezone=True)) if after_key is not None else literal_column(null_key)
+        after = tuple_(after_key, after_id)
+        keyset = tuple_(sort_key, Material.id)
+        query = query.where(keyset < after if descending else keyset > after)
+
+    if descending:
+        return query.order_by(sort_key.desc(), Material.id.desc()).limit(limit + 1)
+    return query.order_by(sort_key, Material.id).limit(limit + 1)
+
+
+async def list_materials(
+    session: AsyncSession,
+    user_id: str,
+    category: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 10,
+    sort: MaterialSort = "id",
+) -> Tuple[List[Material], Optional[str]]:
+    """
+    사용자 재료 목록을 sort 순서로 한 페이지 조회합니다.
+    :return: (재료 리스트, 다음 페이지 cursor 또는 None)
+    """
+    query = build_material_list_query(user_id, category, cursor, limit, sort)
+    materials = (await session.execute(query)).scalars().all()
+
+    next_cursor = None
+    if len(materials) > limit:
+        materials = materials[:limit]
+        next_cursor = encode_list_cursor(materials[-1], sort)
+
+    return materials, next_cursor
+
+
+# 검색 순위는 소수점 6자리로 반올림한 numeric으로 비교 (cursor 왕복 시 float 오차 없이 같은 값)
+SEARCH_RANK_DIGITS = 6
+
+
+def material_search_rank(search: str):
+    """재료 이름과 검색어의 trigram 유사도 (0~1, 높을수록 비슷함)"""
+    return func.round(cast(func.similarity(Material.name, search), Numeric), SEARCH_RANK_DIGITS)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def build_material_search_query(
+    user_id: str,
+    search: str,
+    category: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 10,
+):
+    """
+    사용자 재료 이름 검색 쿼리 (ix_material_name_trgm 사용)
+
+    - 부분 일치(ILIKE '%검색어%')와 유사 이름(pg_trgm % 연산자)을 모두 찾음
+    - 유사도 내림차순, 같은 유사도는 id 내림차순으로 정렬
+    - cursor는 마지막 행의 (유사도, id)로 다음 페이지를 keyset 조회 (순위가 같아도 중복/누락 없음)
+
+    Raises:
+        InvalidCursorError: cursor 형식이 잘못된 경우
+    """
+    rank = material_search_rank(search)
+    query = (
+        select(Material, rank.label("rank"))
+        .where(Material.user_id == user_id)
+        .where(
+            or_(
+                Material.name.ilike(f"%{_escape_like(search)}%", escape="\\"),
+                Material.name.op("%")(search),
+            )
+        )
+    )
+
+    if category:
+        query = query.where(Material.category == category)
+    if cursor:
+        after = decode_cursor(cursor, keys=("rank", "id"))
+        try:
+            after_rank, after_id = Decimal(after["rank"]), int(after["id"])
+        except (InvalidOperation, TypeError, ValueError) as e:
+            raise _invalid_cursor(cursor) from e
+        query = query.where(tuple_(rank, Material.id) < tuple_(literal(after_rank, Numeric), after_id))
+
+    return query.order_by(rank.desc(), Material.id.desc()).limit(limit + 1)
+
+
+async def search_materials(
+    session: AsyncSession,
+    user_id: str,
+    search: str,
+    category: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 10,
+) -> Tuple[List[Material], Optional[str]]:
+    """
+    사용자 재료를 이름 유사도 순으로 검색합니다.
+    :return: (재료 리스트, 다음 페이지 cursor 또는 None)
+    """
+    query = build_material_search_query(user_id, search, category, cursor, limit)
+    rows = (await session.execute(query)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_material, last_rank = rows[-1]
+        next_cursor = encode_cursor({"rank": str(last_rank), "id": last_material.id})
+
+    return [material for material, _ in rows], next_cursor
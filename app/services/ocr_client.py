@@ -0,0 +1,202 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.utils.http_fetch import HostGuardedFetcher
+from app.utils.receipt_image import (
+    OcrPayloadStats,
+    PreparedImage,
+    ReceiptImagePreprocessor,
+    receipt_preprocessor,
+    restore_ocr_coordinates,
+)
+
+OCR_API_URL = "https://api.ocr.space/parse/image"
+
+# OCR.space 요청 옵션 (한국어 영수증, 표 형식 유지)
+OCR_OPTIONS = {
+    "language": "kor",
+    "detectOrientation": "true",
+    "isTable": "true",
+    "OCREngine": "2",
+}
+
+
+class OcrError(Exception):
+    """OCR.space가 이미지를 처리하지 못함 (IsErroredOnProcessing)"""
+
+
+class OcrResultCache:
+    """
+    이미지 SHA-256 → OCR 결과 LRU 캐시 (TTL 지원)
+    같은 영수증을 다시 올리거나 재시도하면 OCR 요청 없이 바로 반환합니다.
+    """
+
+    def __init__(self, max_size: int = 256, ttl: float = 3600.0, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None or self._clock() - entry[0] > self.ttl:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, value: dict):
+        self._entries[key] = (self._clock(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class OcrClient:
+    """
+    OCR.space 공유 클라이언트
+
+    - 앱 수명 동안 하나의 httpx.AsyncClient를 재사용 (연결 풀 / keep-alive)
+    - 연결/읽기 timeout, 일시적 오류 재시도와 circuit breaker (HostGuardedFetcher)
+    - 이미지 바이트의 SHA-256으로 결과 캐시, 같은 이미지 동시 요청은 한 번만 OCR
+    - 캐시에 없을 때만 이미지 전처리(축소/흑백/재압축) 후 전송, 전송 용량과 OCR 지연을 stats에 기록
+      (축소한 이미지의 OCR 좌표는 원본 해상도 기준으로 되돌려 반환)
+    """
+
+    def __init__(
+        self,
+        api_url: str = OCR_API_URL,
+        timeout: Optional[httpx.Timeout] = None,
+        limits: Optional[httpx.Limits] = None,
+        fetcher: Optional[HostGuardedFetcher] = None,
+        cache: Optional[OcrResultCache] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        preprocessor: Optional[ReceiptImagePreprocessor] = receipt_preprocessor,
+    ):
+        self.api_url = api_url
+        # OCR 처리 자체가 수 초 걸리므로 읽기는 여유 있게, 연결은 짧게
+        self.timeout = timeout or httpx.Timeout(30.0, connect=5.0)
+        self.limits = limits or httpx.Limits(max_connections=10, max_keepalive_connections=5)
+        self.fetcher = fetcher or HostGuardedFetcher(
+            rate_per_host=2.0, burst=5.0, max_attempts=3, timeout=self.timeout
+        )
+        self.cache = cache if cache is not None else OcrResultCache()
+        self.preprocessor = preprocessor
+        self.stats = OcrPayloadStats()
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout, limits=self.limits, transport=self._transport
+            )
+        return self._client
+
+    @staticmethod
+    def image_hash(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    async def parse_image(
+        self,
+        content: bytes,
+        filename: str = "receipt.jpg",
+        content_type: Optional[str] = "image/jpeg",
+    ) -> dict:
+        """
+        영수증 이미지를 OCR하여 OCR.space 응답(JSON)을 반환 (캐시된 결과는 수정하지 말 것)
+
+        Raises:
+            OcrError: OCR.space가 이미지 처리에 실패한 경우
+            httpx.HTTPError, CircuitOpenError: 요청 실패 (재시도 후)
+        """
+        key = self.image_hash(content)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        # 같은 이미지가 처리 중이면 그 결과를 기다림 (중복 업로드/재시도)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._recognize(content, filename, content_type)
+            if result.get("IsErroredOnProcessing"):
+                raise OcrError(str(result.get("ErrorMessage") or "OCR processing failed"))
+            self.cache.set(key, result)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 기다리는 요청이 없을 때 "exception was never retrieved" 경고 방지
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _recognize(self, content: bytes, filename: str, content_type: Optional[str]) -> dict:
+        """(캐시 미스) 이미지를 전처리하고 OCR 요청, 용량/지연 기록"""
+        if self.preprocessor is not None and settings.OCR_PREPROCESS_ENABLED:
+            prepared = await self.preprocessor.prepare(content, filename, content_type)
+        else:
+            prepared = PreparedImage(content, filename, content_type, len(content))
+
+        started = time.perf_counter()
+        result = await self.fetcher.call(self.api_url, lambda: self._request(prepared))
+        ocr_seconds = time.perf_counter() - started
+        self.stats.record(prepared, ocr_seconds)
+        # 축소해서 보냈다면 좌표를 원본 해상도 기준으로 되돌림 (캐시에도 원본 기준으로 저장)
+        restore_ocr_coordinates(result, prepared.scale)
+
+        print(
+            f"OCR {prepared.original_bytes / 1024:.0f}KiB -> {len(prepared.content) / 1024:.0f}KiB "
+            f"(preprocess {prepared.preprocess_seconds * 1000:.0f}ms, OCR {ocr_seconds * 1000:.0f}ms)"
+        )
+        return result
+
+    async def _request(self, prepared: PreparedImage) -> dict:
+        response = await self.client.post(
+            self.api_url,
+            files={"file": (prepared.filename, prepared.content, prepared.content_type)},
+            data={"apikey": settings.OCR_API_KEY, **OCR_OPTIONS},
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def aclose(self):
+        if self.preprocessor is not None:
+            self.preprocessor.shutdown()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+ocr_client = OcrClient()
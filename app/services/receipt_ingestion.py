@@ -0,0 +1,326 @@
+import asyncio
+import ipaddress
+import socket
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.models import MaterialResponse, ReceiptJobResponse
+from app.services.expiry_refinement import expiry_refinement_queue
+from app.services.materials import (
+    bulk_create_materials,
+    extract_items_with_fallback,
+    fill_estimated_expiry,
+)
+from app.services.ocr_client import OcrError, ocr_client
+from app.utils.http_client import http_client_scope
+from app.utils.http_fetch import CircuitOpenError, HostGuardedFetcher
+
+RECEIPT_CATEGORY = "기타"
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class ReceiptIngestionError(Exception):
+    """영수증 처리 실패 (status_code는 동기 API 응답 코드로 사용)"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+async def ingest_receipt(
+    session: AsyncSession,
+    user_id: str,
+    content: bytes,
+    filename: str,
+    content_type: Optional[str],
+) -> List[MaterialResponse]:
+    """
+    영수증 이미지 OCR → 항목 추출 → 소비기한 추정 → 일괄 저장 (동기 API와 백그라운드 작업 공용)
+
+    Raises:
+        ReceiptIngestionError: OCR 실패, 항목 추출 실패
+    """
+    try:
+        result = await ocr_client.parse_image(content, filename, content_type)
+    except OcrError as e:
+        raise ReceiptIngestionError(400, f"영수증 이미지를 인식하지 못했습니다: {str(e)}")
+    except (httpx.HTTPError, CircuitOpenError) as e:
+        print(f"OCR request failed: {str(e)}")
+        raise ReceiptIngestionError(502, "OCR 서비스 요청에 실패했습니다.")
+
+    # y 오차 5/10/15/20을 차례로 시도 (정렬/행 분리는 한 번만 수행)
+    data = extract_items_with_fallback(result, threshold_x=10)
+
+    if isinstance(data, str):
+        raise ReceiptIngestionError(400, data)
+
+    purchased_at = datetime.now(timezone.utc)
+    rows = []
+    for item in data:
+        rows.append({
+            "name": item["name"],
+            "price": item["price"],
+            "quantity": item["quantity"],
+            "currency": "KRW",
+            "category": RECEIPT_CATEGORY,
+            "purchased_at": purchased_at,
+            "expired_at": None,
+            "user_id": user_id,
+        })
+
+    # 소비기한은 규칙 기반으로 바로 채우고, AI 보정은 백그라운드 배치로 미룸
+    fill_estimated_expiry(rows)
+    materials = await bulk_create_materials(session, rows)
+    expiry_refinement_queue.enqueue(materials)
+    return materials
+
+
+# 호스트 이름, 포트 → IP 주소 목록
+HostResolver = Callable[[str, int], Awaitable[List[str]]]
+
+
+async def resolve_host(host: str, port: int) -> List[str]:
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return [info[4][0] for info in infos]
+
+
+def is_public_address(address: str) -> bool:
+    """인터넷에서 라우팅되는 주소인지 (사설망, loopback, link-local, 예약, multicast 주소는 False)"""
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+async def validate_webhook_url(url: str, resolve: HostResolver = resolve_host):
+    """
+    webhook_url이 공인 주소로만 연결되는 http(s) URL인지 확인 (SSRF 방지)
+    호스트가 내부망/loopback/link-local(메타데이터 서버 등)/예약 주소로 resolve되면 거부합니다.
+    DNS 응답은 바뀔 수 있으므로 작업 등록 시와 전송 직전에 각각 확인합니다.
+
+    Raises:
+        ReceiptIngestionError: 400
+    """
+    try:
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+    except ValueError:
+        raise ReceiptIngestionError(400, "webhook_url 형식이 올바르지 않습니다.")
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ReceiptIngestionError(400, "webhook_url은 http(s) URL이어야 합니다.")
+
+    try:
+        addresses = await resolve(parts.hostname, port)
+    except (OSError, UnicodeError):
+        raise ReceiptIngestionError(400, "webhook_url의 호스트를 찾을 수 없습니다.")
+
+    if not addresses or not all(is_public_address(address) for address in addresses):
+        raise ReceiptIngestionError(400, "webhook_url은 공인 주소여야 합니다.")
+
+
+@dataclass
+class ReceiptJob:
+    user_id: str
+    webhook_url: Optional[str] = None
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = JOB_QUEUED
+    materials: Optional[List[MaterialResponse]] = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    def update(self, status: str, materials=None, error: Optional[str] = None):
+        self.status = status
+        self.materials = materials
+        self.error = error
+        self.updated_at = datetime.now(timezone.utc)
+
+    def to_response(self) -> ReceiptJobResponse:
+        return ReceiptJobResponse(
+            job_id=self.id,
+            status=self.status,
+            materials=self.materials,
+            error=self.error,
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+        )
+
+
+class ReceiptJobStore:
+    """
+    작업 상태 저장소 (프로세스 메모리)
+    완료 후 ttl이 지난 작업은 새 작업을 저장할 때 정리합니다.
+    """
+
+    def __init__(self, ttl: float = 3600.0, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._jobs: Dict[str, ReceiptJob] = {}
+        self._finished_at: Dict[str, float] = {}
+
+    def add(self, job: ReceiptJob):
+        self._evict_expired()
+        self._jobs[job.id] = job
+
+    def get(self, job_id: str) -> Optional[ReceiptJob]:
+        return self._jobs.get(job_id)
+
+    def mark_finished(self, job: ReceiptJob):
+        self._finished_at[job.id] = self._clock()
+
+    def _evict_expired(self):
+        now = self._clock()
+        for job_id in [j for j, at in self._finished_at.items() if now - at > self.ttl]:
+            self._jobs.pop(job_id, None)
+            del self._finished_at[job_id]
+
+    def __len__(self):
+        return len(self._jobs)
+
+
+@dataclass
+class ReceiptUpload:
+    content: bytes
+    filename: str
+    content_type: Optional[str]
+
+
+class AsyncioReceiptJobQueue:
+    """
+    영수증 처리 작업 큐 (asyncio.Queue + worker task)
+
+    API 서버 프로세스 안에서 실행되는 로컬 구현입니다.
+    SQS 등 외부 큐로 바꿀 때는 submit/start/stop만 같은 형태로 구현하면 됩니다.
+    """
+
+    def __init__(
+        self,
+        store: Optional[ReceiptJobStore] = None,
+        workers: int = 2,
+        session_factory: Optional[Callable] = None,
+        webhook_fetcher: Optional[HostGuardedFetcher] = None,
+        webhook_client: Optional[httpx.AsyncClient] = None,
+        webhook_resolver: HostResolver = resolve_host,
+    ):
+        self.store = store if store is not None else ReceiptJobStore()
+        self.workers = workers
+        self.session_factory = session_factory
+        self.webhook_fetcher = webhook_fetcher or HostGuardedFetcher(
+            max_attempts=3, timeout=httpx.Timeout(10.0, connect=3.0)
+        )
+        self.webhook_client = webhook_client
+        self.webhook_resolver = webhook_resolver
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self):
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"receipt-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    async def submit(self, user_id: str, upload: ReceiptUpload, webhook_url: Optional[str] = None) -> ReceiptJob:
+        """
+        작업을 등록하고 바로 반환 (처리는 worker가 수행)
+
+        Raises:
+            ReceiptIngestionError: webhook_url이 공인 주소의 http(s) URL이 아닌 경우 (400)
+        """
+        if webhook_url is not None:
+            await validate_webhook_url(webhook_url, self.webhook_resolver)
+        if not self.running:
+            await self.start()
+        job = ReceiptJob(user_id=user_id, webhook_url=webhook_url)
+        self.store.add(job)
+        await self._queue.put((job, upload))
+        return job
+
+    async def join(self):
+        """대기 중인 작업이 모두 끝날 때까지 대기 (테스트/종료용)"""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def _worker(self):
+        while True:
+            job, upload = await self._queue.get()
+            try:
+                await self._run(job, upload)
+            finally:
+                self._queue.task_done()
+
+    def _get_session_factory(self) -> Callable:
+        if self.session_factory is None:
+            # DB 엔진은 실제로 작업을 처리할 때 생성 (import만으로 DB 설정이 필요하지 않도록)
+            from app.core.db import async_session_maker
+            self.session_factory = async_session_maker
+        return self.session_factory
+
+    async def _run(self, job: ReceiptJob, upload: ReceiptUpload):
+        job.update(JOB_RUNNING)
+        try:
+            async with self._get_session_factory()() as session:
+                materials = await ingest_receipt(
+                    session, job.user_id, upload.content, upload.filename, upload.content_type
+                )
+            job.update(JOB_SUCCEEDED, materials=materials)
+        except ReceiptIngestionError as e:
+            job.update(JOB_FAILED, error=e.detail)
+        except Exception as e:
+            print(f"Receipt job {job.id} failed: {str(e)}")
+            job.update(JOB_FAILED, error="영수증 처리 중 오류가 발생했습니다.")
+        finally:
+            self.store.mark_finished(job)
+
+        if job.webhook_url:
+            await self._notify(job)
+
+    async def _notify(self, job: ReceiptJob):
+        """완료된 작업 결과를 webhook으로 전송 (실패해도 polling으로 조회 가능)"""
+        try:
+            # 등록 후 DNS가 내부 주소로 바뀌었을 수 있으므로 전송 직전에 다시 확인
+            await validate_webhook_url(job.webhook_url, self.webhook_resolver)
+        except ReceiptIngestionError as e:
+            print(f"Receipt job {job.id} webhook rejected: {e.detail}")
+            return
+
+        payload = job.to_response().model_dump(mode="json")
+
+        async def post():
+            async with http_client_scope(self.webhook_client, timeout=self.webhook_fetcher.timeout) as client:
+                # redirect로 내부 주소에 보내지 않도록 redirect는 따라가지 않음
+                response = await client.post(job.webhook_url, json=payload, follow_redirects=False)
+                response.raise_for_status()
+
+        try:
+            await self.webhook_fetcher.call(job.webhook_url, post)
+        except Exception as e:
+            print(f"Receipt job {job.id} webhook failed: {str(e)}")
+
+
+receipt_job_queue = AsyncioReceiptJobQueue()
@@ -1,15 +1,20 @@
-from datetime import datetime
-from typing import List, Dict
+from datetime import datetime, timezone
+from typing import List, Dict, Optional, Sequence, Set
+from sqlalchemy import and_, delete, exists, false, func, literal, or_, true, update
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.models.recipes import (
+    ConsumedMaterial,
     Priority,
     Recipe,
+    RecipeCookResponse,
     RecipeRecommendation,
     RecipeRecommendationResponse
 )
-from app.models.materials import Material
+from app.models.materials import MATERIAL_EXPIRY_SORT_KEY, Material
+from app.services.fridge_status import fridge_status_service, material_priority
+from app.services.ingredients import ingredient_normalizer
 
 
 # Priority별 가중치 상수
@@ -28,18 +33,7 @@ class RecipeRecommendationService:
         식재료별 Priority 부여
         유통기한에 따라 HIGH(D-3), MEDIUM(D-7), NORMAL로 분류
         """
-        if not material.expired_at:
-            return Priority.NORMAL
-
-        now = datetime.utcnow()
-        days_until_expiry = (material.expired_at.replace(tzinfo=None) - now).days
-
-        if days_until_expiry <= 3:
-            return Priority.HIGH
-        elif days_until_expiry <= 7:
-            return Priority.MEDIUM
-        else:
-            return Priority.NORMAL
+        return material_priority(material.expired_at, datetime.now(timezone.utc))
 
     async def get_user_materials(
         self,
@@ -47,10 +41,79 @@ class RecipeRecommendationService:
         user_id: str
     ) -> List[Material]:
         """사용자 보유 식재료 조회"""
-        query = select(Material).where(Material.user_id == user_id)
-        result = await session.execute(query)
+        result = await session.execute(self.user_materials_query(user_id))
         return result.scalars().all()
 
+    @staticmethod
+    def user_materials_query(user_id: str):
+        """사용자 식재료를 소비기한 임박 순으로 (ix_material_user_id_expiry_sort, 기한 없는 재료는 마지막)"""
+        return (
+            select(Material)
+            .where(Material.user_id == user_id)
+            .order_by(MATERIAL_EXPIRY_SORT_KEY, Material.id)
+        )
+
+    @staticmethod
+    def recipes_query(user_materials: List[Material], min_match_ratio: float):
+        """
+        점수를 계산할 레시피 조회
+        최소 일치율이 있으면 매칭될 수 없는 레시피는 미리 제외 (표준 재료 겹침은 GIN 인덱스)
+        - 정규화 전 레시피(ingredient_ids 없음)는 부분 문자열로 매칭하므로 제외하지 않음
+        - 정규화되지 않은 사용자 재료는 이름이 레시피 재료명에 포함되면 매칭 (calculate_matching_score와 같은 기준)
+        """
+        query = select(Recipe)
+        user_ingredient_ids = sorted({id for m in user_materials for id in (m.ingredient_ids or ())})
+        if min_match_ratio <= 0 or not user_ingredient_ids:
+            return query
+
+        conditions = [
+            Recipe.ingredient_ids.overlap(user_ingredient_ids),
+            func.cardinality(Recipe.ingredient_ids) == 0,
+            Recipe.ingredient_ids.is_(None),
+        ]
+        unnormalized_names = sorted({m.name.lower() for m in user_materials if not m.ingredient_ids and m.name})
+        if unnormalized_names:
+            ingredient = func.unnest(Recipe.material_names).table_valued("name").render_derived()
+            conditions.append(exists(
+                select(ingredient.c.name).where(or_(*(
+                    func.strpos(func.lower(ingredient.c.name), name) > 0 for name in unnormalized_names
+                )))
+            ))
+        return query.where(or_(*conditions))
+
+    @staticmethod
+    def fallback_ingredient_ids(name: str, recipe_ingredients: List[str], recipe_ingredient_ids: Set[int]) -> Set[int]:
+        """
+        정규화되지 않은 재료(ingredient_ids 없음)가 정규화된 레시피와 겹치는 표준 id
+        재료 이름(소문자)이 포함된 레시피 재료 문자열을 정규화하여 레시피의 ingredient_ids와 비교
+        """
+        return recipe_ingredient_ids.intersection(ingredient_normalizer.normalize_all(
+            ingredient for ingredient in recipe_ingredients if name in ingredient
+        ))
+
+    async def fallback_material_names(self, session: AsyncSession, user_id: str, recipe: Optional[Recipe]) -> List[str]:
+        """
+        정규화된 레시피에 대해 calculate_matching_score가 부분 문자열로 매칭하는 사용자 재료 이름 (소문자)
+        요리 완료 시 추천에 나온 재료만 차감하도록 cook_statement에 전달
+        """
+        if recipe is None or not recipe.ingredient_ids:
+            return []
+
+        result = await session.execute(
+            select(Material.name)
+            .where(
+                Material.user_id == user_id,
+                func.cardinality(Material.ingredient_ids) == 0,
+                Material.name != "",
+            )
+        )
+        recipe_ingredients = [m.lower() for m in recipe.material_names or ()]
+        recipe_ingredient_ids = set(recipe.ingredient_ids)
+        return sorted({
+            name.lower() for name in result.scalars().all()
+            if self.fallback_ingredient_ids(name.lower(), recipe_ingredients, recipe_ingredient_ids)
+        })
+
     async def calculate_matching_score(
         self,
         recipe: Recipe,
@@ -67,22 +130,49 @@ class RecipeRecommendationService:
             - missing_materials: 부족한 재료 목록
             - high_priority_materials: HIGH priority 재료 목록
         """
-        # 1. 재료 일치율 계산 (부분 문자열 매칭)
-        recipe_ingredients = set(m.lower() for m in recipe.material_names)
-        user_ingredient_names = set(m.name.lower() for m in user_materials)
-
-        # 부분 문자열 매칭: 사용자 재료가 레시피 재료에 포함되어 있는지 확인
-        matched = set()
-        for user_ingredient in user_ingredient_names:
-            for recipe_ingredient in recipe_ingredients:
-                if user_ingredient in recipe_ingredient:
-                    matched.add(user_ingredient)
-                    break
-
-        if not recipe_ingredients:
-            base_match_ratio = 0.0
+        # 1. 재료 일치율 계산
+        recipe_ingredients = list(dict.fromkeys(m.lower() for m in recipe.material_names or ()))
+        recipe_ingredient_ids = set(recipe.ingredient_ids or ())
+        if recipe_ingredient_ids:
+            # 표준 식재료 id 교집합 (저장 시 정규화해 둔 ingredient_ids)
+            matched_ids = set()
+            matched = set()
+            for m in user_materials:
+                name = m.name.lower()
+                if m.ingredient_ids:
+                    ids = recipe_ingredient_ids.intersection(m.ingredient_ids)
+                elif name:
+                    ids = self.fallback_ingredient_ids(name, recipe_ingredients, recipe_ingredient_ids)
+                else:
+                    ids = set()
+                if ids:
+                    matched_ids |= ids
+                    matched.add(name)
+
+            base_match_ratio = len(matched_ids) / len(recipe_ingredient_ids)
+            # 부족한 재료는 레시피 재료 문자열 그대로 (매칭된 표준 재료가 없는 항목)
+            missing_materials = [
+                ingredient for ingredient in recipe_ingredients
+                if not matched_ids.intersection(ingredient_normalizer.normalize(ingredient))
+            ]
         else:
-            base_match_ratio = len(matched) / len(recipe_ingredients)
+            # ingredient_ids가 없는 레시피 (정규화 전 데이터): 부분 문자열 매칭
+            recipe_ingredients = set(recipe_ingredients)
+            user_ingredient_names = set(m.name.lower() for m in user_materials)
+
+            # 부분 문자열 매칭: 사용자 재료가 레시피 재료에 포함되어 있는지 확인
+            matched = set()
+            for user_ingredient in user_ingredient_names:
+                for recipe_ingredient in recipe_ingredients:
+                    if user_ingredient in recipe_ingredient:
+                        matched.add(user_ingredient)
+                        break
+
+            if not recipe_ingredients:
+                base_match_ratio = 0.0
+            else:
+                base_match_ratio = len(matched) / len(recipe_ingredients)
+            missing_materials = list(recipe_ingredients - user_ingredient_names)
 
         # 2. priority_weight 계산: 매칭된 재료 중 최고 Priority 기준
         matched_materials_list = [
@@ -102,9 +192,8 @@ class RecipeRecommendationService:
         # 3. 최종 점수 = base_match_ratio × priority_weight
         final_score = base_match_ratio * priority_weight
 
-        # 매칭 재료 및 부족 재료 목록
+        # 매칭 재료 목록
         matched_materials = list(matched)
-        missing_materials = list(recipe_ingredients - user_ingredient_names)
 
         # HIGH priority 재료 목록
         high_priority_materials = [
@@ -121,12 +210,27 @@ class RecipeRecommendationService:
             "high_priority_materials": high_priority_materials
         }
 
+    def select_thumbnail_url(self, recipe: Recipe, thumbnail_size: Optional[int] = None) -> str:
+        """
+        클라이언트 썸네일 너비에 맞는 WebP 변형 URL 선택
+        요청 너비 이상인 가장 작은 변형, 없으면 가장 큰 변형을 반환하고
+        너비를 지정하지 않았거나 변형이 없으면 원본 썸네일 URL을 반환합니다.
+        """
+        variants = recipe.thumbnail_variants or {}
+        if not thumbnail_size or not variants:
+            return recipe.thumbnail_url
+
+        widths = sorted(int(width) for width in variants)
+        width = next((w for w in widths if w >= thumbnail_size), widths[-1])
+        return variants[str(width)]
+
     async def get_recipe_recommendations(
         self,
         session: AsyncSession,
         user_id: str,
         limit: int = 10,
-        min_match_ratio: float = 0.3
+        min_match_ratio: float = 0.3,
+        thumbnail_size: Optional[int] = None
     ) -> List[RecipeRecommendationResponse]:
         """
         사용자에게 레시피 추천 (단순화)
@@ -143,15 +247,15 @@ class RecipeRecommendationService:
         if not user_materials:
             return []
 
-        # Step 2: 유통기한 임박 식재료 우선순위 부여
-        material_priorities = {}
-        for material in user_materials:
-            priority = await self.assign_material_priority(material)
-            material_priorities[material.name] = priority
+        # Step 2: 유통기한 임박 식재료 우선순위 부여 (fridge_status와 같은 기준, 기준 시각은 한 번만)
+        now = datetime.now(timezone.utc)
+        material_priorities = {
+            material.name: material_priority(material.expired_at, now)
+            for material in user_materials
+        }
 
         # Step 3: RDS 레시피 데이터베이스에서 레시피 검색
-        query = select(Recipe)
-        result = await session.execute(query)
+        result = await session.execute(self.recipes_query(user_materials, min_match_ratio))
         all_recipes = result.scalars().all()
 
         # Step 4: 매칭 점수 계산
@@ -203,7 +307,7 @@ class RecipeRecommendationService:
                 id=recommendation.id,
                 recipe_id=recipe.recipe_id,
                 recipe_name=recipe.recipe_name,
-                thumbnail_url=recipe.thumbnail_url,
+                thumbnail_url=self.select_thumbnail_url(recipe, thumbnail_size),
                 recipe_pat=recipe.recipe_pat,
                 method=recipe.method,
                 matched_materials=score_info["matched_materials"],
@@ -243,5 +347,133 @@ class RecipeRecommendationService:
 
         return recommendation
 
+    @staticmethod
+    def cook_statement(
+        user_id: str,
+        recommendation_id: int,
+        cooked_at: datetime,
+        material_names: Optional[List[str]] = None,
+        fallback_names: Sequence[str] = ()
+    ):
+        """
+        요리 완료를 한 문장(데이터 변경 CTE)으로 처리
+
+        1. cooked: 추천 기록의 cooked_at 갱신 (본인 추천만)
+        2. matched: calculate_matching_score가 매칭하는 사용자 재료
+           - 표준 재료(ingredient_ids)가 레시피와 겹치는 재료
+           - 정규화 전 레시피(ingredient_ids 없음)는 재료명 부분 문자열
+           - 정규화되지 않은 재료는 fallback_names에 있는 이름만 (fallback_material_names로 계산)
+           같은 이름이 여러 개면 소비기한이 가장 임박한 재료 하나
+        3. consumed / deleted: 수량 1 차감, 마지막 하나였으면 삭제
+
+        Returns: (id, name, quantity, deleted) 행
+        """
+        materials = Material.__table__
+        recipes = Recipe.__table__
+        recommendations = RecipeRecommendation.__table__
+
+        cooked = (
+            update(recommendations)
+            .where(recommendations.c.id == recommendation_id, recommendations.c.user_id == user_id)
+            .values(cooked_at=cooked_at)
+            .returning(recommendations.c.recipe_id)
+            .cte("cooked")
+        )
+
+        ingredient = func.unnest(recipes.c.material_names).table_valued("name").render_derived()
+        material_name = func.lower(materials.c.name)
+        conditions = [
+            materials.c.ingredient_ids.overlap(recipes.c.ingredient_ids),
+            and_(
+                func.cardinality(recipes.c.ingredient_ids) == 0,
+                exists(
+                    select(ingredient.c.name)
+                    .where(func.strpos(func.lower(ingredient.c.name), material_name) > 0)
+                ),
+            ),
+        ]
+        if fallback_names:
+            conditions.append(and_(
+                func.cardinality(materials.c.ingredient_ids) == 0,
+                material_name.in_([name.lower() for name in fallback_names]),
+            ))
+        matched = (
+            select(materials.c.id)
+            .distinct(material_name)
+            .where(
+                materials.c.user_id == user_id,
+                materials.c.name != "",
+                recipes.c.recipe_id == cooked.c.recipe_id,
+                or_(*conditions),
+            )
+            .order_by(material_name, MATERIAL_EXPIRY_SORT_KEY, materials.c.id)
+        )
+        if material_names is not None:
+            matched = matched.where(material_name.in_([name.lower() for name in material_names]))
+        matched = matched.cte("matched")
+
+        consumed = (
+            update(materials)
+            .where(materials.c.id == matched.c.id, materials.c.quantity > 1)
+            .values(quantity=materials.c.quantity - 1)
+            .returning(materials.c.id, materials.c.name, materials.c.quantity)
+            .cte("consumed")
+        )
+        deleted = (
+            delete(materials)
+            .where(materials.c.id == matched.c.id, materials.c.quantity <= 1)
+            .returning(materials.c.id, materials.c.name)
+            .cte("deleted")
+        )
+
+        return select(
+            consumed.c.id, consumed.c.name, consumed.c.quantity, false().label("deleted")
+        ).union_all(
+            select(deleted.c.id, deleted.c.name, literal(0), true())
+        )
+
+    async def cook_recipe(
+        self,
+        session: AsyncSession,
+        user_id: str,
+        recommendation_id: int,
+        material_names: Optional[List[str]] = None
+    ) -> RecipeCookResponse:
+        """
+        추천 레시피로 요리 완료 처리
+        일치하는 재료를 차감/삭제하고 추천 기록에 cooked_at을 남깁니다. (한 트랜잭션)
+        """
+        recommendation = await session.get(RecipeRecommendation, recommendation_id)
+
+        if not recommendation:
+            raise ValueError(f"Recommendation {recommendation_id} not found")
+
+        if recommendation.user_id != user_id:
+            raise ValueError("User ID mismatch")
+
+        # 정규화되지 않은 재료는 추천 시와 같은 기준으로 매칭되는 것만 차감
+        recipe = await session.get(Recipe, recommendation.recipe_id)
+        fallback_names = await self.fallback_material_names(session, user_id, recipe)
+
+        cooked_at = datetime.now(timezone.utc)
+        result = await session.execute(
+            self.cook_statement(user_id, recommendation_id, cooked_at, material_names, fallback_names)
+        )
+        consumed = [
+            ConsumedMaterial(material_id=row.id, name=row.name, quantity=row.quantity, deleted=row.deleted)
+            for row in result.all()
+        ]
+
+        if consumed:
+            await fridge_status_service.refresh(session, [user_id])
+        await session.commit()
+
+        return RecipeCookResponse(
+            id=recommendation_id,
+            recipe_id=recommendation.recipe_id,
+            cooked_at=cooked_at,
+            consumed_materials=consumed
+        )
+
 
 recipe_recommendation_service = RecipeRecommendationService()
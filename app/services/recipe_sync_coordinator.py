@@ -0,0 +1,227 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class LambdaShardInvoker:
+    """
+    수동 동기화 Lambda를 샤드 단위로 비동기(Event) 호출하는 invoker
+
+    호출은 Lambda가 이벤트를 접수하면(202) 바로 반환되므로 코디네이터는 샤드 실행을 기다리지 않고,
+    각 샤드는 별도의 Lambda 실행으로 독립적인 15분 타임아웃을 가집니다.
+    샤드 결과는 각 샤드가 실행 상태(recipe_sync_run_store)에 직접 기록합니다.
+    """
+
+    def __init__(
+        self,
+        function_name: str,
+        region_name: Optional[str] = None,
+        read_timeout: int = 60,
+        max_pool_connections: int = 50,
+    ):
+        self.function_name = function_name
+        self.region_name = region_name or os.environ.get("AWS_REGION", "ap-northeast-2")
+        self.read_timeout = read_timeout
+        self.max_pool_connections = max_pool_connections
+        self._client = None
+
+    def _get_client(self):
+        """Lambda 클라이언트 생성 (lazy loading)"""
+        if self._client is None:
+            import boto3
+            from botocore.config import Config
+
+            self._client = boto3.client(
+                "lambda",
+                region_name=self.region_name,
+                config=Config(
+                    read_timeout=self.read_timeout,
+                    connect_timeout=10,
+                    # 접수 여부를 모른 채 재시도하면 같은 샤드가 중복 실행되므로 재시도 비활성화
+                    retries={"max_attempts": 0},
+                    max_pool_connections=self.max_pool_connections,
+                ),
+            )
+        return self._client
+
+    def __call__(self, payload: Dict) -> Dict:
+        response = self._get_client().invoke(
+            FunctionName=self.function_name,
+            InvocationType="Event",
+            Payload=json.dumps(payload).encode("utf-8"),
+        )
+
+        if response.get("StatusCode") != 202:
+            raise RuntimeError(f"Shard invocation was not accepted: StatusCode={response.get('StatusCode')}")
+        return {"statusCode": 202}
+
+
+class LocalShardInvoker:
+    """
+    Lambda 대신 같은 프로세스에서 핸들러를 직접 호출하는 invoker (로컬/테스트용)
+    """
+
+    def __init__(self, handler: Callable[[Dict, object], Dict]):
+        self.handler = handler
+
+    def __call__(self, payload: Dict) -> Dict:
+        # Lambda 호출과 동일하게 JSON 직렬화를 거쳐 전달
+        return self.handler(json.loads(json.dumps(payload)), None)
+
+
+class RecipeSyncCoordinator:
+    """
+    큰 레시피 범위를 샤드로 나누어 병렬로 동기화하는 코디네이터
+
+    - dispatch: 샤드를 비동기로 호출만 하고 반환 (Lambda, 결과는 샤드가 실행 상태에 기록)
+    - run: 샤드를 실행하고 결과의 total_synced와 실패한 샤드를 모아서 반환 (로컬)
+    """
+
+    def __init__(
+        self,
+        invoker: Callable[[Dict], Dict],
+        max_concurrency: int = 10
+    ):
+        self.invoker = invoker
+        self.max_concurrency = max(1, max_concurrency)
+
+    @staticmethod
+    def plan_shards(
+        start_index: int,
+        end_index: int,
+        shard_size: int
+    ) -> List[Tuple[int, int]]:
+        """
+        [start_index, end_index] 범위를 shard_size 단위로 분할
+
+        Example:
+            plan_shards(1, 250, 100) -> [(1, 100), (101, 200), (201, 250)]
+        """
+        if shard_size < 1:
+            raise ValueError("shard_size must be >= 1")
+        if start_index < 1 or end_index < start_index:
+            raise ValueError("Invalid range: start_index must be >= 1 and end_index >= start_index")
+
+        shards = []
+        shard_start = start_index
+        while shard_start <= end_index:
+            shard_end = min(shard_start + shard_size - 1, end_index)
+            shards.append((shard_start, shard_end))
+            shard_start = shard_end + 1
+        return shards
+
+    def _run_shard(self, shard: Tuple[int, int]) -> Dict:
+        """
+        단일 샤드 실행 후 Lambda 응답 본문을 반환
+        statusCode가 200이 아니면 예외 발생
+        """
+        start_index, end_index = shard
+        response = self.invoker({
+            "start_index": start_index,
+            "end_index": end_index,
+        })
+
+        body = response.get("body", {})
+        if isinstance(body, str):
+            body = json.loads(body)
+
+        if response.get("statusCode") != 200:
+            raise RuntimeError(body.get("error", f"statusCode={response.get('statusCode')}"))
+        return body
+
+    def dispatch(self, run_id: str, shards: List[Tuple[int, int]]) -> Dict:
+        """
+        샤드를 비동기로 호출 (샤드 실행은 기다리지 않음)
+
+        각 샤드 payload에 run_id를 포함하므로 샤드는 끝나면 결과를 해당 실행에 기록합니다.
+
+        Returns:
+            - shards: 전체 샤드 수
+            - dispatched: 호출이 접수된 샤드 수
+            - failed_shards: 호출 자체가 실패한 샤드 범위와 에러 메시지
+        """
+        failed_shards = []
+
+        print(f"Dispatching {len(shards)} shards for run {run_id} (max concurrency: {self.max_concurrency})")
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(shards))) as executor:
+            futures = {
+                executor.submit(self.invoker, {
+                    "run_id": run_id,
+                    "start_index": shard_start,
+                    "end_index": shard_end,
+                }): (shard_start, shard_end)
+                for shard_start, shard_end in shards
+            }
+
+            for future in as_completed(futures):
+                shard_start, shard_end = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Shard {shard_start}-{shard_end} dispatch failed: {str(e)}")
+                    failed_shards.append({
+                        "start_index": shard_start,
+                        "end_index": shard_end,
+                        "error": str(e),
+                    })
+
+        failed_shards.sort(key=lambda shard: shard["start_index"])
+
+        return {
+            "shards": len(shards),
+            "dispatched": len(shards) - len(failed_shards),
+            "failed_shards": failed_shards,
+        }
+
+    def run(self, start_index: int, end_index: int, shard_size: int) -> Dict:
+        """
+        샤드를 병렬로 실행하고 결과를 집계
+
+        Returns:
+            - shards: 전체 샤드 수
+            - total_synced: 모든 샤드에서 동기화된 레시피 수 합계
+            - new / changed / unchanged / failed: 샤드 결과의 레시피별 상태 합계
+            - failed_shards: 실패한 샤드 범위와 에러 메시지 (재실행용)
+            - duration_seconds: 전체 소요 시간
+        """
+        shards = self.plan_shards(start_index, end_index, shard_size)
+        started_at = datetime.utcnow()
+
+        total_synced = 0
+        counts = {"new": 0, "changed": 0, "unchanged": 0, "failed": 0}
+        failed_shards = []
+
+        print(f"Dispatching {len(shards)} shards (max concurrency: {self.max_concurrency})")
+
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(shards))) as executor:
+            futures = {executor.submit(self._run_shard, shard): shard for shard in shards}
+
+            for future in as_completed(futures):
+                shard_start, shard_end = futures[future]
+                try:
+                    body = future.result()
+                    synced = int(body.get("total_synced", 0))
+                    total_synced += synced
+                    for key in counts:
+                        counts[key] += int(body.get(key, 0))
+                    print(f"Shard {shard_start}-{shard_end} completed: {synced} synced")
+                except Exception as e:
+                    print(f"Shard {shard_start}-{shard_end} failed: {str(e)}")
+                    failed_shards.append({
+                        "start_index": shard_start,
+                        "end_index": shard_end,
+                        "error": str(e),
+                    })
+
+        failed_shards.sort(key=lambda shard: shard["start_index"])
+
+        return {
+            "shards": len(shards),
+            "total_synced": total_synced,
+            **counts,
+            "failed_shards": failed_shards,
+            "duration_seconds": (datetime.utcnow() - started_at).total_seconds(),
+        }
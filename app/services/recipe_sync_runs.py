@@ -0,0 +1,222 @@
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.models.recipes import RecipeSyncRun, RecipeSyncShard
+
+# 샤드 결과에서 합산하는 값 (recipe_sync_service 결과 키)
+SHARD_COUNT_KEYS = ("total_synced", "new", "changed", "unchanged", "failed")
+
+# 비동기(Event) 호출이 큐에서 대기하는 시간 여유
+SHARD_START_GRACE = timedelta(minutes=1)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """timezone 없는 값은 UTC로 간주"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def summarize_shards(shards: List[RecipeSyncShard]) -> Dict:
+    """
+    샤드 상태 집계
+
+    Returns:
+        - shards: 전체 샤드 수
+        - total_synced / new / changed / unchanged / failed: 성공한 샤드 결과 합계
+        - pending_shards: 아직 결과를 기록하지 않은 샤드 범위
+        - failed_shards: 실패한 샤드 범위와 에러 메시지 (재실행용)
+    """
+    succeeded = [shard for shard in shards if shard.status == "succeeded"]
+    summary = {key: sum(getattr(shard, key) for shard in succeeded) for key in SHARD_COUNT_KEYS}
+    summary["shards"] = len(shards)
+    summary["pending_shards"] = [
+        {"start_index": shard.start_index, "end_index": shard.end_index}
+        for shard in shards if shard.status == "pending"
+    ]
+    summary["failed_shards"] = [
+        {"start_index": shard.start_index, "end_index": shard.end_index, "error": shard.error}
+        for shard in shards if shard.status == "failed"
+    ]
+    return summary
+
+
+class RecipeSyncRunStore:
+    """
+    코디네이터 모드 실행/샤드 상태 저장소
+
+    코디네이터는 run과 샤드 행(pending)을 만든 뒤 샤드를 비동기(Event)로 호출하고 바로 반환합니다.
+    각 샤드는 끝나면 결과를 기록하고, 마지막으로 끝난 샤드가 전체 결과를 집계하여 run을 완료 처리합니다.
+    Lambda 제한 시간 초과나 메모리 부족으로 죽은 샤드는 결과를 기록하지 못하고 재시도도 없으므로,
+    제한 시간이 지나도 pending인 샤드는 상태 조회 시 실패로 기록하여 run을 완료 처리합니다.
+    """
+
+    def __init__(self, clock=lambda: datetime.now(timezone.utc), shard_timeout: Optional[timedelta] = None):
+        self._clock = clock
+        self._shard_timeout = shard_timeout
+
+    @property
+    def shard_timeout(self) -> timedelta:
+        if self._shard_timeout is None:
+            return timedelta(seconds=settings.RECIPE_SYNC_SHARD_TIMEOUT_SECONDS)
+        return self._shard_timeout
+
+    async def create_run(
+        self,
+        session: AsyncSession,
+        run_id: str,
+        start_index: int,
+        end_index: int,
+        shard_size: int,
+        shards: List[Tuple[int, int]]
+    ) -> RecipeSyncRun:
+        """run과 pending 샤드 행 생성 (샤드 호출 전에 commit)"""
+        run = RecipeSyncRun(
+            run_id=run_id,
+            start_index=start_index,
+            end_index=end_index,
+            shard_size=shard_size,
+            shard_count=len(shards),
+            created_at=self._clock(),
+        )
+        session.add(run)
+        await session.flush()
+        session.add_all([
+            RecipeSyncShard(run_id=run_id, start_index=shard_start, end_index=shard_end)
+            for shard_start, shard_end in shards
+        ])
+        await session.commit()
+        return run
+
+    async def record_shard_result(
+        self,
+        session: AsyncSession,
+        run_id: str,
+        start_index: int,
+        result: Optional[Dict] = None,
+        error: Optional[str] = None
+    ) -> Optional[RecipeSyncRun]:
+        """
+        샤드 결과 기록, 마지막 샤드였다면 run 결과를 집계하여 완료 처리
+
+        run 행을 잠근 상태에서 기록과 완료 판정을 합니다.
+
+        Returns:
+            이번 기록으로 완료된 run, 아직 남은 샤드가 있으면 None
+        """
+        now = self._clock()
+        run = await self._lock_run(session, run_id)
+        if run is None:
+            raise ValueError(f"Sync run {run_id} not found")
+
+        values = {"status": "failed" if error else "succeeded", "error": error, "updated_at": now}
+        for key in SHARD_COUNT_KEYS:
+            values[key] = int((result or {}).get(key, 0))
+        await session.execute(
+            update(RecipeSyncShard)
+            .where(RecipeSyncShard.run_id == run_id, RecipeSyncShard.start_index == start_index)
+            .values(**values)
+        )
+
+        completed = await self._complete_if_finished(session, run, now)
+        await session.commit()
+        return completed
+
+    async def fail_unreported_shards(self, session: AsyncSession, run_id: str) -> Optional[RecipeSyncRun]:
+        """
+        제한 시간이 지나도 결과를 기록하지 않은 샤드를 실패로 기록하고 run을 완료 처리
+
+        Returns:
+            이번에 완료된 run, 아직 제한 시간 전이거나 이미 완료된 run이면 None
+        """
+        now = self._clock()
+        run = await self._lock_run(session, run_id)
+        if run is None or run.status != "running" or now < self.report_deadline(run):
+            await session.commit()
+            return None
+
+        await session.execute(
+            update(RecipeSyncShard)
+            .where(RecipeSyncShard.run_id == run_id, RecipeSyncShard.status == "pending")
+            .values(
+                status="failed",
+                error=f"No result within {int(self.shard_timeout.total_seconds())}s (shard timed out or crashed)",
+                updated_at=now,
+            )
+        )
+
+        completed = await self._complete_if_finished(session, run, now)
+        await session.commit()
+        return completed
+
+    def report_deadline(self, run: RecipeSyncRun) -> datetime:
+        """이 시각까지 결과가 없는 샤드는 Lambda 제한 시간을 넘겨 죽은 것으로 봄"""
+        return _as_utc(run.created_at) + self.shard_timeout + SHARD_START_GRACE
+
+    async def _lock_run(self, session: AsyncSession, run_id: str) -> Optional[RecipeSyncRun]:
+        """
+        run 행 잠금 (SELECT ... FOR UPDATE)
+        같은 run의 샤드가 동시에 끝나도 집계가 한 번만, 모든 결과를 본 뒤에 일어나도록 함
+        """
+        return (await session.execute(
+            select(RecipeSyncRun)
+            .where(RecipeSyncRun.run_id == run_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )).scalar_one_or_none()
+
+    async def _complete_if_finished(
+        self, session: AsyncSession, run: RecipeSyncRun, now: datetime
+    ) -> Optional[RecipeSyncRun]:
+        """pending 샤드가 없으면 결과를 집계하여 run 완료 처리 (run 행을 잠근 상태에서 호출)"""
+        shards = (await session.execute(
+            select(RecipeSyncShard)
+            .where(RecipeSyncShard.run_id == run.run_id)
+            .order_by(RecipeSyncShard.start_index)
+            .execution_options(populate_existing=True)
+        )).scalars().all()
+
+        if run.status != "running" or any(shard.status == "pending" for shard in shards):
+            return None
+
+        summary = summarize_shards(shards)
+        run.status = "partial" if summary["failed_shards"] else "completed"
+        run.result = summary
+        run.completed_at = now
+        return run
+
+    async def get_status(self, session: AsyncSession, run_id: str) -> Optional[Dict]:
+        """
+        run 진행 상태 (샤드 행에서 바로 집계하므로 완료 전에도 조회 가능)
+        제한 시간이 지나도 결과가 없는 샤드는 여기서 실패로 기록하여 run을 완료 처리합니다.
+        """
+        run = await session.get(RecipeSyncRun, run_id)
+        if run is None:
+            return None
+        if run.status == "running" and self._clock() >= self.report_deadline(run):
+            completed = await self.fail_unreported_shards(session, run_id)
+            if completed is not None:
+                print(f"Sync run {run_id} {completed.status}: unreported shards marked as failed")
+            run = await session.get(RecipeSyncRun, run_id, populate_existing=True)
+
+        shards = (await session.execute(
+            select(RecipeSyncShard)
+            .where(RecipeSyncShard.run_id == run_id)
+            .order_by(RecipeSyncShard.start_index)
+            .execution_options(populate_existing=True)
+        )).scalars().all()
+
+        return {
+            "run_id": run.run_id,
+            "status": run.status,
+            "range": {"start_index": run.start_index, "end_index": run.end_index},
+            **summarize_shards(shards),
+            "created_at": run.created_at.isoformat(),
+            "completed_at": run.completed_at.isoformat() if run.completed_at else None,
+        }
+
+
+recipe_sync_run_store = RecipeSyncRunStore()
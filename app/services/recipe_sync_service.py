@@ -1,27 +1,72 @@
+import asyncio
+import hashlib
 import re
-from typing import List, Dict, Optional
-from datetime import datetime
+from collections import Counter
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime, timezone
 import httpx
 import json
-import boto3
+from sqlalchemy import func
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
-from app.models.recipes import Recipe
+from app.models.recipes import Recipe, RecipeSyncState
+from app.services.ingredients import ingredient_normalizer
+from app.utils.http_client import http_client_scope
 from app.utils.s3_helper import s3_helper
 
 
+# 식품안전나라 레시피 API 서비스 ID (동기화 상태 테이블의 source 키)
+RECIPE_SOURCE = 'COOKRCP01'
+
+# 레시피 fingerprint 계산에 사용하는 원본 API 필드 (sync_recipe에서 사용하는 필드)
+FINGERPRINT_FIELDS = (
+    ['RCP_NM', 'RCP_PAT2', 'RCP_WAY2', 'ATT_FILE_NO_MK', 'RCP_PARTS_DTLS']
+    + [f"MANUAL{i:02d}" for i in range(1, 21)]
+    + [f"MANUAL_IMG{i:02d}" for i in range(1, 21)]
+)
+
+# 이미지 처리 방식이 바뀌면 올려서 기존 레시피도 한 번 다시 처리되게 함
+# (2: 썸네일 WebP 변형 생성)
+PIPELINE_VERSION = 2
+
+# 레시피별 동기화 결과
+SYNC_NEW = 'new'
+SYNC_CHANGED = 'changed'
+SYNC_UNCHANGED = 'unchanged'
+SYNC_FAILED = 'failed'
+
+
+def new_sync_result() -> Dict[str, int]:
+    """동기화 결과 집계용 dict (total_synced = new + changed)"""
+    return {'total_synced': 0, SYNC_NEW: 0, SYNC_CHANGED: 0, SYNC_UNCHANGED: 0, SYNC_FAILED: 0}
+
+
+def merge_sync_result(total: Dict[str, int], result: Dict[str, int]) -> Dict[str, int]:
+    """동기화 결과를 total에 더함"""
+    for key in total:
+        total[key] += result.get(key, 0)
+    return total
+
+
 class RecipeSyncService:
-    def __init__(self):
+    def __init__(self, commit_chunk_size: int = 50):
         self.base_url = settings.FOOD_SAFETY_API_BASE_URL
         self._api_key = None
         self._secrets_client = None
-        self._last_sync_date = None
+        # 한 트랜잭션에서 저장할 레시피 수 (레시피별로 SAVEPOINT 사용)
+        self.commit_chunk_size = commit_chunk_size
+        # 이미지 업로드에 실패한 레시피 (동기화 마지막에 한 번 더 시도)
+        self.image_retry_queue: Dict[int, Dict] = {}
+        # Lambda warm start 시 재사용할 공유 HTTP 클라이언트 (없으면 요청마다 생성)
+        self.http_client: Optional[httpx.AsyncClient] = None
 
     def _get_secrets_client(self):
         """Secrets Manager 클라이언트 생성 (lazy loading)"""
         if self._secrets_client is None:
+            import boto3
+
             self._secrets_client = boto3.client(
                 'secretsmanager',
                 region_name=settings.AWS_REGION
@@ -57,48 +102,60 @@ class RecipeSyncService:
             self._api_key = settings.FOOD_SAFETY_API_KEY
             return self._api_key
     
-    def _get_last_sync_date(self) -> Optional[str]:
+    async def _get_sync_state(
+        self,
+        session: AsyncSession,
+        source: str = RECIPE_SOURCE
+    ) -> Optional[RecipeSyncState]:
         """
-        마지막 동기화 날짜를 Secret Manager에서 가져오기
-        형식: YYYYMMDD (예: 20170101)
+        소스별 동기화 상태(high-water mark) 조회
+        첫 동기화라면 None
         """
-        try:
-            client = self._get_secrets_client()
-            response = client.get_secret_value(
-                SecretId='fridger/recipe-sync-metadata'
-            )
-            metadata = json.loads(response['SecretString'])
-            return metadata.get('last_sync_date')
-        except Exception as e:
-            print(f"Failed to get last sync date: {str(e)}")
-            # 첫 동기화이거나 실패 시
-            return "20000101"
-    
-    
-    def _update_last_sync_date(self, sync_date: str):
+        return await session.get(RecipeSyncState, source)
+
+    async def _stage_sync_state(
+        self,
+        session: AsyncSession,
+        change_date: Optional[str],
+        max_recipe_seq: Optional[int],
+        total_synced: int,
+        source: str = RECIPE_SOURCE
+    ) -> RecipeSyncState:
         """
-        마지막 동기화 날짜를 Secret Manager에 저장
+        동기화 상태를 세션에 반영 (commit은 각 배치의 마지막 upsert와 같은 트랜잭션에서 수행)
+
+        Args:
+            change_date: 다음 증분 동기화에 사용할 CHNG_DT (받은 레시피의 최대 CHNG_DT, YYYYMMDD)
+                         동기화가 끝나지 않은 중간 배치에서는 None (기존 값 유지)
+            max_recipe_seq: 이번 동기화에서 받은 최대 RCP_SEQ
+            total_synced: 이번 동기화에서 저장한 레시피 수
         """
-        try:
-            client = self._get_secrets_client()
-            client.put_secret_value(
-                SecretId='fridger/recipe-sync-metadata',
-                SecretString=json.dumps({
-                    'last_sync_date': sync_date
-                })
-            )
-        except client.exceptions.ResourceNotFoundException:
-            # Secret이 없으면 생성
-            client.create_secret(
-                Name='fridger/recipe-sync-metadata',
-                Description='Recipe sync metadata including last sync date',
-                SecretString=json.dumps({
-                    'last_sync_date': sync_date
-                })
-            )
-        except Exception as e:
-            print(f"Failed to update last sync date: {str(e)}")
+        state = await session.get(RecipeSyncState, source)
+        if state is None:
+            state = RecipeSyncState(source=source)
+
+        if change_date is not None:
+            state.last_change_date = change_date
+        if max_recipe_seq is not None:
+            state.max_recipe_seq = max(state.max_recipe_seq or 0, max_recipe_seq)
+        state.total_synced = total_synced
+        state.last_synced_at = datetime.now(timezone.utc)
 
+        session.add(state)
+        return state
+
+    async def _count_recipes_through(self, session: AsyncSession, max_recipe_seq: int) -> int:
+        """RCP_SEQ가 max_recipe_seq 이하인 저장된 레시피 수"""
+        result = await session.execute(
+            select(func.count()).select_from(Recipe).where(Recipe.recipe_id <= max_recipe_seq)
+        )
+        return result.scalar_one()
+
+    @staticmethod
+    def _change_date_of(recipe_data: Dict) -> Optional[str]:
+        """레시피의 CHNG_DT (YYYYMMDD, 구분자가 있어도 숫자만 사용), 없으면 None"""
+        digits = re.sub(r'\D', '', str(recipe_data.get('CHNG_DT') or ''))
+        return digits[:8] if len(digits) >= 8 else None
 
     def _parse_materials(self, rcp_parts_dtls: str) -> List[str]:
         """
@@ -138,7 +195,75 @@ class RecipeSyncService:
                 manual = re.sub(r'[a-z]$', '', manual).strip()
                 instructions.append(manual)
         return instructions
+
+    def _compute_content_hash(self, recipe_data: Dict) -> str:
+        """
+        원본 API 필드의 fingerprint (SHA-256)
+        필드 순서와 앞뒤 공백에 영향받지 않도록 정규화한 JSON으로 계산합니다.
+        """
+        payload = {
+            field: str(recipe_data.get(field) or '').strip()
+            for field in FINGERPRINT_FIELDS
+        }
+        payload['_pipeline_version'] = PIPELINE_VERSION
+        encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    async def _get_content_hashes(
+        self,
+        session: AsyncSession,
+        recipe_ids: List[int]
+    ) -> Dict[int, Optional[str]]:
+        """배치에 포함된 레시피들의 저장된 fingerprint를 한 번의 쿼리로 조회"""
+        if not recipe_ids:
+            return {}
+
+        query = select(Recipe.recipe_id, Recipe.content_hash).where(
+            Recipe.recipe_id.in_(recipe_ids)
+        )
+        result = await session.execute(query)
+        return {recipe_id: content_hash for recipe_id, content_hash in result.all()}
     
+    async def _request_recipes(
+            self,
+            start: int,
+            end: int,
+            change_date: Optional[str] = None
+        ) -> List[Dict]:
+        """
+        식품의약품안전처 API 요청 (실패 시 예외 발생)
+        데이터가 없는 경우에만 빈 리스트를 반환합니다.
+        """
+        self._get_api_key()
+
+        if change_date:
+            url = f"{self.base_url}/{self._api_key}/COOKRCP01/json/{start}/{end}/CHNG_DT={change_date}"
+        else:
+            url = f"{self.base_url}/{self._api_key}/COOKRCP01/json/{start}/{end}"
+
+        print(f"Requesting URL: {url}")  # 디버깅: URL 출력
+
+        async with http_client_scope(self.http_client, timeout=60.0) as client:
+            response = await client.get(url, timeout=60.0)
+
+            # 디버깅: 응답 상태 코드와 내용 출력
+            print(f"Response status: {response.status_code}")
+            print(f"Response headers: {dict(response.headers)}")
+            print(f"Response text (first 500 chars): {response.text[:500]}")
+
+            response.raise_for_status()
+            data = response.json()
+
+        # API 응답 구조: {serviceId: {total_count: ..., row: [...]}}
+        service_id = 'COOKRCP01'
+        if service_id in data and 'row' in data[service_id]:
+            print(f"Successfully parsed {len(data[service_id]['row'])} recipes")
+            return data[service_id]['row']
+        if service_id in data:
+            # 해당하는 데이터 없음 (INFO-200)
+            return []
+        raise ValueError(f"Unexpected API response structure: {list(data.keys())}")
+
     async def fetch_recipes_from_api(
             self,
             start: int = 1,
@@ -154,35 +279,8 @@ class RecipeSyncService:
             change_date: 변경일자 (YYYYMMDD 형식, 예: 20251126)
                             이 날짜 이후 변경된 레시피만 가져옴
         """
-        self._get_api_key()
-
-        if change_date:
-            url = f"{self.base_url}/{self._api_key}/COOKRCP01/json/{start}/{end}/CHNG_DT={change_date}"
-        else:
-            url = f"{self.base_url}/{self._api_key}/COOKRCP01/json/{start}/{end}"
-        
         try:
-            print(f"Requesting URL: {url}")  # 디버깅: URL 출력
-
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.get(url)
-
-                # 디버깅: 응답 상태 코드와 내용 출력
-                print(f"Response status: {response.status_code}")
-                print(f"Response headers: {dict(response.headers)}")
-                print(f"Response text (first 500 chars): {response.text[:500]}")
-
-                response.raise_for_status()
-                data = response.json()
-
-                # API 응답 구조: {serviceId: {total_count: ..., row: [...]}}
-                service_id = 'COOKRCP01'
-                if service_id in data and 'row' in data[service_id]:
-                    print(f"Successfully parsed {len(data[service_id]['row'])} recipes")
-                    return data[service_id]['row']
-                else:
-                    print(f"Unexpected API response structure: {list(data.keys())}")
-                return []
+            return await self._request_recipes(start, end, change_date)
         except Exception as e:
             print(f"Failed to fetch recipes from API: {str(e)}")
             import traceback
@@ -193,8 +291,27 @@ class RecipeSyncService:
         """
         단일 레시피를 DB에 동기화
         """
+        _, recipe = await self.sync_recipe_with_status(session, recipe_data)
+        return recipe
+
+    async def sync_recipe_with_status(
+        self,
+        session: AsyncSession,
+        recipe_data: Dict,
+        content_hash: Optional[str] = None
+    ) -> Tuple[str, Optional[Recipe]]:
+        """
+        단일 레시피를 DB에 동기화하고 결과 상태를 함께 반환
+
+        저장된 fingerprint와 같으면 파싱, 이미지 업로드, DB 쓰기를 모두 건너뜁니다.
+
+        Returns:
+            (new | changed | unchanged | failed, Recipe 또는 None)
+        """
         try:
             recipe_id = int(recipe_data['RCP_SEQ'])
+            if content_hash is None:
+                content_hash = self._compute_content_hash(recipe_data)
             name = recipe_data['RCP_NM']
             recipe_pat = recipe_data.get('RCP_PAT2', '')
             method = recipe_data.get('RCP_WAY2', '')
@@ -203,20 +320,26 @@ class RecipeSyncService:
             query = select(Recipe).where(Recipe.recipe_id == recipe_id)
             result = await session.execute(query)
             existing_recipe = result.scalar_one_or_none()
+
+            if existing_recipe is not None and existing_recipe.content_hash == content_hash:
+                return SYNC_UNCHANGED, existing_recipe
             
             # 재료, 조리순서 추출
             material_names = self._parse_materials(recipe_data.get('RCP_PARTS_DTLS', ''))
+            ingredient_ids = ingredient_normalizer.normalize_all(material_names)
             instructions = self._extract_instructions(recipe_data)
 
-            # 썸네일 이미지를 S3에 업로드
+            # 썸네일 이미지와 너비별 WebP 변형을 S3에 업로드
             thumbnail_original_url = recipe_data.get('ATT_FILE_NO_MK', '').strip()
-            thumbnail_s3_url = await s3_helper.upload_thumbnail_from_url(
+            thumbnail_s3_url, thumbnail_variants = await s3_helper.upload_thumbnail_with_variants(
                 thumbnail_original_url,
                 recipe_id
             )
             # S3 업로드 실패 시 원본 URL 사용
             thumbnail_url = thumbnail_s3_url if thumbnail_s3_url else thumbnail_original_url
 
+            image_failed = bool(thumbnail_original_url) and not thumbnail_s3_url
+
             # 조리 과정 이미지를 S3에 업로드 (MANUAL_IMG01~MANUAL_IMG20)
             manual_image_s3_urls = []
             for i in range(1, 21):
@@ -226,25 +349,34 @@ class RecipeSyncService:
                     s3_url = await s3_helper.upload_image_from_url(img_url, recipe_id, i)
                     if s3_url:
                         manual_image_s3_urls.append(s3_url)
+                    else:
+                        image_failed = True
+
+            if image_failed:
+                # fingerprint를 저장하지 않아 다음 동기화에서도 다시 처리되게 하고, 이번 동기화 마지막에 재시도
+                self.image_retry_queue[recipe_id] = recipe_data
+                content_hash = None
+            else:
+                self.image_retry_queue.pop(recipe_id, None)
             
             # UPSERT: 기존 레시피가 있으면 UPDATE, 없으면 INSERT
             if existing_recipe:
-                # 기존 이미지 삭제 (새 이미지로 교체)
-                if manual_image_s3_urls:  # 새 이미지가 있을 때만 삭제
-                    s3_helper.delete_recipe_images(recipe_id)
-
+                # 기존 이미지 중 더 이상 사용하지 않는 이미지는 commit 후 백그라운드에서 삭제 (_sync_chunk)
                 # 업데이트
                 existing_recipe.recipe_name = name
                 existing_recipe.recipe_pat = recipe_pat
                 existing_recipe.method = method
                 existing_recipe.thumbnail_url = thumbnail_url
+                existing_recipe.thumbnail_variants = thumbnail_variants
                 existing_recipe.instructions = instructions
                 existing_recipe.material_names = material_names
+                existing_recipe.ingredient_ids = ingredient_ids
                 existing_recipe.image_url = manual_image_s3_urls
+                existing_recipe.content_hash = content_hash
 
                 # 명시적으로 flush (롤백 상태 방지)
                 await session.flush()
-                return existing_recipe
+                return SYNC_CHANGED, existing_recipe
             else:
                 # 새로 생성
                 new_recipe = Recipe(
@@ -253,18 +385,132 @@ class RecipeSyncService:
                     method=method,
                     recipe_name=name,
                     thumbnail_url=thumbnail_url,
+                    thumbnail_variants=thumbnail_variants,
                     instructions=instructions,
                     material_names=material_names,
-                    image_url=manual_image_s3_urls
+                    ingredient_ids=ingredient_ids,
+                    image_url=manual_image_s3_urls,
+                    content_hash=content_hash
                 )
                 session.add(new_recipe)
                 await session.flush()  # 명시적으로 flush
-                return new_recipe
+                return SYNC_NEW, new_recipe
                 
         except Exception as e:
             print(f"Failed to sync recipe {recipe_data.get('RCP_SEQ')}: {str(e)}")
-            return None
+            return SYNC_FAILED, None
     
+    async def _sync_chunk(self, session: AsyncSession, recipes: List[Dict]) -> Dict[str, int]:
+        """
+        레시피 목록을 현재 트랜잭션에 저장 (commit은 호출자가 수행)
+        저장된 fingerprint를 한 번에 조회하여 변경 없는 레시피는 건너뛰고,
+        레시피마다 SAVEPOINT를 사용하여 실패한 레시피만 롤백합니다.
+
+        Returns:
+            new / changed / unchanged / failed 수와 total_synced (new + changed)
+        """
+        result = new_sync_result()
+
+        hashes = {}
+        for recipe_data in recipes:
+            try:
+                hashes[int(recipe_data['RCP_SEQ'])] = self._compute_content_hash(recipe_data)
+            except (KeyError, TypeError, ValueError):
+                pass
+        stored_hashes = await self._get_content_hashes(session, list(hashes))
+
+        for recipe_data in recipes:
+            try:
+                recipe_id = int(recipe_data['RCP_SEQ'])
+            except (KeyError, TypeError, ValueError):
+                recipe_id = None
+            content_hash = hashes.get(recipe_id)
+
+            if content_hash is not None and stored_hashes.get(recipe_id) == content_hash:
+                result[SYNC_UNCHANGED] += 1
+                continue
+
+            savepoint = await session.begin_nested()
+            try:
+                status, recipe = await self.sync_recipe_with_status(session, recipe_data, content_hash)
+            except Exception as e:
+                status, recipe = SYNC_FAILED, None
+                print(f"Failed to sync recipe {recipe_data.get('RCP_SEQ', 'unknown')}: {str(e)}")
+
+            if status != SYNC_FAILED:
+                await savepoint.commit()
+                result[status] += 1
+                if status == SYNC_CHANGED:
+                    # 새 이미지는 남기고 이전 이미지만 백그라운드에서 정리
+                    s3_helper.schedule_recipe_cleanup(recipe_id, self._image_keys(recipe))
+            else:
+                # 실패한 레시피만 롤백 후 다음 레시피 계속 처리
+                await savepoint.rollback()
+                result[SYNC_FAILED] += 1
+                print(f"Rolled back recipe {recipe_data.get('RCP_SEQ', 'unknown')}")
+
+        result['total_synced'] = result[SYNC_NEW] + result[SYNC_CHANGED]
+        return result
+
+    def _image_keys(self, recipe: Recipe) -> List[str]:
+        """레시피가 참조하는 S3 이미지 키 (원본 URL은 제외)"""
+        urls = [
+            recipe.thumbnail_url,
+            *(recipe.thumbnail_variants or {}).values(),
+            *(recipe.image_url or []),
+        ]
+        return [key for key in map(s3_helper.key_from_url, urls) if key]
+
+    async def _retry_failed_images(self, session: AsyncSession) -> Dict[str, int]:
+        """
+        이미지 업로드에 실패했던 레시피를 한 번 더 동기화
+        (호스트 circuit이 아직 열려 있으면 즉시 실패하고 다음 동기화로 넘어감)
+
+        Returns:
+            queued / recovered / still_failing 레시피 수
+        """
+        recipes = list(self.image_retry_queue.values())
+        if not recipes:
+            return {'queued': 0, 'recovered': 0, 'still_failing': 0}
+
+        print(f"Retrying images for {len(recipes)} recipes...")
+        self.image_retry_queue.clear()
+        for chunk in self._chunks(recipes):
+            await self._sync_chunk(session, chunk)
+            await session.commit()
+
+        still_failing = len(self.image_retry_queue)
+        print(f"Image retry: {len(recipes) - still_failing}/{len(recipes)} recipes recovered")
+        return {
+            'queued': len(recipes),
+            'recovered': len(recipes) - still_failing,
+            'still_failing': still_failing,
+        }
+
+    async def _load_image_references(self, session: AsyncSession) -> Dict[str, int]:
+        """모든 레시피의 thumbnail_url / thumbnail_variants / image_url에서 S3 키별 참조 수 집계"""
+        result = await session.execute(
+            select(Recipe.thumbnail_url, Recipe.thumbnail_variants, Recipe.image_url)
+        )
+
+        references = Counter()
+        for thumbnail_url, thumbnail_variants, image_urls in result.all():
+            for url in [thumbnail_url, *(thumbnail_variants or {}).values(), *(image_urls or [])]:
+                key = s3_helper.key_from_url(url)
+                if key:
+                    references[key] += 1
+        return references
+
+    async def collect_image_garbage(self, session: AsyncSession) -> Dict[str, int]:
+        """어떤 레시피도 참조하지 않는 content-addressed 이미지 삭제"""
+        references = await self._load_image_references(session)
+        return await asyncio.to_thread(s3_helper.collect_unreferenced_objects, references)
+
+    def _chunks(self, recipes: List[Dict]) -> List[List[Dict]]:
+        """commit_chunk_size 단위로 분할 (빈 목록이면 빈 chunk 하나)"""
+        size = self.commit_chunk_size
+        return [recipes[i:i + size] for i in range(0, len(recipes), size)] or [[]]
+
     async def sync_all_recipes(
             self,
             session: AsyncSession,
@@ -278,52 +524,116 @@ class RecipeSyncService:
             session: DB 세션
             batch_size: 한 번에 가져올 레시피 수
             use_incremental: True이면 마지막 동기화 이후 변경된 레시피만 가져옴
+
+        동기화 상태(recipe_sync_state)는 각 배치의 마지막 upsert chunk와 같은 트랜잭션에서 기록됩니다.
+        - 배치마다 받은 최대 RCP_SEQ(cursor)를 기록하고, CHNG_DT는 마지막 배치에서 받은 레시피의 최대값으로 기록
+        - CHNG_DT 없이 전체 목록을 받는 중이었다면 (첫 동기화가 중간에 실패한 경우 등)
+          다음 동기화는 cursor 이후부터 이어서 요청
+        - 중간에 API 요청이 실패하면 CHNG_DT는 갱신하지 않고 예외를 발생시킴 (핸들러가 500 반환)
+
+        Returns:
+            total_synced, new, changed, unchanged, failed 레시피 수
         """
         change_date = None
+        resume_after = None
+        start = 1
         if use_incremental:
-            change_date = self._get_last_sync_date()
-            print(f"Syncing recipes chagned after: {change_date}")
+            state = await self._get_sync_state(session)
+            change_date = state.last_change_date if state else None
+            print(f"Syncing recipes changed after: {change_date or 'beginning (full sync)'}")
 
-        start = 1
-        total_synced = 0
+            if change_date is None and state is not None and state.max_recipe_seq:
+                # 전체 목록은 RCP_SEQ 순이므로 저장된 레시피 수만큼 건너뛰고 cursor 레시피부터 요청
+                # (첫 행이 cursor와 같은지로 순서를 확인하고, 다르면 처음부터 다시 요청)
+                stored = await self._count_recipes_through(session, state.max_recipe_seq)
+                if stored:
+                    start = stored
+                    resume_after = state.max_recipe_seq
+                    print(f"Resuming full sync after RCP_SEQ {resume_after} (index {start})")
+
+        result = new_sync_result()
+        self.image_retry_queue.clear()
+        s3_helper.reset_cleanup_progress()
+        max_recipe_seq = None
+        max_change_date = None
         
         while True:
             end = start + batch_size - 1
             print(f"Fetching recipes {start} to {end}...")
-            
-            recipes = await self.fetch_recipes_from_api(start, end, change_date)
-            
-            if not recipes:
-                break
-            
-            # 각 레시피 동기화 (개별 커밋으로 롤백 에러 방지)
+
+            try:
+                recipes = await self._request_recipes(start, end, change_date)
+            except Exception as e:
+                print(f"Failed to fetch recipes {start}-{end}, sync state saved up to RCP_SEQ {max_recipe_seq}: {str(e)}")
+                await s3_helper.wait_for_cleanup()
+                raise RuntimeError(f"Failed to fetch recipes {start}-{end}: {str(e)}") from e
+
+            is_final_batch = len(recipes) < batch_size
+
+            if resume_after is not None:
+                first_seq = recipes[0].get('RCP_SEQ') if recipes else None
+                if str(first_seq) != str(resume_after):
+                    print(f"Resume check failed (RCP_SEQ {first_seq} at index {start}), restarting full sync")
+                    start, resume_after = 1, None
+                    continue
+                recipes = recipes[1:]
+                resume_after = None
+
             for recipe_data in recipes:
                 try:
-                    result = await self.sync_recipe(session, recipe_data)
-                    if result:
-                        # 각 레시피마다 개별 커밋 (IntegrityError 방지)
-                        await session.commit()
-                        total_synced += 1
-                except Exception as e:
-                    # 에러 발생 시 롤백 후 다음 레시피 계속 처리
-                    await session.rollback()
-                    recipe_id = recipe_data.get('RCP_SEQ', 'unknown')
-                    print(f"Failed to sync recipe {recipe_id}, rolled back: {str(e)}")
-
-            print(f"Synced {total_synced} recipes in this batch (Total: {total_synced})")
-            
+                    recipe_seq = int(recipe_data['RCP_SEQ'])
+                    max_recipe_seq = max(max_recipe_seq or 0, recipe_seq)
+                except (KeyError, TypeError, ValueError):
+                    pass
+                recipe_change_date = self._change_date_of(recipe_data)
+                if recipe_change_date and recipe_change_date > (max_change_date or ''):
+                    max_change_date = recipe_change_date
+
+            chunks = self._chunks(recipes)
+
+            for index, chunk in enumerate(chunks):
+                merge_sync_result(result, await self._sync_chunk(session, chunk))
+
+                if index == len(chunks) - 1:
+                    # 배치의 마지막 upsert와 같은 트랜잭션에 cursor 기록, 마지막 배치면 CHNG_DT도 기록
+                    # (받은 레시피가 없으면 기존 CHNG_DT 유지)
+                    next_change_date = (max_change_date or change_date) if is_final_batch else None
+                    await self._stage_sync_state(
+                        session,
+                        change_date=next_change_date,
+                        max_recipe_seq=max_recipe_seq,
+                        total_synced=result['total_synced']
+                    )
+                    if is_final_batch:
+                        print(f"Updated sync state: CHNG_DT={next_change_date}, max RCP_SEQ={max_recipe_seq}")
+
+                await session.commit()
+
+            print(f"Processed {len(recipes)} recipes in this batch (Total synced: {result['total_synced']})")
+
             # 다음 배치로
-            if len(recipes) < batch_size:
+            if is_final_batch:
                 break
             start = end + 1
         
-        if use_incremental and total_synced > 0:
-            today = datetime.now().strftime('%Y%m%d')
-            self._update_last_sync_date(today)
-            print(f"Updated last sync date to: {today}")
-        
-        print(f"Sync completed. Total synced: {total_synced} recipes")
-        return total_synced
+        result['image_retry'] = await self._retry_failed_images(session)
+
+        # 백그라운드 이미지 정리가 끝날 때까지 대기 (Lambda 종료 전)
+        result['image_cleanup'] = await s3_helper.wait_for_cleanup()
+
+        # 변경된 레시피가 있으면 참조가 끊긴 이미지 정리
+        if result[SYNC_CHANGED]:
+            try:
+                result['image_gc'] = await self.collect_image_garbage(session)
+            except Exception as e:
+                print(f"Image GC failed: {str(e)}")
+
+        print(
+            f"Sync completed. Total synced: {result['total_synced']} recipes "
+            f"(new: {result[SYNC_NEW]}, changed: {result[SYNC_CHANGED]}, "
+            f"unchanged: {result[SYNC_UNCHANGED]}, failed: {result[SYNC_FAILED]})"
+        )
+        return result
 
     async def sync_recipes_by_range(
             self,
@@ -340,7 +650,7 @@ class RecipeSyncService:
             end_index: 끝 인덱스 (포함)
 
         Returns:
-            동기화된 레시피 수
+            total_synced, new, changed, unchanged, failed 레시피 수
 
         Example:
             # 레시피 1번부터 100번까지 동기화
@@ -349,32 +659,34 @@ class RecipeSyncService:
         print(f"Syncing recipes from {start_index} to {end_index}...")
 
         # API에서 레시피 가져오기 (change_date 없이 전체 가져오기)
-        recipes = await self.fetch_recipes_from_api(start_index, end_index, change_date=None)
+        # 요청이 실패하면 예외를 그대로 전달 (빈 범위와 구분하여 핸들러가 500 반환)
+        recipes = await self._request_recipes(start_index, end_index, change_date=None)
 
         if not recipes:
             print(f"No recipes found in range {start_index}-{end_index}")
-            return 0
+            return new_sync_result()
 
         print(f"Fetched {len(recipes)} recipes from API")
 
-        # 각 레시피 동기화 (개별 커밋)
-        total_synced = 0
-        for recipe_data in recipes:
-            try:
-                result = await self.sync_recipe(session, recipe_data)
-                if result:
-                    # 각 레시피마다 개별 커밋
-                    await session.commit()
-                    total_synced += 1
-                    print(f"Synced recipe {recipe_data.get('RCP_SEQ')} ({total_synced}/{len(recipes)})")
-            except Exception as e:
-                # 에러 발생 시 롤백 후 다음 레시피 계속 처리
-                await session.rollback()
-                recipe_id = recipe_data.get('RCP_SEQ', 'unknown')
-                print(f"Failed to sync recipe {recipe_id}, rolled back: {str(e)}")
+        # chunk 단위 트랜잭션으로 저장 (레시피별 SAVEPOINT)
+        # 부분 범위 동기화이므로 동기화 상태(high-water mark)는 갱신하지 않음
+        result = new_sync_result()
+        self.image_retry_queue.clear()
+        s3_helper.reset_cleanup_progress()
+        for chunk in self._chunks(recipes):
+            merge_sync_result(result, await self._sync_chunk(session, chunk))
+            await session.commit()
+            print(f"Synced {result['total_synced']}/{len(recipes)} recipes")
+
+        result['image_retry'] = await self._retry_failed_images(session)
+        result['image_cleanup'] = await s3_helper.wait_for_cleanup()
 
-        print(f"Range sync completed. Total synced: {total_synced}/{len(recipes)} recipes")
-        return total_synced
+        print(
+            f"Range sync completed. Total synced: {result['total_synced']}/{len(recipes)} recipes "
+            f"(new: {result[SYNC_NEW]}, changed: {result[SYNC_CHANGED]}, "
+            f"unchanged: {result[SYNC_UNCHANGED]}, failed: {result[SYNC_FAILED]})"
+        )
+        return result
 
 
 recipe_sync_service = RecipeSyncService()
\ No newline at end of file
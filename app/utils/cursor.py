@@ -0,0 +1,31 @@
+import base64
+import binascii
+import json
+
+
+class InvalidCursorError(ValueError):
+    """디코딩할 수 없거나 형식이 맞지 않는 페이지 cursor"""
+
+
+def encode_cursor(values: dict) -> str:
+    """keyset 페이지 위치(dict)를 클라이언트에 넘길 불투명 문자열로 인코딩 (URL-safe base64 JSON)"""
+    payload = json.dumps(values, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, keys: tuple = ()) -> dict:
+    """
+    encode_cursor로 만든 cursor를 dict로 복원
+
+    Raises:
+        InvalidCursorError: base64/JSON 형식이 아니거나 keys 중 빠진 값이 있는 경우
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise InvalidCursorError(f"잘못된 cursor입니다: {cursor}") from e
+
+    if not isinstance(values, dict) or any(key not in values for key in keys):
+        raise InvalidCursorError(f"잘못된 cursor입니다: {cursor}")
+    return values
@@ -0,0 +1,20 @@
+from datetime import datetime, timedelta, timezone
+from typing import Tuple
+
+# 소비기한 우선순위 기준 (fridge_status 집계, 레시피 추천, 소비기한 알림이 같은 기준을 사용)
+# 다른 app 모듈을 import하지 않으므로 Lambda에서 app.services 패키지를 거치지 않고 가져올 수 있음
+
+# 남은 기한이 이 시간 미만이면 HIGH(D-3 이내) / MEDIUM(D-7 이내)
+HIGH_WITHIN = timedelta(days=4)
+MEDIUM_WITHIN = timedelta(days=8)
+
+
+def as_utc(value: datetime) -> datetime:
+    """timezone 없는 값은 UTC로 간주"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def priority_boundaries(now: datetime) -> Tuple[datetime, datetime]:
+    """(이 시각 전에 만료되면 HIGH, 이 시각 전에 만료되면 MEDIUM)"""
+    now = as_utc(now)
+    return now + HIGH_WITHIN, now + MEDIUM_WITHIN
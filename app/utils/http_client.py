@@ -0,0 +1,23 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import httpx
+
+
+@asynccontextmanager
+async def http_client_scope(
+    shared_client: Optional[httpx.AsyncClient] = None,
+    **client_kwargs
+) -> AsyncIterator[httpx.AsyncClient]:
+    """
+    공유 HTTP 클라이언트가 있으면 재사용하고, 없으면 이 블록 동안만 사용할 클라이언트를 생성
+
+    Lambda warm start처럼 클라이언트를 재사용할 수 있는 환경에서는 연결(keep-alive)을 유지하고,
+    그 외에는 기존처럼 요청마다 클라이언트를 열고 닫습니다.
+    """
+    if shared_client is not None:
+        yield shared_client
+        return
+
+    async with httpx.AsyncClient(**client_kwargs) as client:
+        yield client
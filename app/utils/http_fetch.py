@@ -0,0 +1,216 @@
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+from urllib.parse import urlsplit
+
+import httpx
+
+T = TypeVar("T")
+
+# 재시도할 HTTP 상태 코드 (일시적인 서버 오류 / rate limit)
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """연속 실패로 circuit이 열려 있어 요청을 보내지 않음"""
+
+    def __init__(self, host: str, retry_after: float):
+        super().__init__(f"Circuit open for {host}, retry after {retry_after:.1f}s")
+        self.host = host
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    호스트별 요청 속도 제한 (초당 rate개, 최대 capacity개까지 몰아서 허용)
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable] = asyncio.sleep,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated_at = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self):
+        """토큰 1개를 사용 (없으면 채워질 때까지 대기)"""
+        while True:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await self._sleep((1 - self._tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 failure_threshold번 이상이면 reset_timeout 동안 요청을 즉시 실패시킴
+    reset_timeout이 지나면 요청 1개를 시험적으로 허용하고(half-open), 성공하면 다시 닫힘
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self._clock() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_request(self, host: str):
+        """요청 전에 호출: circuit이 열려 있으면 CircuitOpenError"""
+        state = self.state
+        if state == "open" or (state == "half_open" and self._probing):
+            retry_after = self.reset_timeout - (self._clock() - self.opened_at)
+            raise CircuitOpenError(host, max(0.0, retry_after))
+        if state == "half_open":
+            self._probing = True
+
+    def release_probe(self):
+        """결과를 기록하지 않고 끝난 요청(취소, HTTP와 무관한 오류)의 half-open 시험 요청 자리를 반납"""
+        self._probing = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            # half-open 시험 요청 실패 또는 임계값 도달 시 다시 열림
+            self.opened_at = self._clock()
+
+
+class HostGuardedFetcher:
+    """
+    외부 호스트 요청 공통 계층: 호스트별 token bucket + jitter exponential backoff 재시도 + circuit breaker
+
+    한 호스트가 계속 timeout 되어도 circuit이 열리면 즉시 실패하므로
+    Lambda 실행 시간을 한 호스트가 모두 소모하지 않습니다.
+    """
+
+    def __init__(
+        self,
+        rate_per_host: float = 5.0,
+        burst: float = 5.0,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0,
+        timeout: Optional[httpx.Timeout] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable] = asyncio.sleep,
+    ):
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        # 전체 120초 대신 연결/읽기 timeout을 짧게 (느린 호스트는 재시도 또는 circuit으로 처리)
+        self.timeout = timeout or httpx.Timeout(20.0, connect=5.0)
+        self._clock = clock
+        self._sleep = sleep
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def bucket(self, host: str) -> TokenBucket:
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(
+                self.rate_per_host, self.burst, clock=self._clock, sleep=self._sleep
+            )
+        return self._buckets[host]
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        if host not in self._breakers:
+            self._breakers[host] = CircuitBreaker(
+                self.failure_threshold, self.reset_timeout, clock=self._clock
+            )
+        return self._breakers[host]
+
+    @staticmethod
+    def is_retryable(error: Exception) -> bool:
+        """일시적인 오류인지 (timeout, 연결 실패, 429/5xx)"""
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in RETRYABLE_STATUS_CODES
+        return isinstance(error, (httpx.TransportError, asyncio.TimeoutError))
+
+    def backoff_delay(self, attempt: int) -> float:
+        """full jitter exponential backoff (attempt는 0부터)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    async def call(self, url: str, operation: Callable[[], Awaitable[T]]) -> T:
+        """
+        url의 호스트 정책(속도 제한, circuit, 재시도)을 적용하여 operation 실행
+
+        Args:
+            url: 요청 대상 URL (호스트 구분용)
+            operation: 실제 요청을 수행하는 코루틴 함수 (재시도 시 다시 호출됨)
+
+        Raises:
+            CircuitOpenError: circuit이 열려 있는 경우 (즉시 실패)
+            재시도할 수 없는 오류 또는 마지막 시도의 오류
+        """
+        host = urlsplit(url).hostname or url
+        breaker = self.breaker(host)
+
+        for attempt in range(self.max_attempts):
+            breaker.before_request(host)
+
+            try:
+                await self.bucket(host).acquire()
+                result = await operation()
+            except Exception as e:
+                if not self.is_retryable(e):
+                    if isinstance(e, httpx.HTTPStatusError):
+                        # 404 등은 호스트가 응답한 것이므로 정상으로 기록
+                        breaker.record_success()
+                    # 그 외 (S3 업로드 오류 등)는 호스트 상태와 무관하므로 기록하지 않음
+                    raise
+                breaker.record_failure()
+                if attempt == self.max_attempts - 1:
+                    raise
+                delay = self.backoff_delay(attempt)
+                print(f"Fetch {url} failed ({type(e).__name__}), retrying in {delay:.2f}s")
+                await self._sleep(delay)
+            else:
+                # operation이 반환했다면 호스트가 정상 응답한 것
+                breaker.record_success()
+                return result
+            finally:
+                # 취소(CancelledError)처럼 결과를 기록하지 못한 경우에도 시험 요청 자리를 반납하여
+                # circuit이 half-open 상태로 계속 막히지 않도록 함
+                breaker.release_probe()
+
+
+# 레시피 이미지 원본 호스트용 공유 fetcher (Lambda warm start 간 circuit 상태 유지)
+image_fetcher = HostGuardedFetcher()
@@ -0,0 +1,90 @@
+import asyncio
+import io
+from concurrent.futures import BrokenExecutor, Executor, ThreadPoolExecutor
+from typing import Dict, Optional, Sequence
+
+
+# 추천 목록 카드용 썸네일 너비 (px)
+THUMBNAIL_WIDTHS = (160, 320, 640)
+WEBP_QUALITY = 80
+
+
+def render_variants(data: bytes, widths: Sequence[int] = THUMBNAIL_WIDTHS) -> Dict[int, bytes]:
+    """
+    원본 이미지를 너비별 WebP로 변환 (프로세스 풀에서 실행되는 top-level 함수)
+    원본보다 큰 너비로는 확대하지 않습니다.
+
+    Returns:
+        {너비: WebP 바이트}
+    """
+    # Pillow는 변환할 때만 로드 (Lambda cold start import 시간 절약)
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)
+        # GIF(팔레트)/CMYK 등은 WebP로 저장할 수 있는 모드로 변환
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+        variants = {}
+        for width in widths:
+            target_width = min(width, image.width)
+            target_height = max(1, round(image.height * target_width / image.width))
+            resized = image.resize((target_width, target_height), Image.Resampling.LANCZOS)
+
+            buffer = io.BytesIO()
+            resized.save(buffer, format='WEBP', quality=WEBP_QUALITY, method=4)
+            variants[width] = buffer.getvalue()
+        return variants
+
+
+class ThumbnailRenderer:
+    """
+    썸네일 변환을 프로세스 풀에서 실행 (CPU 작업이 이벤트 루프를 막지 않도록)
+
+    Lambda처럼 /dev/shm이 없어 프로세스 풀을 만들 수 없는 환경에서는 스레드 풀을 사용합니다.
+    (Pillow의 resize/encode는 GIL을 해제하므로 스레드에서도 병렬 처리됨)
+    """
+
+    def __init__(self, max_workers: int = 2, widths: Sequence[int] = THUMBNAIL_WIDTHS):
+        self.max_workers = max_workers
+        self.widths = tuple(widths)
+        self._executor: Optional[Executor] = None
+
+    def _create_executor(self) -> Executor:
+        # multiprocessing은 풀을 만들 때만 로드 (Lambda cold start import 시간 절약)
+        from concurrent.futures import ProcessPoolExecutor
+
+        try:
+            return ProcessPoolExecutor(max_workers=self.max_workers)
+        except (OSError, NotImplementedError, ImportError) as e:
+            print(f"Process pool unavailable, using threads for thumbnails: {str(e)}")
+            return ThreadPoolExecutor(max_workers=self.max_workers)
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = self._create_executor()
+        return self._executor
+
+    async def render(self, data: bytes) -> Dict[int, bytes]:
+        """이미지를 너비별 WebP로 변환"""
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.executor, render_variants, data, self.widths)
+        except (BrokenExecutor, OSError, NotImplementedError) as e:
+            if isinstance(self._executor, ThreadPoolExecutor):
+                raise
+            # 프로세스 생성 실패 시 스레드 풀로 전환 후 재시도
+            print(f"Process pool failed, falling back to threads: {str(e)}")
+            self.shutdown()
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            return await loop.run_in_executor(self._executor, render_variants, data, self.widths)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+thumbnail_renderer = ThumbnailRenderer()
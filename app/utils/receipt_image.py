@@ -0,0 +1,205 @@
+import asyncio
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import PurePath
+from typing import Optional, Tuple
+
+# OCR.space 무료 플랜 파일 크기 제한 (1 MB)
+OCR_MAX_BYTES = 1024 * 1024
+# 영수증 글자가 충분히 읽히는 긴 변 해상도 (px), 휴대폰 원본(4000px 이상)은 이 크기로 축소
+OCR_MAX_SIDE = 2000
+JPEG_QUALITIES = (85, 75, 65, 55)
+
+
+def prepare_receipt_image(
+    data: bytes,
+    max_side: int = OCR_MAX_SIDE,
+    max_bytes: int = OCR_MAX_BYTES,
+) -> Optional[bytes]:
+    """
+    영수증 사진을 OCR용 흑백 JPEG로 변환
+    EXIF 회전 적용 → 흑백 → 긴 변 max_side로 축소 → max_bytes 이하가 될 때까지 재압축
+
+    Returns:
+        변환된 JPEG 바이트 (이미지로 읽을 수 없으면 None)
+    """
+    prepared = prepare_receipt_image_scaled(data, max_side, max_bytes)
+    return prepared[0] if prepared is not None else None
+
+
+def prepare_receipt_image_scaled(
+    data: bytes,
+    max_side: int = OCR_MAX_SIDE,
+    max_bytes: int = OCR_MAX_BYTES,
+) -> Optional[Tuple[bytes, float]]:
+    """
+    prepare_receipt_image와 같은 변환 + 축소 비율 (executor에서 실행되는 top-level 함수)
+
+    Returns:
+        (변환된 JPEG 바이트, 변환 후 / 원본 해상도 비율) (이미지로 읽을 수 없으면 None)
+    """
+    # Pillow는 변환할 때만 로드 (Lambda cold start import 시간 절약)
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        original = Image.open(io.BytesIO(data))
+        original.load()
+    except (UnidentifiedImageError, OSError):
+        return None
+
+    with original:
+        image = ImageOps.exif_transpose(original).convert('L')
+    original_side = max(image.size)
+
+    if max(image.size) > max_side:
+        image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+
+    while True:
+        for quality in JPEG_QUALITIES:
+            buffer = io.BytesIO()
+            image.save(buffer, format='JPEG', quality=quality, optimize=True)
+            if buffer.tell() <= max_bytes:
+                return buffer.getvalue(), max(image.size) / original_side
+        # 가장 낮은 품질로도 크면 해상도를 더 줄임
+        if max(image.size) <= 500:
+            return buffer.getvalue(), max(image.size) / original_side
+        image = image.resize(
+            (max(1, int(image.width * 0.8)), max(1, int(image.height * 0.8))),
+            Image.Resampling.LANCZOS,
+        )
+
+
+def restore_ocr_coordinates(result: dict, scale: float) -> dict:
+    """
+    축소한 이미지의 OCR 좌표(Left/Top/Width/Height)를 원본 해상도 기준으로 되돌림 (result를 직접 수정)
+    항목 추출의 x/y 오차(threshold_x/threshold_y, 픽셀)는 원본 해상도 기준이므로
+    전송한 이미지 크기와 관계없이 같은 기준으로 비교하도록 합니다.
+
+    Args:
+        scale: 전송한 이미지 / 원본 해상도 비율 (PreparedImage.scale)
+    """
+    if scale == 1.0:
+        return result
+
+    for parsed in result.get("ParsedResults") or []:
+        overlay = parsed.get("TextOverlay") or parsed.get("Overlay") or {}
+        for line in overlay.get("Lines") or []:
+            for key in ("MinTop", "MaxHeight"):
+                if key in line:
+                    line[key] /= scale
+            for word in line.get("Words") or []:
+                for key in ("Left", "Top", "Width", "Height"):
+                    if key in word:
+                        word[key] /= scale
+    return result
+
+
+@dataclass
+class PreparedImage:
+    content: bytes
+    filename: str
+    content_type: Optional[str]
+    original_bytes: int
+    preprocess_seconds: float = 0.0
+    preprocessed: bool = False
+    # 전송한 이미지 / 원본 해상도 비율 (축소했으면 1보다 작음, OCR 좌표 복원에 사용)
+    scale: float = 1.0
+
+
+class OcrPayloadStats:
+    """
+    OCR 요청 크기/지연 통계
+    전처리한 요청과 원본 그대로 보낸 요청을 나눠 집계하여 줄어든 용량과 OCR 지연 차이를 비교합니다.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.preprocessed = 0
+        self.original_bytes = 0
+        self.sent_bytes = 0
+        self.preprocess_seconds = 0.0
+        self.ocr_seconds = {"preprocessed": 0.0, "original": 0.0}
+        self.ocr_requests = {"preprocessed": 0, "original": 0}
+
+    def record(self, prepared: PreparedImage, ocr_seconds: float):
+        bucket = "preprocessed" if prepared.preprocessed else "original"
+        self.requests += 1
+        self.preprocessed += int(prepared.preprocessed)
+        self.original_bytes += prepared.original_bytes
+        self.sent_bytes += len(prepared.content)
+        self.preprocess_seconds += prepared.preprocess_seconds
+        self.ocr_seconds[bucket] += ocr_seconds
+        self.ocr_requests[bucket] += 1
+
+    def average_ocr_seconds(self, bucket: str) -> Optional[float]:
+        count = self.ocr_requests[bucket]
+        return self.ocr_seconds[bucket] / count if count else None
+
+    def summary(self) -> dict:
+        preprocessed = self.average_ocr_seconds("preprocessed")
+        original = self.average_ocr_seconds("original")
+        return {
+            "requests": self.requests,
+            "preprocessed": self.preprocessed,
+            "original_bytes": self.original_bytes,
+            "sent_bytes": self.sent_bytes,
+            "saved_bytes": self.original_bytes - self.sent_bytes,
+            "avg_preprocess_seconds": self.preprocess_seconds / self.requests if self.requests else None,
+            "avg_ocr_seconds_preprocessed": preprocessed,
+            "avg_ocr_seconds_original": original,
+            # 원본 그대로 보낸 요청이 있어야 비교 가능
+            "avg_ocr_seconds_saved": original - preprocessed if preprocessed is not None and original is not None else None,
+        }
+
+
+class ReceiptImagePreprocessor:
+    """
+    영수증 이미지 전처리를 스레드 풀에서 실행 (CPU 작업이 이벤트 루프를 막지 않도록)
+    Pillow의 decode/resize/encode는 GIL을 해제하고, 수 MB 원본을 프로세스로 복사하지 않아도 되므로 스레드를 사용합니다.
+    """
+
+    def __init__(self, max_workers: int = 2, max_side: int = OCR_MAX_SIDE, max_bytes: int = OCR_MAX_BYTES):
+        self.max_workers = max_workers
+        self.max_side = max_side
+        self.max_bytes = max_bytes
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="receipt-image")
+        return self._executor
+
+    async def prepare(self, content: bytes, filename: str, content_type: Optional[str]) -> PreparedImage:
+        """OCR로 보낼 이미지 준비 (이미지가 아니거나 변환 실패 시 원본 그대로)"""
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            prepared = await loop.run_in_executor(
+                self.executor, prepare_receipt_image_scaled, content, self.max_side, self.max_bytes
+            )
+        except Exception as e:
+            print(f"Receipt image preprocessing failed, sending original: {str(e)}")
+            prepared = None
+        elapsed = time.perf_counter() - started
+
+        # 이미 작은 이미지는 재압축하면 오히려 커지거나 화질만 떨어지므로 원본 사용
+        if prepared is None or (len(prepared[0]) >= len(content) and len(content) <= self.max_bytes):
+            return PreparedImage(content, filename, content_type, len(content), elapsed)
+
+        jpeg, scale = prepared
+        jpeg_name = f"{PurePath(filename or 'receipt').stem}.jpg"
+        return PreparedImage(jpeg, jpeg_name, 'image/jpeg', len(content), elapsed, preprocessed=True, scale=scale)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+receipt_preprocessor = ReceiptImagePreprocessor()
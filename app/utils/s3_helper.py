@@ -1,16 +1,128 @@
+import asyncio
+import hashlib
 import re
-from typing import Optional
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 import httpx
-import boto3
 from botocore.exceptions import ClientError
 
 from app.core.config import settings
+from app.utils.http_client import http_client_scope
+from app.utils.http_fetch import image_fetcher
+from app.utils.image_variants import thumbnail_renderer
+
+
+# delete_objects 한 번에 삭제할 수 있는 최대 키 수 (S3 제한)
+S3_DELETE_BATCH_SIZE = 1000
+
+# content-addressed 키는 내용이 바뀌지 않으므로 재검증 없이 1년 캐싱
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+CONTENT_TYPE_MAP = {
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'png': 'image/png',
+    'gif': 'image/gif',
+    'webp': 'image/webp'
+}
+
+# 스트리밍 업로드: 다운로드 chunk 크기와 multipart part 크기 (S3 최소 part 크기 5 MiB)
+# 이미지 1개당 메모리 사용량은 part 크기 정도로 제한됨
+STREAM_CHUNK_SIZE = 64 * 1024
+MULTIPART_PART_SIZE = 5 * 1024 * 1024
+
+
+def sniff_image_extension(head: bytes) -> Optional[str]:
+    """파일 앞부분(magic bytes)으로 이미지 형식 판별"""
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'jpg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if head.startswith((b'GIF87a', b'GIF89a')):
+        return 'gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+class _MultipartUpload:
+    """S3 multipart 업로드 (part를 순서대로 올리고 완료/취소)"""
+
+    def __init__(self, s3_client, bucket_name: str, key: str, content_type: str):
+        self.s3_client = s3_client
+        self.bucket_name = bucket_name
+        self.key = key
+        self.parts: List[Dict] = []
+        response = s3_client.create_multipart_upload(
+            Bucket=bucket_name,
+            Key=key,
+            ContentType=content_type
+        )
+        self.upload_id = response['UploadId']
+
+    def upload_part(self, data: bytes):
+        part_number = len(self.parts) + 1
+        response = self.s3_client.upload_part(
+            Bucket=self.bucket_name,
+            Key=self.key,
+            UploadId=self.upload_id,
+            PartNumber=part_number,
+            Body=data
+        )
+        self.parts.append({'ETag': response['ETag'], 'PartNumber': part_number})
+
+    def complete(self):
+        self.s3_client.complete_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=self.key,
+            UploadId=self.upload_id,
+            MultipartUpload={'Parts': self.parts}
+        )
+
+    def abort(self):
+        try:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=self.key,
+                UploadId=self.upload_id
+            )
+        except ClientError as e:
+            print(f"Failed to abort multipart upload {self.key}: {str(e)}")
 
 
 class S3Helper:
-    def __init__(self):
-        self.s3_client = boto3.client('s3', region_name=settings.AWS_REGION)
+    def __init__(self, cleanup_batch_size: int = 50):
+        self._s3_client = None
         self.bucket_name = settings.S3_BUCKET_NAME
+        # Lambda warm start 시 재사용할 공유 HTTP 클라이언트 (없으면 요청마다 생성)
+        self.http_client: Optional[httpx.AsyncClient] = None
+        # 원본 이미지 호스트별 속도 제한 / 재시도 / circuit breaker
+        self.fetcher = image_fetcher
+
+        # 백그라운드 이미지 정리 (동기화 critical path 밖에서 실행)
+        self.cleanup_batch_size = cleanup_batch_size
+        self._cleanup_pending: Dict[int, Set[str]] = {}
+        self._cleanup_task: Optional[asyncio.Task] = None
+        self.cleanup_progress = {
+            'queued_recipes': 0,
+            'cleaned_recipes': 0,
+            'deleted_objects': 0,
+            'failed_objects': 0,
+        }
+
+    @property
+    def s3_client(self):
+        """S3 클라이언트 생성 (lazy loading, import 시점에 boto3 클라이언트를 만들지 않음)"""
+        if self._s3_client is None:
+            import boto3
+
+            self._s3_client = boto3.client('s3', region_name=settings.AWS_REGION)
+        return self._s3_client
+
+    @s3_client.setter
+    def s3_client(self, client):
+        self._s3_client = client
 
     async def upload_thumbnail_from_url(
         self,
@@ -31,45 +143,9 @@ class S3Helper:
             return None
 
         try:
-            # 이미지 다운로드
-            async with httpx.AsyncClient(timeout=120.0, follow_redirects=True) as client:
-                response = await client.get(image_url)
-                response.raise_for_status()
-                image_data = response.content
-
-            # 파일 확장자 추출
-            extension = image_url.split('.')[-1].lower()
-            if extension not in ['jpg', 'jpeg', 'png', 'gif']:
-                extension = 'jpg'
-
-            # S3 키 생성 (recipes/{recipe_id}/thumbnail.{ext})
-            s3_key = f"{settings.S3_RECIPE_PREFIX}/{recipe_id}/thumbnail.{extension}"
-
-            # Content-Type 설정
-            content_type_map = {
-                'jpg': 'image/jpeg',
-                'jpeg': 'image/jpeg',
-                'png': 'image/png',
-                'gif': 'image/gif'
-            }
-            content_type = content_type_map.get(extension, 'image/jpeg')
-
-            # S3에 업로드 (Public Read 허용)
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=s3_key,
-                Body=image_data,
-                ContentType=content_type,
-                CacheControl='max-age=31536000',  # 1년 캐싱
-                ACL='public-read'  # 인터넷 사용자가 이미지 조회 가능
-            )
-
-            # S3 URL 반환
-            s3_url = f"https://{self.bucket_name}.s3.{settings.AWS_REGION}.amazonaws.com/{s3_key}"
-            return s3_url
-
+            return await self._upload_from_url(image_url)
         except Exception as e:
-            print(f"Failed to upload thumbnail {image_url}: {str(e)}")
+            print(f"Failed to upload thumbnail {image_url} (recipe {recipe_id}): {str(e)}")
             return None
 
     async def upload_image_from_url(
@@ -93,64 +169,424 @@ class S3Helper:
             return None
 
         try:
-            # 이미지 다운로드
-            async with httpx.AsyncClient(timeout=120.0, follow_redirects=True) as client:
-                response = await client.get(image_url)
-                response.raise_for_status()
-                image_data = response.content
-
-            # 파일 확장자 추출
-            extension = image_url.split('.')[-1].lower()
-            if extension not in ['jpg', 'jpeg', 'png', 'gif']:
-                extension = 'jpg'
-
-            # S3 키 생성 (recipes/{recipe_id}/manual_{index:02d}.{ext})
-            s3_key = f"{settings.S3_RECIPE_PREFIX}/{recipe_id}/manual_{image_index:02d}.{extension}"
-
-            # Content-Type 설정
-            content_type_map = {
-                'jpg': 'image/jpeg',
-                'jpeg': 'image/jpeg',
-                'png': 'image/png',
-                'gif': 'image/gif'
-            }
-            content_type = content_type_map.get(extension, 'image/jpeg')
+            return await self._upload_from_url(image_url)
+        except Exception as e:
+            print(f"Failed to upload image {image_url} (recipe {recipe_id}, step {image_index}): {str(e)}")
+            return None
 
-            # S3에 업로드 (Public Read 허용)
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=s3_key,
-                Body=image_data,
-                ContentType=content_type,
-                CacheControl='max-age=31536000',  # 1년 캐싱
-                ACL='public-read'  # 인터넷 사용자가 이미지 조회 가능
+    async def upload_thumbnail_with_variants(
+        self,
+        image_url: str,
+        recipe_id: int
+    ) -> Tuple[Optional[str], Dict[str, str]]:
+        """
+        썸네일 원본과 너비별 WebP 변형(160/320/640px)을 S3에 업로드
+
+        변형 키는 원본 키에서 파생되므로 (recipes/objects/{sha256}.w{width}.webp)
+        이미 모두 있으면 변환을 건너뜁니다.
+
+        Returns:
+            (원본 S3 URL 또는 None, {너비(str): 변형 S3 URL})
+        """
+        if not image_url or image_url == '':
+            return None, {}
+
+        try:
+            original_key, image_data = await self.fetcher.call(
+                image_url, lambda: self._stream_to_s3(image_url)
             )
+        except Exception as e:
+            print(f"Failed to upload thumbnail {image_url} (recipe {recipe_id}): {str(e)}")
+            return None, {}
 
-            # S3 URL 반환
-            s3_url = f"https://{self.bucket_name}.s3.{settings.AWS_REGION}.amazonaws.com/{s3_key}"
-            return s3_url
+        if image_data is None:
+            # part 크기보다 큰 원본은 메모리에 올리지 않으므로 변형 생성 생략
+            print(f"Thumbnail for recipe {recipe_id} is larger than {MULTIPART_PART_SIZE} bytes, skipping variants")
+            return self.object_url(original_key), {}
 
+        variant_keys = {
+            width: self.variant_key(original_key, width)
+            for width in thumbnail_renderer.widths
+        }
+        try:
+            exists = await asyncio.gather(*(
+                asyncio.to_thread(self._reuse_existing, key, 'image/webp') for key in variant_keys.values()
+            ))
+            missing = {
+                width: key for (width, key), found in zip(variant_keys.items(), exists)
+                if not found
+            }
+            if missing:
+                rendered = await thumbnail_renderer.render(image_data)
+                for width, key in missing.items():
+                    await asyncio.to_thread(self.put_object_if_absent, key, rendered[width], 'image/webp')
         except Exception as e:
-            print(f"Failed to upload image {image_url}: {str(e)}")
-            return None
+            # 변형 생성 실패 시 원본만 사용
+            print(f"Failed to create thumbnail variants for recipe {recipe_id}: {str(e)}")
+            return self.object_url(original_key), {}
+
+        variants = {str(width): self.object_url(key) for width, key in variant_keys.items()}
+        return self.object_url(original_key), variants
+
+    def _detect_extension(self, head: bytes, image_url: str) -> str:
+        """magic bytes로 형식 판별, 알 수 없으면 URL 확장자, 그래도 없으면 jpg"""
+        extension = sniff_image_extension(head)
+        if extension:
+            return extension
+
+        extension = image_url.split('.')[-1].lower()
+        return extension if extension in CONTENT_TYPE_MAP else 'jpg'
+
+    async def _stream_to_s3(self, image_url: str) -> Tuple[str, Optional[bytes]]:
+        """
+        원본 이미지를 스트리밍으로 받아 content-addressed 키로 업로드 (메모리 사용량 ≈ part 크기)
+
+        - part 크기 이하: 다운로드가 끝난 뒤 최종 키로 put_object
+        - part 크기 초과: 임시 키로 multipart 업로드하면서 SHA-256을 계산하고,
+          완료 후 최종 키로 복사 (같은 내용이 이미 있으면 복사 생략) 후 임시 객체 삭제
+
+        Returns:
+            (최종 S3 키, 이미지 바이트 — part 크기를 넘으면 None)
+        """
+        hasher = hashlib.sha256()
+        buffer = bytearray()
+        extension = None
+        upload: Optional[_MultipartUpload] = None
 
-    def delete_recipe_images(self, recipe_id: int):
-        """레시피의 모든 이미지 삭제 (썸네일 + 조리 과정 이미지)"""
         try:
-            prefix = f"{settings.S3_RECIPE_PREFIX}/{recipe_id}/"
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=prefix
-            )
+            timeout = self.fetcher.timeout
+            async with http_client_scope(self.http_client, timeout=timeout, follow_redirects=True) as client:
+                async with client.stream('GET', image_url, timeout=timeout, follow_redirects=True) as response:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+                        hasher.update(chunk)
+                        buffer.extend(chunk)
+
+                        while len(buffer) >= MULTIPART_PART_SIZE:
+                            if upload is None:
+                                extension = self._detect_extension(bytes(buffer[:16]), image_url)
+                                upload = await asyncio.to_thread(
+                                    _MultipartUpload,
+                                    self.s3_client,
+                                    self.bucket_name,
+                                    f"{self.staging_prefix}{uuid.uuid4().hex}",
+                                    CONTENT_TYPE_MAP[extension]
+                                )
+                            part = bytes(buffer[:MULTIPART_PART_SIZE])
+                            del buffer[:MULTIPART_PART_SIZE]
+                            await asyncio.to_thread(upload.upload_part, part)
+
+            if upload is None:
+                # 작은 이미지: 한 번에 업로드
+                image_data = bytes(buffer)
+                extension = self._detect_extension(image_data[:16], image_url)
+                key = self._key_for_digest(hasher.hexdigest(), extension)
+                await asyncio.to_thread(
+                    self.put_object_if_absent, key, image_data, CONTENT_TYPE_MAP[extension]
+                )
+                return key, image_data
+
+            if buffer:
+                await asyncio.to_thread(upload.upload_part, bytes(buffer))
+                buffer.clear()
+            await asyncio.to_thread(upload.complete)
+        except BaseException:
+            if upload is not None:
+                await asyncio.to_thread(upload.abort)
+            raise
+
+        key = self._key_for_digest(hasher.hexdigest(), extension)
+        await asyncio.to_thread(self._promote_staged_object, upload.key, key, CONTENT_TYPE_MAP[extension])
+        return key, None
 
-            if 'Contents' in response:
-                objects = [{'Key': obj['Key']} for obj in response['Contents']]
-                self.s3_client.delete_objects(
+    def _promote_staged_object(self, staging_key: str, key: str, content_type: str):
+        """임시 키의 객체를 최종 content-addressed 키로 복사하고 임시 객체 삭제"""
+        try:
+            if not self._reuse_existing(key, content_type):
+                self.s3_client.copy_object(
                     Bucket=self.bucket_name,
-                    Delete={'Objects': objects}
+                    Key=key,
+                    CopySource={'Bucket': self.bucket_name, 'Key': staging_key},
+                    MetadataDirective='REPLACE',
+                    ContentType=content_type,
+                    CacheControl=IMMUTABLE_CACHE_CONTROL,
+                    ACL='public-read'
                 )
+        finally:
+            self.s3_client.delete_object(Bucket=self.bucket_name, Key=staging_key)
+
+    async def _upload_from_url(self, image_url: str) -> str:
+        """이미지를 스트리밍으로 content-addressed 키에 업로드하고 S3 URL을 반환 (호스트 정책 적용)"""
+        key, _ = await self.fetcher.call(image_url, lambda: self._stream_to_s3(image_url))
+        return self.object_url(key)
+
+    def variant_key(self, original_key: str, width: int) -> str:
+        """원본 키에서 파생된 썸네일 변형 키 (recipes/objects/{sha256}.w{width}.webp)"""
+        stem = original_key.rsplit('.', 1)[0]
+        return f"{stem}.w{width}.webp"
+
+    def content_key(self, data: bytes, extension: str) -> str:
+        """
+        내용의 SHA-256으로 S3 키 생성 (recipes/objects/{sha256}.{ext})
+        같은 이미지는 레시피가 달라도 같은 객체를 공유합니다.
+        """
+        return self._key_for_digest(hashlib.sha256(data).hexdigest(), extension)
+
+    def _key_for_digest(self, digest: str, extension: str) -> str:
+        return f"{self.objects_prefix}{digest}.{extension}"
+
+    @property
+    def objects_prefix(self) -> str:
+        return f"{settings.S3_RECIPE_PREFIX}/objects/"
+
+    @property
+    def staging_prefix(self) -> str:
+        """multipart 업로드 중 사용하는 임시 키 prefix (해시 계산 전)"""
+        return f"{settings.S3_RECIPE_PREFIX}/staging/"
+
+    def _object_exists(self, key: str) -> bool:
+        try:
+            self.s3_client.head_object(Bucket=self.bucket_name, Key=key)
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+
+    def _touch_object(self, key: str, content_type: str):
+        """
+        객체를 제자리 복사하여 LastModified 갱신 (내용, 헤더, ACL은 그대로)
+        S3는 같은 키로 복사할 때 메타데이터 변경을 요구하므로 REPLACE로 같은 값을 다시 지정
+        """
+        self.s3_client.copy_object(
+            Bucket=self.bucket_name,
+            Key=key,
+            CopySource={'Bucket': self.bucket_name, 'Key': key},
+            MetadataDirective='REPLACE',
+            ContentType=content_type,
+            CacheControl=IMMUTABLE_CACHE_CONTROL,
+            ACL='public-read'
+        )
+
+    def _reuse_existing(self, key: str, content_type: str) -> bool:
+        """
+        같은 내용의 객체가 이미 있으면 LastModified를 갱신하고 True
+
+        GC(collect_unreferenced_objects)는 grace period 안에 수정된 객체를 삭제하지 않으므로,
+        미참조 상태로 오래된 객체를 새 레시피가 다시 참조하기 시작해도 commit 전에 삭제되지 않음
+        """
+        if not self._object_exists(key):
+            return False
+        self._touch_object(key, content_type)
+        return True
+
+    def put_object_if_absent(self, key: str, data: bytes, content_type: str) -> bool:
+        """
+        content-addressed 객체 업로드 (이미 있으면 LastModified만 갱신하고 건너뜀)
+        키가 내용으로 결정되므로 URL이 바뀌지 않는 한 내용도 바뀌지 않음 → immutable 캐싱
+
+        Returns:
+            새로 업로드했으면 True
+        """
+        if self._reuse_existing(key, content_type):
+            return False
+
+        # S3에 업로드 (Public Read 허용)
+        self.s3_client.put_object(
+            Bucket=self.bucket_name,
+            Key=key,
+            Body=data,
+            ContentType=content_type,
+            CacheControl=IMMUTABLE_CACHE_CONTROL,
+            ACL='public-read'  # 인터넷 사용자가 이미지 조회 가능
+        )
+        return True
+
+    def object_url(self, key: str) -> str:
+        """S3 키의 public URL"""
+        return f"https://{self.bucket_name}.s3.{settings.AWS_REGION}.amazonaws.com/{key}"
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        """이 버킷의 S3 URL이면 키를, 아니면 (원본 URL 등) None을 반환"""
+        prefix = self.object_url('')
+        if url and url.startswith(prefix):
+            return url[len(prefix):]
+        return None
+
+    def _recipe_prefix(self, recipe_id: int) -> str:
+        return f"{settings.S3_RECIPE_PREFIX}/{recipe_id}/"
+
+    def list_objects(self, prefix: str) -> Iterator[Dict]:
+        """prefix 아래의 모든 객체 (ContinuationToken을 따라 페이지네이션)"""
+        params = {'Bucket': self.bucket_name, 'Prefix': prefix}
+        while True:
+            response = self.s3_client.list_objects_v2(**params)
+            yield from response.get('Contents', [])
+
+            if not response.get('IsTruncated'):
+                break
+            params = {**params, 'ContinuationToken': response['NextContinuationToken']}
+
+    def list_keys(self, prefix: str) -> Iterator[str]:
+        """prefix 아래의 모든 키"""
+        for obj in self.list_objects(prefix):
+            yield obj['Key']
+
+    def delete_keys(self, keys: Iterable[str]) -> Tuple[int, int]:
+        """
+        키 목록을 delete_objects로 최대 1,000개씩 나누어 삭제
+
+        Returns:
+            (삭제된 키 수, 실패한 키 수)
+        """
+        keys = list(keys)
+        deleted = 0
+        failed = 0
+
+        for i in range(0, len(keys), S3_DELETE_BATCH_SIZE):
+            batch = keys[i:i + S3_DELETE_BATCH_SIZE]
+            response = self.s3_client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True}
+            )
+            errors = response.get('Errors', []) if isinstance(response, dict) else []
+            for error in errors:
+                print(f"Failed to delete {error.get('Key')}: {error.get('Code')} {error.get('Message')}")
+            failed += len(errors)
+            deleted += len(batch) - len(errors)
+
+        return deleted, failed
+
+    def delete_images_for_recipes(
+        self,
+        recipe_ids: Iterable[int],
+        keep_keys: Optional[Set[str]] = None
+    ) -> Tuple[int, int]:
+        """
+        여러 레시피의 이미지를 한 번에 삭제 (레시피별 목록을 모아 1,000개 단위로 삭제)
+
+        Args:
+            recipe_ids: 레시피 ID 목록
+            keep_keys: 삭제하지 않을 키 (방금 업로드한 이미지 등)
+
+        Returns:
+            (삭제된 키 수, 실패한 키 수)
+        """
+        keep_keys = keep_keys or set()
+        keys = []
+        for recipe_id in recipe_ids:
+            keys.extend(
+                key for key in self.list_keys(self._recipe_prefix(recipe_id))
+                if key not in keep_keys
+            )
+        if not keys:
+            return 0, 0
+        return self.delete_keys(keys)
+
+    def delete_recipe_images(self, recipe_id: int, keep_keys: Optional[Set[str]] = None) -> int:
+        """
+        레시피의 모든 이미지 삭제 (이전 키 구조 recipes/{recipe_id}/ 의 썸네일 + 조리 과정 이미지)
+        content-addressed 객체는 여러 레시피가 공유하므로 collect_unreferenced_objects로 정리합니다.
+
+        Returns:
+            삭제된 키 수
+        """
+        try:
+            deleted, _ = self.delete_images_for_recipes([recipe_id], keep_keys)
+            return deleted
         except ClientError as e:
             print(f"Failed to delete images for recipe {recipe_id}: {str(e)}")
+            return 0
+
+    def collect_unreferenced_objects(
+        self,
+        references: Dict[str, int],
+        grace_period: timedelta = timedelta(days=1),
+        now: Optional[datetime] = None
+    ) -> Dict[str, int]:
+        """
+        참조 수가 0인 content-addressed 객체 삭제 (reference counting GC)
+
+        Args:
+            references: 키별 참조 수 (Recipe.thumbnail_url / image_url 기준)
+            grace_period: 이 기간보다 최근에 업로드(또는 재사용으로 갱신)된 객체는 삭제하지 않음
+                          (진행 중인 동기화가 업로드/재사용 후 아직 commit하지 않은 객체 보호)
+
+        Returns:
+            scanned / referenced / deleted / failed 객체 수
+        """
+        cutoff = (now or datetime.now(timezone.utc)) - grace_period
+        stats = {'scanned': 0, 'referenced': 0, 'deleted': 0, 'failed': 0}
+        garbage = []
+
+        for obj in self.list_objects(self.objects_prefix):
+            stats['scanned'] += 1
+            if references.get(obj['Key'], 0) > 0:
+                stats['referenced'] += 1
+            elif obj['LastModified'] < cutoff:
+                garbage.append(obj['Key'])
+
+        if garbage:
+            stats['deleted'], stats['failed'] = self.delete_keys(garbage)
+
+        print(
+            f"Image GC: scanned {stats['scanned']} objects, "
+            f"{stats['referenced']} referenced, {stats['deleted']} deleted ({stats['failed']} failed)"
+        )
+        return stats
+
+    # ======================
+    # Background cleanup
+    # ======================
+
+    def schedule_recipe_cleanup(self, recipe_id: int, keep_keys: Optional[Iterable[str]] = None):
+        """
+        레시피의 오래된 이미지 삭제를 백그라운드 작업으로 예약
+        keep_keys에 포함된 키(새로 업로드한 이미지)는 삭제하지 않습니다.
+        실행 중인 이벤트 루프에서 호출해야 합니다.
+        """
+        if recipe_id not in self._cleanup_pending:
+            self.cleanup_progress['queued_recipes'] += 1
+        self._cleanup_pending[recipe_id] = set(keep_keys or ())
+
+        if self._cleanup_task is None or self._cleanup_task.done():
+            self._cleanup_task = asyncio.get_running_loop().create_task(self._drain_cleanup())
+
+    async def _drain_cleanup(self):
+        """예약된 레시피를 cleanup_batch_size개씩 묶어서 삭제 (boto3 호출은 스레드에서 실행)"""
+        while self._cleanup_pending:
+            recipe_ids = list(self._cleanup_pending)[:self.cleanup_batch_size]
+            batch = {recipe_id: self._cleanup_pending.pop(recipe_id) for recipe_id in recipe_ids}
+            keep_keys = set().union(*batch.values())
+
+            try:
+                deleted, failed = await asyncio.to_thread(
+                    self.delete_images_for_recipes, list(batch), keep_keys
+                )
+            except Exception as e:
+                print(f"Failed to clean up images for recipes {recipe_ids}: {str(e)}")
+                deleted, failed = 0, 0
+
+            progress = self.cleanup_progress
+            progress['cleaned_recipes'] += len(batch)
+            progress['deleted_objects'] += deleted
+            progress['failed_objects'] += failed
+            print(
+                f"Image cleanup: {progress['cleaned_recipes']}/{progress['queued_recipes']} recipes, "
+                f"{progress['deleted_objects']} objects deleted ({progress['failed_objects']} failed)"
+            )
+
+    async def wait_for_cleanup(self) -> Dict[str, int]:
+        """예약된 이미지 정리가 끝날 때까지 대기하고 진행 상황을 반환"""
+        if self._cleanup_task is not None:
+            await self._cleanup_task
+            self._cleanup_task = None
+        return dict(self.cleanup_progress)
+
+    def reset_cleanup_progress(self):
+        """동기화 시작 시 진행 상황 초기화 (Lambda warm start 간 누적 방지)"""
+        for key in self.cleanup_progress:
+            self.cleanup_progress[key] = 0
 
 
-s3_helper = S3Helper()
\ No newline at end of file
+s3_helper = S3Helper()
@@ -24,7 +24,6 @@ recipe_stack = RecipeStack(
     lambda_sg=backend_stack.lambda_sg,
     uploads_bucket=backend_stack.uploads_bucket,
     food_safety_api_secret=backend_stack.food_safety_api_secret,
-    recipe_sync_metadata_secret=backend_stack.recipe_sync_metadata_secret,
 )
 recipe_stack.add_dependency(backend_stack)
 
@@ -71,8 +71,9 @@ class BackendStack(Stack):
             )
         )
 
-        # Recipe Sync Metadata를 Secret Manager에 저장
-        # 초기값은 20000101로 설정
+        # (Legacy) Recipe Sync Metadata Secret
+        # 동기화 상태는 DB의 recipe_sync_state 테이블로 이전됨
+        # 기존 배포와의 호환을 위해 리소스만 유지하며, Lambda에서는 더 이상 사용하지 않음
         initial_date = "20000101"
         self.recipe_sync_metadata_secret = secretsmanager.Secret(
             self,
@@ -376,6 +377,15 @@ class BackendStack(Stack):
                     allowed_headers=["*"],
                 )
             ],
+            lifecycle_rules=[
+                # 레시피 이미지 스트리밍 업로드 중 Lambda가 종료되어 남은 multipart/임시 객체 정리
+                s3.LifecycleRule(
+                    id="RecipeImageStagingCleanup",
+                    prefix="recipes/staging/",
+                    expiration=Duration.days(1),
+                    abort_incomplete_multipart_upload_after=Duration.days(1),
+                )
+            ],
         )
         self.uploads_bucket.grant_read(self.ec2_instance.role)
 
@@ -9,6 +9,8 @@ from aws_cdk import (
     aws_events_targets as targets,
     aws_secretsmanager as secretsmanager,
     aws_iam as iam,
+    aws_sqs as sqs,
+    ArnFormat,
     RemovalPolicy,
     CfnOutput,
 )
@@ -26,6 +28,8 @@ class RecipeStack(Stack):
     Resources:
     - Lambda Function (Recipe Sync from 식품안전나라 API)
     - EventBridge Rule (매주 월요일 오전 02시)
+    - Lambda Function (소비기한 임박 재료 알림 digest, 매일 오전 09시)
+    - SQS Queue (사용자별 소비기한 알림 digest)
     - Security Groups
 
     Database:
@@ -34,8 +38,9 @@ class RecipeStack(Stack):
     - Tables: recipe, recipe_recommendations
 
     S3 Storage:
-    - 레시피 썸네일 이미지: s3://bucket/recipes/{recipe_id}/thumbnail.jpg
-    - 레시피 조리 과정 이미지: s3://bucket/recipes/{recipe_id}/manual_01.jpg ~ manual_20.jpg
+    - 레시피 이미지 (썸네일 + 조리 과정): s3://bucket/recipes/objects/{sha256}.{ext}
+      (content-addressed, immutable 캐싱, 참조가 없는 객체는 동기화 후 GC)
+    - 이전 키 구조 recipes/{recipe_id}/... 는 레시피 변경 시 정리
     """
 
     def __init__(
@@ -47,7 +52,6 @@ class RecipeStack(Stack):
         lambda_sg: ec2.ISecurityGroup,
         uploads_bucket: s3.IBucket,
         food_safety_api_secret: secretsmanager.ISecret,
-        recipe_sync_metadata_secret: secretsmanager.ISecret,
         **kwargs
     ) -> None:
         super().__init__(scope, construct_id, **kwargs)
@@ -58,7 +62,6 @@ class RecipeStack(Stack):
         self.lambda_sg = lambda_sg
         self.uploads_bucket = uploads_bucket
         self.food_safety_api_secret = food_safety_api_secret
-        self.recipe_sync_metadata_secret = recipe_sync_metadata_secret
 
         is_production = Config.get("Production", False)
         removal_policy = (
@@ -86,6 +89,18 @@ class RecipeStack(Stack):
         import os
         skip_bundling = os.environ.get("CDK_SKIP_BUNDLING", "false").lower() == "true"
 
+        # Lambda 번들링 명령 (두 동기화 함수 공용)
+        # - API 서버 전용 모듈(FastAPI 라우터, JWT 인증, Bedrock)은 번들에서 제외
+        # - /var/task는 읽기 전용이라 런타임에 .pyc를 캐시할 수 없으므로 미리 컴파일
+        lambda_bundling_command = (
+            "pip install -r lambda/requirements.txt -t /asset-output && "
+            "cp -r lambda/* /asset-output/ && "
+            "cp -r app /asset-output/app && "
+            "rm -rf /asset-output/app/api /asset-output/app/main.py "
+            "/asset-output/app/core/auth.py /asset-output/app/utils/bedrock_dependencies.py && "
+            "python -m compileall -q /asset-output/app /asset-output/*.py"
+        )
+
         self.recipe_sync_lambda = lambda_.Function(
             self,
             "RecipeSyncLambda",
@@ -113,15 +128,13 @@ class RecipeStack(Stack):
                         # /asset-output/
                         #   ├── recipe_sync_handler.py (handler)
                         #   ├── requirements.txt
-                        #   ├── app/ (FastAPI 애플리케이션 디렉토리)
+                        #   ├── app/ (동기화에 필요한 모듈만 포함)
                         #   │   ├── core/
                         #   │   ├── models/
                         #   │   ├── services/
                         #   │   └── utils/
                         #   └── [installed dependencies from requirements.txt]
-                        "pip install -r lambda/requirements.txt -t /asset-output && "
-                        "cp -r lambda/* /asset-output/ && "
-                        "cp -r app /asset-output/app"
+                        lambda_bundling_command
                     ],
                 }
             ),
@@ -141,7 +154,6 @@ class RecipeStack(Stack):
                 "DATABASE_USER": database_username,
                 "DB_SECRET_NAME": self.db_instance.secret.secret_name if self.db_instance.secret else "",
                 "FOOD_SAFETY_API_SECRET_NAME": self.food_safety_api_secret.secret_name,
-                "RECIPE_SYNC_METADATA_SECRET_NAME": self.recipe_sync_metadata_secret.secret_name,
                 # AWS_REGION은 Lambda 런타임에서 자동으로 설정됨 (예약된 환경 변수)
                 "FOOD_SAFETY_API_BASE_URL": "http://openapi.foodsafetykorea.go.kr/api",
                 "S3_BUCKET_NAME": self.uploads_bucket.bucket_name,
@@ -153,8 +165,7 @@ class RecipeStack(Stack):
         if self.db_instance.secret:
             self.db_instance.secret.grant_read(self.recipe_sync_lambda)
         self.food_safety_api_secret.grant_read(self.recipe_sync_lambda)
-        self.recipe_sync_metadata_secret.grant_read(self.recipe_sync_lambda)
-        self.recipe_sync_metadata_secret.grant_write(self.recipe_sync_lambda)
+        # 동기화 상태는 DB(recipe_sync_state 테이블)에 저장하므로 메타데이터 Secret 권한 불필요
 
         # S3 버킷 쓰기 권한 부여 (ACL 설정 포함)
         self.uploads_bucket.grant_write(self.recipe_sync_lambda)
@@ -217,9 +228,7 @@ class RecipeStack(Stack):
                     "image": lambda_.Runtime.PYTHON_3_12.bundling_image,
                     "command": [
                         "bash", "-c",
-                        "pip install -r lambda/requirements.txt -t /asset-output && "
-                        "cp -r lambda/* /asset-output/ && "
-                        "cp -r app /asset-output/app"
+                        lambda_bundling_command
                     ],
                 }
             ),
@@ -233,6 +242,8 @@ class RecipeStack(Stack):
             environment={
                 "ENVIRONMENT": "production",
                 "SERVICE_NAME": "recipe_manual",
+                # 코디네이터 모드에서 결과를 기록하지 못한 샤드(timeout, OOM)를 실패로 판정하는 기준
+                "RECIPE_SYNC_SHARD_TIMEOUT_SECONDS": str(lambda_timeout_minutes * 60),
                 "DATABASE_HOST": self.db_instance.db_instance_endpoint_address,
                 "DATABASE_PORT": "5432",
                 "DATABASE_NAME": database_name,
@@ -243,14 +254,15 @@ class RecipeStack(Stack):
                 "S3_BUCKET_NAME": self.uploads_bucket.bucket_name,
                 "S3_RECIPE_PREFIX": "recipes",
             },
+            # 코디네이터 모드의 샤드는 비동기(Event)로 호출되며, 자동 재시도 시 같은 샤드가 중복 실행되므로
+            # 재시도하지 않음 (실패한 샤드는 실행 상태에 기록되므로 그 범위만 다시 호출)
+            retry_attempts=0,
         )
 
         # Manual Lambda에 권한 부여
         if self.db_instance.secret:
             self.db_instance.secret.grant_read(self.manual_recipe_sync_lambda)
         self.food_safety_api_secret.grant_read(self.manual_recipe_sync_lambda)
-        self.recipe_sync_metadata_secret.grant_read(self.manual_recipe_sync_lambda)
-        self.recipe_sync_metadata_secret.grant_write(self.manual_recipe_sync_lambda)
 
         # S3 버킷 쓰기 권한 부여 (ACL 설정 포함)
         self.uploads_bucket.grant_write(self.manual_recipe_sync_lambda)
@@ -264,6 +276,100 @@ class RecipeStack(Stack):
             )
         )
 
+        # 코디네이터 모드에서 샤드별로 자기 자신을 호출하기 위한 권한
+        # (function ARN을 직접 참조하면 Role <-> Function 순환 참조가 생기므로 이름 패턴 사용)
+        self.manual_recipe_sync_lambda.add_to_role_policy(
+            iam.PolicyStatement(
+                actions=["lambda:InvokeFunction"],
+                resources=[
+                    self.format_arn(
+                        service="lambda",
+                        resource="function",
+                        resource_name=f"{self.stack_name}-ManualRecipeSync*",
+                        arn_format=ArnFormat.COLON_RESOURCE_NAME,
+                    )
+                ]
+            )
+        )
+
+        # ======================
+        # Lambda Function - Expiry Notification (소비기한 임박 알림)
+        # ======================
+
+        # 사용자별 digest 메시지 큐 (푸시/메일 발송 워커가 소비)
+        self.expiry_digest_queue = sqs.Queue(
+            self,
+            "ExpiryDigestQueue",
+            retention_period=Duration.days(4),
+            visibility_timeout=Duration.minutes(5),
+            removal_policy=removal_policy,
+        )
+
+        self.expiry_notification_lambda = lambda_.Function(
+            self,
+            "ExpiryNotificationLambda",
+            runtime=lambda_.Runtime.PYTHON_3_12,
+            handler="expiry_notification_handler.lambda_handler",
+            code=lambda_.Code.from_asset(
+                ".",
+                exclude=[
+                    "cdk.out",
+                    ".git",
+                    ".gitignore",
+                    "*.md",
+                    "**/__pycache__",
+                    "venv",
+                    ".venv",
+                    ".env",
+                    "tests",
+                    "infra",
+                ],
+                bundling=None if skip_bundling else {
+                    "image": lambda_.Runtime.PYTHON_3_12.bundling_image,
+                    "command": [
+                        "bash", "-c",
+                        lambda_bundling_command
+                    ],
+                }
+            ),
+            timeout=Duration.minutes(5),
+            memory_size=512,
+            vpc=self.vpc,
+            vpc_subnets=ec2.SubnetSelection(
+                subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS
+            ),
+            security_groups=[self.lambda_sg],
+            environment={
+                "ENVIRONMENT": "production",
+                "SERVICE_NAME": "expiry_notification",
+                "DATABASE_HOST": self.db_instance.db_instance_endpoint_address,
+                "DATABASE_PORT": "5432",
+                "DATABASE_NAME": database_name,
+                "DATABASE_USER": database_username,
+                "DB_SECRET_NAME": self.db_instance.secret.secret_name if self.db_instance.secret else "",
+                "EXPIRY_DIGEST_QUEUE_URL": self.expiry_digest_queue.queue_url,
+            },
+        )
+
+        if self.db_instance.secret:
+            self.db_instance.secret.grant_read(self.expiry_notification_lambda)
+        self.expiry_digest_queue.grant_send_messages(self.expiry_notification_lambda)
+
+        # 매일 09:00 KST = 00:00 UTC
+        self.expiry_notification_rule = events.Rule(
+            self,
+            "ExpiryNotificationRule",
+            description="Trigger Expiry Notification Lambda every day at 09:00 AM KST",
+            schedule=events.Schedule.cron(
+                minute="0",
+                hour="0",  # UTC 00:00
+            ),
+        )
+
+        self.expiry_notification_rule.add_target(
+            targets.LambdaFunction(self.expiry_notification_lambda)
+        )
+
 
         # Outputs
         CfnOutput(
@@ -293,3 +399,17 @@ class RecipeStack(Stack):
             value=self.manual_recipe_sync_lambda.function_name,
             description="Manual Recipe Sync Lambda Function Name",
         )
+
+        CfnOutput(
+            self,
+            "ExpiryNotificationLambdaArn",
+            value=self.expiry_notification_lambda.function_arn,
+            description="Expiry Notification Lambda Function ARN",
+        )
+
+        CfnOutput(
+            self,
+            "ExpiryDigestQueueUrl",
+            value=self.expiry_digest_queue.queue_url,
+            description="SQS queue receiving per-user expiry digests (daily at 09:00 AM KST)",
+        )
@@ -0,0 +1,109 @@
+"""
+Expiry Notification Lambda Handler
+
+EventBridge에 의해 매일 오전 09시(KST)에 실행됩니다.
+소비기한이 임박한 재료를 expired_at 인덱스 범위로 배치 스캔하여
+사용자별 digest를 만들고 알림 큐(SQS)에 전송합니다.
+
+Sink 선택 (환경 변수):
+    EXPIRY_DIGEST_QUEUE_URL: SQS 큐로 전송
+    없으면 EXPIRY_DIGEST_FILE (기본 /tmp/expiry_digests.jsonl)에 JSON Lines로 기록 (로컬 실행용)
+
+이벤트 옵션:
+    {"window_days": 4, "batch_size": 1000}
+"""
+import sys
+import os
+import json
+from datetime import datetime, timedelta
+
+# Lambda 환경에서 app 모듈을 import하기 위한 경로 설정
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.core.lambda_runtime import LambdaRuntime
+
+# warm start 간에 이벤트 루프, DB 엔진, 시크릿을 재사용
+runtime = LambdaRuntime()
+
+
+def create_sink():
+    from app.services.expiry_notifications import JsonlFileSink, SqsSink
+
+    queue_url = os.environ.get("EXPIRY_DIGEST_QUEUE_URL")
+    if queue_url:
+        return SqsSink(queue_url)
+    return JsonlFileSink(os.environ.get("EXPIRY_DIGEST_FILE", "/tmp/expiry_digests.jsonl"))
+
+
+def lambda_handler(event, context):
+    """
+    Lambda 핸들러 함수
+
+    Returns:
+        statusCode: 200 (성공) 또는 500 (실패)
+        body: 스캔한 재료 수, 배치 수, digest를 보낸 사용자 수
+    """
+    try:
+        runtime.begin_invocation()
+        print(f"Expiry notification started at {datetime.utcnow()} (cold_start={runtime.cold_start})")
+
+        from app.services.expiry_notifications import DEFAULT_WINDOW, ExpiryNotificationScanner
+
+        event = event or {}
+        window = timedelta(days=event["window_days"]) if "window_days" in event else DEFAULT_WINDOW
+        scanner = ExpiryNotificationScanner(
+            sink=create_sink(),
+            window=window,
+            batch_size=int(event.get("batch_size", 1000)),
+        )
+
+        session_factory = runtime.prepare()
+        result = runtime.run(scanner.scan(session_factory))
+
+        message = (
+            f"Expiry notification completed. Scanned {result['scanned']} materials "
+            f"in {result['batches']} batches, digests for {result['users']} users"
+        )
+        print(message)
+
+        return {
+            'statusCode': 200,
+            'body': json.dumps({
+                'message': message,
+                **result,
+                'runtime': runtime.timing(),
+                'timestamp': datetime.utcnow().isoformat()
+            })
+        }
+
+    except Exception as e:
+        error_message = f"Expiry notification failed: {str(e)}"
+        print(error_message)
+        print(f"Error type: {type(e).__name__}")
+
+        import traceback
+        traceback.print_exc()
+
+        return {
+            'statusCode': 500,
+            'body': json.dumps({
+                'error': error_message,
+                'runtime': runtime.timing(),
+                'timestamp': datetime.utcnow().isoformat()
+            })
+        }
+
+
+# 로컬 테스트용
+if __name__ == "__main__":
+    test_event = {
+        "version": "0",
+        "id": "test-event-id",
+        "detail-type": "Scheduled Event",
+        "source": "aws.events",
+        "time": datetime.utcnow().isoformat()
+    }
+
+    result = lambda_handler(test_event, {})
+    print("\n=== Test Result ===")
+    print(json.dumps(result, indent=2))
@@ -16,87 +16,229 @@ Recipe Manual Sync Lambda Handler
         "start_index": 1,
         "end_index": 100
     }
+
+코디네이터 모드 (shard_size 지정 시):
+    전체 범위를 shard_size 단위로 나누고 실행(run)과 샤드 상태를 DB에 만든 뒤,
+    이 함수를 샤드별로 비동기(Event) 호출하고 run_id와 함께 바로 반환합니다(202).
+    각 샤드는 끝나면 결과를 기록하고, 마지막 샤드가 total_synced와 실패한 샤드를 집계합니다.
+    {
+        "start_index": 1,
+        "end_index": 1200,
+        "shard_size": 100,
+        "max_concurrency": 12
+    }
+
+실행 상태 조회 (제한 시간이 지나도 결과를 기록하지 않은 샤드는 이때 실패로 기록되고 실행이 완료됨):
+    {
+        "action": "status",
+        "run_id": "..."
+    }
 """
 import sys
 import os
-import asyncio
 import json
+import uuid
 from datetime import datetime
 
 # Lambda 환경에서 app 모듈을 import하기 위한 경로 설정
 sys.path.insert(0, os.path.dirname(__file__))
 
-from app.core.config import settings
+from app.core.lambda_runtime import LambdaRuntime
+
+# warm start 간에 이벤트 루프, DB 엔진, 시크릿, HTTP 클라이언트를 재사용
+runtime = LambdaRuntime()
+
 
+async def create_run_async(session_factory, run_id: str, start_index: int, end_index: int, shard_size: int, shards):
+    from app.services.recipe_sync_runs import recipe_sync_run_store
 
-def get_db_password():
+    async with session_factory() as session:
+        await recipe_sync_run_store.create_run(session, run_id, start_index, end_index, shard_size, shards)
+
+
+async def record_shards_async(session_factory, run_id: str, shard_results):
     """
-    AWS Secrets Manager에서 DB 비밀번호를 가져옵니다.
+    샤드 결과 기록 [(start_index, result, error), ...]
+    마지막 샤드였다면 완료된 실행을 반환
     """
-    import boto3
+    from app.services.recipe_sync_runs import recipe_sync_run_store
+
+    completed = None
+    async with session_factory() as session:
+        for start_index, result, error in shard_results:
+            completed = await recipe_sync_run_store.record_shard_result(
+                session, run_id, start_index, result=result, error=error
+            ) or completed
+    return completed
+
 
-    secret_name = os.environ.get("DB_SECRET_NAME")
-    region_name = os.environ.get("AWS_REGION", "ap-northeast-2")
+async def get_run_status_async(session_factory, run_id: str):
+    from app.services.recipe_sync_runs import recipe_sync_run_store
 
-    if not secret_name:
-        print("Warning: DB_SECRET_NAME environment variable is not set.")
-        return None
+    async with session_factory() as session:
+        return await recipe_sync_run_store.get_status(session, run_id)
 
-    session = boto3.session.Session()
-    client = session.client(service_name='secretsmanager', region_name=region_name)
+
+def get_run_status(event):
+    """코디네이터 모드 실행 상태 조회"""
+    run_id = event.get('run_id')
+    if not run_id:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({'error': 'Missing required parameter: run_id'})
+        }
+
+    session_factory = runtime.prepare()
+    status = runtime.run(get_run_status_async(session_factory, run_id))
+    if status is None:
+        return {
+            'statusCode': 404,
+            'body': json.dumps({'error': f'Sync run {run_id} not found'})
+        }
+
+    return {
+        'statusCode': 200,
+        'body': json.dumps(status)
+    }
+
+
+def run_coordinator(event, context, start_index: int, end_index: int):
+    """
+    코디네이터 모드: 범위를 샤드로 나누어 수동 동기화 함수를 비동기 호출
+    event에 "local": true가 있으면 Lambda 대신 같은 프로세스에서 핸들러를 순서대로 실행하고 결과를 집계합니다.
+    """
+    from app.services.recipe_sync_coordinator import LocalShardInvoker, RecipeSyncCoordinator
 
     try:
-        response = client.get_secret_value(SecretId=secret_name)
-        if 'SecretString' in response:
-            secret = response['SecretString']
-            return json.loads(secret).get('password')
-    except Exception as e:
-        print(f"Error fetching secret: {e}")
-        raise e
-    return None
+        shard_size = int(event.get('shard_size'))
+        max_concurrency = int(event.get('max_concurrency', 10))
+    except (ValueError, TypeError):
+        return {
+            'statusCode': 400,
+            'body': json.dumps({
+                'error': 'shard_size and max_concurrency must be integers'
+            })
+        }
+
+    if shard_size < 1 or max_concurrency < 1:
+        return {
+            'statusCode': 400,
+            'body': json.dumps({
+                'error': 'shard_size and max_concurrency must be >= 1'
+            })
+        }
+
+    if not event.get('local'):
+        return dispatch_shards(context, start_index, end_index, shard_size, max_concurrency)
 
+    # 같은 프로세스에서는 이벤트 루프와 DB 엔진을 공유하므로 샤드를 하나씩 실행
+    coordinator = RecipeSyncCoordinator(LocalShardInvoker(lambda_handler), max_concurrency=1)
+    result = coordinator.run(start_index, end_index, shard_size)
 
-async def sync_recipes_by_range_async(start_index: int, end_index: int):
+    message = (
+        f"Coordinated recipe sync completed. Synced {result['total_synced']} recipes "
+        f"from index {start_index} to {end_index} in {result['shards']} shards "
+        f"({len(result['failed_shards'])} failed)"
+    )
+    print(message)
+
+    return {
+        # 일부 샤드만 실패한 경우 207 (실패한 범위만 다시 호출하면 됨)
+        'statusCode': 200 if not result['failed_shards'] else 207,
+        'body': json.dumps({
+            'message': message,
+            'range': {
+                'start_index': start_index,
+                'end_index': end_index
+            },
+            **result,
+            'runtime': runtime.timing(),
+            'timestamp': datetime.utcnow().isoformat()
+        })
+    }
+
+
+def dispatch_shards(context, start_index: int, end_index: int, shard_size: int, max_concurrency: int):
     """
-    비동기로 특정 범위의 레시피 동기화 실행
+    실행과 샤드 상태를 만든 뒤 샤드를 비동기 호출하고 바로 반환 (202)
+    호출 자체가 실패한 샤드는 실패로 기록하므로, 나머지 샤드가 끝나면 실행은 partial로 완료됩니다.
     """
-    from app.core.config import settings
-    from sqlalchemy.ext.asyncio import create_async_engine
-    from sqlalchemy.orm import sessionmaker
-    from sqlmodel.ext.asyncio.session import AsyncSession
-    from app.services.recipe_sync_service import recipe_sync_service
-    import ssl
-
-    # Lambda 환경에서는 매번 새로운 엔진 생성 (이벤트 루프 충돌 방지)
-    ssl_context = ssl.create_default_context()
-    ssl_context.check_hostname = False
-    ssl_context.verify_mode = ssl.CERT_NONE
-
-    engine = create_async_engine(
-        settings.DATABASE_URL,
-        echo=False,  # Lambda에서는 로그 최소화
-        future=True,
-        connect_args={"ssl": ssl_context} if settings.ENVIRONMENT == "production" else {},
+    from app.services.recipe_sync_coordinator import LambdaShardInvoker, RecipeSyncCoordinator
+
+    run_id = uuid.uuid4().hex
+    shards = RecipeSyncCoordinator.plan_shards(start_index, end_index, shard_size)
+
+    session_factory = runtime.prepare()
+    # 샤드가 결과를 기록할 행이 먼저 있어야 하므로 호출 전에 commit
+    runtime.run(create_run_async(session_factory, run_id, start_index, end_index, shard_size, shards))
+
+    function_name = getattr(context, 'function_name', None) or os.environ.get("AWS_LAMBDA_FUNCTION_NAME")
+    coordinator = RecipeSyncCoordinator(LambdaShardInvoker(function_name), max_concurrency=max_concurrency)
+    result = coordinator.dispatch(run_id, shards)
+
+    if result['failed_shards']:
+        runtime.run(record_shards_async(session_factory, run_id, [
+            (shard['start_index'], None, f"Dispatch failed: {shard['error']}")
+            for shard in result['failed_shards']
+        ]))
+
+    message = (
+        f"Dispatched {result['dispatched']} of {result['shards']} shards "
+        f"from index {start_index} to {end_index} (run_id: {run_id})"
     )
+    print(message)
+
+    return {
+        'statusCode': 202,
+        'body': json.dumps({
+            'message': message,
+            'run_id': run_id,
+            'range': {
+                'start_index': start_index,
+                'end_index': end_index
+            },
+            **result,
+            'runtime': runtime.timing(),
+            'timestamp': datetime.utcnow().isoformat()
+        })
+    }
 
+
+def run_shard(session_factory, run_id: str, start_index: int, end_index: int):
+    """
+    코디네이터가 호출한 샤드 실행: 동기화 결과(또는 실패)를 실행 상태에 기록
+    마지막 샤드였다면 실행 전체 결과를 집계하여 로그로 남김
+    """
     try:
-        # sessionmaker를 사용하여 expire_on_commit=False 설정 적용
-        async_session = sessionmaker(
-            engine,
-            class_=AsyncSession,
-            expire_on_commit=False
+        result = runtime.run(
+            sync_recipes_by_range_async(session_factory, start_index, end_index)
+        )
+    except Exception as e:
+        runtime.run(record_shards_async(session_factory, run_id, [(start_index, None, str(e))]))
+        raise
+
+    completed = runtime.run(record_shards_async(session_factory, run_id, [(start_index, result, None)]))
+    if completed is not None:
+        print(
+            f"Sync run {run_id} {completed.status}: synced {completed.result['total_synced']} recipes "
+            f"in {completed.shard_count} shards ({len(completed.result['failed_shards'])} failed)"
         )
+    return result
 
-        async with async_session() as session:
-            total_synced = await recipe_sync_service.sync_recipes_by_range(
-                session=session,
-                start_index=start_index,
-                end_index=end_index
-            )
-            return total_synced
-    finally:
-        # 엔진 정리 (연결 풀 닫기)
-        await engine.dispose()
+
+async def sync_recipes_by_range_async(session_factory, start_index: int, end_index: int):
+    """
+    비동기로 특정 범위의 레시피 동기화 실행
+    """
+    from app.services.recipe_sync_service import recipe_sync_service
+
+    async with session_factory() as session:
+        result = await recipe_sync_service.sync_recipes_by_range(
+            session=session,
+            start_index=start_index,
+            end_index=end_index
+        )
+        return result
 
 
 def lambda_handler(event, context):
@@ -107,18 +249,26 @@ def lambda_handler(event, context):
         event: 입력 이벤트 객체
             {
                 "start_index": 1,      # 필수: 시작 인덱스
-                "end_index": 100       # 필수: 끝 인덱스
+                "end_index": 100,      # 필수: 끝 인덱스
+                "shard_size": 100,     # 선택: 지정 시 코디네이터 모드로 샤드 병렬 실행
+                "max_concurrency": 10, # 선택: 코디네이터 모드의 동시 호출 샤드 수
+                "run_id": "...",       # 코디네이터가 샤드 호출 시 지정 (결과를 실행 상태에 기록)
+                "action": "status"     # 선택: run_id의 실행 상태 조회
             }
         context: Lambda 실행 컨텍스트
 
     Returns:
-        statusCode: 200 (성공) 또는 400/500 (실패)
+        statusCode: 200 (성공), 202 (코디네이터 모드 샤드 호출 완료) 또는 400/404/500 (실패)
         body: 동기화 결과 메시지
     """
     try:
-        print(f"Manual recipe sync started at {datetime.utcnow()}")
+        runtime.begin_invocation()
+        print(f"Manual recipe sync started at {datetime.utcnow()} (cold_start={runtime.cold_start})")
         print(f"Event: {json.dumps(event)}")
 
+        if event.get('action') == 'status':
+            return get_run_status(event)
+
         # 1. 입력 파라미터 검증
         start_index = event.get('start_index')
         end_index = event.get('end_index')
@@ -165,22 +315,31 @@ def lambda_handler(event, context):
                 })
             }
 
+        # 코디네이터 모드: 실행 상태만 만들고 샤드별로 이 함수를 다시 호출
+        if event.get('shard_size') is not None:
+            return run_coordinator(event, context, start_index, end_index)
+
         print(f"Syncing recipes from {start_index} to {end_index}...")
 
-        # 2. DB 비밀번호 설정
-        if not settings.DATABASE_PASSWORD:
-            print("Fetching DB password from Secrets Manager...")
-            db_password = get_db_password()
-            if db_password:
-                settings.DATABASE_PASSWORD = db_password
-                print("DB password successfully set.")
-            else:
-                raise ValueError("Failed to retrieve DB password.")
+        # 2. DB 엔진/HTTP 클라이언트 준비 (warm start에서는 캐시 사용)
+        from app.services.recipe_sync_service import recipe_sync_service
+        from app.utils.s3_helper import s3_helper
+
+        session_factory = runtime.prepare(recipe_sync_service, s3_helper)
 
-        # 3. 비동기 함수 실행
-        total_synced = asyncio.run(sync_recipes_by_range_async(start_index, end_index))
+        # 3. 유지 중인 이벤트 루프에서 비동기 함수 실행
+        run_id = event.get('run_id')
+        if run_id:
+            result = run_shard(session_factory, run_id, start_index, end_index)
+        else:
+            result = runtime.run(
+                sync_recipes_by_range_async(session_factory, start_index, end_index)
+            )
 
-        message = f"Manual recipe sync completed. Synced {total_synced} recipes from index {start_index} to {end_index}"
+        message = (
+            f"Manual recipe sync completed. Synced {result['total_synced']} recipes "
+            f"from index {start_index} to {end_index} (unchanged: {result['unchanged']})"
+        )
         print(message)
 
         return {
@@ -191,7 +350,8 @@ def lambda_handler(event, context):
                     'start_index': start_index,
                     'end_index': end_index
                 },
-                'total_synced': total_synced,
+                **result,
+                'runtime': runtime.timing(),
                 'timestamp': datetime.utcnow().isoformat()
             })
         }
@@ -208,6 +368,7 @@ def lambda_handler(event, context):
             'statusCode': 500,
             'body': json.dumps({
                 'error': error_message,
+                'runtime': runtime.timing(),
                 'timestamp': datetime.utcnow().isoformat()
             })
         }
@@ -6,7 +6,6 @@ EventBridge에 의해 매주 월요일 오전 02시에 실행됩니다.
 """
 import sys
 import os
-import asyncio
 import json
 from datetime import datetime
 
@@ -14,59 +13,25 @@ from datetime import datetime
 # CDK bundling으로 app 디렉토리가 Lambda 패키지 루트에 위치함
 sys.path.insert(0, os.path.dirname(__file__))
 
-from app.core.config import settings
+from app.core.lambda_runtime import LambdaRuntime
 
+# warm start 간에 이벤트 루프, DB 엔진, 시크릿, HTTP 클라이언트를 재사용
+runtime = LambdaRuntime()
 
-def get_db_password():
-    """
-    AWS Secrets Manager에서 DB 비밀번호를 가져옵니다.
-    """
-    import boto3
-    
-    secret_name = os.environ.get("DB_SECRET_NAME")
-    region_name = os.environ.get("AWS_REGION", "ap-northeast-2")
-
-    if not secret_name:
-        print("Warning: DB_SECRET_NAME environment variable is not set.")
-        return None
 
-    session = boto3.session.Session()
-    client = session.client(service_name='secretsmanager', region_name=region_name)
-
-    try:
-        response = client.get_secret_value(SecretId=secret_name)
-        if 'SecretString' in response:
-            secret = response['SecretString']
-            return json.loads(secret).get('password')
-    except Exception as e:
-        print(f"Error fetching secret: {e}")
-        raise e
-    return None
-
-
-async def sync_recipes_async():
+async def sync_recipes_async(session_factory):
     """
     비동기로 레시피 동기화 실행
     """
-    from app.core.db import async_engine
-    from sqlalchemy.orm import sessionmaker
-    from sqlmodel.ext.asyncio.session import AsyncSession
     from app.services.recipe_sync_service import recipe_sync_service
 
-    # sessionmaker를 사용하여 expire_on_commit=False 설정 적용
-    async_session = sessionmaker(
-        async_engine,
-        class_=AsyncSession,
-        expire_on_commit=False
-    )
-
-    async with async_session() as session:
-        total_synced = await recipe_sync_service.sync_all_recipes(
+    async with session_factory() as session:
+        result = await recipe_sync_service.sync_all_recipes(
             session=session,
             batch_size=500,
             use_incremental=True  # 마지막 동기화 이후 변경된 레시피만 가져옴
         )
-        return total_synced
+        return result
 
 
 def lambda_handler(event, context):
@@ -82,30 +47,31 @@ def lambda_handler(event, context):
         body: 동기화 결과 메시지
     """
     try:
-        print(f"Recipe sync started at {datetime.utcnow()}")
+        runtime.begin_invocation()
+        print(f"Recipe sync started at {datetime.utcnow()} (cold_start={runtime.cold_start})")
         print(f"Event: {json.dumps(event)}")
 
-        # 1. DB 비밀번호가 설정되어 있지 않다면 Secrets Manager에서 가져옵니다.
-        if not settings.DATABASE_PASSWORD:
-            print("Fetching DB password from Secrets Manager...")
-            db_password = get_db_password()
-            if db_password:
-                settings.DATABASE_PASSWORD = db_password
-                print("DB password successfully set.")
-            else:
-                raise ValueError("Failed to retrieve DB password.")
+        # 1. DB 엔진/HTTP 클라이언트 준비 (warm start에서는 캐시 사용)
+        from app.services.recipe_sync_service import recipe_sync_service
+        from app.utils.s3_helper import s3_helper
 
-        # 비동기 함수 실행
-        total_synced = asyncio.run(sync_recipes_async())
+        session_factory = runtime.prepare(recipe_sync_service, s3_helper)
 
-        message = f"Recipe sync completed successfully. Total synced: {total_synced} recipes"
+        # 2. 유지 중인 이벤트 루프에서 비동기 함수 실행
+        result = runtime.run(sync_recipes_async(session_factory))
+
+        message = (
+            f"Recipe sync completed successfully. Total synced: {result['total_synced']} recipes "
+            f"(new: {result['new']}, changed: {result['changed']}, unchanged: {result['unchanged']})"
+        )
         print(message)
 
         return {
             'statusCode': 200,
             'body': json.dumps({
                 'message': message,
-                'total_synced': total_synced,
+                **result,
+                'runtime': runtime.timing(),
                 'timestamp': datetime.utcnow().isoformat()
             })
         }
@@ -122,6 +88,7 @@ def lambda_handler(event, context):
             'statusCode': 500,
             'body': json.dumps({
                 'error': error_message,
+                'runtime': runtime.timing(),
                 'timestamp': datetime.utcnow().isoformat()
             })
         }
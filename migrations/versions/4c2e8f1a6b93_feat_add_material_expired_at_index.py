@@ -0,0 +1,35 @@
+"""feat: add material expired_at index
+
+Revision ID: 4c2e8f1a6b93
+Revises: 0b7d4e9a2f61
+Create Date: 2026-10-19 20:52:31.907154
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c2e8f1a6b93'
+down_revision: Union[str, Sequence[str], None] = '0b7d4e9a2f61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 만료 알림 배치의 소비기한 범위 keyset scan용
+    op.create_index(
+        'ix_material_expired_at_id',
+        'material',
+        ['expired_at', 'id'],
+        unique=False,
+        postgresql_where=sa.text('expired_at IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_material_expired_at_id', table_name='material')
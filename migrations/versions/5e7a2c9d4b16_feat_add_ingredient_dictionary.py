@@ -0,0 +1,209 @@
+"""feat: add ingredient_ids
+
+Revision ID: 5e7a2c9d4b16
+Revises: 9d3b5f7e2a48
+Create Date: 2026-10-19 22:18:47.205931
+
+"""
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e7a2c9d4b16'
+down_revision: Union[str, Sequence[str], None] = '9d3b5f7e2a48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+# 이 리비전 시점의 표준 식재료 사전과 정규화 규칙 (app.services.ingredients 스냅샷)
+# 앱 코드가 바뀌어도 이 마이그레이션의 결과가 달라지지 않도록 복사해 둠, 수정하지 말 것
+INGREDIENTS = {
+    # 채소
+    1: ("양파", "적양파", "자색양파"),
+    2: ("대파", "쪽파", "실파", "파채"),
+    3: ("마늘", "다진마늘", "통마늘", "마늘쫑"),
+    4: ("생강", "다진생강"),
+    5: ("감자", "햇감자", "알감자"),
+    6: ("고구마", "호박고구마", "밤고구마"),
+    7: ("당근",),
+    8: ("양배추", "적양배추"),
+    9: ("배추", "알배추", "알배기배추", "봄동"),
+    10: ("무", "무우", "조선무", "총각무", "알타리무"),
+    11: ("오이", "백오이", "취청오이"),
+    12: ("애호박", "주키니"),
+    13: ("단호박", "늙은호박"),
+    14: ("고추", "풋고추", "청양고추", "홍고추", "꽈리고추", "오이고추"),
+    15: ("파프리카", "피망"),
+    16: ("토마토", "방울토마토", "대추토마토"),
+    17: ("가지",),
+    18: ("시금치",),
+    19: ("상추", "적상추", "청상추"),
+    20: ("깻잎",),
+    21: ("부추", "영양부추"),
+    22: ("미나리",),
+    23: ("브로콜리",),
+    24: ("콩나물",),
+    25: ("숙주", "숙주나물"),
+    26: ("양송이버섯", "양송이"),
+    27: ("표고버섯", "표고"),
+    28: ("느타리버섯", "느타리"),
+    29: ("팽이버섯", "팽이"),
+    30: ("새송이버섯", "새송이"),
+    31: ("양상추",),
+    32: ("셀러리", "샐러리"),
+    33: ("연근",),
+    34: ("우엉",),
+    35: ("고사리",),
+    36: ("도라지",),
+    # 과일
+    37: ("사과", "부사", "홍로"),
+    38: ("배", "신고배"),
+    39: ("바나나",),
+    40: ("딸기",),
+    41: ("레몬", "레몬즙"),
+    42: ("귤", "감귤", "한라봉", "천혜향"),
+    43: ("오렌지",),
+    44: ("키위", "참다래"),
+    45: ("블루베리",),
+    46: ("포도", "샤인머스캣", "청포도"),
+    47: ("아보카도",),
+    # 육류, 달걀
+    48: ("소고기", "쇠고기", "한우", "차돌박이", "우둔", "홍두깨", "불고기용"),
+    49: ("돼지고기", "삼겹살", "목살", "앞다리살", "뒷다리살", "돈가스용"),
+    50: ("닭고기", "닭가슴살", "닭다리", "닭안심", "닭봉", "생닭", "닭날개"),
+    51: ("오리고기", "훈제오리"),
+    52: ("다짐육", "간고기", "다진고기", "다진소고기", "다진돼지고기"),
+    53: ("달걀", "계란", "유정란", "구운란"),
+    54: ("메추리알",),
+    55: ("햄", "스팸", "통조림햄"),
+    56: ("소시지", "비엔나", "소세지"),
+    57: ("베이컨",),
+    # 해산물
+    58: ("새우", "칵테일새우", "대하", "흰다리새우", "건새우"),
+    59: ("오징어", "한치"),
+    60: ("고등어",),
+    61: ("연어", "훈제연어"),
+    62: ("조개", "바지락", "모시조개", "홍합", "꼬막"),
+    63: ("굴", "생굴", "석굴"),
+    64: ("멸치", "국물멸치", "볶음멸치", "잔멸치"),
+    65: ("참치", "참치캔", "참치통조림"),
+    66: ("어묵", "오뎅"),
+    67: ("게맛살", "맛살", "크래미"),
+    68: ("김", "김밥김", "조미김", "구운김"),
+    69: ("미역", "건미역"),
+    70: ("다시마",),
+    71: ("낙지", "쭈꾸미", "주꾸미"),
+    72: ("명태", "동태", "북어", "황태", "코다리"),
+    # 유제품, 콩 가공품
+    73: ("우유", "저지방우유", "흰우유"),
+    74: ("두유",),
+    75: ("치즈", "슬라이스치즈", "모짜렐라", "모차렐라", "파마산"),
+    76: ("버터", "무염버터"),
+    77: ("요거트", "요구르트", "플레인요거트"),
+    78: ("생크림", "휘핑크림"),
+    79: ("두부", "연두부", "순두부", "부침두부", "찌개두부"),
+    80: ("유부",),
+    # 곡물, 면, 가루
+    81: ("쌀", "백미", "현미", "찹쌀", "즉석밥", "햇반", "공깃밥", "흰밥"),
+    82: ("밀가루", "중력분", "강력분", "박력분", "부침가루", "튀김가루"),
+    83: ("빵가루",),
+    84: ("전분", "녹말", "감자전분", "옥수수전분"),
+    85: ("식빵", "바게트"),
+    86: ("국수", "소면", "중면", "칼국수면"),
+    87: ("라면",),
+    88: ("당면",),
+    89: ("파스타", "스파게티", "펜네"),
+    90: ("떡", "떡국떡", "떡볶이떡", "가래떡"),
+    91: ("김치", "배추김치", "묵은지", "깍두기"),
+    # 양념
+    92: ("간장", "진간장", "국간장", "양조간장", "맛간장"),
+    93: ("고추장",),
+    94: ("된장",),
+    95: ("고춧가루",),
+    96: ("설탕", "백설탕", "황설탕"),
+    97: ("소금", "천일염", "꽃소금", "맛소금"),
+    98: ("후추", "후춧가루"),
+    99: ("식초", "사과식초"),
+    100: ("참기름",),
+    101: ("들기름",),
+    102: ("식용유", "카놀라유", "포도씨유", "올리브유", "올리브오일"),
+    103: ("물엿", "올리고당", "조청"),
+    104: ("꿀",),
+    105: ("참깨", "깨", "통깨", "깨소금"),
+    106: ("케첩", "케찹", "토마토케첩"),
+    107: ("마요네즈",),
+    108: ("굴소스",),
+    109: ("맛술", "미림", "청주"),
+    110: ("액젓", "멸치액젓", "까나리액젓", "새우젓"),
+}
+
+_NOISE = re.compile(r"\([^)]*\)|\[[^\]]*\]|\d[\d.,/~]*\s*[a-zA-Z가-힣]{0,3}\b|\s+")
+_IDS = {}
+_EXACT = {}
+for _id, _names in INGREDIENTS.items():
+    for _name in _names:
+        (_EXACT if len(_name) == 1 else _IDS).setdefault(_name.lower(), _id)
+_PATTERN = re.compile("|".join(re.escape(keyword) for keyword in sorted(_IDS, key=len, reverse=True)))
+
+
+def _normalize(name):
+    text = _NOISE.sub("", (name or "").lower())
+    if text in _EXACT:
+        return [_EXACT[text]]
+    return sorted({_IDS[match.group()] for match in _PATTERN.finditer(text)})
+
+
+def _normalize_all(names):
+    ids = set()
+    for name in names or []:
+        ids.update(_normalize(name))
+    return sorted(ids)
+
+
+def _backfill(table: str, key: str, source: str, normalize) -> None:
+    """기존 행의 ingredient_ids를 key 순서로 BACKFILL_BATCH_SIZE개씩 채움"""
+    conn = op.get_bind()
+    select_rows = sa.text(
+        f"SELECT {key}, {source} FROM {table} WHERE {key} > :after ORDER BY {key} LIMIT :limit"
+    )
+    update_row = sa.text(
+        f"UPDATE {table} SET ingredient_ids = :ingredient_ids WHERE {key} = :key"
+    ).bindparams(sa.bindparam('ingredient_ids', type_=postgresql.ARRAY(sa.Integer())))
+
+    after = -1
+    while True:
+        rows = conn.execute(select_rows, {'after': after, 'limit': BACKFILL_BATCH_SIZE}).all()
+        if not rows:
+            break
+        params = [
+            {'key': row[0], 'ingredient_ids': ids}
+            for row in rows
+            if (ids := normalize(row[1]))
+        ]
+        if params:
+            conn.execute(update_row, params)
+        after = rows[-1][0]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('material', sa.Column('ingredient_ids', postgresql.ARRAY(sa.Integer()), server_default='{}', nullable=False))
+    op.add_column('recipe', sa.Column('ingredient_ids', postgresql.ARRAY(sa.Integer()), server_default='{}', nullable=False))
+    op.create_index('ix_recipe_ingredient_ids', 'recipe', ['ingredient_ids'], unique=False, postgresql_using='gin')
+
+    # 기존 재료/레시피는 스냅샷 정규화기로 채움 (이후에는 생성/동기화 시 앱의 정규화기로 계산)
+    _backfill('material', 'id', 'name', _normalize)
+    _backfill('recipe', 'recipe_id', 'material_names', _normalize_all)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_recipe_ingredient_ids', table_name='recipe', postgresql_using='gin')
+    op.drop_column('recipe', 'ingredient_ids')
+    op.drop_column('material', 'ingredient_ids')
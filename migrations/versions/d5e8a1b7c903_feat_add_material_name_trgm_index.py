@@ -0,0 +1,38 @@
+"""feat: add material name trigram index
+
+Revision ID: d5e8a1b7c903
+Revises: c47d19e3a8f2
+Create Date: 2026-10-19 18:04:52.730145
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e8a1b7c903'
+down_revision: Union[str, Sequence[str], None] = 'c47d19e3a8f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 재료 이름 부분 일치/유사도 검색 (ILIKE '%x%', %, similarity)용 trigram GIN 인덱스
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_material_name_trgm',
+        'material',
+        ['name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # pg_trgm 확장은 다른 곳에서 쓸 수 있으므로 남겨 둠
+    op.drop_index('ix_material_name_trgm', table_name='material')
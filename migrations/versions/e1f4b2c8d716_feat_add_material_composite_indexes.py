@@ -0,0 +1,35 @@
+"""feat: add material composite indexes
+
+Revision ID: e1f4b2c8d716
+Revises: d5e8a1b7c903
+Create Date: 2026-10-19 18:47:13.509821
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1f4b2c8d716'
+down_revision: Union[str, Sequence[str], None] = 'd5e8a1b7c903'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_material_user_id_id', 'material', ['user_id', 'id'], unique=False)
+    op.create_index('ix_material_user_id_category_id', 'material', ['user_id', 'category', 'id'], unique=False)
+    op.create_index('ix_material_user_id_expired_at', 'material', ['user_id', 'expired_at'], unique=False)
+    # (user_id, id)의 앞부분과 같으므로 삭제 (INSERT마다 갱신할 인덱스 하나 감소)
+    op.drop_index(op.f('ix_material_user_id'), table_name='material')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_material_user_id'), 'material', ['user_id'], unique=False)
+    op.drop_index('ix_material_user_id_expired_at', table_name='material')
+    op.drop_index('ix_material_user_id_category_id', table_name='material')
+    op.drop_index('ix_material_user_id_id', table_name='material')
@@ -0,0 +1,44 @@
+"""feat: add material sort indexes
+
+Revision ID: f3a9c6d2e158
+Revises: e1f4b2c8d716
+Create Date: 2026-10-19 19:26:40.281934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9c6d2e158'
+down_revision: Union[str, Sequence[str], None] = 'e1f4b2c8d716'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 식은 app.models.materials의 MATERIAL_EXPIRY_SORT_KEY / MATERIAL_PURCHASE_SORT_KEY와 같아야 함
+    op.create_index(
+        'ix_material_user_id_expiry_sort',
+        'material',
+        [sa.text('user_id'), sa.text("coalesce(expired_at, 'infinity'::timestamptz)"), sa.text('id')],
+        unique=False,
+    )
+    op.create_index(
+        'ix_material_user_id_purchase_sort',
+        'material',
+        [sa.text('user_id'), sa.text("coalesce(purchased_at, '-infinity'::timestamptz)"), sa.text('id')],
+        unique=False,
+    )
+    # 추천 조회도 소비기한 정렬 인덱스를 사용
+    op.drop_index('ix_material_user_id_expired_at', table_name='material')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_material_user_id_expired_at', 'material', ['user_id', 'expired_at'], unique=False)
+    op.drop_index('ix_material_user_id_purchase_sort', table_name='material')
+    op.drop_index('ix_material_user_id_expiry_sort', table_name='material')
@@ -0,0 +1,95 @@
+"""
+재료 API 쿼리 실행 계획 검사 (합성 material 20만 행)
+
+엔드포인트/서비스가 실제로 실행하는 쿼리를 EXPLAIN 하여 material을 Seq Scan 하지 않는지 확인합니다.
+새 조회 경로를 추가하면 PLANNED_QUERIES에 함께 등록하세요.
+
+    PLAN_DATABASE_URL=postgresql+asyncpg://... uv run pytest tests/integration/test_material_query_plans.py -s
+"""
+import os
+from datetime import datetime, timedelta, timezone
+
+from app.services.expiry_notifications import build_expiry_scan_query
+from app.services.fridge_status import build_fridge_status_query
+from app.services.materials import build_material_list_query, build_material_search_query
+from app.services.recipe_recommendation_service import RecipeRecommendationService
+from app.utils.cursor import encode_cursor
+from tests.integration.query_plan import (
+    assert_no_seq_scan,
+    explain,
+    format_plan_line,
+    plan_connection,
+    requires_plan_database,
+    seed_materials,
+)
+
+PLAN_ROWS = int(os.environ.get("MATERIAL_PLAN_ROWS", 200_000))
+USER_ID = "bench-user-7"
+# 깊은 페이지 cursor의 정렬 키 (합성 데이터 날짜 범위 중간)
+DEEP_EXPIRY = (datetime.now(timezone.utc) + timedelta(days=7)).isoformat()
+DEEP_PURCHASE = (datetime.now(timezone.utc) - timedelta(days=15)).isoformat()
+
+# 이름 → (쿼리, 사용해야 하는 인덱스)
+PLANNED_QUERIES = {
+    "GET /materials": (
+        build_material_list_query(USER_ID),
+        "ix_material_user_id_id",
+    ),
+    "GET /materials?cursor": (
+        build_material_list_query(USER_ID, cursor="150000"),
+        "ix_material_user_id_id",
+    ),
+    "GET /materials?category": (
+        build_material_list_query(USER_ID, category="유제품"),
+        "ix_material_user_id_category_id",
+    ),
+    "GET /materials?sort=expired_at": (
+        build_material_list_query(USER_ID, sort="expired_at"),
+        "ix_material_user_id_expiry_sort",
+    ),
+    "GET /materials?sort=expired_at&cursor": (
+        build_material_list_query(
+            USER_ID, sort="expired_at", cursor=encode_cursor({"sort": "expired_at", "key": DEEP_EXPIRY, "id": 150000})
+        ),
+        "ix_material_user_id_expiry_sort",
+    ),
+    "GET /materials?sort=purchased_at&cursor": (
+        build_material_list_query(
+            USER_ID, sort="purchased_at", cursor=encode_cursor({"sort": "purchased_at", "key": DEEP_PURCHASE, "id": 150000})
+        ),
+        "ix_material_user_id_purchase_sort",
+    ),
+    "GET /materials?search": (
+        build_material_search_query(USER_ID, "바나나우유"),
+        None,
+    ),
+    "fridge_status refresh": (
+        build_fridge_status_query([USER_ID], datetime.now(timezone.utc)),
+        None,
+    ),
+    "recommender user materials": (
+        RecipeRecommendationService.user_materials_query(USER_ID),
+        "ix_material_user_id_expiry_sort",
+    ),
+    "expiry notification scan": (
+        build_expiry_scan_query(datetime.now(timezone.utc), datetime.now(timezone.utc) + timedelta(days=1)),
+        "ix_material_expired_at_id",
+    ),
+}
+
+
+@requires_plan_database
+async def test_material_queries_use_indexes():
+    async with plan_connection() as conn:
+        await seed_materials(conn, PLAN_ROWS)
+
+        plans = {name: await explain(conn, query, analyze=True) for name, (query, _) in PLANNED_QUERIES.items()}
+
+        print(f"\nmaterial rows: {PLAN_ROWS:,}")
+        for name, plan in plans.items():
+            print(format_plan_line(name, plan, "material"))
+
+        for name, (_, index) in PLANNED_QUERIES.items():
+            assert_no_seq_scan(plans[name], "material")
+            if index:
+                assert index in str(plans[name]), f"{name}: {index} not used"
@@ -0,0 +1,68 @@
+"""
+재료 이름 검색 실행 계획 벤치마크 (합성 material 100만 행)
+
+ix_material_name_trgm이 없을 때와 있을 때 EXPLAIN ANALYZE 결과를 비교합니다.
+    - 기존 검색 조건(name LIKE '%x%'): Seq Scan → Bitmap Index Scan ix_material_name_trgm
+    - 사용자 범위 유사도 검색(build_material_search_query): 인덱스 생성 후 Seq Scan 없음
+
+    PLAN_DATABASE_URL=postgresql+asyncpg://... uv run pytest tests/integration/test_material_search_plan.py -s
+"""
+import os
+
+from sqlalchemy import text
+from sqlmodel import select
+
+from app.models import Material
+from app.services.materials import build_material_search_query
+from tests.integration.query_plan import (
+    BENCH_USERS,
+    assert_no_seq_scan,
+    explain,
+    format_plan_line,
+    plan_connection,
+    requires_plan_database,
+    scans,
+    seed_materials,
+    used_indexes,
+)
+
+BENCH_ROWS = int(os.environ.get("MATERIAL_SEARCH_BENCH_ROWS", 1_000_000))
+SEARCH_TERM = "유기농바나나우유"
+SEARCH_USER = "bench-user-7"
+
+
+async def create_trigram_index(conn):
+    await conn.execute(text("CREATE INDEX ix_material_name_trgm ON material USING gin (name gin_trgm_ops)"))
+    await conn.execute(text("ANALYZE material"))
+    await conn.commit()
+
+
+def legacy_search_query():
+    """기존 get_materials의 이름 조건 (사용자 범위 없음, LIKE '%x%')"""
+    return select(Material.id).where(Material.name.contains(SEARCH_TERM))
+
+
+@requires_plan_database
+async def test_material_search_moves_from_seq_scan_to_trigram_index():
+    async with plan_connection() as conn:
+        await seed_materials(conn, BENCH_ROWS, without_indexes=("ix_material_name_trgm",))
+
+        search = build_material_search_query(SEARCH_USER, SEARCH_TERM)
+        before_legacy = await explain(conn, legacy_search_query(), analyze=True)
+        before_search = await explain(conn, search, analyze=True)
+
+        await create_trigram_index(conn)
+
+        after_legacy = await explain(conn, legacy_search_query(), analyze=True)
+        after_search = await explain(conn, search, analyze=True)
+
+        print(f"\nmaterial rows: {BENCH_ROWS:,}, users: {BENCH_USERS}")
+        print(format_plan_line("LIKE '%x%' (no index)", before_legacy, "material"))
+        print(format_plan_line("LIKE '%x%' (trgm index)", after_legacy, "material"))
+        print(format_plan_line("user search (no trgm index)", before_search, "material"))
+        print(format_plan_line("user search (trgm index)", after_search, "material"))
+
+        assert "Seq Scan" in scans(before_legacy, "material")
+        assert "Seq Scan" not in scans(after_legacy, "material")
+        assert "ix_material_name_trgm" in used_indexes(after_legacy)
+        assert_no_seq_scan(after_search, "material")
@@ -0,0 +1,269 @@
+"""
+영수증 OCR 파싱 회귀 측정용 corpus 하네스
+
+corpus 형식 (tests/fixtures/receipts/*.json, baseline.json 제외):
+    {
+        "description": "영수증 설명",
+        "expected": [{"name": "상품명", "price": 단가, "quantity": 수량}, ...],
+        "response": { OCR.space API 응답 원본 }
+    }
+
+긴 영수증은 기록된 영수증의 상품 행 구간(Top 범위)을 반복해 만듭니다 (response/expected 대신):
+    {"description": "...", "source": "mart_15_items.json", "repeat": 40, "item_band": [160, 612]}
+
+extract_items_from_ocr를 corpus 전체에 실행하여 name/price/quantity 별 precision/recall과
+영수증별 파싱 시간, 메모리 할당 peak를 측정합니다.
+
+파싱 시간은 실행 환경에 따라 크게 달라지므로 pytest에서는 RECEIPT_CORPUS_CHECK_TIME=1일 때만 비교합니다
+(정확도와 할당 peak는 항상 비교, 아래 명령은 시간까지 비교).
+
+기준값 갱신 (파서 개선 후):
+    python -m tests.unit.receipt_corpus --update-baseline
+"""
+import copy
+import json
+import re
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from app.services.materials import extract_items_from_ocr
+
+CORPUS_DIR = Path(__file__).resolve().parent.parent / "fixtures" / "receipts"
+BASELINE_PATH = CORPUS_DIR / "baseline.json"
+
+FIELDS = ("name", "price", "quantity")
+
+# 시간은 실행 환경 편차가 커서 여유를 크게 두고, 할당량은 거의 결정적이라 작게 둠
+TIME_TOLERANCE = 3.0
+TIME_FLOOR_MS = 5.0
+ALLOCATION_TOLERANCE = 1.25
+
+
+def _read_json(path: Path) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def repeat_receipt(receipt: dict, repeat: int, item_band: List[float]) -> dict:
+    """
+    상품 행 구간(item_band: [시작 Top, 끝 Top))을 repeat번 이어 붙인 긴 영수증
+    구간 아래(합계 등)는 늘어난 만큼 아래로 이동하고, 예상 항목도 repeat배가 됩니다.
+    """
+    start, end = item_band
+    band_height = end - start
+    parsed = copy.deepcopy(receipt["response"]["ParsedResults"][0])
+    overlay_key = "TextOverlay" if "TextOverlay" in parsed else "Overlay"
+
+    long_lines = []
+    for line in parsed[overlay_key]["Lines"]:
+        tops = [w["Top"] for w in line["Words"]]
+        if not all(start <= top < end for top in tops):
+            if min(tops) >= end:
+                for word in line["Words"]:
+                    word["Top"] += (repeat - 1) * band_height
+            long_lines.append(line)
+            continue
+        for i in range(repeat):
+            shifted = copy.deepcopy(line)
+            for word in shifted["Words"]:
+                word["Top"] += i * band_height
+            long_lines.append(shifted)
+    parsed[overlay_key]["Lines"] = long_lines
+
+    return {
+        "expected": receipt["expected"] * repeat,
+        "response": {**receipt["response"], "ParsedResults": [parsed]},
+    }
+
+
+def load_corpus(corpus_dir: Path = CORPUS_DIR) -> Dict[str, dict]:
+    """corpus 디렉토리의 영수증들을 {파일 이름: 영수증} 으로 로드"""
+    corpus = {}
+    for path in sorted(corpus_dir.glob("*.json")):
+        if path.name == BASELINE_PATH.name:
+            continue
+        receipt = _read_json(path)
+        if "source" in receipt:
+            source = _read_json(corpus_dir / receipt["source"])
+            long_receipt = repeat_receipt(source, receipt["repeat"], receipt["item_band"])
+            receipt = {"description": receipt["description"], **long_receipt}
+        corpus[path.stem] = receipt
+    return corpus
+
+
+def normalize_name(name: str) -> str:
+    """공백/기호를 제거한 상품명 (OCR이 띄어쓰기, 괄호를 다르게 읽는 경우 대비)"""
+    return re.sub(r"[^0-9a-zA-Z가-힣]", "", name).lower()
+
+
+def names_match(expected: str, predicted: str) -> bool:
+    expected, predicted = normalize_name(expected), normalize_name(predicted)
+    return bool(expected) and bool(predicted) and (expected in predicted or predicted in expected)
+
+
+def match_items(expected: List[dict], predicted: List[dict]) -> List[tuple]:
+    """상품명으로 예상 항목과 추출 항목을 1:1 매칭 (영수증 순서대로 greedy)"""
+    pairs = []
+    used = set()
+    for exp in expected:
+        for idx, pred in enumerate(predicted):
+            if idx not in used and names_match(exp["name"], pred["name"]):
+                used.add(idx)
+                pairs.append((exp, pred))
+                break
+    return pairs
+
+
+def score_receipt(expected: List[dict], predicted: List[dict]) -> Dict[str, Dict[str, int]]:
+    """
+    필드별 정답 개수 집계
+    name은 매칭된 항목 수, price/quantity는 매칭된 항목 중 값까지 일치한 수
+
+    Returns:
+        {field: {"correct": n, "expected": n, "predicted": n}}
+    """
+    pairs = match_items(expected, predicted)
+    counts = {}
+    for field in FIELDS:
+        if field == "name":
+            correct = len(pairs)
+        else:
+            correct = sum(1 for exp, pred in pairs if exp[field] == pred[field])
+        counts[field] = {"correct": correct, "expected": len(expected), "predicted": len(predicted)}
+    return counts
+
+
+def precision_recall(counts: Dict[str, int]) -> Dict[str, float]:
+    precision = counts["correct"] / counts["predicted"] if counts["predicted"] else 0.0
+    recall = counts["correct"] / counts["expected"] if counts["expected"] else 0.0
+    return {"precision": round(precision, 4), "recall": round(recall, 4)}
+
+
+def measure_parse(response: dict, parse: Callable, repeat: int = 5) -> Dict[str, float]:
+    """파싱 시간(가장 빠른 실행, ms)과 tracemalloc 할당 peak(KiB) 측정"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse(response)
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        parse(response)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"parse_ms": round(best * 1000, 3), "peak_kib": round(peak / 1024, 1)}
+
+
+def run_corpus(corpus: Dict[str, dict] = None, parse: Callable = extract_items_from_ocr) -> dict:
+    """
+    corpus 전체 실행 결과
+
+    Returns:
+        {
+            "accuracy": {field: {"precision": p, "recall": r}},
+            "receipts": {이름: {"parse_ms", "peak_kib", "accuracy"}}
+        }
+    """
+    corpus = load_corpus() if corpus is None else corpus
+    totals = {field: {"correct": 0, "expected": 0, "predicted": 0} for field in FIELDS}
+    receipts = {}
+
+    for name, receipt in corpus.items():
+        predicted = parse(receipt["response"])
+        if isinstance(predicted, str):
+            # 오류 메시지는 추출 항목 0개로 취급
+            predicted = []
+
+        counts = score_receipt(receipt["expected"], predicted)
+        for field in FIELDS:
+            for key in totals[field]:
+                totals[field][key] += counts[field][key]
+
+        receipts[name] = {
+            **measure_parse(receipt["response"], parse),
+            "accuracy": {field: precision_recall(counts[field]) for field in FIELDS},
+        }
+
+    return {
+        "accuracy": {field: precision_recall(totals[field]) for field in FIELDS},
+        "receipts": receipts,
+    }
+
+
+def find_regressions(report: dict, baseline: dict, check_time: bool = True) -> List[str]:
+    """
+    baseline 대비 정확도 하락, 시간/할당 증가 항목 목록 (비어 있으면 통과)
+    check_time이 False면 파싱 시간은 비교하지 않음
+    """
+    regressions = []
+
+    for field, scores in baseline["accuracy"].items():
+        for metric, expected in scores.items():
+            actual = report["accuracy"].get(field, {}).get(metric, 0.0)
+            if actual < expected:
+                regressions.append(f"{field} {metric}: {actual} < baseline {expected}")
+
+    for name, expected in baseline["receipts"].items():
+        actual = report["receipts"].get(name)
+        if actual is None:
+            regressions.append(f"{name}: missing from corpus")
+            continue
+
+        max_ms = max(expected["parse_ms"] * TIME_TOLERANCE, TIME_FLOOR_MS)
+        if check_time and actual["parse_ms"] > max_ms:
+            regressions.append(f"{name} parse time: {actual['parse_ms']}ms > {max_ms:.3f}ms")
+
+        max_kib = expected["peak_kib"] * ALLOCATION_TOLERANCE
+        if actual["peak_kib"] > max_kib:
+            regressions.append(f"{name} peak allocation: {actual['peak_kib']}KiB > {max_kib:.1f}KiB")
+
+    return regressions
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_baseline(report: dict, path: Path = BASELINE_PATH):
+    baseline = {
+        "accuracy": report["accuracy"],
+        "receipts": {
+            name: {"parse_ms": result["parse_ms"], "peak_kib": result["peak_kib"]}
+            for name, result in report["receipts"].items()
+        },
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def format_report(report: dict) -> str:
+    lines = ["field      precision  recall"]
+    for field, scores in report["accuracy"].items():
+        lines.append(f"{field:<10} {scores['precision']:>9.4f}  {scores['recall']:>6.4f}")
+    lines.append("")
+    lines.append("receipt                    parse_ms  peak_kib")
+    for name, result in report["receipts"].items():
+        lines.append(f"{name:<26} {result['parse_ms']:>8.3f}  {result['peak_kib']:>8.1f}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    report = run_corpus()
+    print(format_report(report))
+
+    if "--update-baseline" in sys.argv:
+        write_baseline(report)
+        print(f"\nBaseline written to {BASELINE_PATH}")
+    elif BASELINE_PATH.exists():
+        regressions = find_regressions(report, load_baseline())
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        sys.exit(1 if regressions else 0)
@@ -272,3 +272,27 @@ async def test_bedrock_client_caching(service):
         assert client1 is client2
         # boto3.client는 한 번만 호출
         mock_boto3.assert_called_once()
+
+
+@pytest.mark.parametrize("name, category, expected", [
+    ("노브랜드 굿밀크우", "기타", ("dairy_processed", 0.75)),
+    ("순창 고추장 500g", "기타", ("seasoning", 0.75)),
+    ("국산 돼지고기 앞다리", "기타", ("meat", 0.75)),
+    ("청양고추", "기타", ("vegetable", 0.75)),
+    ("고등어 2손", "해산물", ("seafood", 0.75)),
+    ("알 수 없는 상품", "과일", ("fruit", 0.5)),
+    ("대여용부직포쇼핑백", "기타", None),
+])
+def test_match_expiry_rule_korean_aliases(name, category, expected):
+    from app.services.expiry_estimation_service import match_expiry_rule
+
+    assert match_expiry_rule(name, category) == expected
+
+
+def test_estimate_expired_at_returns_none_for_unknown_items():
+    from app.services.expiry_estimation_service import estimate_expired_at
+
+    purchased_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    assert estimate_expired_at("두부", "기타", purchased_at) == purchased_at + timedelta(days=18)
+    assert estimate_expired_at("쇼핑백", "기타", purchased_at) is None
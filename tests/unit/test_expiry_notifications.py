@@ -0,0 +1,149 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.expiry_notifications import (
+    ExpiryDigest,
+    ExpiryNotificationScanner,
+    JsonlFileSink,
+    QueueSink,
+    SqsSink,
+    build_expiry_scan_query,
+)
+
+NOW = datetime(2026, 3, 1, 0, 0, tzinfo=timezone.utc)
+
+
+def compile_sql(query) -> str:
+    return str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_expiry_scan_query_is_keyset_range():
+    sql = compile_sql(build_expiry_scan_query(NOW, NOW + timedelta(days=4), limit=500))
+
+    assert "material.expired_at >= '2026-03-01 00:00:00+00:00'" in sql
+    assert "material.expired_at < '2026-03-05 00:00:00+00:00'" in sql
+    assert "ORDER BY material.expired_at, material.id" in sql
+    assert "LIMIT 500" in sql
+
+    sql = compile_sql(build_expiry_scan_query(NOW, NOW + timedelta(days=4), after=(NOW + timedelta(days=1), 42)))
+    assert "(material.expired_at, material.id) > ('2026-03-02 00:00:00+00:00', 42)" in sql
+
+
+def material_row(id, user_id, expires_in):
+    return SimpleNamespace(id=id, user_id=user_id, name=f"재료{id}", expired_at=NOW + expires_in)
+
+
+def make_session_factory(batches):
+    session = AsyncMock()
+
+    def execute(statement):
+        result = MagicMock()
+        result.all.return_value = batches.pop(0)
+        return result
+
+    session.execute.side_effect = execute
+
+    @asynccontextmanager
+    async def factory():
+        yield session
+
+    return factory, session
+
+
+@pytest.mark.asyncio
+async def test_scan_batches_by_keyset_and_groups_per_user():
+    factory, session = make_session_factory([
+        [material_row(1, "user-1", timedelta(hours=5)), material_row(2, "user-2", timedelta(days=1))],
+        [material_row(3, "user-1", timedelta(days=2, hours=1))],
+    ])
+    sink = QueueSink()
+    scanner = ExpiryNotificationScanner(sink, batch_size=2, clock=lambda: NOW)
+
+    stats = await scanner.scan(factory)
+
+    assert stats == {"scanned": 3, "batches": 2, "users": 2}
+    second_query = compile_sql(session.execute.await_args_list[1][0][0])
+    assert "(material.expired_at, material.id) > ('2026-03-02 00:00:00+00:00', 2)" in second_query
+
+    digests = [sink.queue.get_nowait() for _ in range(sink.queue.qsize())]
+    by_user = {d.user_id: d for d in digests}
+    assert [item.material_id for item in by_user["user-1"].items] == [1, 3]
+    assert [item.days_left for item in by_user["user-1"].items] == [0, 2]
+    assert by_user["user-2"].generated_at == NOW.isoformat()
+
+
+@pytest.mark.asyncio
+async def test_scan_sends_digests_in_chunks():
+    factory, _ = make_session_factory([
+        [material_row(i, f"user-{i}", timedelta(days=1)) for i in range(5)],
+    ])
+    sink = AsyncMock()
+
+    stats = await ExpiryNotificationScanner(sink, send_batch_size=2, clock=lambda: NOW).scan(factory)
+
+    assert stats["users"] == 5
+    assert [len(c[0][0]) for c in sink.send.await_args_list] == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_scan_without_expiring_materials_sends_nothing():
+    factory, _ = make_session_factory([[]])
+    sink = AsyncMock()
+
+    stats = await ExpiryNotificationScanner(sink, clock=lambda: NOW).scan(factory)
+
+    assert stats == {"scanned": 0, "batches": 1, "users": 0}
+    sink.send.assert_not_awaited()
+
+
+def digest(user_id):
+    return ExpiryDigest(user_id=user_id, generated_at=NOW.isoformat())
+
+
+@pytest.mark.asyncio
+async def test_jsonl_file_sink_appends_lines(tmp_path):
+    sink = JsonlFileSink(tmp_path / "out" / "digests.jsonl")
+
+    await sink.send([digest("user-1")])
+    await sink.send([digest("user-2")])
+
+    lines = (tmp_path / "out" / "digests.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["user_id"] for line in lines] == ["user-1", "user-2"]
+
+
+@pytest.mark.asyncio
+async def test_queue_sink_uses_given_queue():
+    queue = asyncio.Queue()
+
+    await QueueSink(queue).send([digest("user-1")])
+
+    assert queue.get_nowait().user_id == "user-1"
+
+
+@pytest.mark.asyncio
+async def test_sqs_sink_sends_batches_of_ten():
+    client = MagicMock()
+    client.send_message_batch.return_value = {"Successful": []}
+
+    await SqsSink("https://sqs.example/queue", client=client).send([digest(f"user-{i}") for i in range(23)])
+
+    calls = client.send_message_batch.call_args_list
+    assert [len(c.kwargs["Entries"]) for c in calls] == [10, 10, 3]
+    assert calls[0].kwargs["QueueUrl"] == "https://sqs.example/queue"
+    assert json.loads(calls[2].kwargs["Entries"][0]["MessageBody"])["user_id"] == "user-20"
+
+
+@pytest.mark.asyncio
+async def test_sqs_sink_raises_on_failed_entries():
+    client = MagicMock()
+    client.send_message_batch.return_value = {"Failed": [{"Id": "0", "Message": "throttled"}]}
+
+    with pytest.raises(RuntimeError, match="throttled"):
+        await SqsSink("https://sqs.example/queue", client=client).send([digest("user-1")])
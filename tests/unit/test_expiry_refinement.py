@@ -0,0 +1,184 @@
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.sql.dml import Update
+from app.models import Material
+from app.models.recipes import ExpiryEstimationResponse
+from app.services.expiry_refinement import ExpiryRefinementQueue, _same_instant
+
+PURCHASED_AT = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def make_material(id, name, expired_at):
+    return Material(
+        id=id, name=name, price=1000, category="기타", purchased_at=PURCHASED_AT,
+        expired_at=expired_at, quantity=1, user_id="user-1",
+    )
+
+
+def make_queue(materials, estimator, **kwargs):
+    """materials를 DB 행처럼 다루는 session (조건부 UPDATE는 expired_at이 같을 때만 반영)"""
+    session = AsyncMock()
+    session.add = MagicMock()
+    session.open = False
+    rows = {material.id: material for material in materials}
+
+    async def execute(statement):
+        result = MagicMock()
+        if isinstance(statement, Update):
+            params = statement.compile().params
+            row = rows.get(params["id_1"])
+            matched = row is not None and _same_instant(row.expired_at, params.get("expired_at_1"))
+            if matched:
+                row.expired_at = params["expired_at"]
+            result.rowcount = 1 if matched else 0
+        else:
+            result.scalars.return_value.all.return_value = list(rows.values())
+        return result
+
+    session.execute.side_effect = execute
+
+    @asynccontextmanager
+    async def factory():
+        session.open = True
+        try:
+            yield session
+        finally:
+            session.open = False
+
+    return ExpiryRefinementQueue(session_factory=factory, estimator=estimator, **kwargs), session
+
+
+@pytest.fixture(autouse=True)
+def enabled():
+    with patch("app.services.expiry_refinement.settings") as mock_settings:
+        mock_settings.EXPIRY_AI_REFINEMENT_ENABLED = True
+        yield mock_settings
+
+
+@pytest.fixture(autouse=True)
+def fridge_status():
+    with patch("app.services.expiry_refinement.fridge_status_service") as mock_service:
+        mock_service.refresh = AsyncMock()
+        yield mock_service
+
+
+def ai_estimator(days=5):
+    estimator = MagicMock()
+    estimator.estimate_expiry_with_bedrock.side_effect = lambda request: ExpiryEstimationResponse(
+        estimated_expiration_date=request.purchased_at + timedelta(days=days), confidence=0.9, notes="AI"
+    )
+    return estimator
+
+
+@pytest.mark.asyncio
+async def test_run_batch_updates_rule_estimates(fridge_status):
+    rule_estimate = PURCHASED_AT + timedelta(days=18)
+    milk = make_material(1, "우유", rule_estimate)
+    unknown = make_material(2, "쇼핑백", None)
+    queue, session = make_queue([milk, unknown], ai_estimator(days=7))
+
+    queue.enqueue([milk, unknown])
+    stats = await queue.run_batch()
+
+    assert stats == {"updated": 2, "skipped": 0, "failed": 0}
+    assert milk.expired_at == PURCHASED_AT + timedelta(days=7)
+    assert unknown.expired_at == PURCHASED_AT + timedelta(days=7)
+    fridge_status.refresh.assert_awaited_once_with(session, {"user-1"})
+    session.commit.assert_awaited_once()
+    assert queue.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_run_batch_keeps_user_edited_expiry():
+    material = make_material(1, "우유", PURCHASED_AT + timedelta(days=18))
+    estimator = ai_estimator()
+    queue, session = make_queue([material], estimator)
+
+    queue.enqueue([SimpleNamespace(id=1, expired_at=PURCHASED_AT + timedelta(days=3))])
+    stats = await queue.run_batch()
+
+    assert stats["skipped"] == 1
+    assert material.expired_at == PURCHASED_AT + timedelta(days=18)
+    estimator.estimate_expiry_with_bedrock.assert_not_called()
+    session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_run_batch_counts_bedrock_failures():
+    material = make_material(1, "우유", None)
+    estimator = MagicMock()
+    estimator.estimate_expiry_with_bedrock.side_effect = RuntimeError("throttled")
+    queue, _ = make_queue([material], estimator)
+
+    queue.enqueue([material])
+    stats = await queue.run_batch()
+
+    assert stats["failed"] == 1
+    assert material.expired_at is None
+
+
+@pytest.mark.asyncio
+async def test_run_batch_processes_batch_size_at_a_time():
+    materials = [make_material(i, "우유", None) for i in range(1, 6)]
+    queue, _ = make_queue(materials[:2], ai_estimator(), batch_size=2)
+
+    queue.enqueue(materials)
+    await queue.run_batch()
+
+    assert queue.pending == 3
+
+
+@pytest.mark.asyncio
+async def test_run_batch_calls_bedrock_outside_session():
+    material = make_material(1, "우유", None)
+    session_open_during_estimate = []
+    queue, session = make_queue([material], MagicMock())
+
+    def estimate(request):
+        session_open_during_estimate.append(session.open)
+        return ExpiryEstimationResponse(
+            estimated_expiration_date=PURCHASED_AT + timedelta(days=7), confidence=0.9, notes="AI"
+        )
+
+    queue.estimator.estimate_expiry_with_bedrock.side_effect = estimate
+    queue.enqueue([material])
+    await queue.run_batch()
+
+    assert session_open_during_estimate == [False]
+
+
+@pytest.mark.asyncio
+async def test_run_batch_does_not_overwrite_expiry_edited_during_estimation(fridge_status):
+    rule_estimate = PURCHASED_AT + timedelta(days=18)
+    user_edit = PURCHASED_AT + timedelta(days=2)
+    material = make_material(1, "우유", rule_estimate)
+    queue, session = make_queue([material], MagicMock())
+
+    def estimate(request):
+        # Bedrock 응답을 기다리는 동안 사용자가 소비기한을 수정
+        material.expired_at = user_edit
+        return ExpiryEstimationResponse(
+            estimated_expiration_date=PURCHASED_AT + timedelta(days=7), confidence=0.9, notes="AI"
+        )
+
+    queue.estimator.estimate_expiry_with_bedrock.side_effect = estimate
+    queue.enqueue([make_material(1, "우유", rule_estimate)])
+    stats = await queue.run_batch()
+
+    assert stats == {"updated": 0, "skipped": 1, "failed": 0}
+    assert material.expired_at == user_edit
+    fridge_status.refresh.assert_not_awaited()
+    session.commit.assert_not_awaited()
+
+
+def test_enqueue_is_noop_when_disabled(enabled):
+    enabled.EXPIRY_AI_REFINEMENT_ENABLED = False
+    queue = ExpiryRefinementQueue()
+
+    queue.enqueue([make_material(1, "우유", None)])
+
+    assert queue.pending == 0
@@ -0,0 +1,208 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql.dml import Insert
+
+from app.models import FridgeStatus
+from app.models.recipes import Priority
+from app.services.fridge_status import (
+    FRIDGE_STATUS_LOCK,
+    FridgeStatusService,
+    build_fridge_status_query,
+    material_priority,
+)
+
+NOW = datetime(2026, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("expires_in, expected", [
+    (timedelta(days=-2), Priority.HIGH),
+    (timedelta(days=3, hours=23), Priority.HIGH),
+    (timedelta(days=4), Priority.MEDIUM),
+    (timedelta(days=7, hours=23), Priority.MEDIUM),
+    (timedelta(days=8), Priority.NORMAL),
+])
+def test_material_priority_matches_day_buckets(expires_in, expected):
+    assert material_priority(NOW + expires_in, NOW) == expected
+
+
+def test_material_priority_without_expiry_or_timezone():
+    assert material_priority(None, NOW) == Priority.NORMAL
+    # timezone 없는 값은 UTC로 간주
+    assert material_priority((NOW + timedelta(days=1)).replace(tzinfo=None), NOW) == Priority.HIGH
+
+
+def test_fridge_status_query_counts_buckets_per_user():
+    sql = str(build_fridge_status_query(["user-1"], NOW).compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    ))
+
+    assert "count(*) FILTER (WHERE material.expired_at < '2026-03-05 12:00:00+00:00') AS high_count" in sql
+    assert "least(" in sql and "AS next_change_at" in sql
+    assert "WHERE material.user_id IN ('user-1') GROUP BY material.user_id" in sql
+
+
+def make_service(session, now=NOW, **kwargs):
+    @asynccontextmanager
+    async def factory():
+        yield session
+
+    return FridgeStatusService(session_factory=factory, clock=lambda: now, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_refresh_upserts_counts_and_zero_rows():
+    session = AsyncMock()
+    counts = MagicMock()
+    counts.all.return_value = [SimpleNamespace(
+        user_id="user-1", high_count=2, medium_count=1, total_count=5, next_change_at=NOW + timedelta(days=1),
+    )]
+    session.execute.side_effect = [MagicMock(), counts, MagicMock()]
+
+    rows = await make_service(session).refresh(session, ["user-2", "user-1", "user-1"])
+
+    # 집계 전에 사용자별 lock을 user_id 순서로 잡음
+    assert session.execute.await_args_list[0][0] == (FRIDGE_STATUS_LOCK, {"user_ids": ["user-1", "user-2"]})
+
+    assert rows["user-1"]["normal_count"] == 2
+    assert rows["user-2"] == {
+        "user_id": "user-2", "high_count": 0, "medium_count": 0, "normal_count": 0,
+        "total_count": 0, "next_change_at": None, "refreshed_at": NOW,
+    }
+    upsert = session.execute.await_args_list[2][0][0]
+    sql = str(upsert.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("INSERT INTO fridge_status")
+    assert "ON CONFLICT (user_id) DO UPDATE" in sql
+    session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_refresh_skips_empty_user_list():
+    session = AsyncMock()
+
+    assert await make_service(session).refresh(session, []) == {}
+    session.execute.assert_not_awaited()
+
+
+class FakeDatabase:
+    """READ COMMITTED 트랜잭션과 advisory lock을 흉내 내는 DB (user-1의 재료 수만 다룸)"""
+
+    def __init__(self):
+        self.material_count = 0
+        self.total_count = None
+        self.locks = {}
+
+    def begin(self):
+        return FakeTransaction(self)
+
+
+class FakeTransaction:
+    def __init__(self, db):
+        self.db = db
+        self.added = 0
+        self.total_count = None
+        self.held = []
+
+    async def execute(self, statement, params=None):
+        if statement is FRIDGE_STATUS_LOCK:
+            for user_id in params["user_ids"]:
+                lock = self.db.locks.setdefault(user_id, asyncio.Lock())
+                await lock.acquire()
+                self.held.append(lock)
+            return MagicMock()
+        if isinstance(statement, Insert):
+            self.total_count = statement.compile().params["total_count_m0"]
+            return MagicMock()
+
+        # 집계는 commit된 재료와 이 트랜잭션이 추가한 재료만 봄
+        result = MagicMock()
+        result.all.return_value = [SimpleNamespace(
+            user_id="user-1", high_count=0, medium_count=0,
+            total_count=self.db.material_count + self.added, next_change_at=None,
+        )]
+        # 집계 직후 다른 트랜잭션이 실행되도록 양보
+        await asyncio.sleep(0)
+        return result
+
+    async def commit(self):
+        self.db.material_count += self.added
+        if self.total_count is not None:
+            self.db.total_count = self.total_count
+        for lock in self.held:
+            lock.release()
+
+
+@pytest.mark.asyncio
+async def test_interleaved_refreshes_for_same_user_converge():
+    db = FakeDatabase()
+    service = FridgeStatusService(clock=lambda: NOW)
+
+    async def add_material():
+        transaction = db.begin()
+        transaction.added += 1
+        await service.refresh(transaction, ["user-1"])
+        await asyncio.sleep(0)
+        await transaction.commit()
+
+    await asyncio.gather(add_material(), add_material())
+
+    assert db.material_count == 2
+    assert db.total_count == 2
+
+
+def fridge_status(next_change_at):
+    return FridgeStatus(
+        user_id="user-1", high_count=1, medium_count=2, normal_count=3, total_count=6,
+        next_change_at=next_change_at, refreshed_at=NOW - timedelta(hours=1),
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_summary_reads_fresh_projection_without_aggregating():
+    session = AsyncMock()
+    session.get.return_value = fridge_status(NOW + timedelta(hours=3))
+
+    summary = await make_service(session).get_summary(session, "user-1")
+
+    assert (summary.high, summary.medium, summary.normal, summary.total) == (1, 2, 3, 6)
+    session.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_summary_refreshes_stale_projection():
+    session = AsyncMock()
+    session.get.return_value = fridge_status(NOW - timedelta(minutes=1))
+    service = make_service(session)
+    service.refresh = AsyncMock(return_value={"user-1": {
+        "high_count": 2, "medium_count": 1, "normal_count": 3, "total_count": 6, "refreshed_at": NOW,
+    }})
+
+    summary = await service.get_summary(session, "user-1")
+
+    assert (summary.high, summary.medium, summary.refreshed_at) == (2, 1, NOW)
+    service.refresh.assert_awaited_once_with(session, ["user-1"])
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_refresh_stale_processes_users_in_batches():
+    session = AsyncMock()
+    batches = [["a", "b"], ["c"]]
+
+    def stale_users(statement):
+        result = MagicMock()
+        result.scalars.return_value.all.return_value = batches.pop(0)
+        return result
+
+    session.execute.side_effect = stale_users
+    service = make_service(session, batch_size=2)
+    service.refresh = AsyncMock()
+
+    assert await service.refresh_stale() == 3
+    assert [c[0][1] for c in service.refresh.await_args_list] == [["a", "b"], ["c"]]
+    assert session.commit.await_count == 2
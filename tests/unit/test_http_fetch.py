@@ -0,0 +1,160 @@
+import httpx
+import pytest
+from unittest.mock import AsyncMock
+from app.utils.http_fetch import (
+    CircuitBreaker,
+    CircuitOpenError,
+    HostGuardedFetcher,
+    TokenBucket,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def sleep(clock):
+    """실제로 기다리지 않고 시계만 앞으로 이동"""
+    async def fake_sleep(seconds):
+        fake_sleep.calls.append(seconds)
+        clock.now += seconds
+
+    fake_sleep.calls = []
+    return fake_sleep
+
+
+def make_fetcher(clock, sleep, **kwargs):
+    options = dict(rate_per_host=100, burst=100, max_attempts=3, failure_threshold=3, reset_timeout=30)
+    options.update(kwargs)
+    return HostGuardedFetcher(clock=clock, sleep=sleep, **options)
+
+
+def http_error(status_code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "http://img.example.com/a.jpg")
+    return httpx.HTTPStatusError(
+        "error", request=request, response=httpx.Response(status_code, request=request)
+    )
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_rate(clock, sleep):
+    """burst를 넘으면 rate에 맞춰 대기"""
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock, sleep=sleep)
+
+    for _ in range(4):
+        await bucket.acquire()
+
+    # 처음 2개는 즉시, 나머지 2개는 0.5초씩 대기
+    assert sum(sleep.calls) == pytest.approx(1.0)
+
+
+def test_circuit_breaker_opens_and_half_opens(clock):
+    """연속 실패 시 열리고 reset_timeout 후 시험 요청 1개만 허용"""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("img.example.com")
+
+    clock.now = 10
+    breaker.before_request("img.example.com")  # half-open 시험 요청
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("img.example.com")
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_fetcher_retries_transient_errors(clock, sleep):
+    """timeout/5xx는 jitter backoff 후 재시도"""
+    fetcher = make_fetcher(clock, sleep)
+    operation = AsyncMock(side_effect=[httpx.ReadTimeout("timeout"), http_error(503), "ok"])
+
+    result = await fetcher.call("http://img.example.com/a.jpg", operation)
+
+    assert result == "ok"
+    assert operation.await_count == 3
+    assert len(sleep.calls) == 2
+    assert all(0 <= delay <= 8.0 for delay in sleep.calls)
+    assert fetcher.breaker("img.example.com").failures == 0
+
+
+@pytest.mark.asyncio
+async def test_fetcher_does_not_retry_not_found(clock, sleep):
+    """404는 재시도하지 않고 circuit에도 반영하지 않음"""
+    fetcher = make_fetcher(clock, sleep)
+    operation = AsyncMock(side_effect=http_error(404))
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await fetcher.call("http://img.example.com/a.jpg", operation)
+
+    assert operation.await_count == 1
+    assert fetcher.breaker("img.example.com").state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_fetcher_fails_fast_when_circuit_open(clock, sleep):
+    """한 호스트가 계속 실패하면 이후 요청은 보내지 않고 즉시 실패 (다른 호스트는 영향 없음)"""
+    fetcher = make_fetcher(clock, sleep)
+    failing = AsyncMock(side_effect=httpx.ConnectTimeout("timeout"))
+
+    with pytest.raises(httpx.ConnectTimeout):
+        await fetcher.call("http://bad.example.com/1.jpg", failing)
+    assert failing.await_count == 3
+
+    with pytest.raises(CircuitOpenError):
+        await fetcher.call("http://bad.example.com/2.jpg", failing)
+    assert failing.await_count == 3
+
+    healthy = AsyncMock(return_value="ok")
+    assert await fetcher.call("http://good.example.com/1.jpg", healthy) == "ok"
+
+
+async def open_circuit(fetcher, clock, host="bad.example.com"):
+    """연속 실패로 circuit을 열고 reset_timeout이 지나 half-open 상태로 만듦"""
+    with pytest.raises(httpx.ConnectTimeout):
+        await fetcher.call(f"http://{host}/1.jpg", AsyncMock(side_effect=httpx.ConnectTimeout("timeout")))
+    clock.now += fetcher.reset_timeout
+    assert fetcher.breaker(host).state == "half_open"
+
+
+@pytest.mark.asyncio
+async def test_fetcher_non_http_error_not_recorded(clock, sleep):
+    """HTTP 응답이 아닌 오류(S3 업로드 실패 등)는 half-open 시험 요청이어도 circuit을 닫지 않음"""
+    fetcher = make_fetcher(clock, sleep)
+    await open_circuit(fetcher, clock)
+
+    with pytest.raises(RuntimeError):
+        await fetcher.call("http://bad.example.com/2.jpg", AsyncMock(side_effect=RuntimeError("S3 put failed")))
+
+    breaker = fetcher.breaker("bad.example.com")
+    assert breaker.state == "half_open"
+    # 시험 요청 자리는 반납되어 다음 요청이 다시 시험 요청이 됨
+    assert await fetcher.call("http://bad.example.com/3.jpg", AsyncMock(return_value="ok")) == "ok"
+    assert breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_fetcher_cancelled_probe_releases_half_open(clock, sleep):
+    """half-open 시험 요청이 취소되어도 circuit이 계속 막히지 않음"""
+    import asyncio
+
+    fetcher = make_fetcher(clock, sleep)
+    await open_circuit(fetcher, clock)
+
+    with pytest.raises(asyncio.CancelledError):
+        await fetcher.call("http://bad.example.com/2.jpg", AsyncMock(side_effect=asyncio.CancelledError()))
+
+    assert await fetcher.call("http://bad.example.com/3.jpg", AsyncMock(return_value="ok")) == "ok"
@@ -0,0 +1,57 @@
+import io
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from PIL import Image
+from app.utils.image_variants import ThumbnailRenderer, render_variants
+
+
+def make_image(width: int, height: int, format: str = "JPEG", mode: str = "RGB") -> bytes:
+    buffer = io.BytesIO()
+    Image.new(mode, (width, height), color=0).save(buffer, format=format)
+    return buffer.getvalue()
+
+
+def image_size(data: bytes):
+    with Image.open(io.BytesIO(data)) as image:
+        return image.format, image.size
+
+
+def test_render_variants_widths():
+    """160/320/640px WebP 변형 생성 (비율 유지)"""
+    variants = render_variants(make_image(1280, 960))
+
+    assert list(variants) == [160, 320, 640]
+    assert image_size(variants[160]) == ("WEBP", (160, 120))
+    assert image_size(variants[640]) == ("WEBP", (640, 480))
+
+
+def test_render_variants_does_not_upscale():
+    """원본보다 큰 너비로 확대하지 않음"""
+    variants = render_variants(make_image(200, 100))
+
+    assert image_size(variants[160])[1] == (160, 80)
+    assert image_size(variants[640])[1] == (200, 100)
+
+
+def test_render_variants_palette_gif():
+    """GIF(팔레트 모드)도 WebP로 변환"""
+    variants = render_variants(make_image(400, 400, format="GIF", mode="P"), widths=(160,))
+
+    assert image_size(variants[160]) == ("WEBP", (160, 160))
+
+
+@pytest.mark.asyncio
+async def test_renderer_falls_back_to_threads():
+    """프로세스 풀을 만들 수 없는 환경(Lambda)에서는 스레드 풀 사용"""
+    renderer = ThumbnailRenderer(widths=(160,))
+
+    with patch(
+        "concurrent.futures.ProcessPoolExecutor",
+        side_effect=OSError(38, "Function not implemented"),
+    ):
+        variants = await renderer.render(make_image(320, 320))
+
+    assert isinstance(renderer.executor, ThreadPoolExecutor)
+    assert image_size(variants[160]) == ("WEBP", (160, 160))
+    renderer.shutdown()
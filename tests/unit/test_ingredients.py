@@ -0,0 +1,46 @@
+import pytest
+
+from app.services.ingredients import INGREDIENTS, IngredientNormalizer, ingredient_normalizer
+
+
+@pytest.mark.parametrize("name, expected", [
+    # 영수증 OCR 품목 (브랜드, 용량 포함)
+    ("CJ 햇반 210g", ["쌀"]),
+    ("풀무원 국산콩 두부 300g", ["두부"]),
+    ("서울우유 1L", ["우유"]),
+    # 레시피 재료 문자열 (분량, 괄호 설명 포함)
+    ("연두부 75g(3/4모)", ["두부"]),
+    ("칵테일새우 20g(5마리)", ["새우"]),
+    ("다진 마늘 1큰술", ["마늘"]),
+    # 긴 동의어 우선 ("고추장"은 "고추"가 아님)
+    ("고추장 2큰술", ["고추장"]),
+    ("깨소금", ["참깨"]),
+    ("사과 1개, 우유 200ml", ["사과", "우유"]),
+])
+def test_normalize_maps_names_to_canonical_ingredients(name, expected):
+    assert ingredient_normalizer.names_of(ingredient_normalizer.normalize(name)) == expected
+
+
+def test_single_character_names_match_only_whole_name():
+    assert ingredient_normalizer.names_of(ingredient_normalizer.normalize("무 1/2개")) == ["무"]
+    assert ingredient_normalizer.normalize("무침") == []
+    assert ingredient_normalizer.normalize("김치") != ingredient_normalizer.normalize("김")
+
+
+def test_normalize_all_returns_sorted_union():
+    ids = ingredient_normalizer.normalize_all(["연두부 75g(3/4모)", "순두부", "달걀 1개", "물 2컵"])
+
+    assert ids == sorted(ids)
+    assert ingredient_normalizer.names_of(ids) == ["달걀", "두부"]
+
+
+def test_dictionary_has_no_duplicate_synonyms():
+    names = [name for names in INGREDIENTS.values() for name in names]
+    assert len(names) == len(set(names))
+
+
+def test_custom_dictionary():
+    normalizer = IngredientNormalizer({1: ("토마토", "방울토마토"), 2: ("케첩", "토마토케첩")})
+
+    assert normalizer.normalize("하인즈 토마토케첩") == [2]
+    assert normalizer.normalize("방울토마토 500g") == [1]
@@ -0,0 +1,110 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+LAMBDA_DIR = ROOT_DIR / "lambda"
+
+# cold start import 시간 예산 (ms, 3회 측정 중 최솟값 기준)
+# 느린 CI 러너에서는 LAMBDA_IMPORT_BUDGET_SCALE 환경 변수로 배율 조정
+IMPORT_BUDGET_SCALE = float(os.environ.get("LAMBDA_IMPORT_BUDGET_SCALE", "1.0"))
+EXPIRY_NOTIFICATION_IMPORT = (
+    "import expiry_notification_handler; "
+    "from app.services.expiry_notifications import ExpiryNotificationScanner"
+)
+IMPORT_BUDGETS_MS = {
+    # 핸들러 모듈 로드 (코디네이터 모드는 여기까지만 필요)
+    "import recipe_manual_sync_handler": 400,
+    # 핸들러 + 첫 동기화 호출 시 로드되는 모듈
+    "import recipe_sync_handler; "
+    "from app.services.recipe_sync_service import recipe_sync_service; "
+    "from app.utils.s3_helper import s3_helper": 900,
+    # 소비기한 알림 핸들러 + 스캔 호출 시 로드되는 모듈 (레시피 동기화 모듈, httpx는 로드하지 않음)
+    EXPIRY_NOTIFICATION_IMPORT: 800,
+}
+
+# 동기화 Lambda에서 로드되면 안 되는 모듈
+FORBIDDEN_MODULES = [
+    "fastapi",
+    "jose",
+    "app.api",
+    "app.core.auth",
+    "app.utils.bedrock_dependencies",
+    "app.services.expiry_estimation_service",
+    # boto3는 S3/Secrets Manager를 처음 사용할 때 로드
+    "boto3",
+    # app.services 패키지는 서비스를 처음 사용할 때 로드
+    "app.services.recipe_recommendation_service",
+    # 프로세스 풀은 썸네일을 처음 변환할 때 로드
+    "concurrent.futures.process",
+]
+
+
+def run_importtime(statement: str) -> Dict[str, int]:
+    """
+    `python -X importtime -c <statement>`를 실행하고
+    최상위 import별 누적 시간(us)을 반환
+    """
+    env = {**os.environ, "PYTHONPATH": str(ROOT_DIR)}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=LAMBDA_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    imports = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # 구분자 뒤 공백 1칸을 제거하면 들여쓰기(중첩 깊이)만 남음
+        imports[name[1:].rstrip()] = int(cumulative)
+    return imports
+
+
+def measure_import_ms(statement: str) -> float:
+    """인터프리터 시작 시 로드되는 모듈을 제외한 import 시간 (ms)"""
+    startup_modules = set(run_importtime("pass"))
+    imports = run_importtime(statement)
+
+    top_level = [
+        cumulative for name, cumulative in imports.items()
+        if not name.startswith(" ") and name not in startup_modules
+    ]
+    return sum(top_level) / 1000
+
+
+@pytest.mark.parametrize("statement", list(IMPORT_BUDGETS_MS))
+def test_lambda_import_time_budget(statement):
+    """Lambda cold start import 시간이 예산을 넘지 않는지 확인"""
+    budget_ms = IMPORT_BUDGETS_MS[statement] * IMPORT_BUDGET_SCALE
+    elapsed_ms = min(measure_import_ms(statement) for _ in range(3))
+
+    print(f"\n{statement}: {elapsed_ms:.1f}ms (budget {budget_ms:.0f}ms)")
+    assert elapsed_ms <= budget_ms, (
+        f"Lambda import time regressed: {elapsed_ms:.1f}ms > {budget_ms:.0f}ms"
+    )
+
+
+@pytest.mark.parametrize("statement", list(IMPORT_BUDGETS_MS))
+def test_lambda_does_not_import_api_dependencies(statement):
+    """동기화 경로에서 FastAPI, jose, Bedrock, boto3가 import 시점에 로드되지 않는지 확인"""
+    loaded = {name.strip() for name in run_importtime(statement)}
+
+    for module in FORBIDDEN_MODULES:
+        assert module not in loaded, f"{module} is imported by the Lambda sync path"
+
+
+def test_expiry_notification_lambda_does_not_import_recipe_sync():
+    """소비기한 알림 경로에서 레시피 동기화 모듈(httpx, S3 helper 포함)이 로드되지 않는지 확인"""
+    loaded = {name.strip() for name in run_importtime(EXPIRY_NOTIFICATION_IMPORT)}
+
+    for module in ["app.services.recipe_sync_service", "app.services.fridge_status", "app.utils.s3_helper", "httpx"]:
+        assert module not in loaded, f"{module} is imported by the expiry notification path"
@@ -0,0 +1,139 @@
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from app.core.config import settings
+from app.core.lambda_runtime import LambdaRuntime
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def runtime(clock, monkeypatch):
+    monkeypatch.setenv("DB_SECRET_NAME", "db-secret")
+    monkeypatch.setattr(settings, "DATABASE_PASSWORD", None)
+    runtime = LambdaRuntime(secret_ttl_seconds=60, clock=clock)
+    runtime._secrets_client = MagicMock()
+    runtime._secrets_client.get_secret_value.return_value = {
+        'SecretString': json.dumps({'password': 'pw-1'})
+    }
+    yield runtime
+    if runtime._loop is not None:
+        runtime._loop.close()
+
+
+def test_get_secret_cached_within_ttl(runtime, clock):
+    """TTL 이내에는 Secrets Manager를 다시 호출하지 않음"""
+    runtime.get_secret("db-secret")
+    clock.now = 59
+    runtime.get_secret("db-secret")
+
+    assert runtime._secrets_client.get_secret_value.call_count == 1
+
+
+def test_get_secret_refreshed_after_ttl(runtime, clock):
+    """TTL이 지나면 시크릿을 다시 가져옴"""
+    runtime.get_secret("db-secret")
+    clock.now = 61
+    runtime.get_secret("db-secret")
+
+    assert runtime._secrets_client.get_secret_value.call_count == 2
+
+
+def test_ensure_database_password_sets_settings(runtime):
+    """시크릿의 password를 settings에 설정"""
+    password = runtime.ensure_database_password()
+
+    assert password == "pw-1"
+    assert settings.DATABASE_PASSWORD == "pw-1"
+
+
+def test_ensure_database_password_missing(runtime):
+    """시크릿에 password가 없으면 예외"""
+    runtime._secrets_client.get_secret_value.return_value = {'SecretString': '{}'}
+
+    with pytest.raises(ValueError):
+        runtime.ensure_database_password()
+
+
+def test_ensure_database_password_without_secret_name(runtime, monkeypatch):
+    """DB_SECRET_NAME이 없으면 기존 설정값 사용 (로컬 환경)"""
+    monkeypatch.delenv("DB_SECRET_NAME")
+    monkeypatch.setattr(settings, "DATABASE_PASSWORD", "local-pw")
+
+    assert runtime.ensure_database_password() == "local-pw"
+    runtime._secrets_client.get_secret_value.assert_not_called()
+
+
+def test_session_factory_reused_on_warm_start(runtime, clock):
+    """warm start에서는 엔진을 다시 만들지 않음"""
+    with patch.object(runtime, "_create_engine", return_value=MagicMock()) as create_engine:
+        first = runtime.get_session_factory()
+        clock.now = 120  # TTL 만료 후에도 비밀번호가 같으면 재사용
+        second = runtime.get_session_factory()
+
+    assert first is second
+    assert create_engine.call_count == 1
+
+
+def test_engine_recreated_on_password_rotation(runtime, clock):
+    """비밀번호가 교체되면 기존 엔진을 정리하고 다시 생성"""
+    old_engine = MagicMock()
+    old_engine.dispose = AsyncMock()
+
+    with patch.object(runtime, "_create_engine", side_effect=[old_engine, MagicMock()]) as create_engine:
+        runtime.get_session_factory()
+
+        runtime._secrets_client.get_secret_value.return_value = {
+            'SecretString': json.dumps({'password': 'pw-2'})
+        }
+        clock.now = 120
+        runtime.get_session_factory()
+
+    assert create_engine.call_count == 2
+    old_engine.dispose.assert_awaited_once()
+
+
+def test_run_reuses_event_loop(runtime):
+    """여러 번 실행해도 같은 이벤트 루프 사용"""
+    import asyncio
+
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    assert runtime.run(current_loop()) is runtime.run(current_loop())
+
+
+def test_prepare_injects_shared_http_client(runtime):
+    """prepare는 공유 HTTP 클라이언트를 주입"""
+    consumer_a = MagicMock(http_client=None)
+    consumer_b = MagicMock(http_client=None)
+
+    with patch.object(runtime, "_create_engine", return_value=MagicMock()):
+        runtime.prepare(consumer_a, consumer_b)
+
+    assert consumer_a.http_client is not None
+    assert consumer_a.http_client is consumer_b.http_client
+
+
+def test_timing_cold_then_warm(runtime):
+    """첫 호출은 cold start, 이후 호출은 warm start"""
+    runtime.begin_invocation()
+    cold = runtime.timing()
+    runtime.begin_invocation()
+    warm = runtime.timing()
+
+    assert cold["cold_start"] is True
+    assert warm["cold_start"] is False
+    assert warm["init_ms"] == 0.0
+    assert warm["invocation_count"] == 2
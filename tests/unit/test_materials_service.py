@@ -1,5 +1,33 @@
 import pytest
-from app.services.materials import extract_items_from_ocr
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from decimal import Decimal
+
+from app.models import Material, MaterialBatchUpdate
+from app.services.materials import (
+    ROW_THRESHOLDS,
+    MaterialBatchError,
+    batch_update_materials,
+    build_material_batch_update,
+    build_material_list_query,
+    build_material_search_query,
+    bulk_create_materials,
+    encode_list_cursor,
+    fill_estimated_expiry,
+    list_materials,
+    search_materials,
+    _parse_ocr_words,
+    extract_items_from_ocr,
+    extract_items_from_rows,
+    extract_items_with_fallback,
+    group_rows,
+)
+from app.utils.cursor import InvalidCursorError, decode_cursor, encode_cursor
 
 test_data_1 = {
     "ParsedResults": [
@@ -1349,3 +1377,425 @@ async def test_extract_items_from_ocr_2():
     assert result[0]["total"] == 1680
     assert result[8]["total"] == 5980
     assert result[13]["total"] == 1960
+
+
+def _long_receipt(payload, copies):
+    """기록된 OCR payload의 행들을 아래로 반복해 붙여 긴 영수증을 만듭니다."""
+    import copy
+
+    parsed = copy.deepcopy(payload["ParsedResults"][0])
+    overlay_key = "TextOverlay" if "TextOverlay" in parsed else "Overlay"
+    lines = parsed[overlay_key]["Lines"]
+    height = max(w["Top"] + w["Height"] for line in lines for w in line["Words"]) + 40
+
+    long_lines = []
+    for i in range(copies):
+        for line in lines:
+            shifted = copy.deepcopy(line)
+            for word in shifted["Words"]:
+                word["Top"] += i * height
+            long_lines.append(shifted)
+    parsed[overlay_key]["Lines"] = long_lines
+    return {**payload, "ParsedResults": [parsed]}
+
+
+def _quadratic_group_rows(sorted_words, threshold_y):
+    """기존 구현: 단어마다 현재 행의 Top 평균을 다시 계산"""
+    rows = []
+    current_row = [sorted_words[0]]
+    for word in sorted_words[1:]:
+        prev_avg_top = sum([w["Top"] for w in current_row]) / len(current_row)
+        if abs(word["Top"] - prev_avg_top) <= threshold_y:
+            current_row.append(word)
+        else:
+            rows.append(current_row)
+            current_row = [word]
+    rows.append(current_row)
+    for row in rows:
+        row.sort(key=lambda x: x["Left"])
+    return rows
+
+
+@pytest.mark.parametrize("payload", [test_data_1, test_data_2])
+def test_group_rows_matches_quadratic_grouping(payload):
+    words = _parse_ocr_words(_long_receipt(payload, 5))
+
+    for threshold in ROW_THRESHOLDS:
+        assert group_rows(words, threshold) == _quadratic_group_rows(words, threshold)
+
+
+def test_extract_items_with_fallback_matches_threshold_loop():
+    for payload in (test_data_1, test_data_2):
+        expected = ""
+        for threshold in ROW_THRESHOLDS:
+            if isinstance(expected, list) and len(expected) > 0:
+                break
+            expected = extract_items_from_ocr(payload, 10, threshold)
+
+        assert extract_items_with_fallback(payload, threshold_x=10) == expected
+
+
+def test_extract_items_with_fallback_returns_error_message():
+    assert extract_items_with_fallback({}) == "데이터 형식이 올바르지 않습니다."
+    assert extract_items_with_fallback({"ParsedResults": [{}]}) == (
+        "JSON에 텍스트 데이터(Overlay/TextOverlay)가 없습니다."
+    )
+
+
+def test_extract_items_with_fallback_returns_empty_when_no_items():
+    # 가격 정보가 없으면 모든 threshold를 시도한 뒤 빈 리스트
+    payload = {"ParsedResults": [{"Overlay": {"Lines": [{"Words": [
+        {"WordText": "두부", "Left": 10, "Top": 100, "Height": 20, "Width": 40},
+        {"WordText": "콩나물", "Left": 60, "Top": 112, "Height": 20, "Width": 50},
+    ]}]}}]}
+
+    assert extract_items_with_fallback(payload) == []
+
+
+def test_benchmark_long_receipt_grouping():
+    """긴 영수증(기록된 payload 반복)에서 기존 4회 재계산 대비 처리 시간 비교"""
+    import time
+
+    payload = _long_receipt(test_data_2, 40)
+
+    def legacy():
+        data = ""
+        for threshold in ROW_THRESHOLDS:
+            if isinstance(data, list) and len(data) > 0:
+                break
+            words = _parse_ocr_words(payload)
+            rows = _quadratic_group_rows(words, threshold)
+            data = extract_items_from_rows(rows, 10)
+        return data
+
+    def measure(fn, repeat=3):
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - started)
+        return best, result
+
+    legacy_time, legacy_items = measure(legacy)
+    new_time, new_items = measure(lambda: extract_items_with_fallback(payload))
+    print(f"long receipt: legacy={legacy_time * 1000:.1f}ms single-pass={new_time * 1000:.1f}ms")
+
+    assert new_items == legacy_items
+    assert len(new_items) > 15
+
+
+def material_row(name, **overrides):
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    row = {
+        "name": name, "image_url": None, "price": 1000, "currency": "KRW", "category": "기타",
+        "purchased_at": now, "expired_at": now, "quantity": 1, "quantity_unit": None, "user_id": "user-1",
+    }
+    row.update(overrides)
+    return row
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_materials_builds_responses_from_returning_rows():
+    rows = [material_row("두부"), material_row("콩나물", price=990)]
+    session = AsyncMock()
+    result = MagicMock()
+    result.all.return_value = [SimpleNamespace(_mapping={**row, "id": 10 + i}) for i, row in enumerate(rows)]
+    session.execute.return_value = result
+
+    with patch("app.services.materials.fridge_status_service") as fridge_status:
+        fridge_status.refresh = AsyncMock()
+        created = await bulk_create_materials(session, rows)
+
+    assert [(m.id, m.name, m.price) for m in created] == [(10, "두부", 1000), (11, "콩나물", 990)]
+    statement, params = session.execute.await_args[0]
+    assert params == rows
+    # 이름을 표준 식재료 id로 정규화하여 함께 저장
+    assert [row["ingredient_ids"] for row in params] == [[79], [24]]
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert sql.startswith("INSERT INTO material")
+    assert "RETURNING" in sql and "material.id" in sql
+    # 같은 트랜잭션에서 fridge_status 갱신
+    fridge_status.refresh.assert_awaited_once_with(session, {"user-1"})
+    session.commit.assert_awaited_once()
+    session.refresh.assert_not_awaited()
+
+
+def test_material_batch_update_is_single_update_from_values():
+    statement = build_material_batch_update("user-1", [
+        MaterialBatchUpdate(id=1, quantity_delta=-2),
+        MaterialBatchUpdate(id=2, name="두부", expired_at=None),
+    ])
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+
+    assert sql.startswith("UPDATE material SET")
+    assert "FROM (VALUES" in sql
+    # 이름을 바꾸면 ingredient_ids도 함께 갱신
+    assert "AS v (id, name, name_set, expired_at, expired_at_set, ingredient_ids, ingredient_ids_set, quantity_delta)" in sql
+    # 보내지 않은 필드는 그대로, 모든 값이 NULL인 컬럼도 컬럼 타입으로 CAST
+    assert "name=CASE WHEN v.name_set THEN CAST(v.name AS VARCHAR) ELSE material.name END" in sql
+    assert "CAST(v.expired_at AS TIMESTAMP WITH TIME ZONE)" in sql
+    assert "quantity=greatest(material.quantity + v.quantity_delta" in sql
+    assert "WHERE material.id = v.id AND material.user_id = %(user_id_1)s" in sql
+    assert "RETURNING material.name" in sql
+    assert "price" not in sql.split("FROM")[0]
+
+
+def test_material_batch_update_without_changes_is_none():
+    assert build_material_batch_update("user-1", [MaterialBatchUpdate(id=1)]) is None
+
+
+def returning_rows(*ids):
+    result = MagicMock()
+    result.all.return_value = [
+        SimpleNamespace(id=id, _mapping={**material_row(f"재료{id}"), "id": id}) for id in ids
+    ]
+    return result
+
+
+@pytest.mark.asyncio
+async def test_batch_update_materials_returns_rows_in_input_order():
+    session = AsyncMock()
+    session.execute.return_value = returning_rows(2, 1)
+    updates = [MaterialBatchUpdate(id=1, quantity_delta=-1), MaterialBatchUpdate(id=2, price=500)]
+
+    with patch("app.services.materials.fridge_status_service") as fridge_status:
+        fridge_status.refresh = AsyncMock()
+        updated = await batch_update_materials(session, "user-1", updates)
+
+    assert [m.id for m in updated] == [1, 2]
+    session.execute.assert_awaited_once()
+    fridge_status.refresh.assert_awaited_once_with(session, ["user-1"])
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_batch_update_materials_rolls_back_when_row_is_missing():
+    session = AsyncMock()
+    session.execute.return_value = returning_rows(1)
+
+    with pytest.raises(MaterialBatchError) as e:
+        await batch_update_materials(
+            session, "user-1", [MaterialBatchUpdate(id=1, price=1), MaterialBatchUpdate(id=9, price=1)]
+        )
+
+    assert e.value.status_code == 404 and "[9]" in e.value.detail
+    session.rollback.assert_awaited_once()
+    session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("updates", [
+    [MaterialBatchUpdate(id=1, price=1), MaterialBatchUpdate(id=1, price=2)],
+    [MaterialBatchUpdate(id=1, quantity=3, quantity_delta=-1)],
+    [MaterialBatchUpdate(id=1)],
+])
+async def test_batch_update_materials_rejects_invalid_batches(updates):
+    session = AsyncMock()
+
+    with pytest.raises(MaterialBatchError) as e:
+        await batch_update_materials(session, "user-1", updates)
+
+    assert e.value.status_code == 400
+    session.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_materials_skips_empty_batch():
+    session = AsyncMock()
+
+    assert await bulk_create_materials(session, []) == []
+    session.execute.assert_not_awaited()
+
+
+def test_fill_estimated_expiry_only_fills_missing_values():
+    given = datetime(2026, 2, 1, tzinfo=timezone.utc)
+    rows = [
+        material_row("우유", expired_at=None),
+        material_row("두부", expired_at=given),
+        material_row("쇼핑백", expired_at=None),
+    ]
+
+    estimated = fill_estimated_expiry(rows)
+
+    assert estimated == [0, 2]
+    assert rows[0]["expired_at"] > rows[0]["purchased_at"]
+    assert rows[1]["expired_at"] == given
+    assert rows[2]["expired_at"] is None
+
+
+def _search_sql(**kwargs):
+    query = build_material_search_query("user-1", "우유", **kwargs)
+    return str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_material_search_query_is_user_scoped_and_trigram_indexable():
+    sql = _search_sql(category="유제품")
+
+    assert "material.user_id = 'user-1'" in sql
+    assert "material.category = '유제품'" in sql
+    # ix_material_name_trgm을 쓸 수 있는 조건만 사용 (lower(name) LIKE 는 인덱스를 못 씀)
+    assert "material.name ILIKE '%%우유%%'" in sql
+    assert "material.name %% '우유'" in sql
+    assert "lower(" not in sql
+    assert "ORDER BY round(CAST(similarity(material.name, '우유') AS NUMERIC), 6) DESC, material.id DESC" in sql
+    assert sql.rstrip().endswith("LIMIT 11")
+
+
+def test_material_search_query_escapes_like_wildcards():
+    compiled = build_material_search_query("user-1", "100%_").compile(dialect=postgresql.dialect())
+
+    assert "ESCAPE '\\'" in str(compiled)
+    assert "%100\\%\\_%" in compiled.params.values()
+
+
+def test_material_search_query_continues_after_cursor():
+    cursor = encode_cursor({"rank": "0.428571", "id": 42})
+
+    sql = _search_sql(cursor=cursor)
+
+    assert "(round(CAST(similarity(material.name, '우유') AS NUMERIC), 6), material.id) < (0.428571, 42)" in sql
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor({"id": 1}), encode_cursor({"rank": "x", "id": 1})])
+def test_material_search_query_rejects_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        build_material_search_query("user-1", "우유", cursor=cursor)
+
+
+def test_cursor_round_trip():
+    values = {"rank": "0.5", "id": 7, "name": "서울우유"}
+
+    cursor = encode_cursor(values)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, keys=("rank", "id")) == values
+
+
+@pytest.mark.asyncio
+async def test_search_materials_returns_rank_keyset_cursor():
+    rows = [
+        (Material(id=id, **material_row(name)), Decimal(rank))
+        for id, name, rank in [(9, "서울우유", "0.5"), (4, "우유식빵", "0.5"), (7, "딸기우유", "0.3")]
+    ]
+    session = AsyncMock()
+    result = MagicMock()
+    result.all.return_value = rows
+    session.execute.return_value = result
+
+    materials, next_cursor = await search_materials(session, "user-1", "우유", limit=2)
+
+    assert [m.id for m in materials] == [9, 4]
+    assert decode_cursor(next_cursor) == {"rank": "0.5", "id": 4}
+
+
+@pytest.mark.asyncio
+async def test_search_materials_last_page_has_no_cursor():
+    session = AsyncMock()
+    result = MagicMock()
+    result.all.return_value = [(Material(id=1, **material_row("우유")), Decimal("1"))]
+    session.execute.return_value = result
+
+    materials, next_cursor = await search_materials(session, "user-1", "우유", limit=2)
+
+    assert [m.id for m in materials] == [1]
+    assert next_cursor is None
+
+
+def test_material_list_query_matches_composite_index_order():
+    sql = str(
+        build_material_list_query("user-1", category="유제품", cursor="42", limit=5)
+        .compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    )
+
+    # ix_material_user_id_category_id (user_id, category, id) 순서로 읽고 바로 LIMIT
+    assert "material.user_id = 'user-1' AND material.category = '유제품' AND material.id > 42" in sql
+    assert "ORDER BY material.id" in sql
+    assert sql.rstrip().endswith("LIMIT 6")
+
+
+def test_material_model_declares_composite_indexes():
+    indexes = {index.name: [column.name for column in index.columns] for index in Material.__table__.indexes}
+
+    assert indexes["ix_material_user_id_id"] == ["user_id", "id"]
+    assert indexes["ix_material_user_id_category_id"] == ["user_id", "category", "id"]
+    assert "ix_material_user_id" not in indexes
+
+
+@pytest.mark.parametrize("index_name", ["ix_material_user_id_expiry_sort", "ix_material_user_id_purchase_sort"])
+def test_date_sort_indexes_match_query_sort_keys(index_name):
+    index = next(index for index in Material.__table__.indexes if index.name == index_name)
+    ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+    sort = "expired_at" if "expiry" in index_name else "purchased_at"
+    sql = _list_sql(sort=sort)
+
+    # 인덱스 식과 쿼리 정렬 식이 같아야 인덱스 순서대로 읽음
+    key = ddl[ddl.index("coalesce"):ddl.rindex(", id)")]
+    assert f"ORDER BY {key.replace('coalesce(', 'coalesce(material.')}" in sql
+
+
+def _list_sql(**kwargs):
+    query = build_material_list_query("user-1", **kwargs)
+    return str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_material_list_query_accepts_legacy_id_cursor():
+    assert "material.id > 42" in _list_sql(cursor="42")
+    assert "material.id > 42" in _list_sql(cursor=encode_cursor({"sort": "id", "id": 42}))
+
+
+def test_material_list_query_sorts_by_expiry_with_nulls_last():
+    cursor = encode_list_cursor(
+        Material(id=42, **material_row("우유", expired_at=datetime(2026, 3, 1, tzinfo=timezone.utc))), "expired_at"
+    )
+
+    sql = _list_sql(sort="expired_at", cursor=cursor)
+
+    assert (
+        "(coalesce(material.expired_at, 'infinity'::timestamptz), material.id) > ('2026-03-01 00:00:00+00:00', 42)"
+        in sql
+    )
+    assert "ORDER BY coalesce(material.expired_at, 'infinity'::timestamptz), material.id" in sql
+
+
+def test_material_list_query_continues_after_row_without_expiry():
+    cursor = encode_list_cursor(Material(id=42, **material_row("쇼핑백", expired_at=None)), "expired_at")
+
+    sql = _list_sql(sort="expired_at", cursor=cursor)
+
+    assert "material.id) > ('infinity'::timestamptz, 42)" in sql
+
+
+def test_material_list_query_sorts_by_recent_purchase():
+    cursor = encode_list_cursor(Material(id=42, **material_row("우유")), "purchased_at")
+
+    sql = _list_sql(sort="purchased_at", cursor=cursor)
+
+    assert (
+        "(coalesce(material.purchased_at, '-infinity'::timestamptz), material.id) < ('2026-01-01 00:00:00+00:00', 42)"
+        in sql
+    )
+    assert "ORDER BY coalesce(material.purchased_at, '-infinity'::timestamptz) DESC, material.id DESC" in sql
+
+
+@pytest.mark.parametrize("sort, cursor", [
+    ("expired_at", "42"),
+    ("expired_at", encode_cursor({"sort": "purchased_at", "key": None, "id": 42})),
+    ("purchased_at", encode_cursor({"sort": "purchased_at", "key": "yesterday", "id": 42})),
+])
+def test_material_list_query_rejects_cursor_of_other_sort(sort, cursor):
+    with pytest.raises(InvalidCursorError):
+        build_material_list_query("user-1", cursor=cursor, sort=sort)
+
+
+@pytest.mark.asyncio
+async def test_list_materials_returns_cursor_of_last_row():
+    rows = [Material(id=id, **material_row(f"재료{id}", expired_at=None)) for id in (3, 8, 9)]
+    session = AsyncMock()
+    result = MagicMock()
+    result.scalars.return_value.all.return_value = rows
+    session.execute.return_value = result
+
+    materials, next_cursor = await list_materials(session, "user-1", limit=2, sort="expired_at")
+
+    assert [m.id for m in materials] == [3, 8]
+    assert decode_cursor(next_cursor) == {"sort": "expired_at", "id": 8, "key": None}
@@ -0,0 +1,127 @@
+import asyncio
+
+import httpx
+import pytest
+from app.services.ocr_client import OcrClient, OcrError, OcrResultCache
+from app.utils.http_fetch import HostGuardedFetcher
+
+OCR_RESULT = {"ParsedResults": [{"TextOverlay": {"Lines": []}}], "IsErroredOnProcessing": False}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+async def no_sleep(seconds):
+    pass
+
+
+def make_client(handler, **kwargs):
+    fetcher = HostGuardedFetcher(rate_per_host=100, burst=100, max_attempts=3, sleep=no_sleep)
+    kwargs.setdefault("preprocessor", None)
+    return OcrClient(transport=httpx.MockTransport(handler), fetcher=fetcher, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_parse_image_caches_by_image_hash():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, json=OCR_RESULT)
+
+    client = make_client(handler)
+
+    first = await client.parse_image(b"receipt-bytes", "r.jpg", "image/jpeg")
+    second = await client.parse_image(b"receipt-bytes", "other-name.jpg", "image/jpeg")
+    await client.parse_image(b"another-receipt", "r.jpg", "image/jpeg")
+
+    assert first == second == OCR_RESULT
+    assert len(calls) == 2
+    assert client.cache.hits == 1
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_parse_image_reuses_one_client():
+    client = make_client(lambda request: httpx.Response(200, json=OCR_RESULT))
+
+    await client.parse_image(b"a")
+    pooled = client.client
+    await client.parse_image(b"b")
+
+    assert client.client is pooled
+    await client.aclose()
+    assert client._client is None
+
+
+@pytest.mark.asyncio
+async def test_parse_image_retries_transient_errors():
+    responses = [httpx.Response(503), httpx.Response(200, json=OCR_RESULT)]
+    client = make_client(lambda request: responses.pop(0))
+
+    assert await client.parse_image(b"a") == OCR_RESULT
+    assert responses == []
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_parse_image_does_not_cache_processing_errors():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, json={"IsErroredOnProcessing": True, "ErrorMessage": ["Timed out"]})
+
+    client = make_client(handler)
+
+    for _ in range(2):
+        with pytest.raises(OcrError):
+            await client.parse_image(b"a")
+
+    assert len(calls) == 2
+    assert len(client.cache) == 0
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicate_uploads_share_one_request():
+    calls = []
+    release = asyncio.Event()
+
+    async def handler(request):
+        calls.append(request)
+        await release.wait()
+        return httpx.Response(200, json=OCR_RESULT)
+
+    client = make_client(handler)
+
+    tasks = [asyncio.create_task(client.parse_image(b"same")) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert results == [OCR_RESULT] * 3
+    assert len(calls) == 1
+    await client.aclose()
+
+
+def test_cache_expires_and_evicts_least_recently_used():
+    clock = FakeClock()
+    cache = OcrResultCache(max_size=2, ttl=10, clock=clock)
+
+    cache.set("a", {"v": 1})
+    cache.set("b", {"v": 2})
+    cache.get("a")
+    cache.set("c", {"v": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+
+    clock.now = 11
+    assert cache.get("a") is None
+    assert len(cache) == 1
@@ -0,0 +1,91 @@
+import os
+
+import pytest
+
+from tests.unit.receipt_corpus import (
+    FIELDS,
+    find_regressions,
+    load_baseline,
+    load_corpus,
+    run_corpus,
+    score_receipt,
+)
+
+# 파싱 시간은 실행 환경(CI 부하 등)에 따라 흔들리므로 명시적으로 켰을 때만 baseline과 비교
+CHECK_PARSE_TIME = os.environ.get("RECEIPT_CORPUS_CHECK_TIME") == "1"
+
+
+@pytest.fixture(scope="module")
+def report():
+    return run_corpus()
+
+
+def test_corpus_receipts_are_well_formed():
+    corpus = load_corpus()
+
+    assert corpus
+    for name, receipt in corpus.items():
+        assert receipt["expected"], name
+        assert "ParsedResults" in receipt["response"], name
+        for item in receipt["expected"]:
+            assert set(FIELDS) <= set(item), name
+
+
+def test_long_receipt_repeats_item_rows():
+    corpus = load_corpus()
+
+    assert len(corpus["mart_15_items_x40"]["expected"]) == 40 * len(corpus["mart_15_items"]["expected"])
+
+
+def test_corpus_has_no_regressions(report):
+    """파서 변경으로 정확도가 떨어지거나 할당이 baseline보다 늘면 실패"""
+    baseline = load_baseline()
+
+    assert set(baseline["receipts"]) == set(report["receipts"])
+    assert find_regressions(report, baseline, check_time=False) == []
+
+
+@pytest.mark.skipif(not CHECK_PARSE_TIME, reason="set RECEIPT_CORPUS_CHECK_TIME=1 to compare parse time")
+def test_corpus_parse_time_within_baseline(report):
+    """파싱 시간이 baseline보다 크게 늘면 실패 (baseline을 기록한 것과 비슷한 환경에서 실행)"""
+    regressions = find_regressions(report, load_baseline())
+
+    assert [r for r in regressions if "parse time" in r] == []
+
+
+def test_score_receipt_counts_fields():
+    expected = [
+        {"name": "두부", "price": 1500, "quantity": 1},
+        {"name": "콩나물", "price": 990, "quantity": 2},
+    ]
+    predicted = [
+        {"name": "풀무원 두부", "price": 1500, "quantity": 2},
+        {"name": "영수증", "price": 100, "quantity": 1},
+    ]
+
+    counts = score_receipt(expected, predicted)
+
+    assert counts["name"] == {"correct": 1, "expected": 2, "predicted": 2}
+    assert counts["price"]["correct"] == 1
+    assert counts["quantity"]["correct"] == 0
+
+
+def test_find_regressions_reports_accuracy_time_and_allocation(report):
+    baseline = load_baseline()
+    worse = {
+        "accuracy": {field: {"precision": 0.0, "recall": 0.0} for field in FIELDS},
+        "receipts": {
+            name: {**result, "parse_ms": result["parse_ms"] * 100 + 100, "peak_kib": result["peak_kib"] * 2}
+            for name, result in report["receipts"].items()
+        },
+    }
+
+    regressions = find_regressions(worse, baseline)
+
+    assert any("name recall" in r for r in regressions)
+    assert any("parse time" in r for r in regressions)
+    assert any("peak allocation" in r for r in regressions)
+
+    without_time = find_regressions(worse, baseline, check_time=False)
+    assert not any("parse time" in r for r in without_time)
+    assert any("peak allocation" in r for r in without_time)
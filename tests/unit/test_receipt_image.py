@@ -0,0 +1,168 @@
+import copy
+import io
+import os
+
+import httpx
+import pytest
+from PIL import Image
+
+from app.services.ocr_client import OcrClient
+from app.utils.http_fetch import HostGuardedFetcher
+from app.utils.receipt_image import (
+    OcrPayloadStats,
+    PreparedImage,
+    ReceiptImagePreprocessor,
+    prepare_receipt_image,
+    prepare_receipt_image_scaled,
+)
+
+
+def make_photo(size=(3000, 4000), orientation=None, noise=False) -> bytes:
+    """휴대폰 사진 크기의 테스트 이미지 (noise=True면 압축이 잘 안 되는 이미지)"""
+    if noise:
+        image = Image.frombytes("RGB", size, os.urandom(size[0] * size[1] * 3))
+    else:
+        image = Image.new("RGB", size, (250, 240, 230))
+    buffer = io.BytesIO()
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    image.save(buffer, format="JPEG", quality=95, exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+def test_prepare_receipt_image_downscales_to_grayscale_jpeg():
+    prepared = prepare_receipt_image(make_photo((3000, 4000)), max_side=2000)
+
+    with Image.open(io.BytesIO(prepared)) as image:
+        assert image.format == "JPEG"
+        assert image.mode == "L"
+        assert image.size == (1500, 2000)
+
+
+def test_prepare_receipt_image_reports_scale():
+    _, scale = prepare_receipt_image_scaled(make_photo((3000, 5000)), max_side=2000)
+    _, unscaled = prepare_receipt_image_scaled(make_photo((400, 300)), max_side=2000)
+
+    assert scale == pytest.approx(0.4)
+    assert unscaled == 1.0
+
+
+def test_prepare_receipt_image_applies_exif_rotation():
+    # orientation 6: 시계 방향 90도 회전해서 보여줘야 하는 사진
+    prepared = prepare_receipt_image(make_photo((400, 300), orientation=6))
+
+    with Image.open(io.BytesIO(prepared)) as image:
+        assert image.size == (300, 400)
+
+
+def test_prepare_receipt_image_fits_size_limit():
+    original = make_photo((1800, 1800), noise=True)
+    assert len(original) > 1024 * 1024
+
+    prepared = prepare_receipt_image(original, max_side=2000, max_bytes=300 * 1024)
+
+    assert len(prepared) <= 300 * 1024
+
+
+def test_prepare_receipt_image_returns_none_for_non_images():
+    assert prepare_receipt_image(b"%PDF-1.4 not an image") is None
+
+
+@pytest.mark.asyncio
+async def test_preprocessor_never_sends_more_than_small_original():
+    preprocessor = ReceiptImagePreprocessor(max_workers=1)
+    small = make_photo((200, 100))
+
+    prepared = await preprocessor.prepare(small, "small.jpg", "image/jpeg")
+    pdf = await preprocessor.prepare(b"%PDF-1.4", "r.pdf", "application/pdf")
+
+    assert len(prepared.content) <= len(small)
+    assert pdf.content == b"%PDF-1.4" and pdf.filename == "r.pdf"
+    assert pdf.preprocessed is False
+    preprocessor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_ocr_client_sends_preprocessed_image_and_records_savings():
+    sent = []
+
+    def handler(request):
+        sent.append(request)
+        return httpx.Response(200, json={"ParsedResults": [], "IsErroredOnProcessing": False})
+
+    preprocessor = ReceiptImagePreprocessor(max_workers=1)
+    client = OcrClient(
+        transport=httpx.MockTransport(handler),
+        fetcher=HostGuardedFetcher(rate_per_host=100, burst=100),
+        preprocessor=preprocessor,
+    )
+    photo = make_photo((3000, 4000), noise=True)
+
+    await client.parse_image(photo, "IMG_0001.HEIC.png", "image/png")
+    await client.parse_image(photo, "IMG_0001.HEIC.png", "image/png")
+
+    summary = client.stats.summary()
+    assert len(sent) == 1
+    assert b'filename="IMG_0001.HEIC.jpg"' in sent[0].content
+    assert summary["requests"] == 1
+    assert summary["preprocessed"] == 1
+    assert summary["sent_bytes"] <= 1024 * 1024
+    assert summary["saved_bytes"] == len(photo) - summary["sent_bytes"]
+    await client.aclose()
+
+
+def test_stats_compare_ocr_latency_between_original_and_preprocessed():
+    stats = OcrPayloadStats()
+
+    stats.record(PreparedImage(b"x" * 1000, "a.jpg", "image/jpeg", 8000, 0.1, preprocessed=True), 1.0)
+    stats.record(PreparedImage(b"x" * 8000, "b.jpg", "image/jpeg", 8000), 3.0)
+
+    summary = stats.summary()
+    assert summary["saved_bytes"] == 7000
+    assert summary["avg_ocr_seconds_saved"] == pytest.approx(2.0)
+
+
+def scale_ocr_response(response: dict, scale: float) -> dict:
+    """원본 해상도 기준 OCR 응답을 scale배 크기 이미지의 좌표로 변환 (축소 이미지를 OCR한 결과 흉내)"""
+    scaled = copy.deepcopy(response)
+    for line in scaled["ParsedResults"][0]["TextOverlay"]["Lines"]:
+        line["MinTop"] *= scale
+        line["MaxHeight"] *= scale
+        for word in line["Words"]:
+            for key in ("Left", "Top", "Width", "Height"):
+                word[key] *= scale
+    return scaled
+
+
+@pytest.mark.asyncio
+async def test_downscaled_receipt_extracts_same_items_as_original():
+    """축소해서 OCR해도 좌표를 원본 기준으로 되돌리므로 항목 추출 threshold가 그대로 맞음"""
+    from app.services.materials import extract_items_with_fallback
+    from tests.unit.receipt_corpus import load_corpus
+
+    response = load_corpus()["mart_15_items"]["response"]
+    # 긴 변 4000 → 2000 (0.5배, 좌표 복원이 부동소수점 오차 없이 정확하도록)
+    photo = make_photo((3000, 4000))
+
+    def handler(request):
+        # 전송된 이미지 크기 기준 좌표로 응답
+        jpeg = request.content[request.content.index(b"\xff\xd8\xff"):]
+        with Image.open(io.BytesIO(jpeg)) as image:
+            sent_scale = max(image.size) / 4000
+        return httpx.Response(200, json=scale_ocr_response(response, sent_scale))
+
+    preprocessor = ReceiptImagePreprocessor(max_workers=1)
+    client = OcrClient(
+        transport=httpx.MockTransport(handler),
+        fetcher=HostGuardedFetcher(rate_per_host=100, burst=100),
+        preprocessor=preprocessor,
+    )
+
+    result = await client.parse_image(photo, "receipt.jpg", "image/jpeg")
+
+    expected = extract_items_with_fallback(copy.deepcopy(response), threshold_x=10)
+    # 축소 좌표 그대로면 threshold가 상대적으로 커져 행/열이 잘못 묶임
+    assert extract_items_with_fallback(scale_ocr_response(response, 0.5), threshold_x=10) != expected
+    assert extract_items_with_fallback(result, threshold_x=10) == expected
+    await client.aclose()
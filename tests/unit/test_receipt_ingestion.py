@@ -0,0 +1,267 @@
+import json
+from datetime import timedelta
+from contextlib import asynccontextmanager
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from app.services.materials import extract_items_with_fallback
+from app.services.ocr_client import OcrError
+from app.services.receipt_ingestion import (
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_SUCCEEDED,
+    AsyncioReceiptJobQueue,
+    ReceiptIngestionError,
+    ReceiptJob,
+    ReceiptJobStore,
+    ReceiptUpload,
+    ingest_receipt,
+    validate_webhook_url,
+)
+from app.utils.http_fetch import HostGuardedFetcher
+
+RECEIPT = json.loads(
+    (Path(__file__).resolve().parent.parent / "fixtures" / "receipts" / "mart_15_items.json").read_text(encoding="utf-8")
+)
+
+# 영수증 API와 같은 threshold fallback으로 추출되는 항목 수
+ITEM_COUNT = len(extract_items_with_fallback(RECEIPT["response"]))
+
+UPLOAD = ReceiptUpload(content=b"receipt", filename="r.jpg", content_type="image/jpeg")
+
+
+def make_resolver(addresses):
+    """호스트 이름 → 주소 목록 (DNS 조회 없이 테스트)"""
+    async def resolve(host, port):
+        if host not in addresses:
+            raise OSError(f"unknown host {host}")
+        return addresses[host]
+    return resolve
+
+
+PUBLIC_RESOLVER = make_resolver({"hooks.example.com": ["93.184.216.34"]})
+
+
+def make_session():
+    """INSERT ... RETURNING 결과로 입력 행에 id를 붙여 돌려주는 session"""
+    session = AsyncMock()
+
+    async def execute(statement, rows):
+        result = MagicMock()
+        result.all.return_value = [SimpleNamespace(_mapping={**row, "id": i + 1}) for i, row in enumerate(rows)]
+        return result
+
+    session.execute.side_effect = execute
+    return session
+
+
+def make_session_factory(session):
+    @asynccontextmanager
+    async def factory():
+        yield session
+
+    return factory
+
+
+@pytest.fixture(autouse=True)
+def fridge_status():
+    with patch("app.services.materials.fridge_status_service") as mock_service:
+        mock_service.refresh = AsyncMock()
+        yield mock_service
+
+
+@pytest.fixture
+def ocr():
+    with patch("app.services.receipt_ingestion.ocr_client") as mock_client:
+        mock_client.parse_image = AsyncMock(return_value=RECEIPT["response"])
+        yield mock_client
+
+
+@pytest.mark.asyncio
+async def test_ingest_receipt_saves_items_in_one_commit(ocr):
+    session = make_session()
+
+    materials = await ingest_receipt(session, "user-1", b"receipt", "r.jpg", "image/jpeg")
+
+    assert len(materials) == ITEM_COUNT
+    rows = session.execute.await_args[0][1]
+    assert all(row["user_id"] == "user-1" for row in rows)
+    expiry = {row["name"]: row["expired_at"] for row in rows}
+    # 이름으로 규칙이 매칭되는 항목만 소비기한 추정, 나머지는 NULL (모두 HIGH로 분류되지 않도록)
+    assert expiry["노브랜드 굿밀크우"] == rows[0]["purchased_at"] + timedelta(days=18)
+    assert expiry["산딸기 500g 박스"] == rows[0]["purchased_at"] + timedelta(days=7)
+    assert expiry["대여용부직포쇼핑백"] is None
+    assert all(m.category == "기타" for m in materials)
+    assert [m.id for m in materials] == list(range(1, ITEM_COUNT + 1))
+    session.execute.assert_awaited_once()
+    session.refresh.assert_not_awaited()
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_ingest_receipt_defers_ai_refinement(ocr):
+    with patch("app.services.receipt_ingestion.expiry_refinement_queue") as refinement:
+        materials = await ingest_receipt(make_session(), "user-1", b"receipt", "r.jpg", "image/jpeg")
+
+    refinement.enqueue.assert_called_once_with(materials)
+
+
+@pytest.mark.asyncio
+async def test_ingest_receipt_maps_ocr_errors(ocr):
+    ocr.parse_image.side_effect = OcrError("E301")
+
+    with pytest.raises(ReceiptIngestionError) as exc_info:
+        await ingest_receipt(make_session(), "user-1", b"x", "r.jpg", "image/jpeg")
+
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_job_returns_immediately_and_completes_in_background(ocr):
+    queue = AsyncioReceiptJobQueue(session_factory=make_session_factory(make_session()))
+
+    job = await queue.submit("user-1", UPLOAD)
+    assert job.status == JOB_QUEUED
+    assert queue.store.get(job.id) is job
+
+    await queue.join()
+    await queue.stop()
+
+    assert job.status == JOB_SUCCEEDED
+    assert len(job.materials) == ITEM_COUNT
+    assert job.to_response().materials[0].id == 1
+
+
+@pytest.mark.asyncio
+async def test_job_records_failure(ocr):
+    ocr.parse_image.return_value = {"ParsedResults": []}
+    queue = AsyncioReceiptJobQueue(session_factory=make_session_factory(make_session()))
+
+    job = await queue.submit("user-1", UPLOAD)
+    await queue.join()
+    await queue.stop()
+
+    assert job.status == JOB_FAILED
+    assert job.error == "데이터 형식이 올바르지 않습니다."
+
+
+@pytest.mark.asyncio
+async def test_job_posts_result_to_webhook(ocr):
+    received = []
+
+    def handler(request):
+        received.append(json.loads(request.content))
+        return httpx.Response(200)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        queue = AsyncioReceiptJobQueue(
+            session_factory=make_session_factory(make_session()),
+            webhook_fetcher=HostGuardedFetcher(rate_per_host=100, burst=100),
+            webhook_client=client,
+            webhook_resolver=PUBLIC_RESOLVER,
+        )
+        job = await queue.submit("user-1", UPLOAD, webhook_url="https://hooks.example.com/receipt")
+        await queue.join()
+        await queue.stop()
+
+    assert received[0]["job_id"] == job.id
+    assert received[0]["status"] == JOB_SUCCEEDED
+    assert len(received[0]["materials"]) == ITEM_COUNT
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1/hook",
+    "http://10.0.0.5/hook",
+    "http://192.168.0.1:8080/hook",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://[::1]/hook",
+    "http://[::ffff:127.0.0.1]/hook",
+    "http://0.0.0.0/hook",
+    "http://240.0.0.1/hook",
+    "http://internal.example.com/hook",
+    "ftp://hooks.example.com/hook",
+    "hooks.example.com/hook",
+])
+async def test_validate_webhook_url_rejects_non_public_targets(url):
+    resolver = make_resolver({
+        "127.0.0.1": ["127.0.0.1"],
+        "10.0.0.5": ["10.0.0.5"],
+        "192.168.0.1": ["192.168.0.1"],
+        "169.254.169.254": ["169.254.169.254"],
+        "::1": ["::1"],
+        "::ffff:127.0.0.1": ["::ffff:127.0.0.1"],
+        "0.0.0.0": ["0.0.0.0"],
+        "240.0.0.1": ["240.0.0.1"],
+        # 공인 주소와 내부 주소가 섞여 있어도 거부
+        "internal.example.com": ["93.184.216.34", "10.1.2.3"],
+        "hooks.example.com": ["93.184.216.34"],
+    })
+
+    with pytest.raises(ReceiptIngestionError) as exc:
+        await validate_webhook_url(url, resolver)
+    assert exc.value.status_code == 400
+
+
+async def test_validate_webhook_url_rejects_unresolvable_host():
+    with pytest.raises(ReceiptIngestionError) as exc:
+        await validate_webhook_url("https://localhost/hook", make_resolver({}))
+    assert exc.value.status_code == 400
+
+
+async def test_validate_webhook_url_accepts_public_host():
+    await validate_webhook_url("https://hooks.example.com/receipt", PUBLIC_RESOLVER)
+
+
+async def test_job_submit_rejects_private_webhook(ocr):
+    queue = AsyncioReceiptJobQueue(
+        session_factory=make_session_factory(make_session()),
+        webhook_resolver=make_resolver({"hooks.example.com": ["10.0.0.5"]}),
+    )
+
+    with pytest.raises(ReceiptIngestionError):
+        await queue.submit("user-1", UPLOAD, webhook_url="https://hooks.example.com/receipt")
+    assert len(queue.store) == 0
+
+
+async def test_job_skips_webhook_when_host_resolves_to_private_address_at_delivery(ocr):
+    received = []
+    addresses = {"hooks.example.com": ["93.184.216.34"]}
+
+    def handler(request):
+        received.append(request)
+        return httpx.Response(200)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        queue = AsyncioReceiptJobQueue(
+            session_factory=make_session_factory(make_session()),
+            webhook_fetcher=HostGuardedFetcher(rate_per_host=100, burst=100),
+            webhook_client=client,
+            webhook_resolver=make_resolver(addresses),
+        )
+        job = await queue.submit("user-1", UPLOAD, webhook_url="https://hooks.example.com/receipt")
+        # 등록 후 DNS 응답이 메타데이터 서버 주소로 바뀜 (DNS rebinding)
+        addresses["hooks.example.com"] = ["169.254.169.254"]
+        await queue.join()
+        await queue.stop()
+
+    assert job.status == JOB_SUCCEEDED
+    assert received == []
+
+
+def test_job_store_evicts_finished_jobs_after_ttl():
+    now = [0.0]
+    store = ReceiptJobStore(ttl=10, clock=lambda: now[0])
+
+    finished, pending = ReceiptJob(user_id="a"), ReceiptJob(user_id="a")
+    store.add(finished)
+    store.add(pending)
+    store.mark_finished(finished)
+
+    now[0] = 11
+    store.add(ReceiptJob(user_id="b"))
+
+    assert store.get(finished.id) is None
+    assert store.get(pending.id) is pending
@@ -1,10 +1,12 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime, timezone, timedelta
+from sqlalchemy.dialects import postgresql
 from app.services.recipe_recommendation_service import (
     RecipeRecommendationService,
     PRIORITY_WEIGHTS
 )
+from app.services.ingredients import ingredient_normalizer
 from app.models.recipes import Recipe, Priority, RecipeRecommendation
 from app.models.materials import Material
 
@@ -151,6 +153,16 @@ async def test_get_user_materials(service):
     session.execute.assert_called_once()
 
 
+def test_user_materials_query_orders_by_expiry():
+    """소비기한 임박 순 조회 (ix_material_user_id_expiry_sort)"""
+    sql = str(RecipeRecommendationService.user_materials_query("user123").compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    ))
+
+    assert "WHERE material.user_id = 'user123'" in sql
+    assert "ORDER BY coalesce(material.expired_at, 'infinity'::timestamptz), material.id" in sql
+
+
 @pytest.mark.asyncio
 async def test_calculate_matching_score_full_match(service, mock_materials, mock_recipes):
     """완전 매칭 (사과 + 우유)"""
@@ -318,9 +330,204 @@ async def test_save_feedback_user_mismatch(service):
         await service.save_feedback(session, "user123", 1, True)
 
 
+@pytest.mark.asyncio
+async def test_calculate_matching_score_by_ingredient_ids(service):
+    """ingredient_ids가 있으면 표준 재료 id 교집합으로 매칭 (OCR 품목명도 매칭)"""
+    now = datetime.now(timezone.utc)
+    materials = [
+        Material(id=1, user_id="user123", name="풀무원 국산콩 두부 300g", price=2000, category="가공식품",
+                 purchased_at=now, expired_at=now + timedelta(days=1), quantity=1, ingredient_ids=[79]),
+        Material(id=2, user_id="user123", name="CJ 햇반 210g", price=1500, category="가공식품",
+                 purchased_at=now, expired_at=now + timedelta(days=30), quantity=3, ingredient_ids=[81]),
+    ]
+    recipe = Recipe(
+        recipe_id=9, recipe_name="새우두부계란찜", recipe_pat="반찬", method="찌기",
+        thumbnail_url="https://example.com/9.jpg",
+        material_names=["연두부 75g(3/4모)", "칵테일새우 20g(5마리)", "달걀 1개"],
+        ingredient_ids=[53, 58, 79],
+    )
+    priorities = {m.name: await service.assign_material_priority(m) for m in materials}
+
+    result = await service.calculate_matching_score(recipe, materials, priorities)
+
+    assert result["base_match_ratio"] == pytest.approx(1 / 3)
+    assert result["matched_materials"] == ["풀무원 국산콩 두부 300g"]
+    # 부족한 재료는 레시피의 재료 문자열 그대로
+    assert sorted(result["missing_materials"]) == ["달걀 1개", "칵테일새우 20g(5마리)"]
+    assert result["high_priority_materials"] == ["풀무원 국산콩 두부 300g"]
+    assert result["matching_score"] == pytest.approx(2 / 3)
+
+
+@pytest.mark.asyncio
+async def test_calculate_matching_score_falls_back_to_name_for_unnormalized_materials(service):
+    """ingredient_ids가 없는 재료도 이름이 레시피 재료명에 포함되면 그 재료의 표준 id로 매칭"""
+    now = datetime.now(timezone.utc)
+    materials = [
+        Material(id=1, user_id="user123", name="연두부", price=2000, category="가공식품",
+                 purchased_at=now, expired_at=now + timedelta(days=10), quantity=1, ingredient_ids=[]),
+    ]
+    recipe = Recipe(
+        recipe_id=9, recipe_name="새우두부계란찜", recipe_pat="반찬", method="찌기",
+        thumbnail_url="https://example.com/9.jpg",
+        material_names=["연두부 75g(3/4모)", "칵테일새우 20g(5마리)", "달걀 1개"],
+        ingredient_ids=[53, 58, 79],
+    )
+    priorities = {m.name: await service.assign_material_priority(m) for m in materials}
+
+    result = await service.calculate_matching_score(recipe, materials, priorities)
+
+    assert result["base_match_ratio"] == pytest.approx(1 / 3)
+    assert result["matched_materials"] == ["연두부"]
+    assert sorted(result["missing_materials"]) == ["달걀 1개", "칵테일새우 20g(5마리)"]
+
+
+def test_recipes_query_keeps_unnormalized_recipes_and_materials():
+    """최소 일치율 사전 필터: 표준 재료 겹침 + 정규화 전 레시피 + 정규화되지 않은 재료 이름"""
+    now = datetime.now(timezone.utc)
+    materials = [
+        Material(id=1, user_id="user123", name="두부", price=1000, category="가공식품",
+                 purchased_at=now, quantity=1, ingredient_ids=[79]),
+        Material(id=2, user_id="user123", name="Tofu", price=1000, category="가공식품",
+                 purchased_at=now, quantity=1, ingredient_ids=[]),
+    ]
+
+    sql = str(RecipeRecommendationService.recipes_query(materials, 0.3).compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    ))
+
+    assert "recipe.ingredient_ids && ARRAY[79]" in sql
+    assert "cardinality(recipe.ingredient_ids) = 0" in sql
+    assert "recipe.ingredient_ids IS NULL" in sql
+    assert "strpos(lower(anon_1.name), 'tofu') > 0" in sql
+
+    # 최소 일치율이 없으면 전체 조회
+    assert "WHERE" not in str(RecipeRecommendationService.recipes_query(materials, 0).compile(
+        dialect=postgresql.dialect()
+    ))
+
+
+def test_cook_statement_consumes_matched_materials_in_one_statement():
+    """추천 기록 갱신, 재료 차감/삭제를 데이터 변경 CTE 한 문장으로"""
+    statement = RecipeRecommendationService.cook_statement(
+        "user123", 7, datetime(2026, 3, 1, tzinfo=timezone.utc), ["두부"], ["두부"]
+    )
+    sql = str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+    assert "WITH cooked AS \n(UPDATE recipe_recommendations SET cooked_at=" in sql
+    assert "WHERE recipe_recommendations.id = 7 AND recipe_recommendations.user_id = 'user123'" in sql
+    # 표준 재료가 겹치는 재료 (정규화 전 레시피는 재료명 포함), 같은 이름은 소비기한이 가장 임박한 하나
+    assert "SELECT DISTINCT ON (lower(material.name)) material.id" in sql
+    assert "material.ingredient_ids && recipe.ingredient_ids" in sql
+    assert "cardinality(recipe.ingredient_ids) = 0 AND (EXISTS" in sql
+    # 정규화되지 않은 재료는 점수 계산에서 매칭된 이름만
+    assert "cardinality(material.ingredient_ids) = 0 AND lower(material.name) IN ('두부')" in sql
+    assert "strpos(lower(anon_1.name), lower(material.name)) > 0" in sql
+    assert "ORDER BY lower(material.name), coalesce(material.expired_at, 'infinity'::timestamptz), material.id" in sql
+    assert "lower(material.name) IN ('두부')" in sql
+    assert "UPDATE material SET quantity=(material.quantity - 1) FROM matched" in sql
+    assert "DELETE FROM material USING matched WHERE material.id = matched.id AND material.quantity <= 1" in sql
+    assert "UNION ALL" in sql
+
+
+@pytest.mark.asyncio
+async def test_cook_recipe_returns_consumed_materials(service):
+    """요리 완료: 차감/삭제 결과 반환, fridge_status 갱신 후 한 번 commit"""
+    session = AsyncMock()
+    session.get.side_effect = [
+        RecipeRecommendation(id=7, user_id="user123", recipe_id=3),
+        Recipe(recipe_id=3, recipe_name="사과우유", recipe_pat="후식", method="기타", material_names=["사과", "우유"]),
+    ]
+    result = MagicMock()
+    result.all.return_value = [
+        MagicMock(id=1, quantity=4, deleted=False),
+        MagicMock(id=2, quantity=0, deleted=True),
+    ]
+    result.all.return_value[0].name = "사과"
+    result.all.return_value[1].name = "우유"
+    session.execute.return_value = result
+
+    with patch("app.services.recipe_recommendation_service.fridge_status_service") as fridge_status:
+        fridge_status.refresh = AsyncMock()
+        response = await service.cook_recipe(session, "user123", 7)
+
+    assert response.recipe_id == 3
+    assert [(m.name, m.quantity, m.deleted) for m in response.consumed_materials] == [
+        ("사과", 4, False), ("우유", 0, True)
+    ]
+    session.execute.assert_awaited_once()
+    fridge_status.refresh.assert_awaited_once_with(session, ["user123"])
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_cook_recipe_unnormalized_material_matches_scoring(service):
+    """정규화된 레시피에서 정규화되지 않은 재료는 점수 계산에서 매칭된 것만 차감"""
+    recipe = Recipe(
+        recipe_id=3, recipe_name="두부조림", recipe_pat="반찬", method="조림",
+        material_names=["두부 1모", "대파 1/2대", "양념장 약간"],
+        ingredient_ids=sorted(ingredient_normalizer.normalize_all(["두부", "대파"]))
+    )
+    # 사전 추가 전에 저장된 재료: "양념"은 "양념장 약간"에 포함되지만 표준 재료로 정규화되지 않음
+    materials = [
+        Material(id=1, user_id="user123", name="두부", ingredient_ids=[]),
+        Material(id=2, user_id="user123", name="양념", ingredient_ids=[]),
+    ]
+    score = await service.calculate_matching_score(recipe, materials, {})
+    assert score["matched_materials"] == ["두부"]
+
+    session = AsyncMock()
+    session.get.side_effect = [RecipeRecommendation(id=7, user_id="user123", recipe_id=3), recipe]
+    names = MagicMock()
+    names.scalars.return_value.all.return_value = [m.name for m in materials]
+    cooked = MagicMock()
+    cooked.all.return_value = []
+    session.execute.side_effect = [names, cooked]
+
+    await service.cook_recipe(session, "user123", 7)
+
+    statement = session.execute.await_args_list[1].args[0]
+    sql = str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    assert "cardinality(material.ingredient_ids) = 0 AND lower(material.name) IN ('두부')" in sql
+
+
+@pytest.mark.asyncio
+async def test_cook_recipe_user_mismatch(service):
+    """다른 사용자의 추천으로는 요리할 수 없음"""
+    session = AsyncMock()
+    session.get.return_value = RecipeRecommendation(id=7, user_id="other_user", recipe_id=3)
+
+    with pytest.raises(ValueError, match="User ID mismatch"):
+        await service.cook_recipe(session, "user123", 7)
+    session.execute.assert_not_awaited()
+
+
 @pytest.mark.asyncio
 async def test_priority_weights_consistency():
     """우선순위 가중치 상수 검증"""
     assert PRIORITY_WEIGHTS[Priority.HIGH] == 2.0
     assert PRIORITY_WEIGHTS[Priority.MEDIUM] == 1.3
     assert PRIORITY_WEIGHTS[Priority.NORMAL] == 1.0
+
+
+def test_select_thumbnail_url(service):
+    """요청 너비 이상인 가장 작은 WebP 변형 선택"""
+    recipe = Recipe(
+        recipe_id=1, recipe_name="김치찌개", recipe_pat="국&찌개", method="끓이기",
+        thumbnail_url="original.jpg",
+        thumbnail_variants={"160": "w160.webp", "320": "w320.webp", "640": "w640.webp"}
+    )
+
+    assert service.select_thumbnail_url(recipe, 200) == "w320.webp"
+    assert service.select_thumbnail_url(recipe, 160) == "w160.webp"
+    assert service.select_thumbnail_url(recipe, 1080) == "w640.webp"
+    assert service.select_thumbnail_url(recipe, None) == "original.jpg"
+
+
+def test_select_thumbnail_url_without_variants(service):
+    """변형이 없는 레시피는 원본 썸네일 사용"""
+    recipe = Recipe(
+        recipe_id=1, recipe_name="김치찌개", recipe_pat="국&찌개", method="끓이기",
+        thumbnail_url="original.jpg"
+    )
+
+    assert service.select_thumbnail_url(recipe, 320) == "original.jpg"
@@ -1,9 +1,31 @@
+import httpx
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime, timezone
 import json
 from app.services.recipe_sync_service import RecipeSyncService
-from app.models.recipes import Recipe
+from app.models.recipes import Recipe, RecipeSyncState
+from app.utils.s3_helper import s3_helper
+
+
+class OfflineFetcher:
+    """네트워크 요청 없이 즉시 연결 실패를 내는 fetcher (재시도/대기 없음)"""
+    timeout = httpx.Timeout(1.0)
+
+    def __init__(self):
+        self.urls = []
+
+    async def call(self, url, operation):
+        self.urls.append(url)
+        raise httpx.ConnectError("offline", request=httpx.Request("GET", url))
+
+
+@pytest.fixture(autouse=True)
+def offline_fetcher(monkeypatch):
+    """이미지 업로드가 실제 호스트(example.com)에 요청하지 않도록 공유 s3_helper의 fetcher 교체"""
+    fetcher = OfflineFetcher()
+    monkeypatch.setattr(s3_helper, 'fetcher', fetcher)
+    return fetcher
 
 
 @pytest.fixture
@@ -369,52 +391,331 @@ def test_get_api_key_caching(service):
     assert api_key == "cached_key"
 
 
-def test_get_last_sync_date_success(service):
-    """마지막 동기화 날짜 가져오기"""
-    mock_secrets_client = MagicMock()
-    mock_secrets_client.get_secret_value.return_value = {
-        'SecretString': json.dumps({'last_sync_date': '20251125'})
-    }
+def make_session(state=None):
+    """동기화 상태 테스트용 세션 mock"""
+    session = AsyncMock()
+    session.get = AsyncMock(return_value=state)
+    session.add = MagicMock()
+    session.begin_nested = AsyncMock(side_effect=lambda: AsyncMock())
+    # 저장된 fingerprint 조회 결과 (기본: 없음)
+    hashes_result = MagicMock()
+    hashes_result.all.return_value = []
+    session.execute = AsyncMock(return_value=hashes_result)
+    return session
+
+
+@pytest.mark.asyncio
+async def test_stage_sync_state_creates_new_state(service):
+    """첫 동기화면 동기화 상태 행을 새로 만듦"""
+    session = make_session(state=None)
 
-    with patch.object(service, '_get_secrets_client', return_value=mock_secrets_client):
-        sync_date = service._get_last_sync_date()
+    state = await service._stage_sync_state(
+        session, change_date='20251128', max_recipe_seq=120, total_synced=10
+    )
 
-        assert sync_date == '20251125'
+    session.add.assert_called_once_with(state)
+    assert state.source == 'COOKRCP01'
+    assert state.last_change_date == '20251128'
+    assert state.max_recipe_seq == 120
+    assert state.total_synced == 10
+    assert state.last_synced_at is not None
+    session.commit.assert_not_called()
 
 
-def test_get_last_sync_date_failure(service):
-    """마지막 동기화 날짜 가져오기 실패 시 기본값"""
-    mock_secrets_client = MagicMock()
-    mock_secrets_client.get_secret_value.side_effect = Exception("Secret not found")
+@pytest.mark.asyncio
+async def test_stage_sync_state_keeps_max_recipe_seq(service):
+    """기존 최대 RCP_SEQ보다 작은 값으로 덮어쓰지 않음"""
+    existing = RecipeSyncState(source='COOKRCP01', last_change_date='20251125', max_recipe_seq=500)
+    session = make_session(state=existing)
 
-    with patch.object(service, '_get_secrets_client', return_value=mock_secrets_client):
-        sync_date = service._get_last_sync_date()
+    state = await service._stage_sync_state(
+        session, change_date='20251128', max_recipe_seq=3, total_synced=1
+    )
 
-        # 기본값 반환
-        assert sync_date == '20000101'
+    assert state is existing
+    assert state.last_change_date == '20251128'
+    assert state.max_recipe_seq == 500
 
 
-def test_update_last_sync_date_success(service):
-    """마지막 동기화 날짜 업데이트 성공"""
-    mock_secrets_client = MagicMock()
+@pytest.mark.asyncio
+async def test_sync_all_recipes_uses_stored_change_date(service, sample_api_response):
+    """저장된 CHNG_DT로 증분 동기화하고 마지막 배치와 함께 상태 기록"""
+    existing = RecipeSyncState(source='COOKRCP01', last_change_date='20251125')
+    session = make_session(state=existing)
+    rows = sample_api_response['COOKRCP01']['row']
+
+    with patch.object(service, '_request_recipes', AsyncMock(return_value=rows)) as request, \
+            patch.object(service, 'sync_recipe_with_status', AsyncMock(return_value=('new', MagicMock()))), \
+            patch.object(service, '_stage_sync_state', AsyncMock()) as stage:
+        result = await service.sync_all_recipes(session, batch_size=500)
+
+    assert result['total_synced'] == 2
+    assert result['new'] == 2
+    assert request.call_args[0][2] == '20251125'
+    stage.assert_awaited_once()
+    assert stage.call_args[1]['max_recipe_seq'] == 2
+    assert stage.call_args[1]['total_synced'] == 2
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_sync_all_recipes_records_observed_change_date(service, sample_api_response):
+    """다음 증분 기준은 실행 날짜가 아니라 받은 레시피의 최대 CHNG_DT"""
+    existing = RecipeSyncState(source='COOKRCP01', last_change_date='20251125')
+    session = make_session(state=existing)
+    rows = [
+        {**sample_api_response['COOKRCP01']['row'][0], 'CHNG_DT': '20251127'},
+        {**sample_api_response['COOKRCP01']['row'][1], 'CHNG_DT': '2025-11-26'},
+    ]
 
-    with patch.object(service, '_get_secrets_client', return_value=mock_secrets_client):
-        service._update_last_sync_date('20251128')
+    with patch.object(service, '_request_recipes', AsyncMock(return_value=rows)), \
+            patch.object(service, 'sync_recipe_with_status', AsyncMock(return_value=('new', MagicMock()))), \
+            patch.object(service, '_stage_sync_state', AsyncMock()) as stage:
+        await service.sync_all_recipes(session, batch_size=500)
 
-        mock_secrets_client.put_secret_value.assert_called_once()
-        call_args = mock_secrets_client.put_secret_value.call_args
-        assert '20251128' in call_args[1]['SecretString']
+    assert stage.call_args[1]['change_date'] == '20251127'
 
 
-def test_update_last_sync_date_create_new_secret(service):
-    """Secret이 없을 때 새로 생성"""
-    mock_secrets_client = MagicMock()
-    mock_secrets_client.put_secret_value.side_effect = [
-        mock_secrets_client.exceptions.ResourceNotFoundException(
-            {'Error': {'Code': 'ResourceNotFoundException'}}, 'PutSecretValue'
+@pytest.mark.asyncio
+async def test_sync_all_recipes_fetch_failure_raises(service, sample_api_response):
+    """API 요청이 실패하면 CHNG_DT는 갱신하지 않고 (cursor만 기록) 예외 발생"""
+    session = make_session(state=None)
+    rows = sample_api_response['COOKRCP01']['row']
+
+    with patch.object(service, '_request_recipes', AsyncMock(side_effect=[rows, Exception("timeout")])), \
+            patch.object(service, 'sync_recipe_with_status', AsyncMock(return_value=('new', MagicMock()))), \
+            patch.object(service, '_stage_sync_state', AsyncMock()) as stage:
+        with pytest.raises(RuntimeError, match="timeout"):
+            await service.sync_all_recipes(session, batch_size=2)
+
+    # 첫 배치는 cursor와 함께 저장되지만 CHNG_DT는 그대로
+    stage.assert_awaited_once()
+    assert stage.call_args[1]['change_date'] is None
+    assert stage.call_args[1]['max_recipe_seq'] == 2
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_sync_all_recipes_resumes_after_cursor(service, sample_api_response):
+    """CHNG_DT 없이 cursor만 있으면 저장된 레시피 수만큼 건너뛰고 cursor 다음부터 동기화"""
+    existing = RecipeSyncState(source='COOKRCP01', max_recipe_seq=1)
+    session = make_session(state=existing)
+    rows = sample_api_response['COOKRCP01']['row']
+    sync = AsyncMock(return_value=('new', MagicMock()))
+
+    with patch.object(service, '_count_recipes_through', AsyncMock(return_value=1)), \
+            patch.object(service, '_request_recipes', AsyncMock(return_value=rows)) as request, \
+            patch.object(service, 'sync_recipe_with_status', sync), \
+            patch.object(service, '_stage_sync_state', AsyncMock()):
+        result = await service.sync_all_recipes(session, batch_size=500)
+
+    assert request.call_args[0][:2] == (1, 500)
+    # 겹쳐서 받은 cursor 레시피(RCP_SEQ 1)는 건너뜀
+    assert result['new'] == 1
+    assert sync.call_args[0][1]['RCP_SEQ'] == '2'
+
+
+@pytest.mark.asyncio
+async def test_sync_all_recipes_resume_mismatch_restarts(service, sample_api_response):
+    """이어받은 위치의 첫 레시피가 cursor와 다르면 처음부터 다시 요청"""
+    existing = RecipeSyncState(source='COOKRCP01', max_recipe_seq=7)
+    session = make_session(state=existing)
+    rows = sample_api_response['COOKRCP01']['row']
+
+    with patch.object(service, '_count_recipes_through', AsyncMock(return_value=5)), \
+            patch.object(service, '_request_recipes', AsyncMock(return_value=rows)) as request, \
+            patch.object(service, 'sync_recipe_with_status', AsyncMock(return_value=('new', MagicMock()))), \
+            patch.object(service, '_stage_sync_state', AsyncMock()):
+        result = await service.sync_all_recipes(session, batch_size=500)
+
+    assert [c[0][0] for c in request.call_args_list] == [5, 1]
+    assert result['new'] == 2
+
+
+@pytest.mark.asyncio
+async def test_sync_all_recipes_rolls_back_failed_recipe_only(service, sample_api_response):
+    """실패한 레시피만 SAVEPOINT 롤백하고 나머지는 저장"""
+    session = make_session(state=None)
+    rows = sample_api_response['COOKRCP01']['row']
+    savepoints = []
+
+    async def begin_nested():
+        savepoint = AsyncMock()
+        savepoints.append(savepoint)
+        return savepoint
+
+    session.begin_nested = begin_nested
+
+    with patch.object(service, '_request_recipes', AsyncMock(return_value=rows)), \
+            patch.object(service, 'sync_recipe_with_status', AsyncMock(side_effect=[('failed', None), ('new', MagicMock())])), \
+            patch.object(service, '_stage_sync_state', AsyncMock()):
+        result = await service.sync_all_recipes(session, batch_size=500)
+
+    assert result['total_synced'] == 1
+    assert result['failed'] == 1
+    savepoints[0].rollback.assert_awaited_once()
+    savepoints[1].commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_sync_recipes_by_range_commits_in_chunks(service, sample_api_response):
+    """범위 동기화는 chunk마다 commit하고 동기화 상태는 갱신하지 않음"""
+    service.commit_chunk_size = 1
+    session = make_session()
+    rows = sample_api_response['COOKRCP01']['row']
+
+    with patch.object(service, '_request_recipes', AsyncMock(return_value=rows)), \
+            patch.object(service, 'sync_recipe_with_status', AsyncMock(return_value=('new', MagicMock()))), \
+            patch.object(service, '_stage_sync_state', AsyncMock()) as stage:
+        result = await service.sync_recipes_by_range(session, 1, 2)
+
+    assert result['total_synced'] == 2
+    assert session.commit.await_count == 2
+    stage.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_sync_recipes_by_range_fetch_failure_raises(service):
+    """범위 동기화도 API 요청 실패를 빈 범위로 처리하지 않고 예외 발생"""
+    session = make_session()
+
+    with patch.object(service, '_request_recipes', AsyncMock(side_effect=Exception("timeout"))):
+        with pytest.raises(Exception, match="timeout"):
+            await service.sync_recipes_by_range(session, 1, 2)
+
+    session.commit.assert_not_awaited()
+
+
+def test_compute_content_hash_stable(service, sample_api_response):
+    """필드 순서, 앞뒤 공백, 사용하지 않는 필드는 fingerprint에 영향 없음"""
+    recipe_data = sample_api_response['COOKRCP01']['row'][0]
+    reordered = dict(reversed(list(recipe_data.items())))
+    reordered['RCP_NM'] = ' 사과파이 '
+    reordered['INFO_ENG'] = '250'
+
+    assert service._compute_content_hash(recipe_data) == service._compute_content_hash(reordered)
+
+
+def test_compute_content_hash_detects_change(service, sample_api_response):
+    """조리 순서가 바뀌면 fingerprint도 바뀜"""
+    recipe_data = sample_api_response['COOKRCP01']['row'][0]
+    changed = {**recipe_data, 'MANUAL02': '반죽을 30분 숙성합니다'}
+
+    assert service._compute_content_hash(recipe_data) != service._compute_content_hash(changed)
+
+
+@pytest.mark.asyncio
+async def test_sync_chunk_skips_unchanged_recipes(service, sample_api_response):
+    """저장된 fingerprint와 같은 레시피는 파싱/이미지/DB 쓰기 없이 건너뜀"""
+    rows = sample_api_response['COOKRCP01']['row']
+    session = make_session()
+    session.execute.return_value.all.return_value = [
+        (1, service._compute_content_hash(rows[0])),
+        (2, 'stale-hash'),
+    ]
+
+    changed_recipe = Recipe(
+        recipe_id=2, recipe_pat='반찬', method='볶기', recipe_name='계란말이',
+        thumbnail_url='https://example.com/thumbnail2.jpg', image_url=[]
+    )
+
+    with patch.object(service, 'sync_recipe_with_status',
+                      AsyncMock(return_value=('changed', changed_recipe))) as sync, \
+            patch('app.services.recipe_sync_service.s3_helper') as mock_s3:
+        result = await service._sync_chunk(session, rows)
+
+    assert result == {'total_synced': 1, 'new': 0, 'changed': 1, 'unchanged': 1, 'failed': 0}
+    sync.assert_awaited_once()
+    assert sync.call_args[0][1]['RCP_SEQ'] == '2'
+    # 변경된 레시피만 이전 이미지 정리 예약
+    mock_s3.schedule_recipe_cleanup.assert_called_once()
+    assert mock_s3.schedule_recipe_cleanup.call_args[0][0] == 2
+
+
+@pytest.mark.asyncio
+async def test_sync_recipe_with_status_unchanged(service, sample_api_response):
+    """기존 레시피의 fingerprint가 같으면 이미지 업로드 없이 unchanged"""
+    recipe_data = sample_api_response['COOKRCP01']['row'][0]
+    existing = Recipe(
+        recipe_id=1, recipe_pat='디저트', method='굽기', recipe_name='사과파이',
+        thumbnail_url='https://s3/thumbnail.jpg',
+        content_hash=service._compute_content_hash(recipe_data)
+    )
+    session = AsyncMock()
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = existing
+    session.execute.return_value = mock_result
+
+    with patch('app.services.recipe_sync_service.s3_helper') as mock_s3:
+        status, recipe = await service.sync_recipe_with_status(session, recipe_data)
+
+    assert status == 'unchanged'
+    assert recipe is existing
+    mock_s3.upload_thumbnail_from_url.assert_not_called()
+    session.flush.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_load_image_references_counts_shared_objects(service):
+    """여러 레시피가 공유하는 객체는 참조 수가 누적되고 원본 URL은 제외"""
+    from app.utils.s3_helper import s3_helper
+
+    shared = s3_helper.object_url('recipes/objects/shared.jpg')
+    session = AsyncMock()
+    rows = MagicMock()
+    rows.all.return_value = [
+        (
+            shared,
+            {'160': s3_helper.object_url('recipes/objects/shared.w160.webp')},
+            [s3_helper.object_url('recipes/objects/step1.jpg')],
         ),
+        ('https://example.com/original.jpg', None, [shared]),
     ]
+    session.execute.return_value = rows
+
+    references = await service._load_image_references(session)
 
-    with patch.object(service, '_get_secrets_client', return_value=mock_secrets_client):
-        # 예외 발생하지 않고 정상 종료
-        service._update_last_sync_date('20251128')
+    assert references == {
+        'recipes/objects/shared.jpg': 2,
+        'recipes/objects/shared.w160.webp': 1,
+        'recipes/objects/step1.jpg': 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_sync_recipe_image_failure_queued_for_retry(service, sample_api_response):
+    """이미지 업로드 실패 시 fingerprint를 저장하지 않고 재시도 큐에 추가"""
+    recipe_data = sample_api_response['COOKRCP01']['row'][1]
+    session = AsyncMock()
+    session.add = MagicMock()
+    session.execute.return_value.scalar_one_or_none = MagicMock(return_value=None)
+
+    with patch('app.services.recipe_sync_service.s3_helper') as mock_s3:
+        mock_s3.upload_thumbnail_with_variants = AsyncMock(return_value=(None, {}))
+        mock_s3.upload_image_from_url = AsyncMock(return_value="https://s3/step.jpg")
+
+        status, recipe = await service.sync_recipe_with_status(session, recipe_data)
+
+    assert status == 'new'
+    assert recipe.content_hash is None
+    assert recipe.thumbnail_url == "https://example.com/thumbnail2.jpg"
+    assert service.image_retry_queue == {2: recipe_data}
+
+
+@pytest.mark.asyncio
+async def test_retry_failed_images_reports_recovery(service, sample_api_response):
+    """재시도 큐의 레시피를 다시 동기화하고 복구 수를 보고"""
+    rows = sample_api_response['COOKRCP01']['row']
+    service.image_retry_queue = {1: rows[0], 2: rows[1]}
+    session = make_session()
+
+    async def sync_chunk(session, chunk):
+        # 레시피 2는 다시 실패하여 큐에 남음
+        service.image_retry_queue[2] = rows[1]
+        return {}
+
+    with patch.object(service, '_sync_chunk', side_effect=sync_chunk):
+        result = await service._retry_failed_images(session)
+
+    assert result == {'queued': 2, 'recovered': 1, 'still_failing': 1}
+    session.commit.assert_awaited()
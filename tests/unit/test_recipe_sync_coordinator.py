@@ -0,0 +1,298 @@
+import json
+import pytest
+from unittest.mock import MagicMock
+from app.services.recipe_sync_coordinator import (
+    LambdaShardInvoker,
+    LocalShardInvoker,
+    RecipeSyncCoordinator,
+)
+
+
+def make_handler(failing_starts=()):
+    """샤드 범위만큼 동기화했다고 응답하는 가짜 수동 동기화 핸들러"""
+    calls = []
+
+    def handler(event, context):
+        calls.append((event["start_index"], event["end_index"]))
+        if event["start_index"] in failing_starts:
+            return {
+                "statusCode": 500,
+                "body": json.dumps({"error": "Manual recipe sync failed: timeout"}),
+            }
+        synced = event["end_index"] - event["start_index"] + 1
+        return {
+            "statusCode": 200,
+            "body": json.dumps({"total_synced": synced, "new": synced, "unchanged": 1}),
+        }
+
+    handler.calls = calls
+    return handler
+
+
+def test_plan_shards_even():
+    """범위가 샤드 크기로 나누어 떨어질 때"""
+    shards = RecipeSyncCoordinator.plan_shards(1, 300, 100)
+
+    assert shards == [(1, 100), (101, 200), (201, 300)]
+
+
+def test_plan_shards_remainder():
+    """마지막 샤드는 남은 범위만 포함"""
+    shards = RecipeSyncCoordinator.plan_shards(1, 250, 100)
+
+    assert shards == [(1, 100), (101, 200), (201, 250)]
+
+
+def test_plan_shards_smaller_than_shard():
+    """범위가 샤드 크기보다 작을 때 단일 샤드"""
+    assert RecipeSyncCoordinator.plan_shards(5, 10, 100) == [(5, 10)]
+
+
+@pytest.mark.parametrize("start, end, size", [(0, 10, 5), (10, 5, 5), (1, 10, 0)])
+def test_plan_shards_invalid(start, end, size):
+    """잘못된 범위/샤드 크기"""
+    with pytest.raises(ValueError):
+        RecipeSyncCoordinator.plan_shards(start, end, size)
+
+
+def test_run_aggregates_total_synced():
+    """모든 샤드 성공 시 total_synced 합계"""
+    handler = make_handler()
+    coordinator = RecipeSyncCoordinator(LocalShardInvoker(handler), max_concurrency=4)
+
+    result = coordinator.run(1, 1000, 100)
+
+    assert result["shards"] == 10
+    assert result["total_synced"] == 1000
+    assert result["failed_shards"] == []
+    assert sorted(handler.calls) == RecipeSyncCoordinator.plan_shards(1, 1000, 100)
+
+
+def test_run_aggregates_change_counts():
+    """샤드별 new/changed/unchanged/failed 수도 합산"""
+    coordinator = RecipeSyncCoordinator(LocalShardInvoker(make_handler()), max_concurrency=2)
+
+    result = coordinator.run(1, 300, 100)
+
+    assert result["new"] == 300
+    assert result["changed"] == 0
+    assert result["unchanged"] == 3
+    assert result["failed"] == 0
+
+
+def test_run_collects_failed_shards():
+    """실패한 샤드는 범위와 에러를 기록하고 나머지는 집계"""
+    handler = make_handler(failing_starts={101, 301})
+    coordinator = RecipeSyncCoordinator(LocalShardInvoker(handler), max_concurrency=3)
+
+    result = coordinator.run(1, 400, 100)
+
+    assert result["total_synced"] == 200
+    assert [(s["start_index"], s["end_index"]) for s in result["failed_shards"]] == [
+        (101, 200),
+        (301, 400),
+    ]
+    assert "timeout" in result["failed_shards"][0]["error"]
+
+
+def test_run_invoker_exception():
+    """invoker 예외도 샤드 실패로 처리"""
+    invoker = MagicMock(side_effect=RuntimeError("Rate exceeded"))
+    coordinator = RecipeSyncCoordinator(invoker)
+
+    result = coordinator.run(1, 50, 25)
+
+    assert result["total_synced"] == 0
+    assert len(result["failed_shards"]) == 2
+
+
+def test_local_invoker_passes_shard_payload_only():
+    """샤드 호출에는 shard_size가 포함되지 않아 재귀적으로 코디네이터가 실행되지 않음"""
+    handler = make_handler()
+    coordinator = RecipeSyncCoordinator(LocalShardInvoker(handler))
+
+    coordinator._run_shard((1, 10))
+
+    assert handler.calls == [(1, 10)]
+
+
+def test_lambda_invoker_event():
+    """Lambda invoker는 Event로 호출하고 접수(202)만 확인"""
+    invoker = LambdaShardInvoker("manual-sync")
+    client = MagicMock()
+    client.invoke.return_value = {"StatusCode": 202, "Payload": MagicMock()}
+    invoker._client = client
+
+    result = invoker({"run_id": "run-1", "start_index": 1, "end_index": 3})
+
+    kwargs = client.invoke.call_args[1]
+    assert kwargs["FunctionName"] == "manual-sync"
+    assert kwargs["InvocationType"] == "Event"
+    assert json.loads(kwargs["Payload"]) == {"run_id": "run-1", "start_index": 1, "end_index": 3}
+    assert result["statusCode"] == 202
+
+
+def test_lambda_invoker_not_accepted():
+    """이벤트가 접수되지 않으면 예외"""
+    invoker = LambdaShardInvoker("manual-sync")
+    client = MagicMock()
+    client.invoke.return_value = {"StatusCode": 500, "Payload": MagicMock()}
+    invoker._client = client
+
+    with pytest.raises(RuntimeError, match="StatusCode=500"):
+        invoker({"run_id": "run-1", "start_index": 1, "end_index": 3})
+
+
+def test_dispatch_passes_run_id_and_collects_failures():
+    """dispatch는 샤드 payload에 run_id를 넣어 호출만 하고, 호출 실패한 샤드를 반환"""
+    payloads = []
+
+    def invoker(payload):
+        payloads.append(payload)
+        if payload["start_index"] == 101:
+            raise RuntimeError("Rate exceeded")
+        return {"statusCode": 202}
+
+    coordinator = RecipeSyncCoordinator(invoker, max_concurrency=3)
+    result = coordinator.dispatch("run-1", RecipeSyncCoordinator.plan_shards(1, 300, 100))
+
+    assert result["shards"] == 3
+    assert result["dispatched"] == 2
+    assert result["failed_shards"] == [{"start_index": 101, "end_index": 200, "error": "Rate exceeded"}]
+    assert sorted((p["run_id"], p["start_index"]) for p in payloads) == [
+        ("run-1", 1), ("run-1", 101), ("run-1", 201),
+    ]
+
+
+class FakeRunSession:
+    """
+    recipe_sync_run_store가 쓰는 쿼리만 흉내 내는 세션
+    (FOR UPDATE로 run 조회 → 샤드 UPDATE → 샤드 목록 조회)
+    """
+
+    def __init__(self, run, shards):
+        self.run = run
+        self.shards = {shard.start_index: shard for shard in shards}
+        self.commits = 0
+
+    async def execute(self, statement):
+        result = MagicMock()
+        if statement.is_select and statement.column_descriptions[0]["name"] == "RecipeSyncRun":
+            assert statement._for_update_arg is not None
+            result.scalar_one_or_none.return_value = self.run
+        elif statement.is_update:
+            params = statement.compile().params
+            if "start_index_1" in params:
+                shards = [self.shards[params["start_index_1"]]]
+            else:
+                # 결과를 기록하지 않은 샤드 일괄 실패 처리
+                shards = [shard for shard in self.shards.values() if shard.status == params["status_1"]]
+            for shard in shards:
+                for key, value in statement._values.items():
+                    setattr(shard, key.key, value.value)
+        else:
+            result.scalars.return_value.all.return_value = sorted(self.shards.values(), key=lambda s: s.start_index)
+        return result
+
+    async def get(self, model, key, **kwargs):
+        return self.run if key == self.run.run_id else None
+
+    async def commit(self):
+        self.commits += 1
+
+
+def make_run(shards):
+    from datetime import datetime, timezone
+    from app.models.recipes import RecipeSyncRun, RecipeSyncShard
+
+    run = RecipeSyncRun(
+        run_id="run-1", start_index=shards[0][0], end_index=shards[-1][1], shard_size=100,
+        shard_count=len(shards), created_at=datetime(2026, 3, 1, tzinfo=timezone.utc),
+    )
+    return run, [RecipeSyncShard(run_id="run-1", start_index=s, end_index=e) for s, e in shards]
+
+
+@pytest.mark.asyncio
+async def test_run_store_last_shard_aggregates():
+    """마지막 샤드가 결과를 기록할 때만 실행이 집계되어 완료됨"""
+    from app.services.recipe_sync_runs import RecipeSyncRunStore
+
+    run, shards = make_run([(1, 100), (101, 200), (201, 300)])
+    session = FakeRunSession(run, shards)
+    store = RecipeSyncRunStore()
+
+    assert await store.record_shard_result(session, "run-1", 201, result={"total_synced": 100, "new": 100}) is None
+    assert await store.record_shard_result(session, "run-1", 101, error="timeout") is None
+    assert run.status == "running"
+
+    completed = await store.record_shard_result(session, "run-1", 1, result={"total_synced": 90, "new": 10, "changed": 80, "unchanged": 10})
+
+    assert completed is run
+    assert run.status == "partial"
+    assert run.completed_at is not None
+    assert run.result["total_synced"] == 190
+    assert run.result["new"] == 110
+    assert run.result["changed"] == 80
+    assert run.result["failed_shards"] == [{"start_index": 101, "end_index": 200, "error": "timeout"}]
+    assert session.commits == 3
+
+
+@pytest.mark.asyncio
+async def test_run_store_completed_once():
+    """모든 샤드가 성공하면 completed, 이미 완료된 실행은 다시 집계하지 않음"""
+    from app.services.recipe_sync_runs import RecipeSyncRunStore
+
+    run, shards = make_run([(1, 100)])
+    session = FakeRunSession(run, shards)
+    store = RecipeSyncRunStore()
+
+    assert await store.record_shard_result(session, "run-1", 1, result={"total_synced": 100}) is run
+    assert run.status == "completed"
+    assert await store.record_shard_result(session, "run-1", 1, result={"total_synced": 100}) is None
+
+    status = await store.get_status(session, "run-1")
+    assert status["status"] == "completed"
+    assert status["pending_shards"] == []
+    assert status["total_synced"] == 100
+
+
+@pytest.mark.asyncio
+async def test_run_store_unknown_run():
+    from app.services.recipe_sync_runs import RecipeSyncRunStore
+
+    run, shards = make_run([(1, 100)])
+    session = FakeRunSession(None, shards)
+
+    with pytest.raises(ValueError):
+        await RecipeSyncRunStore().record_shard_result(session, "run-x", 1, result={})
+
+
+@pytest.mark.asyncio
+async def test_run_store_fails_shards_that_never_report():
+    """Lambda 제한 시간이 지나도 결과를 기록하지 않은 샤드(timeout, OOM)는 상태 조회 시 실패로 기록되고 run이 완료됨"""
+    from datetime import timedelta
+    from app.services.recipe_sync_runs import SHARD_START_GRACE, RecipeSyncRunStore
+
+    run, shards = make_run([(1, 100), (101, 200)])
+    session = FakeRunSession(run, shards)
+    now = [run.created_at + timedelta(minutes=1)]
+    store = RecipeSyncRunStore(clock=lambda: now[0], shard_timeout=timedelta(minutes=15))
+
+    assert await store.record_shard_result(session, "run-1", 1, result={"total_synced": 100}) is None
+
+    # 제한 시간 전에는 아직 실행 중
+    now[0] = run.created_at + timedelta(minutes=15)
+    status = await store.get_status(session, "run-1")
+    assert status["status"] == "running"
+    assert status["pending_shards"] == [{"start_index": 101, "end_index": 200}]
+
+    now[0] = run.created_at + timedelta(minutes=15) + SHARD_START_GRACE
+    status = await store.get_status(session, "run-1")
+
+    assert status["status"] == "partial"
+    assert status["completed_at"] is not None
+    assert status["pending_shards"] == []
+    assert status["total_synced"] == 100
+    assert [shard["start_index"] for shard in status["failed_shards"]] == [101]
+    assert "No result within 900s" in status["failed_shards"][0]["error"]
+    assert run.result["failed_shards"] == status["failed_shards"]
@@ -1,9 +1,27 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from botocore.exceptions import ClientError
+from app.utils.http_fetch import HostGuardedFetcher
 from app.utils.s3_helper import S3Helper
 
 
+def mock_stream(mock_client, content: bytes = b"", error: Exception = None, chunk_size: int = 1024 * 1024):
+    """httpx client.stream('GET', ...) mock (content를 chunk 단위로 반환)"""
+    response = MagicMock()
+    response.raise_for_status = MagicMock(side_effect=error)
+
+    async def aiter_bytes(_chunk_size=None):
+        for i in range(0, len(content), chunk_size):
+            yield content[i:i + chunk_size]
+
+    response.aiter_bytes = aiter_bytes
+    stream = MagicMock()
+    stream.return_value.__aenter__ = AsyncMock(return_value=response)
+    stream.return_value.__aexit__ = AsyncMock(return_value=False)
+    mock_client.return_value.__aenter__.return_value.stream = stream
+    return stream
+
+
 @pytest.fixture
 def s3_helper():
     """S3Helper 인스턴스"""
@@ -11,6 +29,12 @@ def s3_helper():
         helper = S3Helper()
         helper.bucket_name = "test-bucket"
         helper.s3_client = MagicMock()
+        # 테스트 간 circuit 상태를 공유하지 않도록 별도 fetcher 사용
+        helper.fetcher = HostGuardedFetcher()
+        # 기본적으로 객체가 없는 상태 (head_object 404)
+        helper.s3_client.head_object.side_effect = ClientError(
+            {'Error': {'Code': '404'}}, 'HeadObject'
+        )
         return helper
 
 
@@ -26,20 +50,23 @@ async def test_upload_thumbnail_from_url_success(s3_helper):
     mock_response.raise_for_status = MagicMock()
 
     with patch('httpx.AsyncClient') as mock_client:
-        mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
+        mock_stream(mock_client, mock_response.content)
 
         result = await s3_helper.upload_thumbnail_from_url(image_url, recipe_id)
 
         # S3 URL 반환 확인
         assert result is not None
         assert "test-bucket" in result
-        assert f"recipes/{recipe_id}/thumbnail.jpg" in result
+        # 내용 해시 기반 키 (recipes/objects/{sha256}.jpg)
+        expected_key = s3_helper.content_key(b"fake_image_data", "jpg")
+        assert expected_key.startswith("recipes/objects/")
+        assert result.endswith(expected_key)
 
         # S3 put_object 호출 확인
         s3_helper.s3_client.put_object.assert_called_once()
         call_args = s3_helper.s3_client.put_object.call_args
         assert call_args[1]['Bucket'] == "test-bucket"
-        assert call_args[1]['Key'] == f"recipes/{recipe_id}/thumbnail.jpg"
+        assert call_args[1]['Key'] == expected_key
         assert call_args[1]['ContentType'] == 'image/jpeg'
 
 
@@ -54,12 +81,12 @@ async def test_upload_thumbnail_from_url_png(s3_helper):
     mock_response.raise_for_status = MagicMock()
 
     with patch('httpx.AsyncClient') as mock_client:
-        mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
+        mock_stream(mock_client, mock_response.content)
 
         result = await s3_helper.upload_thumbnail_from_url(image_url, recipe_id)
 
         assert result is not None
-        assert "thumbnail.png" in result
+        assert result.endswith(".png")
 
         call_args = s3_helper.s3_client.put_object.call_args
         assert call_args[1]['ContentType'] == 'image/png'
@@ -79,9 +106,7 @@ async def test_upload_thumbnail_from_url_http_error(s3_helper):
     recipe_id = 789
 
     with patch('httpx.AsyncClient') as mock_client:
-        mock_client.return_value.__aenter__.return_value.get = AsyncMock(
-            side_effect=Exception("404 Not Found")
-        )
+        mock_stream(mock_client, error=Exception("404 Not Found"))
 
         result = await s3_helper.upload_thumbnail_from_url(image_url, recipe_id)
 
@@ -104,7 +129,7 @@ async def test_upload_thumbnail_from_url_s3_error(s3_helper):
     )
 
     with patch('httpx.AsyncClient') as mock_client:
-        mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
+        mock_stream(mock_client, mock_response.content)
 
         result = await s3_helper.upload_thumbnail_from_url(image_url, recipe_id)
 
@@ -123,15 +148,16 @@ async def test_upload_image_from_url_success(s3_helper):
     mock_response.raise_for_status = MagicMock()
 
     with patch('httpx.AsyncClient') as mock_client:
-        mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
+        mock_stream(mock_client, mock_response.content)
 
         result = await s3_helper.upload_image_from_url(image_url, recipe_id, image_index)
 
         assert result is not None
-        assert f"recipes/{recipe_id}/manual_01.jpg" in result
+        expected_key = s3_helper.content_key(b"fake_step_image", "jpg")
+        assert result.endswith(expected_key)
 
         call_args = s3_helper.s3_client.put_object.call_args
-        assert call_args[1]['Key'] == f"recipes/{recipe_id}/manual_01.jpg"
+        assert call_args[1]['Key'] == expected_key
 
 
 @pytest.mark.asyncio
@@ -146,12 +172,12 @@ async def test_upload_image_from_url_index_20(s3_helper):
     mock_response.raise_for_status = MagicMock()
 
     with patch('httpx.AsyncClient') as mock_client:
-        mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
+        mock_stream(mock_client, mock_response.content)
 
         result = await s3_helper.upload_image_from_url(image_url, recipe_id, image_index)
 
         assert result is not None
-        assert f"recipes/{recipe_id}/manual_20.jpg" in result
+        assert result.endswith(s3_helper.content_key(b"fake_step_image", "jpg"))
 
 
 @pytest.mark.asyncio
@@ -173,12 +199,12 @@ async def test_upload_image_from_url_unknown_extension(s3_helper):
     mock_response.raise_for_status = MagicMock()
 
     with patch('httpx.AsyncClient') as mock_client:
-        mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
+        mock_stream(mock_client, mock_response.content)
 
         result = await s3_helper.upload_image_from_url(image_url, recipe_id, image_index)
 
         assert result is not None
-        assert "manual_05.jpg" in result
+        assert result.endswith(".jpg")
 
         call_args = s3_helper.s3_client.put_object.call_args
         assert call_args[1]['ContentType'] == 'image/jpeg'
@@ -246,12 +272,12 @@ async def test_upload_gif_image(s3_helper):
     mock_response.raise_for_status = MagicMock()
 
     with patch('httpx.AsyncClient') as mock_client:
-        mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
+        mock_stream(mock_client, mock_response.content)
 
         result = await s3_helper.upload_thumbnail_from_url(image_url, recipe_id)
 
         assert result is not None
-        assert "thumbnail.gif" in result
+        assert result.endswith(".gif")
 
         call_args = s3_helper.s3_client.put_object.call_args
         assert call_args[1]['ContentType'] == 'image/gif'
@@ -268,9 +294,282 @@ async def test_cache_control_header(s3_helper):
     mock_response.raise_for_status = MagicMock()
 
     with patch('httpx.AsyncClient') as mock_client:
-        mock_client.return_value.__aenter__.return_value.get = AsyncMock(return_value=mock_response)
+        mock_stream(mock_client, mock_response.content)
 
         await s3_helper.upload_thumbnail_from_url(image_url, recipe_id)
 
         call_args = s3_helper.s3_client.put_object.call_args
-        assert call_args[1]['CacheControl'] == 'max-age=31536000'
+        assert call_args[1]['CacheControl'] == 'public, max-age=31536000, immutable'
+
+
+def test_delete_recipe_images_paginated(s3_helper):
+    """ContinuationToken을 따라 모든 페이지의 키를 삭제"""
+    s3_helper.s3_client.list_objects_v2.side_effect = [
+        {
+            'Contents': [{'Key': 'recipes/1/thumbnail.jpg'}],
+            'IsTruncated': True,
+            'NextContinuationToken': 'token-1',
+        },
+        {
+            'Contents': [{'Key': 'recipes/1/manual_01.jpg'}],
+            'IsTruncated': False,
+        },
+    ]
+    s3_helper.s3_client.delete_objects.return_value = {}
+
+    deleted = s3_helper.delete_recipe_images(1)
+
+    assert deleted == 2
+    second_call = s3_helper.s3_client.list_objects_v2.call_args_list[1]
+    assert second_call[1]['ContinuationToken'] == 'token-1'
+
+
+def test_delete_recipe_images_keep_keys(s3_helper):
+    """keep_keys에 포함된 키(새로 업로드한 이미지)는 삭제하지 않음"""
+    s3_helper.s3_client.list_objects_v2.return_value = {
+        'Contents': [
+            {'Key': 'recipes/1/thumbnail.jpg'},
+            {'Key': 'recipes/1/manual_01.jpg'},
+            {'Key': 'recipes/1/manual_02.jpg'},
+        ]
+    }
+    s3_helper.s3_client.delete_objects.return_value = {}
+
+    s3_helper.delete_recipe_images(1, keep_keys={'recipes/1/thumbnail.jpg', 'recipes/1/manual_01.jpg'})
+
+    objects = s3_helper.s3_client.delete_objects.call_args[1]['Delete']['Objects']
+    assert objects == [{'Key': 'recipes/1/manual_02.jpg'}]
+
+
+def test_delete_keys_batches_of_1000(s3_helper):
+    """delete_objects는 최대 1,000개씩 호출하고 실패한 키 수를 집계"""
+    keys = [f'recipes/{i}/thumbnail.jpg' for i in range(2500)]
+    s3_helper.s3_client.delete_objects.side_effect = [
+        {},
+        {'Errors': [{'Key': 'recipes/1000/thumbnail.jpg', 'Code': 'AccessDenied'}]},
+        {},
+    ]
+
+    deleted, failed = s3_helper.delete_keys(keys)
+
+    batch_sizes = [
+        len(call[1]['Delete']['Objects'])
+        for call in s3_helper.s3_client.delete_objects.call_args_list
+    ]
+    assert batch_sizes == [1000, 1000, 500]
+    assert (deleted, failed) == (2499, 1)
+
+
+@pytest.mark.asyncio
+async def test_schedule_recipe_cleanup_runs_in_background(s3_helper):
+    """예약된 레시피를 묶어서 한 번에 정리하고 진행 상황을 보고"""
+    s3_helper.s3_client.list_objects_v2.side_effect = lambda **kwargs: {
+        'Contents': [
+            {'Key': f"{kwargs['Prefix']}thumbnail.jpg"},
+            {'Key': f"{kwargs['Prefix']}manual_01.jpg"},
+        ]
+    }
+    s3_helper.s3_client.delete_objects.return_value = {}
+
+    s3_helper.schedule_recipe_cleanup(1, keep_keys=['recipes/1/thumbnail.jpg'])
+    s3_helper.schedule_recipe_cleanup(2)
+    progress = await s3_helper.wait_for_cleanup()
+
+    assert progress == {
+        'queued_recipes': 2,
+        'cleaned_recipes': 2,
+        'deleted_objects': 3,
+        'failed_objects': 0,
+    }
+    # 두 레시피의 키를 한 번의 delete_objects로 삭제
+    s3_helper.s3_client.delete_objects.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_upload_skips_existing_object(s3_helper):
+    """같은 내용의 객체가 이미 있으면 다시 업로드하지 않고 같은 URL 사용"""
+    s3_helper.s3_client.head_object.side_effect = None
+    s3_helper.s3_client.head_object.return_value = {}
+
+    mock_response = MagicMock()
+    mock_response.content = b"shared_image"
+    mock_response.raise_for_status = MagicMock()
+
+    with patch('httpx.AsyncClient') as mock_client:
+        mock_stream(mock_client, mock_response.content)
+
+        first = await s3_helper.upload_image_from_url("https://example.com/a.jpg", 1, 1)
+        second = await s3_helper.upload_image_from_url("https://example.com/b.jpg", 2, 3)
+
+    assert first == second
+    s3_helper.s3_client.put_object.assert_not_called()
+    # 재사용한 객체는 제자리 복사로 LastModified를 갱신하여 GC grace period 안에 둠
+    copies = s3_helper.s3_client.copy_object.call_args_list
+    assert len(copies) == 2
+    key = s3_helper.key_from_url(first)
+    assert copies[0][1]['Key'] == key
+    assert copies[0][1]['CopySource'] == {'Bucket': 'test-bucket', 'Key': key}
+    assert copies[0][1]['MetadataDirective'] == 'REPLACE'
+    assert copies[0][1]['CacheControl'] == 'public, max-age=31536000, immutable'
+
+
+def test_collect_skips_object_reused_after_long_unreferenced(s3_helper):
+    """오래 미참조였던 객체도 재사용 시 갱신된 LastModified 때문에 GC에서 제외"""
+    from datetime import datetime, timedelta, timezone
+
+    now = datetime(2026, 1, 10, tzinfo=timezone.utc)
+    key = 'recipes/objects/aaa.jpg'
+    s3_helper.s3_client.head_object.side_effect = None
+    touched = {}
+    s3_helper.s3_client.copy_object.side_effect = lambda **kwargs: touched.update({kwargs['Key']: now})
+
+    assert s3_helper.put_object_if_absent(key, b"data", 'image/jpeg') is False
+
+    s3_helper.s3_client.list_objects_v2.return_value = {
+        'Contents': [{'Key': key, 'LastModified': touched.get(key, now - timedelta(days=30))}]
+    }
+    stats = s3_helper.collect_unreferenced_objects({}, grace_period=timedelta(days=1), now=now)
+
+    assert stats['deleted'] == 0
+    s3_helper.s3_client.delete_objects.assert_not_called()
+
+
+def test_collect_unreferenced_objects(s3_helper):
+    """참조 수가 0이고 grace period가 지난 객체만 삭제"""
+    from datetime import datetime, timedelta, timezone
+
+    now = datetime(2026, 1, 10, tzinfo=timezone.utc)
+    old = now - timedelta(days=3)
+    s3_helper.s3_client.list_objects_v2.return_value = {
+        'Contents': [
+            {'Key': 'recipes/objects/aaa.jpg', 'LastModified': old},  # 참조 중
+            {'Key': 'recipes/objects/bbb.jpg', 'LastModified': old},  # 미참조 → 삭제
+            {'Key': 'recipes/objects/ccc.jpg', 'LastModified': now},  # 방금 업로드 → 유지
+        ]
+    }
+    s3_helper.s3_client.delete_objects.return_value = {}
+
+    stats = s3_helper.collect_unreferenced_objects(
+        {'recipes/objects/aaa.jpg': 2}, grace_period=timedelta(days=1), now=now
+    )
+
+    assert stats == {'scanned': 3, 'referenced': 1, 'deleted': 1, 'failed': 0}
+    objects = s3_helper.s3_client.delete_objects.call_args[1]['Delete']['Objects']
+    assert objects == [{'Key': 'recipes/objects/bbb.jpg'}]
+    assert s3_helper.s3_client.list_objects_v2.call_args[1]['Prefix'] == 'recipes/objects/'
+
+
+@pytest.mark.asyncio
+async def test_upload_thumbnail_with_variants(s3_helper):
+    """원본과 너비별 WebP 변형을 원본 키 옆에 업로드"""
+    mock_response = MagicMock()
+    mock_response.content = b"original_image"
+    mock_response.raise_for_status = MagicMock()
+    rendered = {160: b"w160", 320: b"w320", 640: b"w640"}
+
+    with patch('httpx.AsyncClient') as mock_client, \
+            patch('app.utils.s3_helper.thumbnail_renderer.render', AsyncMock(return_value=rendered)):
+        mock_stream(mock_client, mock_response.content)
+
+        url, variants = await s3_helper.upload_thumbnail_with_variants("https://example.com/a.jpg", 1)
+
+    original_key = s3_helper.content_key(b"original_image", "jpg")
+    stem = original_key[:-len(".jpg")]
+    assert url.endswith(original_key)
+    assert variants == {
+        str(width): s3_helper.object_url(f"{stem}.w{width}.webp") for width in (160, 320, 640)
+    }
+    put_calls = {call[1]['Key']: call[1] for call in s3_helper.s3_client.put_object.call_args_list}
+    assert put_calls[f"{stem}.w320.webp"]['ContentType'] == 'image/webp'
+    assert put_calls[f"{stem}.w320.webp"]['Body'] == b"w320"
+
+
+@pytest.mark.asyncio
+async def test_upload_thumbnail_variants_failure_keeps_original(s3_helper):
+    """변형 생성에 실패해도 원본 썸네일 URL은 반환"""
+    mock_response = MagicMock()
+    mock_response.content = b"not_an_image"
+    mock_response.raise_for_status = MagicMock()
+
+    with patch('httpx.AsyncClient') as mock_client, \
+            patch('app.utils.s3_helper.thumbnail_renderer.render',
+                  AsyncMock(side_effect=OSError("cannot identify image file"))):
+        mock_stream(mock_client, mock_response.content)
+
+        url, variants = await s3_helper.upload_thumbnail_with_variants("https://example.com/a.jpg", 1)
+
+    assert url.endswith(s3_helper.content_key(b"not_an_image", "jpg"))
+    assert variants == {}
+
+
+@pytest.mark.asyncio
+async def test_content_type_sniffed_from_magic_bytes(s3_helper):
+    """URL 확장자가 아니라 파일 앞부분으로 Content-Type 결정"""
+    png_data = b"\x89PNG\r\n\x1a\n" + b"rest_of_png"
+
+    with patch('httpx.AsyncClient') as mock_client:
+        mock_stream(mock_client, png_data)
+
+        result = await s3_helper.upload_image_from_url("https://example.com/step.jpg?type=w", 1, 1)
+
+    call_args = s3_helper.s3_client.put_object.call_args
+    assert call_args[1]['ContentType'] == 'image/png'
+    assert result.endswith(s3_helper.content_key(png_data, "png"))
+
+
+@pytest.mark.asyncio
+async def test_large_image_streamed_as_multipart(s3_helper):
+    """part 크기를 넘는 이미지는 multipart로 올리고 최종 키로 복사"""
+    from app.utils.s3_helper import MULTIPART_PART_SIZE
+
+    data = b"\xff\xd8\xff" + b"x" * (MULTIPART_PART_SIZE * 2 + 100)
+    client = s3_helper.s3_client
+    client.create_multipart_upload.return_value = {'UploadId': 'upload-1'}
+    client.upload_part.side_effect = lambda **kwargs: {'ETag': f"etag-{kwargs['PartNumber']}"}
+
+    with patch('httpx.AsyncClient') as mock_client:
+        mock_stream(mock_client, data, chunk_size=256 * 1024)
+
+        result = await s3_helper.upload_image_from_url("https://example.com/big", 1, 1)
+
+    final_key = s3_helper.content_key(data, "jpg")
+    assert result.endswith(final_key)
+    # 5 MiB, 5 MiB, 나머지
+    assert [len(call[1]['Body']) for call in client.upload_part.call_args_list] == [
+        MULTIPART_PART_SIZE, MULTIPART_PART_SIZE, len(data) - 2 * MULTIPART_PART_SIZE
+    ]
+    parts = client.complete_multipart_upload.call_args[1]['MultipartUpload']['Parts']
+    assert [part['PartNumber'] for part in parts] == [1, 2, 3]
+
+    staging_key = client.create_multipart_upload.call_args[1]['Key']
+    assert staging_key.startswith("recipes/staging/")
+    copy_kwargs = client.copy_object.call_args[1]
+    assert copy_kwargs['Key'] == final_key
+    assert copy_kwargs['CopySource'] == {'Bucket': 'test-bucket', 'Key': staging_key}
+    assert copy_kwargs['CacheControl'] == 'public, max-age=31536000, immutable'
+    client.delete_object.assert_called_once_with(Bucket='test-bucket', Key=staging_key)
+    client.put_object.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_multipart_aborted_on_stream_error(s3_helper):
+    """스트리밍 도중 실패하면 multipart 업로드를 취소"""
+    from app.utils.s3_helper import MULTIPART_PART_SIZE
+
+    client = s3_helper.s3_client
+    client.create_multipart_upload.return_value = {'UploadId': 'upload-1'}
+    client.upload_part.return_value = {'ETag': 'etag'}
+
+    async def broken_stream(_chunk_size=None):
+        yield b"x" * MULTIPART_PART_SIZE
+        raise ConnectionError("connection reset")
+
+    with patch('httpx.AsyncClient') as mock_client:
+        stream = mock_stream(mock_client)
+        stream.return_value.__aenter__.return_value.aiter_bytes = broken_stream
+
+        result = await s3_helper.upload_image_from_url("https://example.com/big.jpg", 1, 1)
+
+    assert result is None
+    client.abort_multipart_upload.assert_called_once()
+    client.complete_multipart_upload.assert_not_called()